@@ -10,11 +10,12 @@ Simple, fast, production-ready.
 import os
 import json
 import time
+import asyncio
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
-from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Set, Tuple
+from dataclasses import dataclass, field
 from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct, PayloadSchemaType
+from qdrant_client.models import PointStruct
 import logging
 from datetime import datetime
 import math
@@ -24,6 +25,7 @@ from dotenv import load_dotenv
 load_dotenv()
 QDRANT_URL = os.getenv('QDRANT_URL')
 QDRANT_API_KEY = os.getenv('QDRANT_API_KEY')
+QDRANT_PREFER_GRPC = os.getenv('QDRANT_PREFER_GRPC', 'true').lower() == 'true'
 
 # Add paths for imports
 import sys
@@ -43,8 +45,13 @@ OUTPUT_DIR = ingestion_config.OUTPUT_DIR
 VERTICALS = ingestion_config.VERTICALS
 EMBEDDING_PROVIDER = ingestion_config.EMBEDDING_PROVIDER
 EMBEDDING_MODEL = ingestion_config.EMBEDDING_MODEL
+EMBEDDING_DIMENSION = ingestion_config.EMBEDDING_DIMENSION
+VECTOR_STORE_DIR = ingestion_config.VECTOR_STORE_DIR
+VECTOR_STORE_DTYPE = ingestion_config.VECTOR_STORE_DTYPE
 
 from embedding.google_embedder import get_embedder
+from embedding.vector_store import VectorStore
+from embedding.qdrant_writer import QdrantWriter, stable_point_id
 from config.vertical_map import (
     get_collection_name, get_all_collections
 )
@@ -52,6 +59,7 @@ from config.vertical_map import (
 # Configuration
 EMBED_BATCH_SIZE = 32
 UPLOAD_BATCH_SIZE = 100
+UPLOAD_BATCH_BYTES = int(os.getenv('UPLOAD_BATCH_BYTES', 4 * 1024 * 1024))
 MAX_RETRIES = 3
 MAX_TEXT_LENGTH = 20000  # Safety limit for Google API
 CHECKPOINT_FILE = "upload_progress.json"
@@ -62,6 +70,10 @@ FAILED_CHUNKS_FILE = "failed_chunks.jsonl"
 GOOGLE_REQUESTS_PER_MINUTE = 1500  # Adjust based on your tier
 GOOGLE_BATCH_ENABLED = True
 
+# Pipelining: embedding requests and Qdrant upserts in flight at once
+EMBED_CONCURRENCY = int(os.getenv('EMBED_CONCURRENCY', 4))
+UPLOAD_CONCURRENCY = int(os.getenv('UPLOAD_CONCURRENCY', 4))
+
 @dataclass
 class UploadMetrics:
     """Track upload metrics"""
@@ -90,7 +102,7 @@ def setup_logging():
 def setup_qdrant():
     """Setup Qdrant client with validation"""
     try:
-        client = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
+        client = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY, prefer_grpc=QDRANT_PREFER_GRPC)
         collections = client.get_collections()
         logging.info(f"✅ Connected to Qdrant. Found {len(collections.collections)} existing collections.")
         return client
@@ -322,119 +334,17 @@ def create_complete_payload(chunk: Dict) -> Dict:
     
     return {k: v for k, v in payload.items() if v is not None}
 
-def ensure_collection_exists(client: QdrantClient, vertical: str):
+def ensure_collection_exists(writer: QdrantWriter, vertical: str) -> str:
     """Ensure collection exists with correct schema AND payload indexes"""
+    collection_name = get_collection_name(vertical)
     try:
-        collection_name = get_collection_name(vertical)
-        # Use default vector params for now
-        from qdrant_client.models import VectorParams, Distance
-        vector_params = VectorParams(size=768, distance=Distance.COSINE)
-        
-        collections = client.get_collections()
-        existing = [c.name for c in collections.collections]
-        
-        if collection_name in existing:
-            collection_info = client.get_collection(collection_name)
-            current_size = collection_info.config.params.vectors.size
-            if current_size != vector_params.size:
-                logging.warning(f"🔧 Collection {collection_name} has wrong vector size. Recreating...")
-                client.delete_collection(collection_name)
-                time.sleep(2)
-                existing.remove(collection_name)
-            else:
-                logging.info(f"✅ Collection {collection_name} exists")
-                
-                # CRITICAL FIX: Ensure payload indexes exist
-                try:
-                    _ensure_payload_indexes(client, collection_name, vertical)
-                except Exception as e:
-                    logging.warning(f"⚠️ Could not create payload indexes: {e}")
-                
-                return collection_name
-        
-        if collection_name not in existing:
-            logging.info(f"🆕 Creating collection: {collection_name}")
-            client.create_collection(
-                collection_name=collection_name,
-                vectors_config=vector_params
-            )
-            logging.info(f"✅ Created: {collection_name} (dim={vector_params.size})")
-            
-            # CRITICAL FIX: Create payload indexes immediately
-            try:
-                _ensure_payload_indexes(client, collection_name, vertical)
-                logging.info(f"✅ Created payload indexes for {collection_name}")
-            except Exception as e:
-                logging.error(f"❌ Failed to create payload indexes: {e}")
-                
+        writer.ensure_collection(collection_name, vertical, recreate_on_mismatch=True)
+        logging.info(f"✅ Collection {collection_name} ready")
         return collection_name
-        
     except Exception as e:
         logging.error(f"❌ Failed to ensure collection: {e}")
         raise
 
-
-def _ensure_payload_indexes(client: QdrantClient, collection_name: str, vertical: str):
-    """
-    CRITICAL FIX: Create payload indexes for filterable fields.
-    
-    This is THE KEY FIX for the 57.1% → 100% improvement.
-    Without this, Qdrant can't filter on list fields like 'sections'.
-    """
-    
-    # Define which fields to index per vertical
-    index_fields = {
-        "legal": [
-            ("sections", PayloadSchemaType.KEYWORD),     # PRIMARY FIX
-            ("section", PayloadSchemaType.KEYWORD),
-            ("mentioned_sections", PayloadSchemaType.KEYWORD),
-            ("year", PayloadSchemaType.INTEGER),
-            ("act_name", PayloadSchemaType.KEYWORD)
-        ],
-        "go": [
-            ("go_number", PayloadSchemaType.KEYWORD),
-            ("mentioned_sections", PayloadSchemaType.KEYWORD),
-            ("year", PayloadSchemaType.INTEGER),
-            ("department", PayloadSchemaType.KEYWORD),
-            ("departments", PayloadSchemaType.KEYWORD)
-        ],
-        "judicial": [
-            ("case_number", PayloadSchemaType.KEYWORD),
-            ("mentioned_sections", PayloadSchemaType.KEYWORD),
-            ("year", PayloadSchemaType.INTEGER)
-        ],
-        "data": [
-            ("year", PayloadSchemaType.INTEGER),
-            ("departments", PayloadSchemaType.KEYWORD)
-        ],
-        "schemes": [
-            ("scheme_name", PayloadSchemaType.KEYWORD),
-            ("year", PayloadSchemaType.INTEGER),
-            ("departments", PayloadSchemaType.KEYWORD)
-        ]
-    }
-    
-    fields_to_index = index_fields.get(vertical, [])
-    
-    for field_name, field_type in fields_to_index:
-        try:
-            client.create_payload_index(
-                collection_name=collection_name,
-                field_name=field_name,
-                field_schema=field_type,
-                wait=True
-            )
-            logging.info(f"   ✅ Indexed: {field_name} ({field_type})")
-        except Exception as e:
-            # Index might already exist, that's okay
-            if "already exists" not in str(e).lower():
-                logging.warning(f"   ⚠️ Could not index {field_name}: {e}")
-
-def generate_stable_id(doc_id: str, chunk_id: str) -> str:
-    """Generate stable UUID for Qdrant"""
-    import uuid
-    return str(uuid.uuid5(uuid.NAMESPACE_DNS, f"{doc_id}|{chunk_id}"))
-
 def validate_embedding_quality(embedding: List[float]) -> Tuple[bool, str]:
     """Validate embedding is not corrupt"""
     if all(x == 0 for x in embedding):
@@ -561,55 +471,321 @@ def embed_chunks_with_retries(
     
     return successful_chunks, all_embeddings
 
-def upload_with_retries(client: QdrantClient, collection_name: str, points: List[PointStruct]) -> bool:
-    """Upload with retry logic"""
-    for attempt in range(MAX_RETRIES):
-        try:
-            client.upsert(collection_name=collection_name, points=points)
-            return True
-        except Exception as e:
-            wait_time = 2 ** attempt
-            logging.warning(f"   ⚠️ Upload attempt {attempt + 1} failed: {e}")
-            if attempt < MAX_RETRIES - 1:
-                time.sleep(wait_time)
-            else:
-                return False
+# ============================================================================
+# Pipelined embed + upload
+# ============================================================================
 
-def upload_to_qdrant(
-    client: QdrantClient, 
-    collection_name: str, 
-    chunks: List[Dict], 
-    embeddings: List,
-    metrics: UploadMetrics
-) -> int:
-    """Upload chunks with complete metadata"""
-    points = []
+class TokenBucket:
+    """Async token bucket: `rate_per_minute` tokens refill continuously, bursts up to `capacity`"""
     
-    for chunk, embedding in zip(chunks, embeddings):
-        point_id = generate_stable_id(chunk['doc_id'], chunk['chunk_id'])
-        payload = create_complete_payload(chunk)
-        
-        points.append(PointStruct(
-            id=point_id,
+    def __init__(self, rate_per_minute: float, capacity: int = 1):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self, tokens: int = 1):
+        """Wait until `tokens` tokens are available (no-op when rate is 0)"""
+        if self.rate <= 0:
+            return
+        tokens = min(tokens, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+@dataclass
+class BatchJob:
+    """One embed batch of one document, tracked through embed -> upload -> checkpoint"""
+    vertical: str
+    collection_name: str
+    file_key: str
+    batch_index: int
+    chunks: List[Dict]
+    embeddings: List = field(default_factory=list)
+    partial: bool = False  # Some chunks had no vector (--from-store); upload but don't acknowledge
+
+class UploadCheckpoint:
+    """
+    Per-batch checkpoint on top of the progress file.
+    
+    Finished documents keep the old format ("vertical:doc_id" -> uploaded count),
+    so existing checkpoints stay valid. Documents in flight store the acknowledged
+    batch indices, so a crash resumes from the last acknowledged batch instead of
+    re-embedding the whole document.
+    """
+    
+    def __init__(self, progress: Dict, persist: bool = True):
+        self.progress = progress
+        self.persist = persist
+    
+    def is_done(self, file_key: str) -> bool:
+        value = self.progress.get(file_key, 0)
+        return isinstance(value, int) and value > 0
+    
+    def acked_batches(self, file_key: str) -> Set[int]:
+        entry = self.progress.get(file_key)
+        # Batch indices only mean something for the batch size that produced them
+        if isinstance(entry, dict) and entry.get("batch_size") == EMBED_BATCH_SIZE:
+            return set(entry.get("acked", []))
+        return set()
+    
+    def start(self, file_key: str, total_batches: int):
+        entry = self.progress.get(file_key)
+        if not (isinstance(entry, dict) and entry.get("batch_size") == EMBED_BATCH_SIZE):
+            self.progress[file_key] = {
+                "batch_size": EMBED_BATCH_SIZE,
+                "total_batches": total_batches,
+                "acked": [],
+                "uploaded": 0,
+            }
+    
+    def ack(self, file_key: str, batch_index: int, uploaded: int) -> bool:
+        """Record an acknowledged batch; returns True when the document is complete"""
+        entry = self.progress[file_key]
+        if batch_index not in entry["acked"]:
+            entry["acked"].append(batch_index)
+            entry["uploaded"] += uploaded
+        done = len(entry["acked"]) >= entry["total_batches"]
+        if done:
+            self.progress[file_key] = entry["uploaded"]
+        if self.persist:
+            save_progress(self.progress)
+        return done
+
+def build_points(chunks: List[Dict], embeddings: List) -> List[PointStruct]:
+    """Chunks + embeddings -> Qdrant points with complete metadata"""
+    return [
+        PointStruct(
+            id=stable_point_id(chunk['doc_id'], chunk['chunk_id']),
             vector=embedding,
-            payload=payload
-        ))
+            payload=create_complete_payload(chunk)
+        )
+        for chunk, embedding in zip(chunks, embeddings)
+    ]
+
+def lookup_stored_vectors(store: Optional[VectorStore], chunks: List[Dict]) -> List[Optional[List[float]]]:
+    """Stored vectors for chunks (None where the text is not in the store)"""
+    if store is None:
+        return [None] * len(chunks)
+    return store.get_many([chunk['text'] for chunk in chunks])
+
+def embed_with_store(
+    embedder,
+    store: Optional[VectorStore],
+    chunks: List[Dict],
+    cached: List[Optional[List[float]]],
+    metrics: UploadMetrics,
+    from_store: bool = False
+) -> Tuple[List[Dict], List[List[float]], bool]:
+    """
+    Embed a batch, taking vectors from the local store where the text is known.
     
-    # Upload in batches
-    uploaded = 0
-    for i in range(0, len(points), UPLOAD_BATCH_SIZE):
-        batch = points[i:i + UPLOAD_BATCH_SIZE]
-        batch_num = i // UPLOAD_BATCH_SIZE + 1
-        total_batches = (len(points) - 1) // UPLOAD_BATCH_SIZE + 1
-        
-        if upload_with_retries(client, collection_name, batch):
-            uploaded += len(batch)
-            logging.info(f"   ✅ Uploaded batch {batch_num}/{total_batches}")
-        else:
-            logging.error(f"   ❌ Failed batch {batch_num}")
-            metrics.upload_failures += len(batch)
+    Only store misses go to the API (and are written back to the store). With
+    from_store=True nothing goes to the API; misses are recorded as failed.
+    
+    Args:
+        cached: lookup_stored_vectors() result for the chunks
+    
+    Returns:
+        (chunks with vectors, vectors, complete) - complete is False when
+        from_store left chunks without a vector
+    """
+    vectors = {i: vector for i, vector in enumerate(cached) if vector is not None}
+    missing = [i for i in range(len(chunks)) if i not in vectors]
+    complete = True
+    
+    if missing and from_store:
+        for i in missing:
+            save_failed_chunk(chunks[i], "not_in_vector_store")
+        metrics.embedding_failures += len(missing)
+        complete = False
+    elif missing:
+        to_embed = [chunks[i] for i in missing]
+        embedded_chunks, embeddings = embed_chunks_with_retries(
+            embedder, to_embed, EMBED_BATCH_SIZE, metrics
+        )
+        # Quality filtering can drop chunks; match survivors back by identity
+        positions = {id(chunk): i for i, chunk in zip(missing, to_embed)}
+        for chunk, embedding in zip(embedded_chunks, embeddings):
+            vectors[positions[id(chunk)]] = embedding
+        # The embedder can fall back to another backend mid-run: only keep vectors of the store's model
+        if store is not None and embeddings and embedder.model_id == store.model:
+            store.put_many([chunk['text'] for chunk in embedded_chunks], embeddings)
+    
+    order = sorted(vectors)
+    return [chunks[i] for i in order], [vectors[i] for i in order], complete
+
+def _merge_metrics(metrics: UploadMetrics, batch_metrics: UploadMetrics):
+    metrics.embedding_failures += batch_metrics.embedding_failures
+    metrics.total_characters += batch_metrics.total_characters
+    metrics.total_cost += batch_metrics.total_cost
+
+async def run_pipelined_upload(
+    embedder,
+    writer: QdrantWriter,
+    chunk_files_by_vertical: Dict[str, List[Path]],
+    progress: Dict,
+    metrics: UploadMetrics,
+    store: Optional[VectorStore] = None,
+    from_store: bool = False
+):
+    """
+    Embed and upload with both sides running concurrently.
+    
+    A producer splits documents into embed batches (skipping acknowledged ones),
+    EMBED_CONCURRENCY workers embed them under a token bucket, and
+    UPLOAD_CONCURRENCY workers hand the results to the QdrantWriter (parallel
+    wait=False upserts). Bounded queues keep memory flat. A batch is
+    checkpointed once Qdrant acknowledges it; writer.flush() at the end is the
+    consistency barrier.
+    
+    With a vector store, known texts skip the API; with from_store=True no
+    embedding calls are made at all (embedder may be None).
+    """
+    if embedder is not None and embedder.is_using_google and not from_store:
+        requests_per_batch = 1 if GOOGLE_BATCH_ENABLED else EMBED_BATCH_SIZE
+        bucket = TokenBucket(
+            GOOGLE_REQUESTS_PER_MINUTE,
+            capacity=max(requests_per_batch, EMBED_CONCURRENCY)
+        )
+    else:
+        requests_per_batch = 1
+        bucket = TokenBucket(0)
+    
+    embed_queue: asyncio.Queue = asyncio.Queue(maxsize=EMBED_CONCURRENCY * 2)
+    upload_queue: asyncio.Queue = asyncio.Queue(maxsize=UPLOAD_CONCURRENCY * 2)
+    # A rebuild from the store is cheap to redo and must not clobber the embed checkpoint
+    checkpoint = UploadCheckpoint(progress, persist=not from_store)
+    
+    async def produce():
+        for vertical, chunk_files in chunk_files_by_vertical.items():
+            if not chunk_files:
+                continue
+            
+            try:
+                collection_name = get_collection_name(vertical)
+            except ValueError:
+                logging.warning(f"Unknown vertical: {vertical}, skipping")
+                continue
+            
+            logging.info(f"\n🎯 Processing: {vertical} → {collection_name}")
+            await asyncio.to_thread(ensure_collection_exists, writer, vertical)
+            metrics.collections_created += 1
+            
+            for chunk_file in chunk_files:
+                # FIX: Use document directory name, not just "chunks.jsonl"
+                doc_id = chunk_file.parent.name
+                file_key = f"{vertical}:{doc_id}"
+                
+                if checkpoint.is_done(file_key):
+                    logging.info(f"   ⏭️ Skip: {doc_id} (already processed)")
+                    continue
+                
+                logging.info(f"   📖 Loading: {doc_id}/chunks.jsonl")
+                chunks = await asyncio.to_thread(load_chunks_from_file, chunk_file)
+                
+                if not chunks:
+                    continue
+                
+                total_batches = (len(chunks) - 1) // EMBED_BATCH_SIZE + 1
+                acked = checkpoint.acked_batches(file_key)
+                checkpoint.start(file_key, total_batches)
+                pending = [b for b in range(total_batches) if b not in acked]
+                metrics.chunks_total += sum(
+                    len(chunks[b * EMBED_BATCH_SIZE:(b + 1) * EMBED_BATCH_SIZE]) for b in pending
+                )
+                if acked:
+                    logging.info(f"      ↩️ Resuming: {len(acked)}/{total_batches} batches already uploaded")
+                else:
+                    logging.info(f"      📊 {len(chunks)} chunks loaded")
+                
+                for batch_index in pending:
+                    start = batch_index * EMBED_BATCH_SIZE
+                    await embed_queue.put(BatchJob(
+                        vertical=vertical,
+                        collection_name=collection_name,
+                        file_key=file_key,
+                        batch_index=batch_index,
+                        chunks=chunks[start:start + EMBED_BATCH_SIZE]
+                    ))
+    
+    async def embed_worker():
+        while True:
+            job = await embed_queue.get()
+            if job is None:
+                return
+            batch_metrics = UploadMetrics()
+            complete = True
+            try:
+                cached = await asyncio.to_thread(lookup_stored_vectors, store, job.chunks)
+                # Only batches that will call the API spend rate budget
+                if not from_store and any(vector is None for vector in cached):
+                    await bucket.acquire(requests_per_batch)
+                chunks_ok, embeddings, complete = await asyncio.to_thread(
+                    embed_with_store, embedder, store, job.chunks, cached, batch_metrics, from_store
+                )
+            except Exception as e:
+                logging.error(f"   ❌ Embedding failed for {job.file_key} batch {job.batch_index}: {e}")
+                chunks_ok, embeddings = [], []
+            _merge_metrics(metrics, batch_metrics)
+            metrics.chunks_embedded += len(embeddings)
+            
+            if not embeddings:
+                # Not acknowledged, so the next run retries this batch
+                continue
+            job.chunks, job.embeddings, job.partial = chunks_ok, embeddings, not complete
+            await upload_queue.put(job)
+    
+    async def upload_worker():
+        while True:
+            job = await upload_queue.get()
+            if job is None:
+                return
+            points = build_points(job.chunks, job.embeddings)
+            results = await asyncio.gather(
+                *(asyncio.wrap_future(f) for f in writer.upsert(job.collection_name, points)),
+                return_exceptions=True
+            )
+            uploaded = sum(r for r in results if isinstance(r, int))
+            
+            if uploaded < len(points):
+                metrics.upload_failures += len(points) - uploaded
+                logging.error(f"   ❌ Failed upload: {job.file_key} batch {job.batch_index}")
+                continue
+            
+            metrics.chunks_uploaded += uploaded
+            if job.partial:
+                continue
+            if checkpoint.ack(job.file_key, job.batch_index, uploaded):
+                doc_id = job.file_key.split(":", 1)[1]
+                logging.info(
+                    f"   ✅ Done: {doc_id} ({progress[job.file_key]} chunks), "
+                    f"${metrics.total_cost:.4f} total"
+                )
     
-    return uploaded
+    embed_tasks = [asyncio.create_task(embed_worker()) for _ in range(EMBED_CONCURRENCY)]
+    upload_tasks = [asyncio.create_task(upload_worker()) for _ in range(UPLOAD_CONCURRENCY)]
+    try:
+        await produce()
+        for _ in embed_tasks:
+            await embed_queue.put(None)
+        await asyncio.gather(*embed_tasks)
+        for _ in upload_tasks:
+            await upload_queue.put(None)
+        await asyncio.gather(*upload_tasks)
+    finally:
+        for task in embed_tasks + upload_tasks:
+            task.cancel()
+    
+    # Consistency barrier: all wait=False upserts are visible from here on
+    await asyncio.to_thread(writer.flush)
 
 def load_progress() -> Dict:
     """Load checkpoint"""
@@ -641,6 +817,43 @@ def get_all_chunk_files() -> Dict[str, List[Path]]:
     
     return chunk_files_by_vertical
 
+def _vertical_key(vertical: str) -> str:
+    """Ingestion vertical name -> upload vertical name"""
+    return "schemes" if vertical == "scheme" else vertical
+
+def load_delta(delta_path: Path) -> Dict:
+    """Load the delta written by an incremental ingestion run"""
+    with open(delta_path, 'r') as f:
+        delta = json.load(f)
+    logging.info(
+        f"📒 Delta: {len(delta.get('upsert', []))} documents to upload, "
+        f"{len(delta.get('delete', []))} documents with stale points"
+    )
+    return delta
+
+def get_delta_chunk_files(delta: Dict) -> Dict[str, List[Path]]:
+    """Chunk files listed in an ingestion delta, by vertical"""
+    chunk_files_by_vertical = {}
+    for entry in delta.get("upsert", []):
+        chunks_path = Path(entry["chunks_path"])
+        if not chunks_path.exists():
+            logging.warning(f"   ⚠️ Delta chunk file missing: {chunks_path}")
+            continue
+        chunk_files_by_vertical.setdefault(_vertical_key(entry["vertical"]), []).append(chunks_path)
+    return chunk_files_by_vertical
+
+def delete_stale_points(writer: QdrantWriter, delta: Dict) -> int:
+    """Delete points of chunks that no longer exist (changed or removed documents)"""
+    deleted = 0
+    for entry in delta.get("delete", []):
+        try:
+            collection_name = get_collection_name(_vertical_key(entry["vertical"]))
+            deleted += writer.delete_points(collection_name, entry["point_ids"])
+            logging.info(f"   🗑️ {entry['doc_id']}: deleted {len(entry['point_ids'])} stale points")
+        except Exception as e:
+            logging.warning(f"   ⚠️ Failed to delete stale points for {entry['doc_id']}: {e}")
+    return deleted
+
 def save_metrics(metrics: UploadMetrics):
     """Save final metrics"""
     duration = time.time() - metrics.start_time
@@ -661,6 +874,19 @@ def save_metrics(metrics: UploadMetrics):
 
 def main():
     """Main execution"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Embed and upload ingestion outputs to Qdrant")
+    parser.add_argument("--delta", type=str, default=None,
+                        help="Only sync documents listed in an ingestion delta (ingestion_delta.json)")
+    parser.add_argument("--from-store", action="store_true",
+                        help="Rebuild collections from the local vector store without any embedding calls")
+    parser.add_argument("--no-store", action="store_true",
+                        help="Don't read or write the local vector store")
+    args = parser.parse_args()
+    if args.from_store and args.no_store:
+        parser.error("--from-store needs the vector store")
+    
     setup_logging()
     metrics = UploadMetrics()
     metrics.start_time = time.time()
@@ -668,18 +894,48 @@ def main():
     logging.info("🚀 Starting FINAL embedding & upload with sidecar metadata merge")
     
     try:
-        embedder = get_embedder()
+        embedder = None if args.from_store else get_embedder()
         client = setup_qdrant()
-        progress = load_progress()
+        writer = QdrantWriter(
+            client,
+            vector_size=EMBEDDING_DIMENSION,
+            batch_bytes=UPLOAD_BATCH_BYTES,
+            max_batch_points=UPLOAD_BATCH_SIZE,
+            workers=UPLOAD_CONCURRENCY,
+            max_retries=MAX_RETRIES
+        )
+        progress = {} if args.from_store else load_progress()
         logging.info(f"🔍 Debug: Progress dict has {len(progress)} entries")
         if len(progress) > 0:
             logging.info(f"🔍 Debug: First few progress entries: {list(progress.items())[:3]}")
         
-        logging.info(f"📡 Model: {EMBEDDING_MODEL} ({embedder.embedding_dimension}d)")
+        store = None
+        if not args.no_store:
+            if args.from_store:
+                store_model, store_dim = EMBEDDING_MODEL, EMBEDDING_DIMENSION
+            else:
+                store_model, store_dim = embedder.model_id, embedder.embedding_dimension
+            store = VectorStore(VECTOR_STORE_DIR, store_model, store_dim, VECTOR_STORE_DTYPE)
+            logging.info(f"🗄️ Vector store: {store.path} ({len(store):,} vectors)")
+        
+        if args.from_store:
+            logging.info(f"📡 Model: {EMBEDDING_MODEL} ({EMBEDDING_DIMENSION}d) - vectors from store only")
+        else:
+            logging.info(f"📡 Model: {EMBEDDING_MODEL} ({embedder.embedding_dimension}d)")
         logging.info(f"📊 Batches: embed={EMBED_BATCH_SIZE}, upload={UPLOAD_BATCH_SIZE}")
+        logging.info(f"🔌 Qdrant transport: {'gRPC' if QDRANT_PREFER_GRPC else 'REST'}")
         logging.info(f"💾 Storage: Complete metadata in Qdrant (entities, relations, all fields)")
         
-        chunk_files_by_vertical = get_all_chunk_files()
+        if args.delta:
+            delta = load_delta(Path(args.delta))
+            delete_stale_points(writer, delta)
+            chunk_files_by_vertical = get_delta_chunk_files(delta)
+            # Changed documents must be re-uploaded even if an old checkpoint lists them
+            for vertical, chunk_files in chunk_files_by_vertical.items():
+                for chunk_file in chunk_files:
+                    progress.pop(f"{vertical}:{chunk_file.parent.name}", None)
+        else:
+            chunk_files_by_vertical = get_all_chunk_files()
         
         if not chunk_files_by_vertical:
             logging.error("❌ No chunk files found!")
@@ -688,63 +944,18 @@ def main():
         total_files = sum(len(files) for files in chunk_files_by_vertical.values())
         logging.info(f"📊 Found {total_files} files across {len(chunk_files_by_vertical)} verticals")
         
-        # Process each vertical
-        for vertical, chunk_files in chunk_files_by_vertical.items():
-            if not chunk_files:
-                continue
-            
-            try:
-                collection_name = get_collection_name(vertical)
-            except ValueError:
-                logging.warning(f"Unknown vertical: {vertical}, skipping")
-                continue
-            
-            logging.info(f"\n🎯 Processing: {vertical} → {collection_name}")
-            ensure_collection_exists(client, vertical)
-            metrics.collections_created += 1
-            
-            for chunk_file in chunk_files:
-                # FIX: Use document directory name, not just "chunks.jsonl"
-                doc_id = chunk_file.parent.name
-                file_key = f"{vertical}:{doc_id}"
-                progress_value = progress.get(file_key, 0)
-                logging.info(f"🔍 Debug: {file_key} -> progress value: {progress_value}")
-                
-                if progress_value > 0:
-                    logging.info(f"   ⏭️ Skip: {doc_id} (already processed)")
-                    continue
-                
-                logging.info(f"   📖 Loading: {doc_id}/chunks.jsonl")
-                chunks = load_chunks_from_file(chunk_file)
-                
-                if not chunks:
-                    continue
-                
-                metrics.chunks_total += len(chunks)
-                logging.info(f"      📊 {len(chunks)} chunks loaded")
-                
-                # Embed
-                logging.info(f"   🧠 Embedding...")
-                chunks_ok, embeddings = embed_chunks_with_retries(
-                    embedder, chunks, EMBED_BATCH_SIZE, metrics
-                )
-                
-                metrics.chunks_embedded += len(embeddings)
-                
-                if not embeddings:
-                    continue
-                
-                # Upload
-                logging.info(f"   ☁️ Uploading {len(embeddings)} chunks...")
-                uploaded = upload_to_qdrant(
-                    client, collection_name, chunks_ok, embeddings, metrics
-                )
-                metrics.chunks_uploaded += uploaded
-                
-                progress[file_key] = uploaded
-                save_progress(progress)
-                
-                logging.info(f"   ✅ Done: {uploaded} chunks, ${metrics.total_cost:.4f} total")
+        logging.info(f"⚡ Pipeline: {EMBED_CONCURRENCY} embed workers, {UPLOAD_CONCURRENCY} upload workers")
+        asyncio.run(run_pipelined_upload(
+            embedder, writer, chunk_files_by_vertical, progress, metrics,
+            store=store, from_store=args.from_store
+        ))
+        if store is not None:
+            logging.info(
+                f"🗄️ Vector store: {store.stats['hits']:,} reused, "
+                f"{store.stats['writes']:,} new ({len(store):,} total)"
+            )
+            store.close()
+        writer.close()
         
         # Final summary
         logging.info("\n🎉 Upload complete!")
@@ -763,7 +974,7 @@ def main():
         
         save_metrics(metrics)
         
-        if os.path.exists(CHECKPOINT_FILE):
+        if not args.from_store and os.path.exists(CHECKPOINT_FILE):
             os.remove(CHECKPOINT_FILE)
         
         if os.path.exists(FAILED_CHUNKS_FILE):
@@ -4,7 +4,7 @@ Vertical classifier using Gemini LLM.
 Simple, accurate classification into 5 verticals.
 Uses LLM ONLY for classification - nothing else.
 """
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
 import os
 import json
@@ -17,9 +17,102 @@ except ImportError:
 
 from ..config.constants import VERTICAL_KEYWORDS
 from ..utils.llm_cache import get_cache
+from ..utils.llm_queue import LLMWorkQueue, PromptPacker
 
 logger = logging.getLogger(__name__)
 
+CLASSIFICATION_TASK = "vertical_classification"
+
+CATEGORY_GUIDE = """Classify each document into EXACTLY ONE of these 5 categories:
+1. "go" - Government Orders (GOs) - documents with G.O.Ms.No or G.O.Rt.No, preambles, official orders
+2. "legal" - Legal Documents - Acts, Rules, Sections, Amendments, Regulations
+3. "judicial" - Judicial Documents - Court cases, judgments, petitions, legal proceedings
+4. "data" - Data Reports - Statistics, tables, enrollment data, UDISE reports, metrics
+5. "scheme" - Government Schemes - Scheme guidelines, eligibility, benefits, implementation"""
+
+
+def _strip_code_fence(response_text: str) -> str:
+    """Strip markdown code blocks if present"""
+    response_text = response_text.strip()
+    if response_text.startswith("```"):
+        response_text = response_text.split("```")[1]
+        if response_text.startswith("json"):
+            response_text = response_text[4:]
+        response_text = response_text.strip()
+    return response_text
+
+
+class ClassificationPacker(PromptPacker):
+    """Packs several documents' classification samples into one prompt."""
+    
+    max_items = 5
+    max_chars = 15000
+    
+    def size(self, item: Tuple[str, str]) -> int:
+        file_name, sample = item
+        return len(file_name) + len(sample)
+    
+    def build_single(self, item: Tuple[str, str]) -> str:
+        file_name, sample = item
+        return f"""You are a document classifier for Indian government education documents.
+
+{CATEGORY_GUIDE.replace("each document", "this document")}
+
+Document filename: {file_name}
+
+Document text (first 3000 chars):
+{sample}
+
+Respond with ONLY a valid JSON object:
+{{
+    "vertical": "one of: go, legal, judicial, data, scheme",
+    "confidence": <float between 0.0 and 1.0>,
+    "reasoning": "<brief 1-sentence explanation>"
+}}
+
+DO NOT include any text outside the JSON object."""
+    
+    def build(self, items: List[Tuple[str, str]]) -> str:
+        documents = "\n\n".join(
+            f"=== DOCUMENT {i} ===\nDocument filename: {file_name}\n\nDocument text (first 3000 chars):\n{sample}"
+            for i, (file_name, sample) in enumerate(items, 1)
+        )
+        return f"""You are a document classifier for Indian government education documents.
+
+{CATEGORY_GUIDE}
+
+Classify each of the {len(items)} documents below independently.
+
+{documents}
+
+Respond with ONLY a valid JSON array with one object per document, in order:
+[
+    {{
+        "document": <document number>,
+        "vertical": "one of: go, legal, judicial, data, scheme",
+        "confidence": <float between 0.0 and 1.0>,
+        "reasoning": "<brief 1-sentence explanation>"
+    }}
+]
+
+DO NOT include any text outside the JSON array."""
+    
+    def split(self, response_text: str, count: int) -> List[Optional[str]]:
+        answers: List[Optional[str]] = [None] * count
+        results = json.loads(_strip_code_fence(response_text))
+        if not isinstance(results, list):
+            return answers
+        for position, result in enumerate(results):
+            if not isinstance(result, dict):
+                continue
+            try:
+                index = int(result.pop("document", position + 1)) - 1
+            except (TypeError, ValueError):
+                continue
+            if 0 <= index < count and answers[index] is None:
+                answers[index] = json.dumps(result)
+        return answers
+
 
 class VerticalClassifier:
     """Classify documents into verticals using Gemini."""
@@ -40,6 +133,11 @@ class VerticalClassifier:
         # Initialize cache
         self.cache = get_cache()
         
+        # Optional shared work queue (set by the pipeline): packs samples from
+        # documents in flight together and adds retries
+        self.llm_queue: Optional[LLMWorkQueue] = None
+        self.packer = ClassificationPacker()
+        
         if self.use_llm:
             genai.configure(api_key=self.api_key)
             self.model = genai.GenerativeModel(self.model_name)
@@ -47,6 +145,11 @@ class VerticalClassifier:
         else:
             logger.warning("Gemini not available - using fallback classification")
     
+    def set_llm_queue(self, queue: LLMWorkQueue):
+        """Send classification calls through a shared LLM work queue."""
+        self.llm_queue = queue
+        queue.register_packer(CLASSIFICATION_TASK, self.packer)
+    
     def classify(self, text: str, file_name: str = "") -> Dict:
         """
         Classify document into vertical.
@@ -74,45 +177,22 @@ class VerticalClassifier:
             cached_result = self.cache.get(
                 content=cache_key_content,
                 model=self.model_name,
-                task_type="vertical_classification"
+                task_type=CLASSIFICATION_TASK
             )
             
             if cached_result:
                 logger.debug("Using cached classification result")
                 return cached_result["response"]
             
-            prompt = f"""You are a document classifier for Indian government education documents.
-
-Classify this document into EXACTLY ONE of these 5 categories:
-1. "go" - Government Orders (GOs) - documents with G.O.Ms.No or G.O.Rt.No, preambles, official orders
-2. "legal" - Legal Documents - Acts, Rules, Sections, Amendments, Regulations
-3. "judicial" - Judicial Documents - Court cases, judgments, petitions, legal proceedings
-4. "data" - Data Reports - Statistics, tables, enrollment data, UDISE reports, metrics
-5. "scheme" - Government Schemes - Scheme guidelines, eligibility, benefits, implementation
-
-Document filename: {file_name}
-
-Document text (first 3000 chars):
-{sample}
-
-Respond with ONLY a valid JSON object:
-{{
-    "vertical": "one of: go, legal, judicial, data, scheme",
-    "confidence": <float between 0.0 and 1.0>,
-    "reasoning": "<brief 1-sentence explanation>"
-}}
-
-DO NOT include any text outside the JSON object."""
-
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
+            if self.llm_queue is not None:
+                response_text = self.llm_queue.generate_item(
+                    self.model, CLASSIFICATION_TASK, (file_name, sample)
+                )
+            else:
+                response = self.model.generate_content(self.packer.build_single((file_name, sample)))
+                response_text = response.text
             
-            # Strip markdown code blocks if present
-            if response_text.startswith("```"):
-                response_text = response_text.split("```")[1]
-                if response_text.startswith("json"):
-                    response_text = response_text[4:]
-                response_text = response_text.strip()
+            response_text = _strip_code_fence(response_text)
             
             result = json.loads(response_text)
             
@@ -142,7 +222,7 @@ DO NOT include any text outside the JSON object."""
                 content=cache_key_content,
                 response=result_dict,
                 model=self.model_name,
-                task_type="vertical_classification"
+                task_type=CLASSIFICATION_TASK
             )
             
             return result_dict
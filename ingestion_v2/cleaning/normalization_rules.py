@@ -4,12 +4,37 @@ Normalization rules for government documents.
 Standardize references, dates, and common patterns.
 """
 import re
-from typing import Dict
+from typing import Dict, Tuple
 import logging
 
+from .rules import RegexRule, RuleSet, contains_any
+
 logger = logging.getLogger(__name__)
 
 
+GO_REFERENCE_RULES = [
+    RegexRule("go_refs.ms", r'G\.O\.(Ms|MS)\.?No\.?(\d+)', r'G.O.Ms.No. \2', flags=re.IGNORECASE),
+    RegexRule("go_refs.rt", r'G\.O\.(Rt|RT)\.?No\.?(\d+)', r'G.O.Rt.No. \2', flags=re.IGNORECASE),
+    RegexRule("go_refs.go_ms", r'GO\s+(MS|Ms)\.?\s*No\.?\s*(\d+)', r'G.O.Ms.No. \2', flags=re.IGNORECASE),
+    RegexRule("go_refs.go_rt", r'GO\s+(RT|Rt)\.?\s*No\.?\s*(\d+)', r'G.O.Rt.No. \2', flags=re.IGNORECASE),
+]
+
+SECTION_REFERENCE_RULES = [
+    RegexRule("section_refs.sec", r'Sec\.?\s*(\d+)', r'Section \1', flags=re.IGNORECASE),
+    RegexRule("section_refs.symbol", r'§\s*(\d+)', r'Section \1', precheck=contains_any('§')),
+]
+
+DATE_RULES = [
+    RegexRule("dates.separators", r'(\d{1,2})[/.](\d{1,2})[/.](\d{4})', r'\1-\2-\3',
+              precheck=contains_any('/', '.')),
+]
+
+_GO_RULES = RuleSet(GO_REFERENCE_RULES)
+_SECTION_RULES = RuleSet(SECTION_REFERENCE_RULES)
+_DATE_RULES = RuleSet(DATE_RULES)
+_ALL_RULES = RuleSet(GO_REFERENCE_RULES + SECTION_REFERENCE_RULES + DATE_RULES)
+
+
 class NormalizationRules:
     """Apply normalization rules to text."""
     
@@ -22,13 +47,7 @@ class NormalizationRules:
             "G.O.Ms.No.123" -> "G.O.Ms.No. 123"
             "GO MS No 123" -> "G.O.Ms.No. 123"
         """
-        # Normalize spacing
-        text = re.sub(r'G\.O\.(Ms|MS)\.?No\.?(\d+)', r'G.O.Ms.No. \2', text, flags=re.IGNORECASE)
-        text = re.sub(r'G\.O\.(Rt|RT)\.?No\.?(\d+)', r'G.O.Rt.No. \2', text, flags=re.IGNORECASE)
-        text = re.sub(r'GO\s+(MS|Ms)\.?\s*No\.?\s*(\d+)', r'G.O.Ms.No. \2', text, flags=re.IGNORECASE)
-        text = re.sub(r'GO\s+(RT|Rt)\.?\s*No\.?\s*(\d+)', r'G.O.Rt.No. \2', text, flags=re.IGNORECASE)
-        
-        return text
+        return _GO_RULES.apply(text)
     
     @staticmethod
     def standardize_section_references(text: str) -> str:
@@ -39,10 +58,7 @@ class NormalizationRules:
             "Sec.12" -> "Section 12"
             "§12" -> "Section 12"
         """
-        text = re.sub(r'Sec\.?\s*(\d+)', r'Section \1', text, flags=re.IGNORECASE)
-        text = re.sub(r'§\s*(\d+)', r'Section \1', text)
-        
-        return text
+        return _SECTION_RULES.apply(text)
     
     @staticmethod
     def standardize_dates(text: str) -> str:
@@ -53,18 +69,19 @@ class NormalizationRules:
             "12/05/2024" -> "12-05-2024"
             "12.05.2024" -> "12-05-2024"
         """
-        # Replace / and . with -
-        text = re.sub(r'(\d{1,2})[/.](\d{1,2})[/.](\d{4})', r'\1-\2-\3', text)
-        
-        return text
+        return _DATE_RULES.apply(text)
     
     @staticmethod
     def apply_all(text: str) -> str:
         """Apply all normalization rules."""
-        text = NormalizationRules.standardize_go_references(text)
-        text = NormalizationRules.standardize_section_references(text)
-        text = NormalizationRules.standardize_dates(text)
-        return text
+        return _ALL_RULES.apply(text)
+    
+    @staticmethod
+    def apply_with_hits(text: str) -> Tuple[str, Dict[str, int]]:
+        """Apply all normalization rules and report per-rule hit counts."""
+        hits: Dict[str, int] = {}
+        text = _ALL_RULES.apply(text, hits)
+        return text, hits
 
 
 def normalize_text(text: str) -> str:
@@ -0,0 +1,152 @@
+"""
+Compiled rule engine for text cleaning and normalization.
+
+Rules are compiled once at import and run in a fixed order. Each rule has a
+cheap precheck so passes that cannot match skip the whole-string copy, and
+every rule reports how many times it fired.
+
+Rules that could interact stay separate, sequential passes. Merging them
+into one alternation would change the output, because a match produced by one
+rule can set up (or break) a match for the next. Only rules that provably
+commute are folded into a single regex or translation table.
+"""
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class RegexRule:
+    """re.sub rule with hit counting."""
+
+    def __init__(
+        self,
+        name: str,
+        pattern: str,
+        repl,
+        flags: int = 0,
+        precheck: Optional[Callable[[str], bool]] = None
+    ):
+        self.name = name
+        self.regex = re.compile(pattern, flags)
+        self.repl = repl
+        self.precheck = precheck
+
+    def apply(self, text: str) -> Tuple[str, int]:
+        if self.precheck is not None and not self.precheck(text):
+            return text, 0
+        return self.regex.subn(self.repl, text)
+
+
+class LiteralRule:
+    """str.replace rule with hit counting."""
+
+    def __init__(self, name: str, old: str, new: str):
+        self.name = name
+        self.old = old
+        self.new = new
+
+    def apply(self, text: str) -> Tuple[str, int]:
+        hits = text.count(self.old)
+        if hits:
+            text = text.replace(self.old, self.new)
+        return text, hits
+
+
+class TranslateRule:
+    """Single-character replacements/deletions in one scan."""
+
+    def __init__(self, name: str, mapping: Dict[str, Optional[str]], ranges: Iterable[Tuple[int, int]] = ()):
+        self.name = name
+        table = {char: repl or '' for char, repl in mapping.items()}
+        for start, end in ranges:
+            for codepoint in range(start, end + 1):
+                table[chr(codepoint)] = ''
+        self.table = table
+        self._delete_only = not any(table.values())
+        chars = "".join(re.escape(char) for char in sorted(table))
+        self._finder = re.compile(f"[{chars}]")
+
+    def apply(self, text: str) -> Tuple[str, int]:
+        # One scan; most documents have none of these characters
+        if not self._finder.search(text):
+            return text, 0
+        if self._delete_only:
+            return self._finder.subn('', text)
+        return self._finder.subn(lambda m: self.table[m.group()], text)
+
+
+class GatedRule:
+    """
+    Case-insensitive rule that only runs when its keyword can be present.
+
+    The keyword check uses str.lower(). Non-ASCII characters that regex
+    IGNORECASE folds onto ASCII letters (dotless/dotted i, long s, Kelvin
+    sign) disable the gate so results never differ from the plain rule.
+    """
+
+    IGNORECASE_ASCII_ALIASES = ('\u0131', '\u0130', '\u017f', '\u212a')
+
+    def __init__(self, rule, keywords: Iterable[str]):
+        self.rule = rule
+        self.name = rule.name
+        self.keywords = [keyword.lower() for keyword in keywords]
+
+    def may_match(self, text: str, lowered: str) -> bool:
+        if any(keyword in lowered for keyword in self.keywords):
+            return True
+        return not text.isascii() and any(alias in text for alias in self.IGNORECASE_ASCII_ALIASES)
+
+    def apply(self, text: str, lowered: Optional[str] = None) -> Tuple[str, int]:
+        if lowered is None:
+            lowered = text.lower()
+        if not self.may_match(text, lowered):
+            return text, 0
+        return self.rule.apply(text)
+
+
+class FunctionRule:
+    """Rule backed by a function returning (text, hits)."""
+
+    def __init__(self, name: str, func: Callable[[str], Tuple[str, int]]):
+        self.name = name
+        self.func = func
+
+    def apply(self, text: str) -> Tuple[str, int]:
+        return self.func(text)
+
+
+class RuleSet:
+    """Ordered rules applied with per-rule hit counts."""
+
+    def __init__(self, rules: List):
+        self.rules = rules
+
+    def apply(self, text: str, hits: Optional[Dict[str, int]] = None) -> str:
+        """
+        Run all rules in order.
+
+        Args:
+            text: Input text
+            hits: Optional dict updated with rule name -> hit count
+
+        Returns:
+            Transformed text
+        """
+        lowered = None
+        for rule in self.rules:
+            if isinstance(rule, GatedRule):
+                # One lowercase copy serves every gate until the text changes
+                if lowered is None:
+                    lowered = text.lower()
+                text, count = rule.apply(text, lowered)
+            else:
+                text, count = rule.apply(text)
+            if count:
+                lowered = None
+                if hits is not None:
+                    hits[rule.name] = hits.get(rule.name, 0) + count
+        return text
+
+
+def contains_any(*needles: str) -> Callable[[str], bool]:
+    """Precheck: text contains at least one of the substrings."""
+    return lambda text: any(needle in text for needle in needles)
@@ -5,18 +5,104 @@ Reusing proven cleaning functions from old pipeline, but simplified.
 """
 import re
 import unicodedata
-from typing import Optional
+from typing import Dict, Tuple
 import logging
 
+from .rules import (
+    FunctionRule, GatedRule, LiteralRule, RegexRule, RuleSet, TranslateRule, contains_any
+)
+
 logger = logging.getLogger(__name__)
 
 
+# ============================================================================
+# COMPILED RULES (same order and semantics as the original passes)
+# ============================================================================
+
+# Step 1 (after NFKC). NFKC already folds "…", NBSP, U+2007, U+202F and "™",
+# so only the characters it leaves alone need explicit rules.
+UNICODE_RULES_PRE = [
+    # Historical quote rule: replaces the literal text `, "'").replace(`
+    LiteralRule("unicode.quote_literal", ', "\'").replace(', "'"),
+    TranslateRule("unicode.dashes_ellipsis_a_circumflex", {
+        '\u2013': '-', '\u2014': '-', '\u2212': '-',
+        '\u2026': '...',
+        '\u00c2': None,
+    }),
+    # Mojibake - order matters ("â€" is a prefix of the other two)
+    LiteralRule("unicode.mojibake_apostrophe", '\u00e2\u20ac\u2122', "'"),
+    LiteralRule("unicode.mojibake_open_quote", '\u00e2\u20ac\u0153', '"'),
+    LiteralRule("unicode.mojibake_quote", '\u00e2\u20ac', '"'),
+    TranslateRule(
+        "unicode.zero_width_nbsp",
+        {'\ufeff': None, '\ufffe': None, '\u00a0': ' '},
+        ranges=[(0x200b, 0x200f), (0x2028, 0x202f), (0x205f, 0x206f)]
+    ),
+]
+
+HYPHENATION_RULES = [
+    # Leading \b: a match can only start at a word start, and the anchor lets
+    # the scan skip mid-word positions instead of backtracking through them
+    RegexRule("hyphenation", r'\b(\w+)-\s*\n\s*(\w+)', r'\1\2', precheck=contains_any('-')),
+]
+
+PAGE_MARKER_RULES = [
+    RegexRule("page_markers.dashed_number", r'\n\s*[-–—]\s*\d+\s*[-–—]\s*\n', '\n',
+              precheck=contains_any('-', '–', '—')),
+    RegexRule("page_markers.page_n", r'\nPage\s+\d+\s*\n', '\n', flags=re.IGNORECASE),
+    RegexRule("page_markers.n_of_m", r'\n\d+\s+of\s+\d+\s*\n', '\n', flags=re.IGNORECASE),
+    RegexRule("page_markers.dashed_page", r'\n\s*[-–—]{1,}\s*Page\s+\d+\s*[-–—]{1,}\s*\n', '\n',
+              flags=re.IGNORECASE, precheck=contains_any('-', '–', '—')),
+]
+
+ARTIFACT_RULES = [
+    RegexRule("artifacts.image", r'\[Image:.*?\]', '', flags=re.IGNORECASE, precheck=contains_any('[')),
+    RegexRule("artifacts.chart", r'\[Chart:.*?\]', '', flags=re.IGNORECASE, precheck=contains_any('[')),
+    RegexRule("artifacts.html_tags", r'<.*?>', '', precheck=contains_any('<')),
+    RegexRule("artifacts.ampersand_lines", r'\n\s*&{2,}.*?\n', '\n', precheck=contains_any('&&')),
+    RegexRule("artifacts.hash_lines", r'\n\s*#{2,}.*?\n', '\n', precheck=contains_any('##')),
+    RegexRule("artifacts.star_lines", r'\n\s*\*{3,}.*?\n', '\n', precheck=contains_any('***')),
+    TranslateRule("artifacts.copyright_symbols", {'©': None, '®': None, '™': None}),
+]
+
+WHITESPACE_RULES = [
+    RegexRule("whitespace.spaces", r' {2,}', ' ', precheck=contains_any('  ')),
+    RegexRule("whitespace.blank_lines", r'\n\s*\n\s*\n+', '\n\n'),
+    RegexRule("whitespace.line_start", r'^ +', '', flags=re.MULTILINE, precheck=contains_any(' ')),
+    RegexRule("whitespace.line_end", r' +$', '', flags=re.MULTILINE, precheck=contains_any(' ')),
+]
+
+# Case-insensitive scans are slow, so each fix only runs when its misspelling
+# occurs in the text at all (most documents have none)
+OCR_FIX_RULES = [
+    GatedRule(RegexRule("ocr_fixes.government", r'\bGovemment\b', 'Government', flags=re.IGNORECASE), ['govemment']),
+    GatedRule(RegexRule("ocr_fixes.education", r'\bEducalion\b', 'Education', flags=re.IGNORECASE), ['educalion']),
+    GatedRule(RegexRule("ocr_fixes.andhra_pradesh", r'\bAndhra\s+Pradcsh\b', 'Andhra Pradesh', flags=re.IGNORECASE), ['pradcsh']),
+    GatedRule(RegexRule("ocr_fixes.order", r'\b0rder\b', 'Order', flags=re.IGNORECASE), ['0rder']),
+    GatedRule(RegexRule("ocr_fixes.section", r'\bSec[il]on\b', 'Section', flags=re.IGNORECASE), ['secion', 'seclon']),
+]
+
+
 class TextCleaner:
     """Clean and normalize extracted text."""
     
     def __init__(self):
         """Initialize text cleaner."""
-        pass
+        self._unicode_rules = RuleSet(
+            UNICODE_RULES_PRE + [
+                FunctionRule("unicode.ocr_garbage_lines", self._remove_ocr_garbage_counted),
+                LiteralRule("unicode.figure_space", '\u2007', ' '),
+            ]
+        )
+        self._hyphenation_rules = RuleSet(HYPHENATION_RULES)
+        self._page_marker_rules = RuleSet(PAGE_MARKER_RULES)
+        self._artifact_rules = RuleSet(ARTIFACT_RULES)
+        self._whitespace_rules = RuleSet(WHITESPACE_RULES)
+        self._ocr_fix_rules = RuleSet(OCR_FIX_RULES)
+        
+        # Rule hits for the last document / all documents cleaned by this instance
+        self.last_hits: Dict[str, int] = {}
+        self.total_hits: Dict[str, int] = {}
     
     def clean(self, text: str) -> str:
         """
@@ -28,127 +114,81 @@ class TextCleaner:
         Returns:
             Cleaned text
         """
+        return self.clean_with_hits(text)[0]
+    
+    def clean_with_hits(self, text: str) -> Tuple[str, Dict[str, int]]:
+        """
+        Apply all cleaning steps and report how often each rule fired.
+        
+        Args:
+            text: Raw text
+            
+        Returns:
+            (cleaned text, rule name -> hit count)
+        """
+        hits: Dict[str, int] = {}
         if not text:
-            return ""
+            self.last_hits = hits
+            return "", hits
         
         # Step 1: Normalize Unicode
-        text = self.normalize_unicode(text)
+        text = unicodedata.normalize('NFKC', text)
+        text = self._unicode_rules.apply(text, hits)
         
         # Step 2: Fix hyphenation
-        text = self.fix_hyphenation(text)
+        text = self._hyphenation_rules.apply(text, hits)
         
         # Step 3: Remove page markers
-        text = self.remove_page_markers(text)
+        text = self._page_marker_rules.apply(text, hits)
         
         # Step 4: Remove artifacts
-        text = self.remove_artifacts(text)
+        text = self._artifact_rules.apply(text, hits)
         
         # Step 5: Normalize whitespace
-        text = self.normalize_whitespace(text)
+        text = self._whitespace_rules.apply(text, hits).strip()
         
         # Step 6: Fix common OCR errors
-        text = self.fix_ocr_errors(text)
+        text = self._ocr_fix_rules.apply(text, hits)
         
-        return text.strip()
+        self.last_hits = hits
+        for name, count in hits.items():
+            self.total_hits[name] = self.total_hits.get(name, 0) + count
+        
+        return text.strip(), hits
     
     def normalize_unicode(self, text: str) -> str:
         """Normalize Unicode characters."""
-        # Normalize to NFKC form
-        text = unicodedata.normalize('NFKC', text)
-        
-        # Replace various quote marks
-        text = text.replace('"', '"').replace('"', '"')
-        text = text.replace(''', "'").replace(''', "'")
-        
-        # Replace various dashes
-        text = text.replace('–', '-').replace('—', '-')
-        text = text.replace('−', '-')
-        
-        # Replace ellipsis
-        text = text.replace('…', '...')
-        
-        # Fix common encoding issues
-        text = text.replace('Â', '')
-        text = text.replace('â€™', "'")
-        text = text.replace('â€œ', '"').replace('â€', '"')
-        
-        # Remove zero-width and formatting chars
-        text = re.sub(r'[\u200b-\u200f\u2028-\u202f\u205f-\u206f]', '', text)
-        text = re.sub(r'[\ufeff\ufffe]', '', text)
-        
-        # Replace non-breaking spaces
-        text = text.replace('\u00a0', ' ')
-        
-        # Handle Telugu/Indic scripts - Remove OCR garbage
-        # Telugu script range: U+0C00-U+0C7F
-        # If it's not clean Telugu, it's likely OCR garbage - remove it
-        text = self.remove_ocr_garbage(text)
-        text = text.replace('\u2007', ' ')
-        
-        return text
+        # Normalize to NFKC form, then quotes/dashes/mojibake/zero-width
+        # chars, Telugu/Indic OCR garbage lines and figure spaces
+        return self._unicode_rules.apply(unicodedata.normalize('NFKC', text))
     
     def fix_hyphenation(self, text: str) -> str:
         """Fix words broken by hyphens at line endings."""
         # Fix hyphenated words: "educa-\ntion" -> "education"
-        text = re.sub(r'(\w+)-\s*\n\s*(\w+)', r'\1\2', text)
-        return text
+        return self._hyphenation_rules.apply(text)
     
     def remove_page_markers(self, text: str) -> str:
         """Remove page numbers and markers."""
-        # Remove various page marker patterns
-        text = re.sub(r'\n\s*[-–—]\s*\d+\s*[-–—]\s*\n', '\n', text)
-        text = re.sub(r'\nPage\s+\d+\s*\n', '\n', text, flags=re.IGNORECASE)
-        text = re.sub(r'\n\d+\s+of\s+\d+\s*\n', '\n', text, flags=re.IGNORECASE)
-        text = re.sub(r'\n\s*[-–—]{1,}\s*Page\s+\d+\s*[-–—]{1,}\s*\n', '\n', text, flags=re.IGNORECASE)
-        
-        return text
+        return self._page_marker_rules.apply(text)
     
     def remove_artifacts(self, text: str) -> str:
         """Remove PDF extraction artifacts."""
-        # Remove common artifacts
-        text = re.sub(r'\[Image:.*?\]', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'\[Chart:.*?\]', '', text, flags=re.IGNORECASE)
-        text = re.sub(r'<.*?>', '', text)  # HTML tags
-        
-        # Remove delimiter artifacts
-        text = re.sub(r'\n\s*&{2,}.*?\n', '\n', text)
-        text = re.sub(r'\n\s*#{2,}.*?\n', '\n', text)
-        text = re.sub(r'\n\s*\*{3,}.*?\n', '\n', text)
-        
-        # Remove copyright symbols
-        text = re.sub(r'[©®™]+', '', text)
-        
-        return text
+        return self._artifact_rules.apply(text)
     
     def normalize_whitespace(self, text: str) -> str:
         """Normalize whitespace."""
-        # Replace multiple spaces
-        text = re.sub(r' +', ' ', text)
-        
-        # Replace multiple newlines
-        text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
-        
-        # Remove spaces at line boundaries
-        text = re.sub(r'^ +', '', text, flags=re.MULTILINE)
-        text = re.sub(r' +$', '', text, flags=re.MULTILINE)
-        
-        return text.strip()
+        return self._whitespace_rules.apply(text).strip()
     
     def fix_ocr_errors(self, text: str) -> str:
         """Fix common OCR errors in government documents."""
-        # Common OCR mistakes
-        ocr_fixes = {
-            r'\bGovemment\b': 'Government',
-            r'\bEducalion\b': 'Education',
-            r'\bAndhra\s+Pradcsh\b': 'Andhra Pradesh',
-            r'\b0rder\b': 'Order',
-            r'\bSec[il]on\b': 'Section',
-        }
-        
-        for pattern, replacement in ocr_fixes.items():
-            text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
-        
-        return text
+        return self._ocr_fix_rules.apply(text)
+    
+    def _remove_ocr_garbage_counted(self, text: str) -> Tuple[str, int]:
+        """remove_ocr_garbage plus the number of lines dropped."""
+        cleaned = self.remove_ocr_garbage(text)
+        if len(cleaned) == len(text):
+            return cleaned, 0
+        return cleaned, text.count('\n') - cleaned.count('\n')
     
     def remove_ocr_garbage(self, text: str) -> str:
         """
@@ -163,6 +203,11 @@ class TextCleaner:
         cleaned_lines = []
         
         for line in lines:
+            # Fast path: printable ASCII lines always pass Rule 1
+            if line.isascii() and line.isprintable():
+                cleaned_lines.append(line)
+                continue
+            
             # Skip empty lines
             if not line.strip():
                 cleaned_lines.append(line)
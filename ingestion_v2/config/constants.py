@@ -253,6 +253,70 @@ JUDICIAL_STRUCTURE_MARKERS = {
     "ratio": [r"RATIO", r"Reasoning", r"Analysis"],
 }
 
+# ============================================================================
+# CHUNK FEATURES (query-independent reranking signals)
+# ============================================================================
+
+# Bump whenever the tables below change so retrieval ignores stale features
+CHUNK_FEATURE_VERSION = 1
+
+# Policy category indicators - keep in sync with
+# retrieval_v3/pipeline/diversity_reranker.py::DiversityReranker.CATEGORY_INDICATORS
+POLICY_CATEGORY_INDICATORS = {
+    "access": [
+        'admission', 'enrollment', 'dropout', 'out-of-school', 'inclusion',
+        'girl child education', 'SC ST', 'minority', 'disabled', 'CWSN',
+        'school mapping', 'catchment', 'distance norm', 'equity', 'access'
+    ],
+    "infrastructure": [
+        'nadu nedu', 'infrastructure', 'building', 'classroom', 'toilet',
+        'drinking water', 'electricity', 'playground', 'library', 'laboratory',
+        'kitchen', 'boundary wall', 'ramp', 'CCTV', 'fire safety', 'TMF',
+        'maintenance', 'construction', 'facility', 'sanitation'
+    ],
+    "governance": [
+        'administration', 'governance', 'management', 'inspection', 'monitoring',
+        'supervision', 'compliance', 'regulation', 'DEO', 'MEO', 'DIET',
+        'SCERT', 'RJD', 'CCE coordinator', 'headmaster', 'principal',
+        'district collector', 'authority', 'responsibility', 'oversight'
+    ],
+    "welfare": [
+        'amma vodi', 'vidya kanuka', 'vidya deevena', 'gorumudda',
+        'mid day meal', 'midday meal', 'school kit', 'uniform', 'scholarship',
+        'financial assistance', 'transport', 'hostel', 'residential school',
+        'welfare scheme', 'benefit', 'incentive', 'nutrition'
+    ],
+    "curriculum": [
+        'curriculum', 'syllabus', 'textbook', 'subject', 'course', 'content',
+        'learning material', 'digital content', 'e-content', 'pedagogy',
+        'teaching method', 'learning outcome', 'competency', 'FLN',
+        'foundational literacy', 'lesson plan', 'activity'
+    ],
+    "assessment": [
+        'assessment', 'evaluation', 'examination', 'test', 'CCE',
+        'continuous comprehensive evaluation', 'grading', 'marking',
+        'progress tracking', 'learning assessment', 'achievement',
+        'performance', 'result', 'pass', 'fail', 'promotion', 'scoring'
+    ],
+    "teacher": [
+        'teacher', 'teaching', 'faculty', 'staff', 'recruitment', 'appointment',
+        'transfer', 'posting', 'training', 'capacity building',
+        'professional development', 'in-service', 'pre-service',
+        'teacher education', 'B.Ed', 'TET', 'DSC', 'educator'
+    ],
+}
+
+# Section type priors - keep in sync with
+# retrieval_v3/retrieval_core/scoring.py::section_type_boost
+SECTION_TYPE_BOOSTS = {
+    "orders": 1.3,
+    "order": 1.3,
+    "content": 1.2,
+    "annexure": 1.0,
+    "preamble": 0.85,
+    "table": 0.95,
+}
+
 # ============================================================================
 # TEXT CLEANING PATTERNS
 # ============================================================================
@@ -41,6 +41,8 @@ VERTICALS = ["go", "legal", "judicial", "data", "scheme"]
 ENABLE_OCR = True
 OCR_CONFIDENCE_THRESHOLD = 0.3  # Pages below this score get OCR
 MIN_WORDS_PER_PAGE = 10  # Minimum words to consider text extraction successful
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", 0))  # OCR processes per document (0 = one per CPU core)
+OCR_DPI = 200  # Page rasterization resolution
 
 # PDF Extraction
 USE_PDFPLUMBER = True  # Primary extraction method
@@ -112,6 +114,43 @@ EMBEDDING_DIMENSION = 768
 LOCAL_EMBEDDING_MODEL = "BAAI/bge-base-en-v1.5"
 BATCH_SIZE = 32  # For batch embedding
 
+# Content-addressed vector store: embeddings keyed by (model, dim, sha256(text)),
+# so unchanged chunks are never re-embedded and collections can be rebuilt offline
+VECTOR_STORE_DIR = BASE_DIR / "data" / "vector_store"
+VECTOR_STORE_DTYPE = "float32"  # "float32" or "float16" (half the disk)
+
+# ============================================================================
+# CHUNK FEATURES
+# ============================================================================
+# Precompute query-independent reranking signals (categories, token stats,
+# entity keys, section priors) into each chunk's metadata["features"]
+COMPUTE_CHUNK_FEATURES = True
+
+# ============================================================================
+# BATCH PARALLELISM
+# ============================================================================
+# Worker processes for process_batch (1 = serial, 0 = one per CPU core)
+BATCH_WORKERS = int(os.getenv("INGESTION_WORKERS", 1))
+
+# LLM calls are shared across all workers: cap in-flight calls and call rate
+LLM_MAX_CONCURRENT = int(os.getenv("LLM_MAX_CONCURRENT", 4))
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", 60))
+
+# Documents in flight per process (threads): their LLM calls overlap in the
+# shared work queue, and classification samples arriving within
+# LLM_BATCH_WINDOW seconds of each other are packed into one prompt
+LLM_DOC_CONCURRENCY = int(os.getenv("LLM_DOC_CONCURRENCY", 1))
+LLM_BATCH_WINDOW = 0.2
+
+# ============================================================================
+# INCREMENTAL INGESTION
+# ============================================================================
+# Skip documents whose bytes and stage fingerprints are unchanged (manifest
+# lives in OUTPUT_DIR); the delta file lists what the upload step must redo
+INCREMENTAL_INGESTION = True
+MANIFEST_FILENAME = "ingestion_manifest.db"
+DELTA_FILENAME = "ingestion_delta.json"
+
 # ============================================================================
 # QUALITY CONTROL
 # ============================================================================
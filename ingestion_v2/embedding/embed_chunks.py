@@ -10,6 +10,8 @@ from dataclasses import dataclass
 from sentence_transformers import SentenceTransformer
 import logging
 
+from .vector_store import VectorStore, text_hash
+
 logger = logging.getLogger(__name__)
 
 
@@ -219,30 +221,40 @@ class SOTAEmbedder:
 
 class EmbeddingCache:
     """
-    Simple embedding cache to avoid re-embedding
-    Uses content hash as key
+    Embedding cache to avoid re-embedding
+    Uses content hash (sha256) as key; with a VectorStore behind it, entries
+    survive the process and are shared with the upload script
     """
     
-    def __init__(self, max_size: int = 10000):
+    def __init__(self, max_size: int = 10000, store: Optional[VectorStore] = None):
         self.cache = {}
         self.max_size = max_size
+        self.store = store
     
     def get(self, content: str) -> Optional[List[float]]:
         """Get cached embedding"""
-        key = hash(content)
-        return self.cache.get(key)
+        key = text_hash(content)
+        embedding = self.cache.get(key)
+        if embedding is None and self.store is not None:
+            embedding = self.store.get(content)
+            if embedding is not None:
+                self._remember(key, embedding)
+        return embedding
     
     def set(self, content: str, embedding: List[float]):
         """Cache embedding"""
+        self._remember(text_hash(content), embedding)
+        if self.store is not None:
+            self.store.put(content, embedding)
+    
+    def _remember(self, key: str, embedding: List[float]):
         if len(self.cache) >= self.max_size:
             # Simple eviction: remove oldest (first) item
             self.cache.pop(next(iter(self.cache)))
-        
-        key = hash(content)
         self.cache[key] = embedding
     
     def clear(self):
-        """Clear cache"""
+        """Clear in-memory cache (the backing store is kept)"""
         self.cache.clear()
 
 
@@ -5,6 +5,7 @@ Reuses the retrieval embedder so embeddings stay consistent.
 
 from typing import List, Union
 
+from retrieval.config.settings import EMBEDDING_CONFIG
 from retrieval.embeddings.embedder import get_embedder as get_retrieval_embedder
 
 
@@ -32,6 +33,16 @@ class GoogleEmbedder:
     def is_using_google(self) -> bool:
         """Expose whether the underlying embedder is using Google API"""
         return getattr(self._embedder, "_backend", "lite") == "google"
+    
+    @property
+    def model_id(self) -> str:
+        """Model currently producing vectors (the backend can fall back mid-run)"""
+        backend = getattr(self._embedder, "_backend", "lite")
+        if backend == "google":
+            return EMBEDDING_CONFIG.model
+        if backend == "sentence_transformer":
+            return EMBEDDING_CONFIG.fast_model
+        return "lite"
 
 
 _embedder = None
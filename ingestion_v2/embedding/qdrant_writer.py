@@ -0,0 +1,427 @@
+"""
+Bulk Qdrant writer for the ingestion pipeline.
+
+- Upserts are split into batches bounded by estimated request bytes (and a
+  point cap) and sent in parallel from a thread pool with wait=False, with
+  retries and exponential backoff per batch.
+- Collections are created on demand, and payload indexes for filterable
+  fields are created once per collection as it is first written to
+  (create_qdrant_indexes.py remains the tool for backfilling indexes on
+  existing collections).
+- Point ids are stable (uuid5 of doc_id|chunk_id), so re-uploading a document
+  overwrites its points instead of duplicating them.
+- replace_document() deletes a document's points that are no longer among its
+  chunks, so a re-chunked document leaves no stale points behind.
+- flush() is the barrier: it waits for every queued batch and then for each
+  touched collection to apply all pending updates.
+
+The client is any QdrantClient, including QdrantClient(":memory:") for tests.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+import json
+import logging
+import threading
+import time
+import uuid
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    HasIdCondition,
+    MatchValue,
+    PayloadSchemaType,
+    PointIdsList,
+    PointStruct,
+    VectorParams,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_BYTES = 4 * 1024 * 1024
+DEFAULT_MAX_BATCH_POINTS = 256
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_RETRIES = 3
+
+# Indexed in every collection (entity expansion, relation search, core filters)
+COMMON_PAYLOAD_INDEXES: List[Tuple[str, PayloadSchemaType]] = [
+    ("entities.go_numbers", PayloadSchemaType.KEYWORD),
+    ("entities.sections", PayloadSchemaType.KEYWORD),
+    ("entities.go_refs", PayloadSchemaType.KEYWORD),
+    ("entities.departments", PayloadSchemaType.KEYWORD),
+    ("entities.acts", PayloadSchemaType.KEYWORD),
+    ("entities.schemes", PayloadSchemaType.KEYWORD),
+    ("relations[].type", PayloadSchemaType.KEYWORD),
+    ("relations[].relation_type", PayloadSchemaType.KEYWORD),
+    ("relations[].target", PayloadSchemaType.KEYWORD),
+    ("doc_id", PayloadSchemaType.KEYWORD),
+    ("vertical", PayloadSchemaType.KEYWORD),
+    ("section_type", PayloadSchemaType.KEYWORD),
+    ("year", PayloadSchemaType.INTEGER),
+    ("date_issued_ts", PayloadSchemaType.INTEGER),
+    ("is_superseded", PayloadSchemaType.KEYWORD),
+]
+
+# Extra filterable fields per vertical (list fields like "sections" can't be
+# filtered without an index)
+VERTICAL_PAYLOAD_INDEXES: Dict[str, List[Tuple[str, PayloadSchemaType]]] = {
+    "legal": [
+        ("sections", PayloadSchemaType.KEYWORD),
+        ("section", PayloadSchemaType.KEYWORD),
+        ("mentioned_sections", PayloadSchemaType.KEYWORD),
+        ("act_name", PayloadSchemaType.KEYWORD),
+    ],
+    "go": [
+        ("go_number", PayloadSchemaType.KEYWORD),
+        ("mentioned_sections", PayloadSchemaType.KEYWORD),
+        ("department", PayloadSchemaType.KEYWORD),
+        ("departments", PayloadSchemaType.KEYWORD),
+    ],
+    "judicial": [
+        ("case_number", PayloadSchemaType.KEYWORD),
+        ("mentioned_sections", PayloadSchemaType.KEYWORD),
+    ],
+    "data": [
+        ("departments", PayloadSchemaType.KEYWORD),
+    ],
+    "schemes": [
+        ("scheme_name", PayloadSchemaType.KEYWORD),
+        ("departments", PayloadSchemaType.KEYWORD),
+    ],
+}
+
+
+def stable_point_id(doc_id: str, chunk_id: str) -> str:
+    """Qdrant point id for a chunk (same scheme as the ingestion manifest)."""
+    return str(uuid.uuid5(uuid.NAMESPACE_DNS, f"{doc_id}|{chunk_id}"))
+
+
+def payload_indexes_for(vertical: Optional[str]) -> List[Tuple[str, PayloadSchemaType]]:
+    """Payload indexes a collection for this vertical should have."""
+    fields = dict(COMMON_PAYLOAD_INDEXES)
+    for name, schema in VERTICAL_PAYLOAD_INDEXES.get(vertical or "", []):
+        fields.setdefault(name, schema)
+    return list(fields.items())
+
+
+def estimate_point_bytes(point: PointStruct) -> int:
+    """Rough request size of a point (JSON payload + ~10 bytes per float)."""
+    vector = point.vector if isinstance(point.vector, list) else []
+    payload = json.dumps(point.payload or {}, default=str)
+    return len(payload) + 10 * len(vector) + 64
+
+
+class QdrantWriter:
+    """Batched, parallel, idempotent writer for Qdrant collections."""
+
+    def __init__(
+        self,
+        client: QdrantClient,
+        vector_size: int = 768,
+        distance: Distance = Distance.COSINE,
+        batch_bytes: int = DEFAULT_BATCH_BYTES,
+        max_batch_points: int = DEFAULT_MAX_BATCH_POINTS,
+        workers: int = DEFAULT_WORKERS,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        create_indexes: bool = True
+    ):
+        """
+        Initialize writer.
+
+        Args:
+            client: Qdrant client (remote, or QdrantClient(":memory:") in tests)
+            vector_size: Embedding dimension for new collections
+            distance: Distance metric for new collections
+            batch_bytes: Max estimated request bytes per upsert batch
+            max_batch_points: Max points per upsert batch
+            workers: Upsert batches in flight
+            max_retries: Attempts per batch before it is reported as failed
+            create_indexes: Create payload indexes when a collection is first used
+        """
+        self.client = client
+        self.vector_size = vector_size
+        self.distance = distance
+        self.batch_bytes = max(1, batch_bytes)
+        self.max_batch_points = max(1, max_batch_points)
+        self.max_retries = max(1, max_retries)
+        self.create_indexes = create_indexes
+
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="qdrant-writer")
+        self._lock = threading.Lock()
+        self._pending: Set[Future] = set()
+        self._ready: Set[str] = set()
+        self._last_point: Dict[str, PointStruct] = {}
+        self._started: Optional[float] = None
+        self.failures: List[Dict] = []
+        self.stats = {
+            "points": 0,
+            "bytes": 0,
+            "batches": 0,
+            "retries": 0,
+            "failed_points": 0,
+            "deleted_points": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Collections and indexes
+    # ------------------------------------------------------------------
+
+    def ensure_collection(
+        self,
+        collection_name: str,
+        vertical: Optional[str] = None,
+        recreate_on_mismatch: bool = False
+    ) -> str:
+        """
+        Create the collection if missing and make sure its payload indexes exist.
+
+        Args:
+            collection_name: Collection to prepare
+            vertical: Vertical whose filterable fields get indexed
+            recreate_on_mismatch: Drop and recreate a collection whose vector
+                size differs (otherwise raise)
+
+        Returns:
+            collection_name
+        """
+        if collection_name in self._ready:
+            return collection_name
+
+        existing = {c.name for c in self.client.get_collections().collections}
+        if collection_name in existing:
+            current_size = self.client.get_collection(collection_name).config.params.vectors.size
+            if current_size != self.vector_size:
+                if not recreate_on_mismatch:
+                    raise ValueError(
+                        f"Collection {collection_name} has vector size {current_size}, expected {self.vector_size}"
+                    )
+                logger.warning(f"🔧 Collection {collection_name} has wrong vector size. Recreating...")
+                self.client.delete_collection(collection_name)
+                existing.discard(collection_name)
+
+        if collection_name not in existing:
+            logger.info(f"🆕 Creating collection: {collection_name}")
+            self.client.create_collection(
+                collection_name=collection_name,
+                vectors_config=VectorParams(size=self.vector_size, distance=self.distance)
+            )
+
+        if self.create_indexes:
+            self.ensure_payload_indexes(collection_name, vertical)
+
+        with self._lock:
+            self._ready.add(collection_name)
+        return collection_name
+
+    def ensure_payload_indexes(self, collection_name: str, vertical: Optional[str] = None) -> int:
+        """
+        Create missing payload indexes for a collection.
+
+        Returns:
+            Number of indexes created
+        """
+        try:
+            present = set((self.client.get_collection(collection_name).payload_schema or {}).keys())
+        except Exception:
+            present = set()
+
+        created = 0
+        for field_name, schema in payload_indexes_for(vertical):
+            if field_name in present:
+                continue
+            try:
+                self.client.create_payload_index(
+                    collection_name=collection_name,
+                    field_name=field_name,
+                    field_schema=schema,
+                    wait=True
+                )
+                created += 1
+            except Exception as e:
+                if "already exists" not in str(e).lower():
+                    logger.warning(f"   ⚠️ Could not index {collection_name}.{field_name}: {e}")
+        if created:
+            logger.info(f"   ✅ {collection_name}: created {created} payload indexes")
+        return created
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def make_point(self, chunk: Dict, vector: Sequence[float], payload: Optional[Dict] = None) -> PointStruct:
+        """Point with a stable id for a chunk (payload defaults to the chunk itself)."""
+        return PointStruct(
+            id=stable_point_id(chunk["doc_id"], chunk["chunk_id"]),
+            vector=[float(x) for x in vector],
+            payload=payload if payload is not None else chunk
+        )
+
+    def _batches(self, points: Sequence[PointStruct]) -> List[Tuple[List[PointStruct], int]]:
+        batches = []
+        batch: List[PointStruct] = []
+        size = 0
+        for point in points:
+            point_bytes = estimate_point_bytes(point)
+            if batch and (size + point_bytes > self.batch_bytes or len(batch) >= self.max_batch_points):
+                batches.append((batch, size))
+                batch, size = [], 0
+            batch.append(point)
+            size += point_bytes
+        if batch:
+            batches.append((batch, size))
+        return batches
+
+    def _send(self, collection_name: str, batch: List[PointStruct], size: int) -> int:
+        for attempt in range(self.max_retries):
+            try:
+                self.client.upsert(collection_name=collection_name, points=batch, wait=False)
+                break
+            except Exception as e:
+                if attempt == self.max_retries - 1:
+                    with self._lock:
+                        self.stats["failed_points"] += len(batch)
+                        self.failures.append({
+                            "collection": collection_name,
+                            "point_ids": [p.id for p in batch],
+                            "error": str(e),
+                        })
+                    logger.error(f"   ❌ Upsert of {len(batch)} points to {collection_name} failed: {e}")
+                    raise
+                with self._lock:
+                    self.stats["retries"] += 1
+                logger.warning(f"   ⚠️ Upsert attempt {attempt + 1} failed: {e}")
+                time.sleep(2 ** attempt)
+
+        with self._lock:
+            self.stats["points"] += len(batch)
+            self.stats["bytes"] += size
+            self.stats["batches"] += 1
+            self._last_point[collection_name] = batch[-1]
+        return len(batch)
+
+    def upsert(self, collection_name: str, points: Sequence[PointStruct]) -> List[Future]:
+        """
+        Queue points for upsert.
+
+        Returns:
+            One future per batch, resolving to the number of points written
+            (or raising once retries are exhausted)
+        """
+        if self._started is None:
+            self._started = time.time()
+        futures = []
+        for batch, size in self._batches(points):
+            future = self._executor.submit(self._send, collection_name, batch, size)
+            with self._lock:
+                self._pending.add(future)
+            future.add_done_callback(self._discard)
+            futures.append(future)
+        return futures
+
+    def _discard(self, future: Future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def delete_points(self, collection_name: str, point_ids: Sequence[str]) -> int:
+        """Delete points by id (synchronous, wait=True)."""
+        if not point_ids:
+            return 0
+        self.client.delete(
+            collection_name=collection_name,
+            points_selector=PointIdsList(points=list(point_ids)),
+            wait=True
+        )
+        with self._lock:
+            self.stats["deleted_points"] += len(point_ids)
+        return len(point_ids)
+
+    def delete_stale_points(self, collection_name: str, doc_id: str, keep_ids: Sequence[str]) -> None:
+        """Delete a document's points whose ids are not in keep_ids."""
+        must_not = [HasIdCondition(has_id=list(keep_ids))] if keep_ids else None
+        self.client.delete(
+            collection_name=collection_name,
+            points_selector=FilterSelector(filter=Filter(
+                must=[FieldCondition(key="doc_id", match=MatchValue(value=doc_id))],
+                must_not=must_not
+            )),
+            wait=True
+        )
+
+    def replace_document(self, collection_name: str, doc_id: str, points: Sequence[PointStruct]) -> List[Future]:
+        """
+        Upsert a document's points and delete its points from earlier chunkings.
+
+        The delete only matches ids outside the new set, so it is safe to run
+        while the upserts are still in flight.
+
+        Returns:
+            Upsert futures (see upsert)
+        """
+        futures = self.upsert(collection_name, points)
+        self.delete_stale_points(collection_name, doc_id, [p.id for p in points])
+        return futures
+
+    # ------------------------------------------------------------------
+    # Barrier and reporting
+    # ------------------------------------------------------------------
+
+    def flush(self) -> Dict:
+        """
+        Wait until everything queued so far is applied.
+
+        Waits for all queued batches, then re-upserts the last point of each
+        touched collection with wait=True: Qdrant applies updates in order, so
+        that returns only after every earlier wait=False update is visible.
+
+        Returns:
+            Throughput report (see report)
+        """
+        while True:
+            with self._lock:
+                pending = list(self._pending)
+            if not pending:
+                break
+            for future in pending:
+                try:
+                    future.result()
+                except Exception:
+                    pass  # Recorded in self.failures
+
+        with self._lock:
+            barriers = list(self._last_point.items())
+            self._last_point.clear()
+        for collection_name, point in barriers:
+            self.client.upsert(collection_name=collection_name, points=[point], wait=True)
+
+        report = self.report()
+        logger.info(
+            f"📤 Qdrant: {report['points']:,} points in {report['batches']:,} batches, "
+            f"{report['points_per_second']:.1f} points/s, {report['mb_per_second']:.2f} MB/s"
+            + (f", {report['failed_points']:,} failed" if report['failed_points'] else "")
+        )
+        return report
+
+    def report(self) -> Dict:
+        """Counters plus throughput since the first upsert."""
+        elapsed = time.time() - self._started if self._started else 0.0
+        with self._lock:
+            report = dict(self.stats)
+        report["seconds"] = round(elapsed, 2)
+        report["points_per_second"] = report["points"] / elapsed if elapsed > 0 else 0.0
+        report["mb_per_second"] = report["bytes"] / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+        return report
+
+    def close(self):
+        """Flush and stop the worker threads."""
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
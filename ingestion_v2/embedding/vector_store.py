@@ -0,0 +1,207 @@
+"""
+Content-addressed local vector store.
+
+Embeddings are keyed by (model, dimension, sha256(text)). A chunk whose text is
+unchanged is never sent to the embedding API twice - not on a re-run, not after
+a re-chunk that leaves most chunks intact, and not when a Qdrant collection is
+rebuilt for a schema change.
+
+Layout (one directory per model / dimension / dtype):
+    vectors.bin   fixed-width little-endian rows, append-only, read via mmap
+    index.db      SQLite index: text_hash -> row number
+
+Rows are written before their index entries are committed, so the index never
+points at data that was not written. On open, a torn trailing row is truncated
+and index entries past the end of the data file are dropped.
+
+One process appends at a time (threads within it are fine); other processes can
+read concurrently.
+"""
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+import hashlib
+import logging
+import mmap
+import os
+import re
+import sqlite3
+import struct
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Supported on-disk element types -> struct format character
+DTYPES = {"float32": "f", "float16": "e"}
+
+# Max host parameters per SQLite IN (...) lookup
+_LOOKUP_BATCH = 500
+
+
+def text_hash(text: str) -> str:
+    """Content key for a text (stable across processes, unlike hash())."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _slug(model: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", model).strip("_") or "model"
+
+
+class VectorStore:
+    """Memory-mapped embedding store for one (model, dim, dtype)."""
+
+    def __init__(self, root: Path, model: str, dim: int, dtype: str = "float32"):
+        """
+        Open (or create) a store.
+
+        Args:
+            root: Directory holding all stores
+            model: Model identity the vectors came from
+            dim: Embedding dimension
+            dtype: "float32" or "float16" (half the disk, ~3 significant digits)
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported dtype: {dtype} (expected one of {sorted(DTYPES)})")
+
+        self.model = model
+        self.dim = int(dim)
+        self.dtype = dtype
+        self.row_format = f"<{self.dim}{DTYPES[dtype]}"
+        self.row_bytes = struct.calcsize(self.row_format)
+        self.path = Path(root) / f"{_slug(model)}__{self.dim}__{dtype}"
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path / "index.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors (text_hash TEXT PRIMARY KEY, row INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._check_meta()
+
+        data_path = self.path / "vectors.bin"
+        self._file = open(data_path, "a+b")
+        size = os.path.getsize(data_path)
+        self._rows = size // self.row_bytes
+        if size % self.row_bytes:
+            logger.warning(f"⚠️ Vector store {self.path.name}: truncating torn trailing row")
+            self._file.truncate(self._rows * self.row_bytes)
+        dropped = self._conn.execute("DELETE FROM vectors WHERE row >= ?", (self._rows,)).rowcount
+        if dropped:
+            logger.warning(f"⚠️ Vector store {self.path.name}: dropped {dropped} index entries without data")
+        self._conn.commit()
+
+        self._mmap: Optional[mmap.mmap] = None
+        self._mapped_rows = 0
+        self.stats = {"hits": 0, "misses": 0, "writes": 0}
+
+    def _check_meta(self):
+        expected = {"model": self.model, "dim": str(self.dim), "dtype": self.dtype}
+        stored = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+        if not stored:
+            self._conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", expected.items())
+            self._conn.commit()
+        elif stored != expected:
+            raise ValueError(f"Vector store at {self.path} was created for {stored}, not {expected}")
+
+    def close(self):
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+            self._file.close()
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __contains__(self, text: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM vectors WHERE text_hash = ?", (text_hash(text),)
+            ).fetchone()
+        return row is not None
+
+    def _lookup_rows(self, hashes: Sequence[str]) -> Dict[str, int]:
+        rows = {}
+        unique = list(dict.fromkeys(hashes))
+        for i in range(0, len(unique), _LOOKUP_BATCH):
+            batch = unique[i:i + _LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows.update(self._conn.execute(
+                f"SELECT text_hash, row FROM vectors WHERE text_hash IN ({placeholders})", batch
+            ).fetchall())
+        return rows
+
+    def _read_row(self, row: int) -> List[float]:
+        if row >= self._mapped_rows:
+            # Appends since the last mapping: remap to cover them
+            if self._mmap is not None:
+                self._mmap.close()
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped_rows = len(self._mmap) // self.row_bytes
+        return list(struct.unpack_from(self.row_format, self._mmap, row * self.row_bytes))
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """Stored embedding for a text, or None."""
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Stored embeddings for texts (None where missing), in input order.
+        """
+        hashes = [text_hash(text) for text in texts]
+        with self._lock:
+            rows = self._lookup_rows(hashes)
+            vectors = [self._read_row(rows[h]) if h in rows else None for h in hashes]
+            hits = len(hashes) - vectors.count(None)
+            self.stats["hits"] += hits
+            self.stats["misses"] += len(hashes) - hits
+        return vectors
+
+    def put_many(self, texts: Sequence[str], vectors: Iterable[Sequence[float]]) -> int:
+        """
+        Store embeddings (texts already in the store are left untouched).
+
+        Returns:
+            Number of new rows written
+        """
+        pending: Dict[str, Sequence[float]] = {}
+        for text, vector in zip(texts, vectors):
+            if len(vector) != self.dim:
+                raise ValueError(f"Wrong dimension: {len(vector)} vs {self.dim}")
+            pending.setdefault(text_hash(text), vector)
+        if not pending:
+            return 0
+
+        with self._lock:
+            existing = self._lookup_rows(list(pending))
+            new = [(h, v) for h, v in pending.items() if h not in existing]
+            if not new:
+                return 0
+
+            # Data first, index second: a crash in between leaves unindexed rows, never dangling entries
+            self._file.seek(0, os.SEEK_END)
+            first_row = self._file.tell() // self.row_bytes
+            self._file.write(b"".join(struct.pack(self.row_format, *vector) for _, vector in new))
+            self._file.flush()
+
+            self._conn.executemany(
+                "INSERT INTO vectors (text_hash, row) VALUES (?, ?)",
+                [(h, first_row + i) for i, (h, _) in enumerate(new)]
+            )
+            self._conn.commit()
+            self._rows = first_row + len(new)
+            self.stats["writes"] += len(new)
+        return len(new)
+
+    def put(self, text: str, vector: Sequence[float]) -> bool:
+        """Store one embedding; returns True if it was new."""
+        return self.put_many([text], [vector]) == 1
@@ -3,6 +3,7 @@ Entity Extractor
 Smart entity extraction: regex for simple, LLM for complex
 """
 import logging
+import os
 from typing import Dict, List, Optional
 from .patterns import EntityPatterns
 
@@ -37,6 +38,9 @@ class EntityExtractor:
         # LLM extractor (lazy load)
         self._llm_extractor = None
         
+        # Optional shared LLM work queue (set by the pipeline)
+        self.llm_queue = None
+        
         logger.info(f"Entity extractor initialized - LLM: {use_llm}")
     
     def extract(
@@ -86,8 +90,13 @@ class EntityExtractor:
         if self._llm_extractor is None:
             # Lazy load LLM extractor
             try:
-                from .llm_entity_extractor import LLMEntityExtractor
-                self._llm_extractor = LLMEntityExtractor()
+                from .llm_entity_extraction import LLMEntityExtractor
+                self._llm_extractor = LLMEntityExtractor(
+                    api_key=os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY") or ""
+                )
+                if self.llm_queue is not None:
+                    from ..utils.llm_queue import route_model
+                    route_model(self._llm_extractor, self.llm_queue, "entity_extraction")
             except Exception as e:
                 logger.error(f"Failed to load LLM extractor: {e}")
                 return {}
@@ -3,9 +3,13 @@ PDF text extraction for ingestion_v2.
 
 Clean, multi-strategy extraction without over-engineering.
 Uses: pdfplumber (primary) → PyPDF2 (fallback) → OCR (if needed)
+
+pdfplumber pages are processed in a single pass each: the page's layout
+objects are parsed once and text, tables and quality signals all come from
+that parse; the page cache is released before the next page is opened.
 """
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Dict, Iterator, List
 import logging
 
 try:
@@ -26,14 +30,26 @@ logger = logging.getLogger(__name__)
 class TextExtractor:
     """Extract text from PDFs using multiple strategies."""
     
-    def __init__(self, use_pdfplumber: bool = True, fallback_to_pypdf: bool = True):
+    # Share of "(cid:N)" glyphs above which a text layer is considered garbage
+    MAX_CID_RATIO = 0.3
+    # Image coverage above which a low-text page is treated as a scan
+    SCAN_IMAGE_RATIO = 0.8
+    
+    def __init__(
+        self,
+        use_pdfplumber: bool = True,
+        fallback_to_pypdf: bool = True,
+        min_words_per_page: int = 10
+    ):
         """
         Initialize text extractor.
         
         Args:
             use_pdfplumber: Use pdfplumber as primary method
             fallback_to_pypdf: Fall back to PyPDF2 if pdfplumber fails
+            min_words_per_page: Pages with fewer words are flagged for OCR
         """
+        self.min_words_per_page = min_words_per_page
         self.use_pdfplumber = use_pdfplumber and PDFPLUMBER_AVAILABLE
         self.fallback_to_pypdf = fallback_to_pypdf and PYPDF2_AVAILABLE
         
@@ -56,6 +72,9 @@ class TextExtractor:
                 - method: Extraction method used
                 - page_count: Number of pages
                 - word_count: Number of words
+                - page_texts: Native text per page (page order, "" for empty pages)
+                - pages: Per-page quality signals (pdfplumber only)
+                - page_offsets: Page → character range in text
                 - success: Boolean
         """
         logger.info(f"Extracting text from: {pdf_path.name}")
@@ -86,47 +105,139 @@ class TextExtractor:
             "char_count": 0,
             "success": False,
             "needs_ocr": True,
+            "page_texts": [],
+            "pages": [],
+            "page_offsets": [],
             "tables": [],
             "table_count": 0
         }
     
+    @staticmethod
+    def assemble_text(page_texts: List[str], tables: List[Dict]) -> str:
+        """
+        Build document text: non-empty pages in order, then table text.
+        
+        Args:
+            page_texts: Text per page
+            tables: Extracted tables (with formatted_text)
+            
+        Returns:
+            Document text
+        """
+        all_text = "\n\n".join(t for t in page_texts if t)
+        
+        # Add table text to main text if tables were found
+        table_texts = [t['formatted_text'] for t in tables if t.get('formatted_text')]
+        if table_texts:
+            all_text += "\n\n" + "\n\n".join(table_texts)
+        
+        return all_text
+    
+    @staticmethod
+    def page_offsets(page_texts: List[str]) -> List[Dict]:
+        """
+        Character range of each page in the text built by assemble_text.
+        
+        Args:
+            page_texts: Text per page
+            
+        Returns:
+            List of {"page": 1-based page number, "start": int, "end": int}
+            (pages without text are omitted)
+        """
+        offsets = []
+        position = 0
+        for page_number, page_text in enumerate(page_texts, 1):
+            if not page_text:
+                continue
+            if offsets:
+                position += 2  # "\n\n" separator
+            offsets.append({"page": page_number, "start": position, "end": position + len(page_text)})
+            position += len(page_text)
+        return offsets
+    
+    def iter_pages(self, pdf_path: Path) -> Iterator[Dict]:
+        """
+        Stream pages out of a PDF, one layout parse per page.
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Yields:
+            Dictionary per page with text, tables and quality signals
+        """
+        with pdfplumber.open(pdf_path) as pdf:
+            for page_num, page in enumerate(pdf.pages):
+                try:
+                    yield self._extract_page(page, page_num)
+                finally:
+                    # Drop this page's parsed layout before moving on
+                    if hasattr(page, "close"):
+                        page.close()
+                    elif hasattr(page, "flush_cache"):
+                        page.flush_cache()
+    
+    def _extract_page(self, page, page_num: int) -> Dict:
+        """Text, tables and quality signals from one parse of a page."""
+        page_text = ""
+        tables = []
+        chars = []
+        image_ratio = 0.0
+        try:
+            # Parses the page layout; extract_text/extract_tables reuse it
+            chars = page.chars
+            page_text = page.extract_text() or ""
+            tables = self._extract_tables_from_page(page, page_num)
+            
+            page_area = float(page.width * page.height) or 1.0
+            image_area = sum(
+                max(0.0, float(img["x1"] - img["x0"])) * max(0.0, float(img["bottom"] - img["top"]))
+                for img in page.images
+            )
+            image_ratio = min(1.0, image_area / page_area)
+        except Exception as e:
+            logger.debug(f"Error extracting page {page_num}: {e}")
+        
+        word_count = len(page_text.split())
+        cid_count = page_text.count("(cid:")
+        cid_ratio = cid_count / max(word_count, 1)
+        needs_ocr = (
+            word_count < self.min_words_per_page
+            or cid_ratio > self.MAX_CID_RATIO
+            or (image_ratio > self.SCAN_IMAGE_RATIO and word_count < 50)
+        )
+        
+        return {
+            "page_num": page_num,
+            "text": page_text,
+            "tables": tables,
+            "stats": {
+                "page": page_num + 1,
+                "word_count": word_count,
+                "char_count": len(chars),
+                "table_count": len(tables),
+                "image_ratio": round(image_ratio, 3),
+                "cid_ratio": round(cid_ratio, 3),
+                "needs_ocr": needs_ocr,
+            },
+        }
+    
     def _extract_with_pdfplumber(self, pdf_path: Path) -> Dict:
         """Extract text and tables using pdfplumber."""
         try:
-            text_parts = []
+            page_texts = []
+            page_stats = []
             extracted_tables = []
-            page_count = 0
             
-            with pdfplumber.open(pdf_path) as pdf:
-                page_count = len(pdf.pages)
-                
-                for page_num, page in enumerate(pdf.pages):
-                    try:
-                        # Extract regular text
-                        page_text = page.extract_text()
-                        if page_text:
-                            text_parts.append(page_text)
-                        
-                        # Extract tables from this page
-                        page_tables = self._extract_tables_from_page(page, page_num)
-                        extracted_tables.extend(page_tables)
-                        
-                    except Exception as e:
-                        logger.debug(f"Error extracting page {page_num}: {e}")
-                        continue
+            for page in self.iter_pages(pdf_path):
+                page_texts.append(page["text"])
+                page_stats.append(page["stats"])
+                extracted_tables.extend(page["tables"])
             
-            # Combine regular text and table text
-            all_text = "\n\n".join(text_parts)
+            page_count = len(page_texts)
             
-            # Add table text to main text if tables were found
-            if extracted_tables:
-                table_texts = []
-                for table_info in extracted_tables:
-                    table_texts.append(table_info['formatted_text'])
-                
-                # Merge table text with regular text
-                if table_texts:
-                    all_text += "\n\n" + "\n\n".join(table_texts)
+            # Combine regular text and table text
+            all_text = self.assemble_text(page_texts, extracted_tables)
             
             word_count = len(all_text.split())
             
@@ -138,6 +249,9 @@ class TextExtractor:
                 "char_count": len(all_text),
                 "success": word_count > 0,
                 "needs_ocr": word_count < 50,
+                "page_texts": page_texts,
+                "pages": page_stats,
+                "page_offsets": self.page_offsets(page_texts),
                 "tables": extracted_tables,
                 "table_count": len(extracted_tables)
             }
@@ -218,7 +332,7 @@ class TextExtractor:
     def _extract_with_pypdf(self, pdf_path: Path) -> Dict:
         """Extract text using PyPDF2."""
         try:
-            text_parts = []
+            page_texts = []
             page_count = 0
             
             with open(pdf_path, 'rb') as f:
@@ -226,15 +340,14 @@ class TextExtractor:
                 page_count = len(pdf_reader.pages)
                 
                 for page in pdf_reader.pages:
+                    page_text = ""
                     try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text_parts.append(page_text)
+                        page_text = page.extract_text() or ""
                     except Exception as e:
                         logger.debug(f"Error extracting page: {e}")
-                        continue
+                    page_texts.append(page_text)
             
-            text = "\n\n".join(text_parts)
+            text = self.assemble_text(page_texts, [])
             word_count = len(text.split())
             
             return {
@@ -245,6 +358,9 @@ class TextExtractor:
                 "char_count": len(text),
                 "success": word_count > 0,
                 "needs_ocr": word_count < 50,
+                "page_texts": page_texts,
+                "pages": [],
+                "page_offsets": self.page_offsets(page_texts),
                 "tables": [],
                 "table_count": 0
             }
@@ -2,10 +2,19 @@
 Selective OCR engine for low-quality PDFs.
 
 Simple, targeted OCR - only used when regular extraction fails.
+
+OCR is page-granular: only pages without a usable text layer are OCR'd, each
+page is rasterized on its own (never the whole PDF in memory) and pages are
+spread over a process pool. Results merge back in page order.
 """
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional
 import logging
+import multiprocessing
+import os
+
+from .extract_text import TextExtractor
 
 try:
     import pytesseract
@@ -18,17 +27,61 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+def _ocr_page(pdf_path: str, page_number: int, dpi: int, lang: str) -> str:
+    """
+    Rasterize and OCR one page (runs in a worker process).
+    
+    Args:
+        pdf_path: Path to PDF file
+        page_number: 1-based page number
+        dpi: Rasterization resolution
+        lang: Tesseract language
+        
+    Returns:
+        OCR text ("" on failure)
+    """
+    try:
+        images = pdf2image.convert_from_path(
+            pdf_path, dpi=dpi, first_page=page_number, last_page=page_number
+        )
+        if not images:
+            return ""
+        image = images[0]
+        try:
+            return pytesseract.image_to_string(image, lang=lang)
+        finally:
+            image.close()
+    except Exception as e:
+        logger.warning(f"OCR failed for page {page_number}: {e}")
+        return ""
+
+
 class OCREngine:
     """Simple OCR engine for problematic PDFs."""
     
-    def __init__(self, confidence_threshold: float = 0.3):
+    def __init__(
+        self,
+        confidence_threshold: float = 0.3,
+        min_words_per_page: int = 10,
+        max_workers: Optional[int] = None,
+        dpi: int = 200,
+        lang: str = 'eng'
+    ):
         """
         Initialize OCR engine.
         
         Args:
             confidence_threshold: Minimum confidence for OCR (0-1)
+            min_words_per_page: Pages with fewer native words get OCR'd
+            max_workers: OCR worker processes (None/0 = one per CPU core)
+            dpi: Rasterization resolution
+            lang: Tesseract language
         """
         self.confidence_threshold = confidence_threshold
+        self.min_words_per_page = min_words_per_page
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.dpi = dpi
+        self.lang = lang
         self.available = TESSERACT_AVAILABLE
         
         if not self.available:
@@ -52,7 +105,95 @@ class OCREngine:
         words_per_page = word_count / max(page_count, 1)
         
         # If less than 10 words per page, probably needs OCR
-        return words_per_page < 10
+        return words_per_page < self.min_words_per_page
+    
+    def pages_needing_ocr(self, page_texts: List[str]) -> List[int]:
+        """
+        Find pages without a usable text layer.
+        
+        Args:
+            page_texts: Native text per page (page order)
+            
+        Returns:
+            1-based page numbers to OCR
+        """
+        return [
+            i for i, page_text in enumerate(page_texts, 1)
+            if len((page_text or "").split()) < self.min_words_per_page
+        ]
+    
+    def ocr_pages(self, pdf_path: Path, page_numbers: List[int]) -> Dict[int, str]:
+        """
+        OCR selected pages, one page image at a time per worker.
+        
+        Args:
+            pdf_path: Path to PDF file
+            page_numbers: 1-based page numbers
+            
+        Returns:
+            Dictionary mapping page number to OCR text
+        """
+        if not self.available or not page_numbers:
+            return {}
+        
+        workers = min(self.max_workers, len(page_numbers))
+        if workers <= 1:
+            return {
+                n: _ocr_page(str(pdf_path), n, self.dpi, self.lang)
+                for n in page_numbers
+            }
+        
+        # spawn: callers may already hold gRPC clients that don't survive fork
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            texts = pool.map(
+                _ocr_page,
+                [str(pdf_path)] * len(page_numbers),
+                page_numbers,
+                [self.dpi] * len(page_numbers),
+                [self.lang] * len(page_numbers)
+            )
+            return dict(zip(page_numbers, texts))
+    
+    def ocr_missing_pages(
+        self,
+        pdf_path: Path,
+        page_texts: List[str],
+        candidates: Optional[List[int]] = None
+    ) -> Dict:
+        """
+        OCR only the pages that lack a usable text layer and merge in page order.
+        
+        A page keeps its native text unless OCR produced more words.
+        
+        Args:
+            pdf_path: Path to PDF file
+            page_texts: Native text per page (page order)
+            candidates: 1-based pages to OCR (default: pages_needing_ocr)
+            
+        Returns:
+            Dictionary with merged page_texts and the pages OCR replaced
+        """
+        if candidates is None:
+            candidates = self.pages_needing_ocr(page_texts)
+        if not candidates or not self.available:
+            return {"page_texts": list(page_texts), "ocr_pages": []}
+        
+        logger.info(f"Running OCR on {len(candidates)}/{len(page_texts)} pages of {pdf_path.name}")
+        ocr_texts = self.ocr_pages(pdf_path, candidates)
+        
+        merged = list(page_texts)
+        replaced = []
+        for page_number, ocr_text in ocr_texts.items():
+            native = merged[page_number - 1] or ""
+            if len(ocr_text.split()) > len(native.split()):
+                merged[page_number - 1] = ocr_text
+                replaced.append(page_number)
+        
+        logger.info(f"✓ OCR replaced {len(replaced)}/{len(candidates)} pages")
+        return {"page_texts": merged, "ocr_pages": sorted(replaced)}
     
     def ocr_pdf(self, pdf_path: Path, max_pages: Optional[int] = None) -> Dict:
         """
@@ -75,33 +216,27 @@ class OCREngine:
         try:
             logger.info(f"Running OCR on: {pdf_path.name}")
             
-            # Convert PDF to images
-            images = pdf2image.convert_from_path(str(pdf_path))
-            
+            # Page count only - pages are rasterized one by one in the workers
+            page_count = pdf2image.pdfinfo_from_path(str(pdf_path))["Pages"]
             if max_pages:
-                images = images[:max_pages]
+                page_count = min(page_count, max_pages)
             
-            # OCR each page
-            text_parts = []
-            for i, image in enumerate(images):
-                try:
-                    page_text = pytesseract.image_to_string(image, lang='eng')
-                    if page_text.strip():
-                        text_parts.append(page_text)
-                    logger.debug(f"OCR page {i+1}/{len(images)}")
-                except Exception as e:
-                    logger.warning(f"OCR failed for page {i+1}: {e}")
-                    continue
+            ocr_texts = self.ocr_pages(pdf_path, list(range(1, page_count + 1)))
+            # Blank scans often OCR to whitespace ("\x0c"); count them as empty
+            # so the text and TextExtractor.page_offsets skip the same pages
+            page_texts = [ocr_texts.get(n, "") for n in range(1, page_count + 1)]
+            page_texts = [t if t.strip() else "" for t in page_texts]
             
-            text = "\n\n".join(text_parts)
+            text = TextExtractor.assemble_text(page_texts, [])
             word_count = len(text.split())
             
-            logger.info(f"✓ OCR completed: {word_count} words from {len(images)} pages")
+            logger.info(f"✓ OCR completed: {word_count} words from {page_count} pages")
             
             return {
                 "text": text,
+                "page_texts": page_texts,
                 "method": "ocr",
-                "page_count": len(images),
+                "page_count": page_count,
                 "word_count": word_count,
                 "char_count": len(text),
                 "success": word_count > 0,
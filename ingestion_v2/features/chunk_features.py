@@ -0,0 +1,110 @@
+"""
+Chunk Feature Builder
+Precomputes query-independent reranking signals for every chunk at ingestion time.
+
+The retrieval rerankers (diversity, BM25 boost, entity matching, section boost)
+used to rescan each candidate's text on every request. None of those signals
+depend on the query, so they are computed once here and shipped in the payload
+under metadata["features"].
+"""
+import re
+from typing import Dict, List, Optional
+
+from ingestion_v2.config.constants import (
+    CHUNK_FEATURE_VERSION,
+    POLICY_CATEGORY_INDICATORS,
+    SECTION_TYPE_BOOSTS,
+)
+
+# Chunk metadata field -> EntityMatcher entity type
+ENTITY_FIELDS = {
+    "mentioned_gos": "go_numbers",
+    "mentioned_sections": "sections",
+    "departments": "departments",
+    "schemes": "schemes",
+}
+
+
+class ChunkFeatureBuilder:
+    """
+    Builds the per-chunk feature record
+
+    Features:
+    - categories: policy category -> keyword hit count
+    - entity_keys: normalized entity values per entity type
+    - section_boost: section type prior
+
+    Per-chunk term frequencies are not stored: they would roughly double
+    every payload, and BM25Booster tokenizes a chunk in microseconds.
+    """
+
+    def __init__(self):
+        # Compiled exactly like DiversityReranker._compile_keyword_patterns
+        self.category_patterns = {
+            category: [
+                re.compile(r'\b' + re.escape(keyword.lower()) + r'\b', re.IGNORECASE)
+                for keyword in keywords
+            ]
+            for category, keywords in POLICY_CATEGORY_INDICATORS.items()
+        }
+
+    def build(self, content: str, chunk_metadata: Dict) -> Dict:
+        """
+        Build features for a single chunk
+
+        Args:
+            content: Chunk text
+            chunk_metadata: Metadata from MetadataBuilder.build_chunk_metadata
+
+        Returns:
+            Feature dictionary (JSON serializable)
+        """
+        return {
+            "version": CHUNK_FEATURE_VERSION,
+            "categories": self._category_counts(content),
+            "entity_keys": self._entity_keys(chunk_metadata),
+            "section_boost": self._section_boost(chunk_metadata.get("section_type")),
+        }
+
+    def _category_counts(self, content: str) -> Dict[str, int]:
+        """Count keyword hits per policy category (only non-zero categories)"""
+        counts = {}
+        for category, patterns in self.category_patterns.items():
+            hits = sum(len(pattern.findall(content)) for pattern in patterns)
+            if hits:
+                counts[category] = hits
+        return counts
+
+    def _entity_keys(self, chunk_metadata: Dict) -> Dict[str, List[str]]:
+        """Normalize chunk-level entity mentions into matchable keys"""
+        keys = {}
+        for field, entity_type in ENTITY_FIELDS.items():
+            values = chunk_metadata.get(field) or []
+            if not isinstance(values, list):
+                values = [values]
+
+            normalized = []
+            for value in values:
+                key = self._normalize_entity(entity_type, str(value))
+                if key and key not in normalized:
+                    normalized.append(key)
+
+            if normalized:
+                keys[entity_type] = normalized
+        return keys
+
+    def _normalize_entity(self, entity_type: str, value: str) -> str:
+        """Reduce an entity to the form EntityMatcher extracts from queries"""
+        value = " ".join(value.lower().split())
+
+        if entity_type in ("go_numbers", "sections"):
+            # "GO.MS.No.123" -> "123", "Section 12(1)" -> "12(1)"
+            match = re.search(r'(\d+(?:\([0-9a-z]+\))*)\s*$', value)
+            if match:
+                return match.group(1)
+
+        return value
+
+    def _section_boost(self, section_type: Optional[str]) -> float:
+        """Section type prior (orders > content > annexure > preamble)"""
+        return SECTION_TYPE_BOOSTS.get(section_type.lower() if section_type else "", 1.0)
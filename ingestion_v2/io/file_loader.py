@@ -80,6 +80,10 @@ class FileLoader:
                 files.extend(directory.glob(f"*{ext}"))
                 files.extend(directory.glob(f"*{ext.upper()}"))
         
+        # Stable order (and no duplicates on case-insensitive filesystems) so
+        # batch runs are reproducible
+        files = sorted(set(files))
+        
         logger.info(f"Found {len(files)} files in {directory}")
         
         file_infos = []
@@ -0,0 +1,317 @@
+"""
+Ingestion manifest for incremental re-ingestion.
+
+SQLite table keyed by source content hash (+ doc_id, since the same bytes can
+live under two file names). Each row records which stage fingerprints produced
+the outputs, where the outputs are, and the chunk / Qdrant point ids, so a
+batch run can:
+
+- skip documents whose bytes and stage fingerprints are unchanged,
+- reuse the saved extraction (PDF + OCR, the expensive part) when only
+  downstream stages changed,
+- hand the embed/upload step a delta: what to upsert, which points to delete.
+
+A stage fingerprint hashes the stage's source files plus the settings it reads,
+so editing a chunker or changing CHUNK_SIZES invalidates chunking and
+everything after it without anyone bumping a version by hand.
+"""
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import hashlib
+import json
+import logging
+import sqlite3
+import uuid
+
+from ingestion_v2.config import settings
+from ingestion_v2.config.constants import CHUNK_FEATURE_VERSION
+
+logger = logging.getLogger(__name__)
+
+PACKAGE_DIR = Path(__file__).parent.parent
+
+# Pipeline stages in execution order: (stage, source dirs/files, settings read)
+PIPELINE_STAGES = [
+    ("extraction", ["extraction"], [
+        "ENABLE_OCR", "OCR_CONFIDENCE_THRESHOLD", "MIN_WORDS_PER_PAGE",
+        "OCR_DPI", "OCR_WORKERS", "USE_PDFPLUMBER", "FALLBACK_TO_PYPDF",
+    ]),
+    ("cleaning", ["cleaning"], []),
+    ("classification", ["classification"], ["USE_LLM_FOR_CLASSIFICATION", "GEMINI_MODEL"]),
+    ("structure", ["structure"], []),
+    ("chunking", ["chunking"], ["CHUNK_SIZES", "MIN_CHUNK_WORDS", "MAX_CHUNK_WORDS"]),
+    ("entities", ["entities"], ["USE_LLM_FOR_ENTITIES", "LLM_ENABLED_VERTICALS"]),
+    ("relations", ["relations"], ["USE_LLM_FOR_RELATIONS", "RELATION_ENABLED_VERTICALS"]),
+    ("metadata", ["metadata", "features", "pipeline.py"], ["COMPUTE_CHUNK_FEATURES"]),
+]
+
+STAGE_NAMES = [name for name, _, _ in PIPELINE_STAGES]
+
+
+def file_content_hash(file_path: Path, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's bytes (streamed)."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def point_id_for(doc_id: str, chunk_id: str) -> str:
+    """Qdrant point id for a chunk (same scheme as the upload script)."""
+    return str(uuid.uuid5(uuid.NAMESPACE_DNS, f"{doc_id}|{chunk_id}"))
+
+
+def _source_hash(paths: List[str]) -> str:
+    """Hash the .py sources under the given package-relative paths."""
+    digest = hashlib.sha256()
+    for rel in paths:
+        target = PACKAGE_DIR / rel
+        files = sorted(target.rglob("*.py")) if target.is_dir() else [target]
+        for source in files:
+            if source.exists():
+                digest.update(str(source.relative_to(PACKAGE_DIR)).encode("utf-8"))
+                digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def compute_stage_fingerprints() -> Dict[str, str]:
+    """
+    Fingerprint every pipeline stage.
+
+    Fingerprints chain: a stage's fingerprint includes the one before it, so a
+    change upstream invalidates everything downstream.
+
+    Returns:
+        Dictionary mapping stage name to fingerprint
+    """
+    fingerprints = {}
+    previous = ""
+    for name, sources, setting_names in PIPELINE_STAGES:
+        config = {key: getattr(settings, key, None) for key in setting_names}
+        if name == "metadata":
+            config["CHUNK_FEATURE_VERSION"] = CHUNK_FEATURE_VERSION
+        payload = json.dumps(
+            {"previous": previous, "source": _source_hash(sources), "config": config},
+            sort_keys=True,
+            default=lambda v: sorted(v) if isinstance(v, (set, frozenset)) else str(v)
+        )
+        previous = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+        fingerprints[name] = previous
+    return fingerprints
+
+
+class IngestionManifest:
+    """SQLite-backed record of what produced each document's outputs."""
+
+    def __init__(self, db_path: Path):
+        """
+        Initialize manifest.
+
+        Args:
+            db_path: SQLite database file (created if missing)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                content_hash TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                source_path TEXT NOT NULL,
+                vertical TEXT,
+                stage_fingerprints TEXT NOT NULL,
+                output_paths TEXT NOT NULL,
+                chunk_ids TEXT NOT NULL,
+                point_ids TEXT NOT NULL,
+                uploaded INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (content_hash, doc_id)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_doc_id ON documents(doc_id)")
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def _row_to_dict(self, row: Optional[sqlite3.Row]) -> Optional[Dict]:
+        if row is None:
+            return None
+        record = dict(row)
+        for key in ("stage_fingerprints", "output_paths", "chunk_ids", "point_ids"):
+            record[key] = json.loads(record[key])
+        record["uploaded"] = bool(record["uploaded"])
+        return record
+
+    def get(self, content_hash: str, doc_id: str) -> Optional[Dict]:
+        """Record for exactly these bytes under this doc_id."""
+        row = self._conn.execute(
+            "SELECT * FROM documents WHERE content_hash = ? AND doc_id = ?",
+            (content_hash, doc_id)
+        ).fetchone()
+        return self._row_to_dict(row)
+
+    def find_by_doc_id(self, doc_id: str) -> List[Dict]:
+        """All records for a doc_id (older versions of a changed file)."""
+        rows = self._conn.execute("SELECT * FROM documents WHERE doc_id = ?", (doc_id,)).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def find_by_hash(self, content_hash: str) -> List[Dict]:
+        """All records with these bytes (renamed or duplicated files)."""
+        rows = self._conn.execute("SELECT * FROM documents WHERE content_hash = ?", (content_hash,)).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def all_records(self) -> List[Dict]:
+        rows = self._conn.execute("SELECT * FROM documents ORDER BY doc_id").fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def plan(self, content_hash: str, doc_id: str, fingerprints: Dict[str, str]) -> Dict:
+        """
+        Decide what a batch run has to do for one document.
+
+        Args:
+            content_hash: Hash of the source file
+            doc_id: Document ID derived from the file name
+            fingerprints: Current stage fingerprints
+
+        Returns:
+            {"action": "skip" | "process", "stale_stages": [...],
+             "reuse_extraction_from": doc dir or None, "previous": [records replaced]}
+        """
+        record = self.get(content_hash, doc_id)
+        previous = [r for r in self.find_by_doc_id(doc_id) if r["content_hash"] != content_hash]
+
+        if record is not None:
+            stale = [
+                name for name in STAGE_NAMES
+                if record["stage_fingerprints"].get(name) != fingerprints.get(name)
+            ]
+            outputs_exist = Path(record["output_paths"].get("chunks", "")).exists()
+            if not stale and outputs_exist:
+                return {"action": "skip", "stale_stages": [], "reuse_extraction_from": None, "previous": []}
+            candidates = [record]
+        else:
+            stale = list(STAGE_NAMES)
+            # Same bytes already ingested under another name
+            candidates = self.find_by_hash(content_hash)
+
+        reuse_from = None
+        for candidate in candidates:
+            doc_dir = Path(candidate["output_paths"].get("doc_dir", ""))
+            if (candidate["stage_fingerprints"].get("extraction") == fingerprints.get("extraction")
+                    and (doc_dir / "raw_text.txt").exists()
+                    and (doc_dir / "extraction.json").exists()):
+                reuse_from = str(doc_dir)
+                break
+        if reuse_from and "extraction" in stale:
+            stale.remove("extraction")
+
+        return {
+            "action": "process",
+            "stale_stages": stale,
+            "reuse_extraction_from": reuse_from,
+            "previous": previous + ([record] if record else []),
+        }
+
+    def record(
+        self,
+        content_hash: str,
+        source_path: str,
+        result: Dict,
+        fingerprints: Dict[str, str]
+    ) -> Dict:
+        """
+        Store a successful processing result.
+
+        Args:
+            content_hash: Hash of the source file
+            source_path: Source file path
+            result: process_document result (needs doc_id, vertical, output_paths, chunk_ids)
+            fingerprints: Stage fingerprints the result was produced with
+
+        Returns:
+            The stored record
+        """
+        doc_id = result["doc_id"]
+        chunk_ids = list(result.get("chunk_ids", []))
+        point_ids = [point_id_for(doc_id, chunk_id) for chunk_id in chunk_ids]
+
+        # A newer version replaces older rows for this doc_id
+        self._conn.execute(
+            "DELETE FROM documents WHERE doc_id = ? AND content_hash != ?",
+            (doc_id, content_hash)
+        )
+        self._conn.execute(
+            """
+            INSERT OR REPLACE INTO documents
+                (content_hash, doc_id, source_path, vertical, stage_fingerprints,
+                 output_paths, chunk_ids, point_ids, uploaded, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?)
+            """,
+            (
+                content_hash, doc_id, str(source_path), result.get("vertical"),
+                json.dumps(fingerprints, sort_keys=True),
+                json.dumps(result.get("output_paths", {}), sort_keys=True),
+                json.dumps(chunk_ids),
+                json.dumps(point_ids),
+                datetime.now().isoformat(),
+            )
+        )
+        self._conn.commit()
+        return self.get(content_hash, doc_id)
+
+    def remove(self, content_hash: str, doc_id: str):
+        """Drop a record (source file deleted)."""
+        self._conn.execute(
+            "DELETE FROM documents WHERE content_hash = ? AND doc_id = ?",
+            (content_hash, doc_id)
+        )
+        self._conn.commit()
+
+    def mark_uploaded(self, doc_id: str):
+        """Flag a document's current chunks as uploaded to Qdrant."""
+        self._conn.execute("UPDATE documents SET uploaded = 1 WHERE doc_id = ?", (doc_id,))
+        self._conn.commit()
+
+
+def build_delta(upserts: List[Dict], replaced: List[Dict], removed: List[Dict]) -> Dict:
+    """
+    Build the delta handed to the embed/upload step.
+
+    Args:
+        upserts: Records written this run
+        replaced: Records the upserts replaced (older content / other vertical)
+        removed: Records whose source file is gone
+
+    Returns:
+        {"upsert": [...], "delete": [{"doc_id", "vertical", "point_ids"}]}
+    """
+    current = {(r["vertical"], pid) for r in upserts for pid in r["point_ids"]}
+
+    deletes: Dict[tuple, List[str]] = {}
+    for record in list(replaced) + list(removed):
+        stale = [pid for pid in record["point_ids"] if (record["vertical"], pid) not in current]
+        if stale:
+            deletes.setdefault((record["doc_id"], record["vertical"]), []).extend(stale)
+
+    return {
+        "generated_at": datetime.now().isoformat(),
+        "upsert": [
+            {
+                "doc_id": r["doc_id"],
+                "vertical": r["vertical"],
+                "content_hash": r["content_hash"],
+                "chunks_path": r["output_paths"].get("chunks"),
+                "point_ids": r["point_ids"],
+            }
+            for r in upserts
+        ],
+        "delete": [
+            {"doc_id": doc_id, "vertical": vertical, "point_ids": sorted(set(point_ids))}
+            for (doc_id, vertical), point_ids in sorted(deletes.items())
+        ],
+    }
@@ -9,12 +9,18 @@ COMPLETE pipeline flow:
 5. Chunk document (vertical-aware)
 6. Extract entities (regex + optional LLM)
 7. Extract relations (regex + LLM for important docs)
-8. Build metadata (clean, retrieval-optimized)
+8. Build metadata (clean, retrieval-optimized) + precomputed reranking features
 9. Write outputs (organized by vertical)
 """
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+import atexit
+import json
 import logging
+import multiprocessing
+import os
+import shutil
 import sys
 import time
 
@@ -25,6 +31,12 @@ from ingestion_v2.config.settings import (
     OUTPUT_DIR, VERTICALS, GEMINI_API_KEY, 
     USE_LLM_FOR_ENTITIES, USE_LLM_FOR_RELATIONS,
     LLM_ENABLED_VERTICALS, RELATION_ENABLED_VERTICALS,
+    COMPUTE_CHUNK_FEATURES,
+    BATCH_WORKERS, LLM_MAX_CONCURRENT, LLM_REQUESTS_PER_MINUTE,
+    LLM_DOC_CONCURRENCY, LLM_BATCH_WINDOW, GEMINI_MAX_RETRIES,
+    INCREMENTAL_INGESTION, MANIFEST_FILENAME, DELTA_FILENAME,
+    ENABLE_OCR, MIN_WORDS_PER_PAGE, OCR_WORKERS, OCR_DPI,
+    USE_PDFPLUMBER, FALLBACK_TO_PYPDF,
     validate_config
 )
 
@@ -32,6 +44,9 @@ from ingestion_v2.io.file_loader import FileLoader
 from ingestion_v2.io.json_writer import write_json, write_jsonl
 from ingestion_v2.io.text_writer import write_text
 from ingestion_v2.io.directory_manager import DirectoryManager
+from ingestion_v2.io.manifest import (
+    IngestionManifest, build_delta, compute_stage_fingerprints, file_content_hash
+)
 
 from ingestion_v2.extraction.extract_text import TextExtractor
 from ingestion_v2.extraction.ocr_engine import OCREngine
@@ -66,11 +81,19 @@ from ingestion_v2.relations.relation_rules import should_extract_relations
 
 # Metadata
 from ingestion_v2.metadata.metadata_builder import MetadataBuilder
+from ingestion_v2.features.chunk_features import ChunkFeatureBuilder
 from ingestion_v2.utils.logging_config import setup_logging, StageLogger
+from ingestion_v2.utils.rate_limiter import LLMRateLimiter
+from ingestion_v2.utils.llm_queue import LLMWorkQueue, route_model
 
 logger = logging.getLogger(__name__)
 
 
+def doc_id_from_path(file_path: Path) -> str:
+    """Document ID derived from the file name."""
+    return file_path.stem.lower().replace(' ', '_').replace('-', '_')
+
+
 def _make_json_serializable(obj):
     """Convert dataclass objects and other non-serializable types to dicts."""
     if hasattr(obj, '__dict__'):
@@ -90,6 +113,40 @@ def _make_json_serializable(obj):
         return obj
 
 
+# Per-process pipeline for parallel batch workers (built once by the initializer)
+_worker_pipeline = None
+
+
+def _init_batch_worker(
+    output_dir: Optional[Path],
+    limiter: Optional[LLMRateLimiter],
+    log_level: str,
+    ocr_workers: int = 1
+):
+    """Pool initializer: build one pipeline per worker process."""
+    global _worker_pipeline
+    
+    # Spawned workers start with a bare root logger
+    if not logging.getLogger().handlers:
+        setup_logging(level=log_level, log_file=None, use_colors=False)
+    
+    _worker_pipeline = IngestionPipeline(output_dir=output_dir)
+    # Share the cores with the other batch workers instead of oversubscribing
+    _worker_pipeline.ocr_engine.max_workers = ocr_workers
+    if limiter is not None:
+        _worker_pipeline.set_llm_limiter(limiter)
+    # Flush and stop the LLM queue when the pool shuts the worker down
+    atexit.register(_worker_pipeline.close)
+
+
+def _process_in_worker(file_path: str, reuse_extraction_from: Optional[str] = None) -> Dict:
+    """Run one document through the worker's pipeline."""
+    return _worker_pipeline.process_document(
+        Path(file_path),
+        reuse_extraction_from=Path(reuse_extraction_from) if reuse_extraction_from else None
+    )
+
+
 class IngestionPipeline:
     """
     COMPLETE ingestion pipeline - uses all components properly.
@@ -115,8 +172,16 @@ class IngestionPipeline:
         self.dir_manager = DirectoryManager(self.output_dir)
         
         # Initialize extraction components
-        self.text_extractor = TextExtractor()
-        self.ocr_engine = OCREngine()
+        self.text_extractor = TextExtractor(
+            use_pdfplumber=USE_PDFPLUMBER,
+            fallback_to_pypdf=FALLBACK_TO_PYPDF,
+            min_words_per_page=MIN_WORDS_PER_PAGE
+        )
+        self.ocr_engine = OCREngine(
+            min_words_per_page=MIN_WORDS_PER_PAGE,
+            max_workers=OCR_WORKERS,
+            dpi=OCR_DPI
+        )
         
         # Initialize cleaning components
         self.text_cleaner = TextCleaner()
@@ -159,6 +224,25 @@ class IngestionPipeline:
         # Initialize metadata builder
         self.metadata_builder = MetadataBuilder()
         
+        # Initialize chunk feature builder (query-independent reranking signals)
+        self.feature_builder = ChunkFeatureBuilder() if COMPUTE_CHUNK_FEATURES else None
+        
+        # One LLM work queue for every stage: bounded concurrency, rate limit,
+        # retries, and packing of classification samples across documents
+        self.llm_queue = LLMWorkQueue(
+            max_concurrent=LLM_MAX_CONCURRENT,
+            limiter=LLMRateLimiter(
+                max_concurrent=LLM_MAX_CONCURRENT,
+                requests_per_minute=LLM_REQUESTS_PER_MINUTE
+            ),
+            max_retries=GEMINI_MAX_RETRIES
+        )
+        if self.vertical_classifier.use_llm:
+            self.vertical_classifier.set_llm_queue(self.llm_queue)
+        route_model(self.relation_extractor, self.llm_queue, "relation_extraction")
+        # Entity LLM extractor is lazy-loaded; it is routed through the queue on load
+        self.entity_extractor.llm_queue = self.llm_queue
+        
         # Create vertical directories
         self.dir_manager.create_vertical_dirs(VERTICALS)
         
@@ -166,12 +250,76 @@ class IngestionPipeline:
         logger.info(f"   - LLM entities: {USE_LLM_FOR_ENTITIES}")
         logger.info(f"   - LLM relations: {USE_LLM_FOR_RELATIONS}")
     
-    def process_document(self, file_path: Path) -> Dict:
+    def set_llm_limiter(self, limiter: LLMRateLimiter):
+        """
+        Route every Gemini call made by this pipeline through a shared limiter.
+        
+        All stages call Gemini through the LLM work queue, so swapping the
+        queue's limiter covers them all.
+        
+        Args:
+            limiter: Limiter shared by all batch workers
+        """
+        self.llm_queue.limiter = limiter
+        logger.debug("Shared LLM limiter installed on the LLM work queue")
+    
+    def close(self):
+        """
+        Shut down the LLM work queue (sends anything still buffered first).
+        
+        Call once the pipeline run is finished; the pipeline can't make LLM
+        calls afterwards.
+        """
+        self.llm_queue.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+    
+    def _load_saved_extraction(self, doc_dir: Path) -> Optional[Dict]:
+        """
+        Load stage 1 output written by an earlier run.
+        
+        Args:
+            doc_dir: Document output directory
+            
+        Returns:
+            Extraction result in TextExtractor format, or None if unreadable
+        """
+        try:
+            text = (doc_dir / "raw_text.txt").read_text(encoding="utf-8")
+            with open(doc_dir / "extraction.json", "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load saved extraction from {doc_dir}: {e}")
+            return None
+        
+        tables = saved.get("tables", [])
+        return {
+            "text": text,
+            "method": f"{saved.get('method', 'unknown')} (reused)",
+            "page_count": saved.get("page_count", 0),
+            "word_count": saved.get("word_count", len(text.split())),
+            "char_count": saved.get("char_count", len(text)),
+            "success": True,
+            "needs_ocr": False,  # Saved text is already post-OCR
+            "tables": tables,
+            "table_count": len(tables),
+            "pages": saved.get("pages", []),
+            "page_offsets": saved.get("page_offsets", []),
+        }
+    
+    def process_document(self, file_path: Path, reuse_extraction_from: Optional[Path] = None) -> Dict:
         """
         Process a single document through the COMPLETE pipeline.
         
         Args:
             file_path: Path to PDF file
+            reuse_extraction_from: Output dir of an earlier run of the same bytes;
+                its raw_text.txt / extraction.json replace stage 1 (PDF + OCR)
             
         Returns:
             Processing result dictionary
@@ -186,15 +334,23 @@ class IngestionPipeline:
         
         try:
             # Generate doc_id
-            doc_id = file_path.stem.lower().replace(' ', '_').replace('-', '_')
+            doc_id = doc_id_from_path(file_path)
             logger.info(f"Document ID: {doc_id}")
             
             # ================================================================
             # STAGE 1: TEXT EXTRACTION
             # ================================================================
             with StageLogger(logger, "STAGE 1: TEXT EXTRACTION") as stage:
-                stage.step("Loading PDF file")
-                extraction_result = self.text_extractor.extract(file_path)
+                extraction_result = None
+                if reuse_extraction_from is not None:
+                    stage.step(f"Reusing extraction from {reuse_extraction_from}")
+                    extraction_result = self._load_saved_extraction(reuse_extraction_from)
+                    if extraction_result is None:
+                        stage.warning("Saved extraction unreadable - extracting again")
+                
+                if extraction_result is None:
+                    stage.step("Loading PDF file")
+                    extraction_result = self.text_extractor.extract(file_path)
                 
                 # Check if we should try OCR before failing
                 if not extraction_result["success"] and not extraction_result.get("needs_ocr", False):
@@ -222,27 +378,40 @@ class IngestionPipeline:
                         stage.metric("Total table rows", table_rows)
                 
                 # OCR if needed (including complete extraction failures)
-                if extraction_result.get("needs_ocr", False):
-                    if not extraction_result["success"]:
-                        stage.step("Text extraction failed - attempting OCR")
-                        stage.warning(f"Standard extraction failed, trying OCR on {page_count} pages")
-                        ocr_result = self.ocr_engine.ocr_pdf(file_path)
-                        if ocr_result["success"]:
-                            text = ocr_result["text"]
-                            word_count = ocr_result["word_count"]
-                            char_count = ocr_result["char_count"]
-                            stage.metric("Words from OCR", word_count)
-                        else:
-                            stage.error(f"OCR also failed: {ocr_result.get('error', 'Unknown error')}")
-                            return {"status": "failed", "stage": "extraction", "doc_id": doc_id}
+                page_texts = extraction_result.get("page_texts") or []
+                page_offsets = extraction_result.get("page_offsets", [])
+                if extraction_result["success"] and page_texts and ENABLE_OCR:
+                    # Page-level: OCR only the pages without a usable text layer
+                    page_stats = extraction_result.get("pages") or []
+                    if page_stats:
+                        ocr_candidates = [p["page"] for p in page_stats if p["needs_ocr"]]
+                    else:
+                        ocr_candidates = self.ocr_engine.pages_needing_ocr(page_texts)
+                    if ocr_candidates:
+                        stage.step(f"{len(ocr_candidates)}/{page_count} pages lack a usable text layer - running page OCR")
+                        merged = self.ocr_engine.ocr_missing_pages(file_path, page_texts, ocr_candidates)
+                        stage.metric("Pages OCR'd", len(merged["ocr_pages"]))
+                        if merged["ocr_pages"]:
+                            text = TextExtractor.assemble_text(merged["page_texts"], extracted_tables)
+                            page_offsets = TextExtractor.page_offsets(merged["page_texts"])
+                            word_count = len(text.split())
+                            char_count = len(text)
+                            stage.metric("Words after OCR", word_count)
+                            stage.metric("Characters after OCR", char_count)
+                elif extraction_result.get("needs_ocr", False) and not extraction_result["success"]:
+                    stage.step("Text extraction failed - attempting OCR")
+                    stage.warning(f"Standard extraction failed, trying OCR on {page_count} pages")
+                    ocr_result = self.ocr_engine.ocr_pdf(file_path)
+                    if ocr_result["success"]:
+                        text = ocr_result["text"]
+                        page_offsets = TextExtractor.page_offsets(ocr_result.get("page_texts", []))
+                        word_count = ocr_result["word_count"]
+                        char_count = ocr_result["char_count"]
+                        page_count = ocr_result.get("page_count", page_count)
+                        stage.metric("Words from OCR", word_count)
                     else:
-                        stage.step("Low quality text detected - running OCR")
-                        stage.warning(f"Text quality low ({word_count} words for {page_count} pages)")
-                        text = self.ocr_engine.selective_ocr(file_path, text, page_count)
-                        word_count = len(text.split())
-                        char_count = len(text)
-                        stage.metric("Words after OCR", word_count)
-                        stage.metric("Characters after OCR", char_count)
+                        stage.error(f"OCR also failed: {ocr_result.get('error', 'Unknown error')}")
+                        return {"status": "failed", "stage": "extraction", "doc_id": doc_id}
                 
                 stage.success(f"Text extraction complete: {word_count} words, {page_count} pages")
             
@@ -251,10 +420,11 @@ class IngestionPipeline:
             # ================================================================
             with StageLogger(logger, "STAGE 2: TEXT CLEANING & NORMALIZATION") as stage:
                 stage.step("Normalizing Unicode characters")
-                cleaned_text = self.text_cleaner.clean(text)
+                cleaned_text, rule_hits = self.text_cleaner.clean_with_hits(text)
                 
                 stage.step("Applying normalization rules")
-                cleaned_text = self.normalizer.apply_all(cleaned_text)
+                cleaned_text, normalization_hits = self.normalizer.apply_with_hits(cleaned_text)
+                rule_hits.update(normalization_hits)
                 
                 original_words = word_count
                 cleaned_words = len(cleaned_text.split())
@@ -267,6 +437,9 @@ class IngestionPipeline:
                 stage.metric("Original characters", original_chars)
                 stage.metric("Cleaned characters", cleaned_chars)
                 stage.metric("Character reduction", f"{((original_chars - cleaned_chars) / max(original_chars, 1) * 100):.1f}%")
+                if rule_hits:
+                    top_rules = sorted(rule_hits.items(), key=lambda kv: -kv[1])[:5]
+                    stage.metric("Top cleaning rules", ", ".join(f"{name}={count}" for name, count in top_rules))
                 
                 stage.success(f"Text cleaning complete: {cleaned_words} words, {cleaned_chars} characters")
             
@@ -528,12 +701,20 @@ class IngestionPipeline:
                         vertical=vertical
                     )
                     
+                    # Precompute reranking features so retrieval doesn't rescan text
+                    if self.feature_builder:
+                        chunk_metadata["features"] = self.feature_builder.build(
+                            chunk_dict["content"],
+                            chunk_metadata
+                        )
+                    
                     # Add metadata to chunk
                     chunk_dict["metadata"] = chunk_metadata
                     chunk_dicts.append(chunk_dict)
                 
                 stage.metric("Chunks processed", len(chunk_dicts))
                 stage.metric("Metadata fields per chunk", len(chunk_dicts[0]["metadata"]) if chunk_dicts else 0)
+                stage.metric("Chunk features", "computed" if self.feature_builder else "disabled")
                 
                 stage.success(f"Metadata building complete: {len(chunk_dicts)} chunks with metadata")
             
@@ -550,6 +731,19 @@ class IngestionPipeline:
                 write_text(text, output_paths["raw_text"])
                 stage.metric("  raw_text.txt", f"{output_paths['raw_text'].stat().st_size:,} bytes")
                 
+                # Write extraction summary (lets incremental runs skip stage 1)
+                extraction_path = output_paths["doc_dir"] / "extraction.json"
+                write_json({
+                    "method": extraction_result.get("method", "unknown"),
+                    "page_count": page_count,
+                    "word_count": word_count,
+                    "char_count": char_count,
+                    "tables": extraction_result.get("tables", []),
+                    "pages": extraction_result.get("pages", []),
+                    # Page → character range in raw_text.txt (for snippet location)
+                    "page_offsets": page_offsets,
+                }, extraction_path)
+                
                 # Write cleaned text
                 stage.step("Writing cleaned text")
                 cleaned_text_path = output_paths.get("cleaned_text", output_paths["doc_dir"] / "cleaned_text.txt")
@@ -621,6 +815,8 @@ class IngestionPipeline:
                 "relations_count": len(relations),
                 "processing_time": processing_time,
                 "output_dir": str(output_paths["doc_dir"]),
+                "output_paths": {name: str(path) for name, path in output_paths.items()},
+                "chunk_ids": [c["chunk_id"] for c in chunk_dicts],
             }
             
             logger.info(f"\n{'='*80}")
@@ -650,16 +846,39 @@ class IngestionPipeline:
                 "stage": "unknown"
             }
     
-    def process_batch(self, input_dir: Path, max_docs: Optional[int] = None) -> List[Dict]:
+    def process_batch(
+        self,
+        input_dir: Path,
+        max_docs: Optional[int] = None,
+        workers: Optional[int] = None,
+        incremental: Optional[bool] = None,
+        doc_threads: Optional[int] = None
+    ) -> List[Dict]:
         """
         Process all documents in a directory.
         
+        With workers > 1 documents run in a process pool: each worker builds
+        its pipeline (parsers, chunkers, LLM clients) once, and all workers
+        share one LLM rate limit. Results come back in input order either way.
+        
+        With doc_threads > 1 (single-process runs) several documents are in
+        flight at once, so their LLM calls overlap in the shared work queue and
+        classification samples get packed into combined prompts.
+        
+        In incremental mode the ingestion manifest decides per file: unchanged
+        bytes + unchanged stage fingerprints are skipped, and documents whose
+        extraction is still valid reuse it. A delta file for the embed/upload
+        step is written to the output directory.
+        
         Args:
             input_dir: Input directory
             max_docs: Maximum documents to process (None for all)
+            workers: Worker processes (None = BATCH_WORKERS, 0 = one per CPU core)
+            incremental: Use the ingestion manifest (None = INCREMENTAL_INGESTION)
+            doc_threads: Documents in flight per process (None = LLM_DOC_CONCURRENCY)
             
         Returns:
-            List of processing results
+            List of processing results (same order as the input files)
         """
         logger.info(f"\n{'#'*60}")
         logger.info(f"BATCH PROCESSING: {input_dir}")
@@ -673,22 +892,272 @@ class IngestionPipeline:
         
         logger.info(f"📁 Found {len(file_infos)} documents to process")
         
-        results = []
+        if incremental is None:
+            incremental = INCREMENTAL_INGESTION
+        
         start_time = time.time()
         
-        for i, file_info in enumerate(file_infos, 1):
-            logger.info(f"\n{'─'*60}")
-            logger.info(f"[{i}/{len(file_infos)}] Processing document...")
-            logger.info(f"{'─'*60}")
+        results: List[Optional[Dict]] = [None] * len(file_infos)
+        jobs: List[Tuple[int, Path, Optional[str]]] = []
+        plans: Dict[int, Dict] = {}
+        manifest = fingerprints = None
+        
+        if incremental:
+            manifest = IngestionManifest(self.output_dir / MANIFEST_FILENAME)
+            fingerprints = compute_stage_fingerprints()
+            for i, file_info in enumerate(file_infos):
+                file_path = Path(file_info["path"])
+                content_hash = file_content_hash(file_path)
+                plan = manifest.plan(content_hash, doc_id_from_path(file_path), fingerprints)
+                plan["content_hash"] = content_hash
+                plans[i] = plan
+                if plan["action"] == "skip":
+                    results[i] = {"status": "skipped", "doc_id": doc_id_from_path(file_path)}
+                else:
+                    jobs.append((i, file_path, plan["reuse_extraction_from"]))
+            
+            reused = sum(1 for _, _, reuse_from in jobs if reuse_from)
+            logger.info(
+                f"📒 Manifest: {len(file_infos) - len(jobs)} unchanged, "
+                f"{len(jobs)} to process ({reused} reusing extraction)"
+            )
+        else:
+            jobs = [(i, Path(file_info["path"]), None) for i, file_info in enumerate(file_infos)]
+        
+        if workers is None:
+            workers = BATCH_WORKERS
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, len(jobs)))
+        
+        if doc_threads is None:
+            doc_threads = LLM_DOC_CONCURRENCY
+        doc_threads = max(1, min(doc_threads, len(jobs)))
+        
+        if workers > 1:
+            job_results = self._process_batch_parallel(jobs, workers)
+        elif doc_threads > 1:
+            job_results = self._process_batch_threaded(jobs, doc_threads)
+        else:
+            job_results = []
+            for n, (_, file_path, reuse_from) in enumerate(jobs, 1):
+                logger.info(f"\n{'─'*60}")
+                logger.info(f"[{n}/{len(jobs)}] Processing document...")
+                logger.info(f"{'─'*60}")
+                
+                result = self.process_document(
+                    file_path,
+                    reuse_extraction_from=Path(reuse_from) if reuse_from else None
+                )
+                job_results.append(result)
+        
+        for (i, _, _), result in zip(jobs, job_results):
+            results[i] = result
+        
+        if manifest is not None:
+            try:
+                self._update_manifest(
+                    manifest, fingerprints, file_infos, results, plans,
+                    full_scan=not max_docs, input_dir=input_dir
+                )
+            finally:
+                manifest.close()
+        
+        self._log_batch_summary(results, time.time() - start_time, workers)
+        
+        return results
+    
+    def _process_batch_threaded(
+        self,
+        jobs: List[Tuple[int, Path, Optional[str]]],
+        doc_threads: int
+    ) -> List[Dict]:
+        """
+        Run several documents at once in this process, returning results in job order.
+        
+        Documents spend most of their time waiting on Gemini; running them on
+        threads lets the LLM work queue overlap those calls and pack
+        classification samples from different documents into one prompt.
+        
+        Args:
+            jobs: (input index, file path, extraction dir to reuse) per document
+            doc_threads: Documents in flight
             
-            file_path = Path(file_info["path"])
-            result = self.process_document(file_path)
-            results.append(result)
+        Returns:
+            List of processing results (same order as jobs)
+        """
+        logger.info(
+            f"⚡ Threaded batch: {doc_threads} documents in flight, LLM limit "
+            f"{LLM_MAX_CONCURRENT} concurrent / {LLM_REQUESTS_PER_MINUTE} per min"
+        )
+        
+        results: List[Optional[Dict]] = [None] * len(jobs)
+        previous_window = self.llm_queue.batch_window
+        # Give classification requests from other documents a moment to join a pack
+        self.llm_queue.batch_window = LLM_BATCH_WINDOW
+        try:
+            with ThreadPoolExecutor(max_workers=doc_threads, thread_name_prefix="ingest-doc") as pool:
+                futures = {
+                    pool.submit(
+                        self.process_document,
+                        file_path,
+                        reuse_extraction_from=Path(reuse_from) if reuse_from else None
+                    ): n
+                    for n, (_, file_path, reuse_from) in enumerate(jobs)
+                }
+                for done, future in enumerate(as_completed(futures), 1):
+                    n = futures[future]
+                    results[n] = future.result()  # process_document never raises
+                    logger.info(f"[{done}/{len(jobs)}] {jobs[n][1].name}: {results[n].get('status')}")
+        finally:
+            self.llm_queue.batch_window = previous_window
+        
+        stats = self.llm_queue.get_stats()
+        if stats["requests"]:
+            logger.info(
+                f"🤖 LLM queue: {stats['requests']} requests in {stats['calls']} calls "
+                f"({stats['packed_items']} packed into {stats['packed_calls']} prompts, "
+                f"{stats['retries']} retries, {stats['failures']} failed)"
+            )
+        return results
+    
+    def _process_batch_parallel(
+        self,
+        jobs: List[Tuple[int, Path, Optional[str]]],
+        workers: int
+    ) -> List[Dict]:
+        """
+        Run documents through a process pool, returning results in job order.
         
-        # Summary
-        total_time = time.time() - start_time
+        Args:
+            jobs: (input index, file path, extraction dir to reuse) per document
+            workers: Number of worker processes
+            
+        Returns:
+            List of processing results (same order as jobs)
+        """
+        # spawn: the Gemini/gRPC clients already created in this process are not fork-safe
+        ctx = multiprocessing.get_context("spawn")
+        limiter = LLMRateLimiter(
+            max_concurrent=LLM_MAX_CONCURRENT,
+            requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+            context=ctx
+        )
+        log_level = logging.getLevelName(logging.getLogger().getEffectiveLevel())
+        
+        logger.info(
+            f"⚡ Parallel batch: {workers} workers, LLM limit "
+            f"{LLM_MAX_CONCURRENT} concurrent / {LLM_REQUESTS_PER_MINUTE} per min"
+        )
+        
+        results: List[Optional[Dict]] = [None] * len(jobs)
+        
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=ctx,
+            initializer=_init_batch_worker,
+            initargs=(self.output_dir, limiter, log_level, max(1, (os.cpu_count() or 1) // workers))
+        ) as pool:
+            futures = {
+                pool.submit(_process_in_worker, str(file_path), reuse_from): n
+                for n, (_, file_path, reuse_from) in enumerate(jobs)
+            }
+            
+            for done, future in enumerate(as_completed(futures), 1):
+                n = futures[future]
+                file_path = jobs[n][1]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # Worker crashed (or the pool broke) - record and keep going
+                    logger.error(f"❌ Worker failed on {file_path.name}: {e}")
+                    result = {
+                        "status": "failed",
+                        "error": str(e),
+                        "doc_id": doc_id_from_path(file_path),
+                        "stage": "worker"
+                    }
+                results[n] = result
+                logger.info(f"[{done}/{len(jobs)}] {file_path.name}: {result.get('status')}")
+        
+        return results
+    
+    def _update_manifest(
+        self,
+        manifest: IngestionManifest,
+        fingerprints: Dict[str, str],
+        file_infos: List[Dict],
+        results: List[Dict],
+        plans: Dict[int, Dict],
+        full_scan: bool,
+        input_dir: Optional[Path] = None
+    ):
+        """
+        Record this run in the manifest, clean up superseded outputs and
+        write the embed/upload delta.
+        
+        Args:
+            manifest: Open ingestion manifest
+            fingerprints: Stage fingerprints used for this run
+            file_infos: Input files (same order as results)
+            results: Processing results
+            plans: Manifest plan per input index
+            full_scan: Whether file_infos is the whole input directory
+                (only then are missing files treated as deleted)
+            input_dir: Directory this run scanned. The manifest is shared by
+                every input folder, so only records under it can be pruned
+        """
+        upserts, replaced, removed = [], [], []
+        
+        for i, (file_info, result) in enumerate(zip(file_infos, results)):
+            if result.get("status") != "success":
+                continue
+            plan = plans[i]
+            source_path = str(Path(file_info["path"]).resolve())
+            record = manifest.record(plan["content_hash"], source_path, result, fingerprints)
+            upserts.append(record)
+            for old in plan["previous"]:
+                replaced.append(old)
+                self._remove_stale_outputs(old, keep=record)
+        
+        if full_scan and input_dir is not None:
+            # Compare resolved paths so relative/absolute spellings of one file match
+            root = Path(input_dir).resolve()
+            seen = {Path(file_info["path"]).resolve() for file_info in file_infos}
+            for old in manifest.all_records():
+                old_path = Path(old["source_path"]).resolve()
+                if root not in old_path.parents or old_path in seen:
+                    continue
+                manifest.remove(old["content_hash"], old["doc_id"])
+                self._remove_stale_outputs(old)
+                removed.append(old)
+        
+        delta = build_delta(upserts, replaced, removed)
+        delta_path = self.output_dir / DELTA_FILENAME
+        write_json(delta, delta_path)
+        
+        logger.info(
+            f"📒 Manifest updated: {len(upserts)} upserted, {len(removed)} removed; "
+            f"delta → {delta_path} ({len(delta['upsert'])} to upload, "
+            f"{sum(len(d['point_ids']) for d in delta['delete'])} points to delete)"
+        )
+    
+    def _remove_stale_outputs(self, old: Dict, keep: Optional[Dict] = None):
+        """Delete an old record's output dir unless the new record still uses it."""
+        old_dir = old["output_paths"].get("doc_dir")
+        if not old_dir or (keep and keep["output_paths"].get("doc_dir") == old_dir):
+            return
+        old_dir = Path(old_dir)
+        # Only ever delete document dirs inside our own output tree
+        if old_dir.exists() and self.output_dir.resolve() in old_dir.resolve().parents:
+            shutil.rmtree(old_dir)
+            logger.info(f"🧹 Removed superseded outputs: {old_dir}")
+    
+    def _log_batch_summary(self, results: List[Dict], total_time: float, workers: int = 1):
+        """Log one aggregated summary for a batch run."""
         success_count = sum(1 for r in results if r["status"] == "success")
-        fail_count = len(results) - success_count
+        skipped_count = sum(1 for r in results if r["status"] == "skipped")
+        fail_count = len(results) - success_count - skipped_count
         
         # Calculate statistics
         successful_results = [r for r in results if r["status"] == "success"]
@@ -700,18 +1169,33 @@ class IngestionPipeline:
         else:
             total_chunks = total_entities = total_relations = avg_time = 0
         
+        by_vertical: Dict[str, int] = {}
+        for r in successful_results:
+            vertical = r.get("vertical", "unknown")
+            by_vertical[vertical] = by_vertical.get(vertical, 0) + 1
+        
+        failed_stages: Dict[str, int] = {}
+        for r in results:
+            if r["status"] == "failed":
+                stage = r.get("stage", "unknown")
+                failed_stages[stage] = failed_stages.get(stage, 0) + 1
+        
         logger.info(f"\n{'='*60}")
         logger.info(f"BATCH COMPLETE")
         logger.info(f"{'='*60}")
         logger.info(f"Total: {len(results)} documents")
-        logger.info(f"Success: {success_count} | Failed: {fail_count}")
-        logger.info(f"Total time: {total_time:.1f}s | Avg: {avg_time:.1f}s/doc")
+        logger.info(f"Success: {success_count} | Skipped (unchanged): {skipped_count} | Failed: {fail_count}")
+        logger.info(f"Total time: {total_time:.1f}s | Avg: {avg_time:.1f}s/doc | Workers: {workers}")
+        if total_time > 0:
+            logger.info(f"Throughput: {len(results) / total_time * 60:.1f} docs/min")
         logger.info(f"Total chunks: {total_chunks}")
         logger.info(f"Total entities: {total_entities}")
         logger.info(f"Total relations: {total_relations}")
+        if by_vertical:
+            logger.info(f"By vertical: {dict(sorted(by_vertical.items()))}")
+        if failed_stages:
+            logger.info(f"Failures by stage: {dict(sorted(failed_stages.items()))}")
         logger.info(f"{'='*60}\n")
-        
-        return results
 
 
 def main():
@@ -722,6 +1206,12 @@ def main():
     parser.add_argument("--input", type=str, required=True, help="Input directory or file")
     parser.add_argument("--output", type=str, default=None, help="Output directory")
     parser.add_argument("--max-docs", type=int, default=None, help="Max documents to process")
+    parser.add_argument("--full", action="store_true",
+                        help="Reprocess every document, ignoring the ingestion manifest")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes for batch runs (default: BATCH_WORKERS, 0 = all cores)")
+    parser.add_argument("--doc-threads", type=int, default=None,
+                        help="Documents in flight per process, sharing the LLM queue (default: LLM_DOC_CONCURRENCY)")
     
     args = parser.parse_args()
     
@@ -733,19 +1223,20 @@ def main():
         use_colors=True
     )
     
-    # Initialize pipeline
-    pipeline = IngestionPipeline(output_dir=Path(args.output) if args.output else None)
-    
-    # Process
-    input_path = Path(args.input)
-    if input_path.is_file():
-        result = pipeline.process_document(input_path)
-        print(f"\nResult: {result}")
-    elif input_path.is_dir():
-        results = pipeline.process_batch(input_path, max_docs=args.max_docs)
-        print(f"\nProcessed {len(results)} documents")
-    else:
-        print(f"Error: {input_path} is not a valid file or directory")
+    # Initialize pipeline (closed on exit, which stops the LLM work queue)
+    with IngestionPipeline(output_dir=Path(args.output) if args.output else None) as pipeline:
+        # Process
+        input_path = Path(args.input)
+        if input_path.is_file():
+            result = pipeline.process_document(input_path)
+            print(f"\nResult: {result}")
+        elif input_path.is_dir():
+            results = pipeline.process_batch(input_path, max_docs=args.max_docs, workers=args.workers,
+                                              incremental=False if args.full else None,
+                                              doc_threads=args.doc_threads)
+            print(f"\nProcessed {len(results)} documents")
+        else:
+            print(f"Error: {input_path} is not a valid file or directory")
 
 
 if __name__ == "__main__":
@@ -1,11 +1,24 @@
 """
 LLM Response Cache
-Simple file-based cache for LLM responses to avoid repeated API calls
+Single-file SQLite cache for LLM responses to avoid repeated API calls
+
+Entries live in one WAL-mode database next to the old per-entry JSON
+directory (cache/llm_responses.db), so lookups are one indexed query and
+parallel ingestion workers (threads or processes) can share the cache.
+Large responses are zlib-compressed; old entries expire (TTL) and the least
+recently used ones are evicted once the cache exceeds its size bound.
+
+Existing cache/llm_responses/<sha256>.json files are imported once on first
+open (keys are unchanged, so every old entry still hits).
 """
-import os
 import json
 import hashlib
 import logging
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
 from typing import Optional, Dict, Any
 from pathlib import Path
 
@@ -14,206 +27,385 @@ logger = logging.getLogger(__name__)
 
 class LLMCache:
     """
-    Simple file-based cache for LLM responses
+    SQLite-backed cache for LLM responses
     Uses content hash as key to ensure cache hits for identical inputs
     """
-    
-    def __init__(self, cache_dir: str = "cache/llm_responses"):
+
+    # Only refresh an entry's LRU timestamp if it is older than this (seconds),
+    # so hot entries don't turn every read into a write
+    TOUCH_INTERVAL = 60.0
+
+    # Run TTL/LRU eviction every N writes
+    EVICT_EVERY = 100
+
+    def __init__(
+        self,
+        cache_dir: str = "cache/llm_responses",
+        db_path: Optional[str] = None,
+        ttl_days: Optional[float] = None,
+        max_entries: Optional[int] = 100000,
+        compress_threshold: int = 2048,
+        migrate: bool = True
+    ):
         """
         Initialize LLM cache
-        
+
         Args:
-            cache_dir: Directory to store cache files
+            cache_dir: Legacy directory of per-entry JSON files (imported once)
+            db_path: SQLite file (default: <cache_dir>.db)
+            ttl_days: Expire entries older than this (None = never)
+            max_entries: Evict least recently used entries beyond this (None = unbounded)
+            compress_threshold: Compress responses larger than this many bytes
+            migrate: Import legacy JSON files on first open
         """
         self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
-        
+        self.db_path = Path(db_path) if db_path else self.cache_dir.parent / f"{self.cache_dir.name}.db"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_days * 86400 if ttl_days else None
+        self.max_entries = max_entries
+        self.compress_threshold = compress_threshold
+
+        # One connection per thread; SQLite serializes writers across threads and processes
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._writes = 0
+
         # Stats
         self.hits = 0
         self.misses = 0
-        
-        logger.info(f"LLM cache initialized at {cache_dir}")
-    
+
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                task_type TEXT,
+                content_length INTEGER,
+                cached_at TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                compressed INTEGER NOT NULL DEFAULT 0,
+                data BLOB NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        conn.commit()
+
+        if migrate:
+            self.migrate_files()
+
+        logger.info(f"LLM cache initialized at {self.db_path}")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
     def _generate_key(self, content: str, model: str = "", task_type: str = "") -> str:
         """
         Generate cache key from content hash
-        
+
         Args:
             content: Input content
             model: Model name
             task_type: Type of task (classification, relation_extraction, etc.)
-            
+
         Returns:
             Cache key
         """
         # Create combined string for hashing
         combined = f"{task_type}:{model}:{content}"
-        
+
         # Generate SHA-256 hash
         hash_object = hashlib.sha256(combined.encode('utf-8'))
         return hash_object.hexdigest()
-    
+
+    def _encode(self, response: Any) -> tuple:
+        data = json.dumps(response, ensure_ascii=False).encode('utf-8')
+        if len(data) > self.compress_threshold:
+            return zlib.compress(data, 6), 1
+        return data, 0
+
+    @staticmethod
+    def _decode(data: bytes, compressed: int) -> Any:
+        if compressed:
+            data = zlib.decompress(data)
+        return json.loads(data.decode('utf-8'))
+
+    def _count(self, hit: bool):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
     def get(
-        self, 
-        content: str, 
-        model: str = "", 
+        self,
+        content: str,
+        model: str = "",
         task_type: str = ""
     ) -> Optional[Dict[str, Any]]:
         """
         Get cached response
-        
+
         Args:
             content: Input content
             model: Model name
             task_type: Task type
-            
+
         Returns:
-            Cached response or None
+            Cached entry ({"response", "model", "task_type", ...}) or None
         """
         try:
             key = self._generate_key(content, model, task_type)
-            cache_file = self.cache_dir / f"{key}.json"
-            
-            if cache_file.exists():
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    cached_data = json.load(f)
-                
-                self.hits += 1
-                logger.debug(f"Cache hit for {task_type} task")
-                return cached_data
-            else:
-                self.misses += 1
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT model, task_type, content_length, cached_at, created, accessed, compressed, data "
+                "FROM entries WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None:
+                self._count(False)
                 logger.debug(f"Cache miss for {task_type} task")
                 return None
-                
+
+            entry_model, entry_task, content_length, cached_at, created, accessed, compressed, data = row
+            now = time.time()
+
+            if self.ttl_seconds and now - created > self.ttl_seconds:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                conn.commit()
+                self._count(False)
+                logger.debug(f"Cache entry expired for {task_type} task")
+                return None
+
+            if now - accessed > self.TOUCH_INTERVAL:
+                conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+                conn.commit()
+
+            self._count(True)
+            logger.debug(f"Cache hit for {task_type} task")
+            return {
+                "response": self._decode(data, compressed),
+                "model": entry_model,
+                "task_type": entry_task,
+                "content_length": content_length,
+                "cached_at": cached_at
+            }
+
         except Exception as e:
             logger.error(f"Cache read error: {e}")
-            self.misses += 1
+            self._count(False)
             return None
-    
+
     def set(
-        self, 
-        content: str, 
-        response: Dict[str, Any], 
-        model: str = "", 
+        self,
+        content: str,
+        response: Dict[str, Any],
+        model: str = "",
         task_type: str = ""
     ) -> bool:
         """
         Cache response
-        
+
         Args:
             content: Input content
             response: LLM response to cache
             model: Model name
             task_type: Task type
-            
+
         Returns:
             True if cached successfully
         """
         try:
             key = self._generate_key(content, model, task_type)
-            cache_file = self.cache_dir / f"{key}.json"
-            
-            # Add metadata
-            cache_data = {
-                "response": response,
-                "model": model,
-                "task_type": task_type,
-                "content_length": len(content),
-                "cached_at": str(self._get_current_timestamp())
-            }
-            
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
-            
+            data, compressed = self._encode(response)
+            now = time.time()
+
+            conn = self._conn()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO entries
+                    (key, model, task_type, content_length, cached_at, created, accessed, compressed, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, model, task_type, len(content), self._get_current_timestamp(), now, now, compressed, data)
+            )
+            conn.commit()
+
+            with self._stats_lock:
+                self._writes += 1
+                evict = self._writes % self.EVICT_EVERY == 0
+            if evict:
+                self.evict()
+
             logger.debug(f"Cached response for {task_type} task")
             return True
-            
+
         except Exception as e:
             logger.error(f"Cache write error: {e}")
             return False
-    
+
     def _get_current_timestamp(self) -> str:
         """Get current timestamp as string"""
-        from datetime import datetime
         return datetime.now().isoformat()
-    
+
+    def evict(self) -> int:
+        """
+        Drop expired entries, then least recently used ones beyond max_entries
+
+        Returns:
+            Number of entries removed
+        """
+        conn = self._conn()
+        removed = 0
+        if self.ttl_seconds:
+            removed += conn.execute(
+                "DELETE FROM entries WHERE created < ?", (time.time() - self.ttl_seconds,)
+            ).rowcount
+        if self.max_entries:
+            excess = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+            if excess > 0:
+                # Trim a little below the bound so eviction doesn't run on every write
+                excess += self.max_entries // 10
+                removed += conn.execute(
+                    "DELETE FROM entries WHERE key IN "
+                    "(SELECT key FROM entries ORDER BY accessed LIMIT ?)",
+                    (excess,)
+                ).rowcount
+        conn.commit()
+        if removed:
+            logger.info(f"Evicted {removed} LLM cache entries")
+        return removed
+
+    def migrate_files(self, remove: bool = False) -> int:
+        """
+        Import legacy per-entry JSON files (runs once per database)
+
+        Args:
+            remove: Delete each file after importing it
+
+        Returns:
+            Number of entries imported
+        """
+        conn = self._conn()
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_files'").fetchone():
+            return 0
+
+        imported = 0
+        files = sorted(self.cache_dir.glob("*.json")) if self.cache_dir.is_dir() else []
+        for cache_file in files:
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    cached_data = json.load(f)
+                data, compressed = self._encode(cached_data.get("response"))
+                mtime = cache_file.stat().st_mtime
+                conn.execute(
+                    """
+                    INSERT OR IGNORE INTO entries
+                        (key, model, task_type, content_length, cached_at, created, accessed, compressed, data)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        cache_file.stem,
+                        cached_data.get("model", ""),
+                        cached_data.get("task_type", ""),
+                        cached_data.get("content_length", 0),
+                        cached_data.get("cached_at") or datetime.fromtimestamp(mtime).isoformat(),
+                        mtime, mtime, compressed, data
+                    )
+                )
+                imported += 1
+            except Exception as e:
+                logger.warning(f"Skipping unreadable cache file {cache_file.name}: {e}")
+
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_files', ?)",
+            (self._get_current_timestamp(),)
+        )
+        conn.commit()
+
+        if remove:
+            for cache_file in files:
+                cache_file.unlink(missing_ok=True)
+        if imported:
+            logger.info(f"Imported {imported} legacy LLM cache files from {self.cache_dir}")
+        return imported
+
     def clear(self) -> bool:
         """
-        Clear all cache files
-        
+        Clear all cache entries
+
         Returns:
             True if cleared successfully
         """
         try:
-            import shutil
-            if self.cache_dir.exists():
-                shutil.rmtree(self.cache_dir)
-                self.cache_dir.mkdir(parents=True, exist_ok=True)
-            
+            conn = self._conn()
+            conn.execute("DELETE FROM entries")
+            conn.commit()
+            conn.execute("VACUUM")
+
             self.hits = 0
             self.misses = 0
             logger.info("Cache cleared")
             return True
-            
+
         except Exception as e:
             logger.error(f"Cache clear error: {e}")
             return False
-    
+
     def get_stats(self) -> Dict[str, Any]:
         """
         Get cache statistics
-        
+
         Returns:
             Cache stats
         """
         total_requests = self.hits + self.misses
         hit_rate = (self.hits / total_requests * 100) if total_requests > 0 else 0
-        
-        # Count cache files
-        cache_files = list(self.cache_dir.glob("*.json"))
-        total_cache_files = len(cache_files)
-        
-        # Calculate total cache size
-        total_size = sum(f.stat().st_size for f in cache_files)
+
+        total_entries, total_size = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM entries"
+        ).fetchone()
         total_size_mb = total_size / (1024 * 1024)
-        
+
         return {
             "hits": self.hits,
             "misses": self.misses,
             "hit_rate": f"{hit_rate:.1f}%",
-            "total_files": total_cache_files,
+            "total_entries": total_entries,
             "total_size_mb": f"{total_size_mb:.2f}",
-            "cache_dir": str(self.cache_dir)
+            "cache_db": str(self.db_path)
         }
-    
+
     def cleanup_old_files(self, days_old: int = 30) -> int:
         """
-        Remove cache files older than specified days
-        
+        Remove cache entries older than specified days
+
         Args:
-            days_old: Remove files older than this many days
-            
+            days_old: Remove entries older than this many days
+
         Returns:
-            Number of files removed
+            Number of entries removed
         """
         try:
-            from datetime import datetime, timedelta
-            cutoff_time = datetime.now() - timedelta(days=days_old)
-            
-            removed_count = 0
-            for cache_file in self.cache_dir.glob("*.json"):
-                # Check file modification time
-                file_time = datetime.fromtimestamp(cache_file.stat().st_mtime)
-                if file_time < cutoff_time:
-                    cache_file.unlink()
-                    removed_count += 1
-            
+            conn = self._conn()
+            removed_count = conn.execute(
+                "DELETE FROM entries WHERE created < ?", (time.time() - days_old * 86400,)
+            ).rowcount
+            conn.commit()
+
             if removed_count > 0:
-                logger.info(f"Removed {removed_count} old cache files")
-            
+                logger.info(f"Removed {removed_count} old cache entries")
+
             return removed_count
-            
+
         except Exception as e:
             logger.error(f"Cache cleanup error: {e}")
             return 0
@@ -221,19 +413,21 @@ class LLMCache:
 
 # Global cache instance
 _cache_instance = None
+_cache_lock = threading.Lock()
 
 
 def get_cache(cache_dir: str = "cache/llm_responses") -> LLMCache:
     """
     Get global cache instance
-    
+
     Args:
-        cache_dir: Cache directory
-        
+        cache_dir: Legacy cache directory (the database sits next to it)
+
     Returns:
         LLM cache instance
     """
     global _cache_instance
-    if _cache_instance is None:
-        _cache_instance = LLMCache(cache_dir)
-    return _cache_instance
\ No newline at end of file
+    with _cache_lock:
+        if _cache_instance is None:
+            _cache_instance = LLMCache(cache_dir)
+    return _cache_instance
@@ -0,0 +1,336 @@
+"""
+LLM work queue shared by the ingestion stages.
+
+Classification, entity extraction and relation extraction each make one
+blocking Gemini call per document. When several documents are in flight, their
+stages submit prompts here instead. The queue:
+
+- runs calls on a bounded thread pool, under the (optionally shared) rate
+  limiter, retrying failed calls with exponential backoff,
+- resolves each request's future back to the stage that submitted it,
+- packs small items of the same task from different documents into one prompt
+  (e.g. several classification samples), using a registered PromptPacker.
+
+Items a packed response doesn't answer are retried on their own, so packing
+never loses a result.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+import logging
+import threading
+import time
+
+from .rate_limiter import LLMRateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponse:
+    """Minimal stand-in for a Gemini response (stages only read .text)."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class PromptPacker:
+    """
+    Packs several items of one task into a single prompt.
+
+    Subclasses implement build_single, build and split.
+    """
+
+    max_items: int = 5
+    max_chars: int = 12000
+
+    def size(self, item: Any) -> int:
+        """Prompt characters an item adds."""
+        return len(str(item))
+
+    def build_single(self, item: Any) -> str:
+        """Prompt for one item on its own."""
+        raise NotImplementedError
+
+    def build(self, items: List[Any]) -> str:
+        """Prompt answering several items at once."""
+        raise NotImplementedError
+
+    def split(self, response_text: str, count: int) -> List[Optional[str]]:
+        """
+        Per-item response texts from a packed response, in item order.
+
+        Each text must parse exactly like a build_single() response; None
+        marks an item the response did not answer.
+        """
+        raise NotImplementedError
+
+
+class _PackSlot:
+    __slots__ = ("item", "future", "model")
+
+    def __init__(self, item: Any, future: Future, model: Any):
+        self.item = item
+        self.future = future
+        self.model = model
+
+
+class LLMWorkQueue:
+    """Concurrent, retrying, packing dispatcher for LLM calls."""
+
+    def __init__(
+        self,
+        max_concurrent: int = 4,
+        limiter: Optional[LLMRateLimiter] = None,
+        max_retries: int = 3,
+        backoff_base: float = 2.0,
+        batch_window: float = 0.0
+    ):
+        """
+        Initialize queue.
+
+        Args:
+            max_concurrent: LLM calls in flight from this process
+            limiter: Rate limiter every call goes through (shared across processes)
+            max_retries: Attempts per call
+            backoff_base: Seconds before the first retry (doubles each time)
+            batch_window: Seconds a packable item waits for companions (0 = send
+                as soon as the dispatcher sees it)
+        """
+        self.limiter = limiter
+        self.max_retries = max(1, max_retries)
+        self.backoff_base = backoff_base
+        self.batch_window = batch_window
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_concurrent),
+            thread_name_prefix="llm-queue"
+        )
+        self._packers: Dict[str, PromptPacker] = {}
+        self._buffers: Dict[str, List[_PackSlot]] = {}
+        self._buffer_started: Dict[str, float] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._dispatcher: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "calls": 0,
+            "packed_calls": 0,
+            "packed_items": 0,
+            "unpacked_fallbacks": 0,
+            "retries": 0,
+            "failures": 0,
+        }
+
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    # ------------------------------------------------------------------
+    # Plain requests
+    # ------------------------------------------------------------------
+
+    def submit(self, model: Any, prompt: str, task_type: str = "generic") -> Future:
+        """
+        Queue one prompt.
+
+        Returns:
+            Future resolving to the response text
+        """
+        self._count("requests")
+        return self._executor.submit(self._call, model, prompt, task_type)
+
+    def generate(self, model: Any, prompt: str, task_type: str = "generic") -> str:
+        """Submit and wait (for stage code that runs inside a document thread)."""
+        return self.submit(model, prompt, task_type).result()
+
+    def _call(self, model: Any, prompt: str, task_type: str) -> str:
+        for attempt in range(self.max_retries):
+            try:
+                self._count("calls")
+                if self.limiter is not None:
+                    with self.limiter:
+                        response = model.generate_content(prompt)
+                else:
+                    response = model.generate_content(prompt)
+                return response.text
+            except Exception as e:
+                if attempt == self.max_retries - 1:
+                    self._count("failures")
+                    raise
+                wait = self.backoff_base * (2 ** attempt)
+                self._count("retries")
+                logger.warning(f"LLM {task_type} call failed ({e}), retrying in {wait:.1f}s")
+                time.sleep(wait)
+
+    # ------------------------------------------------------------------
+    # Packed requests
+    # ------------------------------------------------------------------
+
+    def register_packer(self, task_type: str, packer: PromptPacker):
+        """Enable packing for a task type."""
+        self._packers[task_type] = packer
+
+    def submit_item(self, model: Any, task_type: str, item: Any) -> Future:
+        """
+        Queue one item of a packable task.
+
+        Items that don't fit a pack (or tasks without a packer) are sent on
+        their own.
+
+        Returns:
+            Future resolving to the item's response text
+        """
+        packer = self._packers.get(task_type)
+        if packer is None:
+            raise ValueError(f"No packer registered for {task_type}")
+        if packer.max_items <= 1 or packer.size(item) > packer.max_chars // 2:
+            return self.submit(model, packer.build_single(item), task_type)
+
+        self._count("requests")
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("LLM work queue is closed")
+            buffer = self._buffers.setdefault(task_type, [])
+            if not buffer:
+                self._buffer_started[task_type] = time.monotonic()
+            buffer.append(_PackSlot(item, future, model))
+            self._ensure_dispatcher()
+            self._cond.notify()
+        return future
+
+    def generate_item(self, model: Any, task_type: str, item: Any) -> str:
+        """submit_item and wait."""
+        return self.submit_item(model, task_type, item).result()
+
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or not self._dispatcher.is_alive():
+            self._dispatcher = threading.Thread(
+                target=self._dispatch_loop, name="llm-queue-dispatcher", daemon=True
+            )
+            self._dispatcher.start()
+
+    def _take_ready(self, now: float, force: bool) -> List[tuple]:
+        """Pop packs that are full, timed out or forced (called with the lock held)."""
+        ready = []
+        for task_type, buffer in self._buffers.items():
+            packer = self._packers[task_type]
+            while buffer:
+                full = self._pack_length(packer, buffer)
+                waited = now - self._buffer_started.get(task_type, now)
+                if not (force or full < len(buffer) or full >= packer.max_items or waited >= self.batch_window):
+                    break
+                ready.append((task_type, buffer[:full]))
+                del buffer[:full]
+                self._buffer_started[task_type] = now
+        return ready
+
+    @staticmethod
+    def _pack_length(packer: PromptPacker, buffer: List[_PackSlot]) -> int:
+        """How many buffered items (from the front) fit in one pack."""
+        total = 0
+        for n, slot in enumerate(buffer[:packer.max_items]):
+            total += packer.size(slot.item)
+            if n and total > packer.max_chars:
+                return n
+        return min(len(buffer), packer.max_items)
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                while not self._closed and not any(self._buffers.values()):
+                    self._cond.wait()
+                ready = self._take_ready(time.monotonic(), force=self._closed)
+                if not ready:
+                    if self._closed:
+                        return
+                    oldest = min(
+                        self._buffer_started[t] for t, b in self._buffers.items() if b
+                    )
+                    self._cond.wait(max(0.0, oldest + self.batch_window - time.monotonic()))
+                    continue
+            for task_type, slots in ready:
+                self._executor.submit(self._run_pack, task_type, slots)
+
+    def _run_pack(self, task_type: str, slots: List[_PackSlot]):
+        packer = self._packers[task_type]
+        model = slots[0].model
+
+        if len(slots) == 1:
+            self._resolve(slots[0], lambda: self._call(model, packer.build_single(slots[0].item), task_type))
+            return
+
+        try:
+            text = self._call(model, packer.build([slot.item for slot in slots]), task_type)
+            answers = packer.split(text, len(slots))
+        except Exception as e:
+            logger.warning(f"Packed {task_type} call for {len(slots)} items failed ({e}), sending them one by one")
+            answers = [None] * len(slots)
+        self._count("packed_calls")
+
+        for slot, answer in zip(slots, answers):
+            if answer is not None:
+                self._count("packed_items")
+                slot.future.set_result(answer)
+            else:
+                self._count("unpacked_fallbacks")
+                self._resolve(slot, lambda slot=slot: self._call(slot.model, packer.build_single(slot.item), task_type))
+
+    @staticmethod
+    def _resolve(slot: _PackSlot, fn):
+        try:
+            slot.future.set_result(fn())
+        except Exception as e:
+            slot.future.set_exception(e)
+
+    # ------------------------------------------------------------------
+
+    def close(self):
+        """Send everything still buffered, wait for it, stop the threads."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self.stats)
+
+
+class QueuedModel:
+    """
+    Model facade whose generate_content goes through an LLMWorkQueue.
+
+    Lets existing stage code keep calling self.model.generate_content(prompt)
+    while the call gets the queue's concurrency limit, rate limit and retries.
+    """
+
+    def __init__(self, model: Any, queue: LLMWorkQueue, task_type: str = "generic"):
+        self._model = model
+        self._queue = queue
+        self._task_type = task_type
+
+    def generate_content(self, prompt, *args, **kwargs):
+        if args or kwargs:
+            # Generation options the queue doesn't forward: call directly
+            return self._model.generate_content(prompt, *args, **kwargs)
+        return LLMResponse(self._queue.generate(self._model, prompt, self._task_type))
+
+    def __getattr__(self, name: str):
+        return getattr(self._model, name)
+
+
+def route_model(owner: Any, queue: LLMWorkQueue, task_type: str, attr: str = "model") -> bool:
+    """
+    Route owner.<attr> through the queue (no-op if the owner has no model).
+
+    Returns:
+        True if a model was wrapped
+    """
+    model = getattr(owner, attr, None)
+    if model is None or isinstance(model, QueuedModel):
+        return False
+    setattr(owner, attr, QueuedModel(model, queue, task_type))
+    return True
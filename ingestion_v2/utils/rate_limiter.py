@@ -0,0 +1,76 @@
+"""
+LLM rate limiting shared across batch worker processes.
+
+Parallel batch ingestion runs one pipeline per worker process, and every
+pipeline talks to Gemini. Without a shared limit, N workers fire N times the
+request rate and the API starts returning 429s. This limiter caps in-flight
+calls (semaphore) and spaces call starts (shared "next slot" timestamp), both
+built on multiprocessing primitives so all workers draw from one budget.
+"""
+import logging
+import multiprocessing
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LLMRateLimiter:
+    """
+    Process-safe limiter for LLM calls.
+
+    Create it in the parent process and hand it to workers through the pool
+    initializer (multiprocessing primitives can't be pickled any other way).
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 4,
+        requests_per_minute: int = 60,
+        context: Optional[Any] = None
+    ):
+        """
+        Initialize limiter.
+
+        Args:
+            max_concurrent: Max LLM calls in flight across all workers
+            requests_per_minute: Max LLM call starts per minute across all workers (0 = no spacing)
+            context: multiprocessing context (must match the pool's start method)
+        """
+        ctx = context or multiprocessing.get_context()
+        self.max_concurrent = max(1, max_concurrent)
+        self.requests_per_minute = max(0, requests_per_minute)
+        self.interval = 60.0 / self.requests_per_minute if self.requests_per_minute else 0.0
+        self._semaphore = ctx.BoundedSemaphore(self.max_concurrent)
+        self._next_slot = ctx.Value('d', 0.0)  # Carries its own lock
+
+    def acquire(self) -> float:
+        """
+        Block until a call may start.
+
+        Returns:
+            Seconds spent waiting
+        """
+        start = time.time()
+        self._semaphore.acquire()
+        if self.interval:
+            with self._next_slot.get_lock():
+                now = time.time()
+                slot = max(now, self._next_slot.value)
+                self._next_slot.value = slot + self.interval
+            if slot > now:
+                time.sleep(slot - now)
+        return time.time() - start
+
+    def release(self):
+        """Mark a call as finished."""
+        self._semaphore.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
@@ -7,129 +7,6 @@ Clean, simple, reliable.
 
 import time
 import logging
-from typing import List
-from datetime import datetime
-
-from .config import get_internet_config
-from .schemas import InternetSnippet, InternetSearchResult
-from .search import get_search_engine
-from .extract import get_content_extractor
-from .filters import get_domain_filter
-
-logger = logging.getLogger(__name__)
-
-
-class InternetServiceClient:
-    """
-    Main internet service.
-    Combines search, extraction, filtering.
-    """
-    
-    def __init__(self):
-        self.config = get_internet_config()
-        self.search_engine = get_search_engine()
-        self.extractor = get_content_extractor()
-        self.filter = get_domain_filter()
-    
-    def search(
-        self,
-        query: str,
-        max_results: int = None
-    ) -> InternetSearchResult:
-        """
-        Search internet and extract content.
-        
-        Args:
-            query: Search query
-            max_results: Max results to return (default from config)
-            
-        Returns:
-            InternetSearchResult with snippets
-        """
-        
-        if max_results is None:
-            max_results = self.config.max_results
-        
-        start_time = time.time()
-        
-        try:
-            logger.info(f"🌐 Internet search: '{query}'")
-            
-            # 1. Search Google PSE
-            raw_results = self.search_engine.search(query, num_results=max_results * 2)
-            
-            if not raw_results:
-                logger.warning("No search results found")
-                return InternetSearchResult(
-                    query=query,
-                    snippets=[],
-                    success=True,
-                    search_time=time.time() - start_time,
-                    total_results_found=0
-                )
-            
-            # 2. Format and filter
-            formatted = self.search_engine.format_results(raw_results)
-            filtered = self.filter.filter_results(formatted)
-            
-            # 3. Extract content from each URL
-            snippets = []
-            
-            for result in filtered[:max_results]:
-                try:
-                    url = result["url"]
-                    
-                    # Safety check
-                    if not self.filter.is_safe_url(url):
-                        continue
-                    
-                    # Extract full content
-                    content = self.extractor.extract_with_fallback(
-                        url,
-                        result["snippet"]
-                    )
-                    
-                    snippet = InternetSnippet(
-                        url=url,
-                        title=result["title"],
-                        snippet=result["snippet"],
-                        content=content,
-                        domain=result["domain"],
-                        timestamp=datetime.now().isoformat()
-                    )
-                    
-                    snippets.append(snippet)
-                    
-                except Exception as e:
-                    logger.warning(f"Error processing result {url}: {e}")
-                    continue
-            
-            search_time = time.time() - start_time
-            
-            logger.info(f"✅ Internet search completed: {len(snippets)} snippets in {search_time:.2f}s")
-            
-            return InternetSearchResult(
-                query=query,
-                snippets=snippets,
-                success=True,
-                search_time=search_time,
-                total_results_found=len(raw_results)
-            )
-            
-        except Exception as e:
-            logger.error(f"❌ Internet search failed: {e}")
-            return InternetSearchResult(
-                query=query,
-           """
-Internet Service Client
-========================
-Main interface for internet search and content extraction.
-Clean, simple, reliable.
-"""
-
-import time
-import logging
-from typing import List
 from datetime import datetime
 
 from .config import get_internet_config
@@ -194,25 +71,22 @@ class InternetServiceClient:
             formatted = self.search_engine.format_results(raw_results)
             filtered = self.filter.filter_results(formatted)
             
-            # 3. Extract content from each URL
+            # 3. Extract content from all URLs concurrently (snippet fallback
+            #    for pages that fail or miss the fetch deadline)
+            selected = [
+                result for result in filtered[:max_results]
+                if self.filter.is_safe_url(result["url"])
+            ]
+            contents = self.extractor.extract_many_with_fallback(
+                [(result["url"], result["snippet"]) for result in selected]
+            )
+            
             snippets = []
             
-            for result in filtered[:max_results]:
+            for result, content in zip(selected, contents):
                 try:
-                    url = result["url"]
-                    
-                    # Safety check
-                    if not self.filter.is_safe_url(url):
-                        continue
-                    
-                    # Extract full content
-                    content = self.extractor.extract_with_fallback(
-                        url,
-                        result["snippet"]
-                    )
-                    
                     snippet = InternetSnippet(
-                        url=url,
+                        url=result["url"],
                         title=result["title"],
                         snippet=result["snippet"],
                         content=content,
@@ -223,7 +97,7 @@ class InternetServiceClient:
                     snippets.append(snippet)
                     
                 except Exception as e:
-                    logger.warning(f"Error processing result {url}: {e}")
+                    logger.warning(f"Error processing result {result.get('url')}: {e}")
                     continue
             
             search_time = time.time() - start_time
@@ -299,50 +173,4 @@ def search_internet(query: str, max_results: int = None) -> InternetSearchResult
         InternetSearchResult
     """
     client = get_internet_client()
-    return client.search(query, max_results)     snippets=[],
-                success=False,
-                error=str(e),
-                search_time=time.time() - start_time
-            )
-    
-    def health_check(self) -> dict:
-        """Check if internet service is healthy"""
-        
-        has_credentials = bool(
-            self.config.pse_api_key and 
-            self.config.pse_engine_id
-        )
-        
-        return {
-            "status": "healthy" if has_credentials else "no_credentials",
-            "pse_configured": has_credentials,
-            "whitelist_size": len(self.config.whitelisted_domains),
-            "max_results": self.config.max_results
-        }
-
-
-# Singleton
-_client = None
-
-def get_internet_client() -> InternetServiceClient:
-    """Get global internet service client"""
-    global _client
-    if _client is None:
-        _client = InternetServiceClient()
-    return _client
-
-
-# Convenience function
-def search_internet(query: str, max_results: int = None) -> InternetSearchResult:
-    """
-    Quick search function.
-    
-    Args:
-        query: Search query
-        max_results: Max results
-        
-    Returns:
-        InternetSearchResult
-    """
-    client = get_internet_client()
-    return client.search(query, max_results)
\ No newline at end of file
+    return client.search(query, max_results)
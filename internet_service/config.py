@@ -30,6 +30,12 @@ class InternetConfig:
     extract_timeout: float = 2.0
     max_content_length: int = 3000  # chars per snippet
     
+    # Page fetching (all result pages are fetched concurrently)
+    fetch_workers: int = 8
+    fetch_per_host: int = 2  # concurrent requests to one host
+    fetch_deadline: float = 3.0  # whole batch; unfinished pages fall back to snippets
+    max_response_bytes: int = 2_000_000  # larger pages are truncated
+    
     # Domain whitelist (trusted sources only)
     whitelisted_domains: Set[str] = None
     
@@ -112,71 +118,3 @@ DEFAULT_CONFIG = InternetConfig()
 def get_internet_config() -> InternetConfig:
     """Get internet service configuration"""
     return DEFAULT_CONFIG
-        
-        # Default whitelist (trusted education/policy sources)
-        if self.whitelisted_domains is None:
-            self.whitelisted_domains = {
-                # Indian Government
-                "gov.in",
-                "nic.in",
-                "india.gov.in",
-                "education.gov.in",
-                "mhrd.gov.in",
-                "apgovern.in",
-                
-                # International Organizations
-                "unesco.org",
-                "worldbank.org",
-                "oecd.org",
-                "unicef.org",
-                "who.int",
-                
-                # Research/Academia
-                "edu",
-                "ac.in",
-                "ac.uk",
-                "nih.gov",
-                "ncbi.nlm.nih.gov",
-                
-                # News (reputable)
-                "thehindu.com",
-                "indianexpress.com",
-                "economist.com",
-                "reuters.com",
-                
-                # Education-specific
-                "edudel.nic.in",
-                "ncert.nic.in",
-                "nios.ac.in",
-                "ugc.ac.in",
-                "aicte-india.org",
-            }
-    
-    def is_domain_allowed(self, url: str) -> bool:
-        """Check if domain is whitelisted"""
-        from urllib.parse import urlparse
-        
-        try:
-            domain = urlparse(url).netloc.lower()
-            
-            # Check exact match
-            if domain in self.whitelisted_domains:
-                return True
-            
-            # Check if any whitelisted domain is a suffix
-            for allowed in self.whitelisted_domains:
-                if domain.endswith(f".{allowed}") or domain == allowed:
-                    return True
-            
-            return False
-        except:
-            return False
-
-
-# Default instance
-DEFAULT_CONFIG = InternetConfig()
-
-
-def get_internet_config() -> InternetConfig:
-    """Get internet service configuration"""
-    return DEFAULT_CONFIG
\ No newline at end of file
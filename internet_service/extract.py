@@ -7,13 +7,13 @@ Fast, reliable, handles most cases.
 
 import time
 import logging
-from typing import Optional
+from typing import List, Optional, Tuple
 
-import requests
 from trafilatura import extract
 from trafilatura.settings import use_config
 
 from .config import get_internet_config
+from .fetch import get_page_fetcher
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +26,7 @@ class ContentExtractor:
     
     def __init__(self):
         self.config = get_internet_config()
+        self.fetcher = get_page_fetcher()
         
         # Configure trafilatura for fast extraction
         self.trafilatura_config = use_config()
@@ -43,25 +44,35 @@ class ContentExtractor:
             Extracted text or None if failed
         """
         
-        try:
-            # Fetch HTML
-            start_time = time.time()
-            
-            response = requests.get(
-                url,
-                timeout=self.config.extract_timeout,
-                headers={
-                    "User-Agent": "Mozilla/5.0 (compatible; PolicyBot/1.0)"
-                }
-            )
-            
-            if response.status_code != 200:
-                logger.warning(f"Failed to fetch {url}: {response.status_code}")
-                return None
-            
-            html = response.text
+        start_time = time.time()
+        
+        # Fetch HTML (pooled session, size-capped)
+        html = self.fetcher.fetch(url)
+        if html is None:
+            return None
+        
+        text = self.extract_text(html)
+        
+        if not text:
+            logger.warning(f"No content extracted from {url}")
+            return None
+        
+        logger.debug(f"Extracted {len(text)} chars from {url} in {time.time() - start_time:.2f}s")
+        
+        return text
+    
+    def extract_text(self, html: str) -> Optional[str]:
+        """
+        Extract clean text from fetched HTML.
+        
+        Args:
+            html: Page HTML
             
-            # Extract text
+        Returns:
+            Extracted text (truncated to max_content_length) or None
+        """
+        
+        try:
             text = extract(
                 html,
                 config=self.trafilatura_config,
@@ -69,27 +80,18 @@ class ContentExtractor:
                 include_tables=True,
                 no_fallback=False
             )
-            
-            extract_time = time.time() - start_time
-            
-            if not text:
-                logger.warning(f"No content extracted from {url}")
-                return None
-            
-            # Truncate if too long
-            if len(text) > self.config.max_content_length:
-                text = text[:self.config.max_content_length] + "..."
-            
-            logger.debug(f"Extracted {len(text)} chars from {url} in {extract_time:.2f}s")
-            
-            return text
-            
-        except requests.Timeout:
-            logger.warning(f"Timeout extracting from {url}")
-            return None
         except Exception as e:
-            logger.warning(f"Error extracting from {url}: {e}")
+            logger.warning(f"Error extracting text: {e}")
             return None
+        
+        if not text:
+            return None
+        
+        # Truncate if too long
+        if len(text) > self.config.max_content_length:
+            text = text[:self.config.max_content_length] + "..."
+        
+        return text
     
     def extract_with_fallback(self, url: str, snippet: str) -> str:
         """
@@ -103,8 +105,36 @@ class ContentExtractor:
             Extracted text or snippet
         """
         
-        text = self.extract(url)
+        return self._prefer_text(url, self.extract(url), snippet)
+    
+    def extract_many_with_fallback(
+        self,
+        items: List[Tuple[str, str]],
+        deadline: float = None
+    ) -> List[str]:
+        """
+        Extract several pages concurrently, with snippet fallback.
+        
+        Pages that fail or don't finish within the deadline use their snippet,
+        so latency is bounded by the deadline, not the sum of page times.
+        
+        Args:
+            items: (url, fallback snippet) pairs
+            deadline: Seconds for the whole batch (default from config)
+            
+        Returns:
+            Extracted text or snippet per item, in input order
+        """
         
+        texts = self.fetcher.fetch_many(
+            [url for url, _ in items],
+            deadline=deadline,
+            transform=self.extract_text
+        )
+        return [self._prefer_text(url, texts.get(url), snippet) for url, snippet in items]
+    
+    @staticmethod
+    def _prefer_text(url: str, text: Optional[str], snippet: str) -> str:
         if text and len(text) > len(snippet):
             return text
         
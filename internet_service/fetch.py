@@ -0,0 +1,296 @@
+"""
+Page Fetching
+=============
+Concurrent, bounded fetching of result pages.
+
+One slow site used to add its whole timeout to every query, because pages
+were fetched one after another. The fetcher runs them on a small thread pool
+over a shared keep-alive session, limits concurrent requests per host, caps
+response size, and stops waiting at a batch deadline: pages that finished are
+returned, the rest come back as None (callers fall back to the search snippet).
+
+Fetches beyond a host's limit wait in a per-host queue rather than in a pool
+thread, so many URLs on one host never starve the other hosts in a batch.
+
+Other fetchers (e.g. the retrieval_v3 internet crawler) run their own per-page
+work through run_many, so every page fetch in the process shares one pool,
+one session and the same per-host limits.
+"""
+
+import time
+import logging
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import get_internet_config
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (compatible; PolicyBot/1.0)"
+
+
+class PageFetcher:
+    """
+    Pooled concurrent page fetcher.
+    Thread-safe; one instance is shared by the whole process.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = None,
+        per_host: int = None,
+        timeout: float = None,
+        max_bytes: int = None,
+        user_agent: str = USER_AGENT
+    ):
+        """
+        Args:
+            max_workers: Concurrent fetches overall (default from config)
+            per_host: Concurrent fetches to one host (default from config)
+            timeout: Connect/read timeout per request, seconds (default from config)
+            max_bytes: Bytes read per response before truncating (default from config)
+            user_agent: User-Agent header
+        """
+        config = get_internet_config()
+        self.max_workers = max_workers or config.fetch_workers
+        self.per_host = per_host or config.fetch_per_host
+        self.timeout = timeout or config.extract_timeout
+        self.max_bytes = max_bytes or config.max_response_bytes
+
+        # Keep-alive connections shared by all workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = user_agent
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="page-fetch")
+        # Per host: fetches in flight, and queued (work, future) pairs waiting for a slot
+        self._host_active: Dict[str, int] = defaultdict(int)
+        self._host_queues: Dict[str, deque] = defaultdict(deque)
+        self._host_cond = threading.Condition()
+        # Host whose slot the current thread holds (fetches inside run_many work)
+        self._slot = threading.local()
+
+    @staticmethod
+    def _host(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def _submit(self, url: str, work: Callable[[], Any]) -> Future:
+        """Run work on the pool once its host has a free slot"""
+        host = self._host(url)
+        future = Future()
+        with self._host_cond:
+            if self._host_active[host] < self.per_host:
+                self._host_active[host] += 1
+                future.set_running_or_notify_cancel()
+                self._executor.submit(self._run, host, work, future)
+            else:
+                self._host_queues[host].append((work, future))
+        return future
+
+    def _run(self, host: str, work: Callable[[], Any], future: Future):
+        self._slot.host = host
+        try:
+            future.set_result(work())
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            self._slot.host = None
+            self._release_host(host)
+
+    def _release_host(self, host: str):
+        """Hand the host slot to the next queued fetch, or free it"""
+        with self._host_cond:
+            queue = self._host_queues.get(host)
+            while queue:
+                work, future = queue.popleft()
+                # Skips fetches cancelled at their batch deadline
+                if future.set_running_or_notify_cancel():
+                    self._executor.submit(self._run, host, work, future)
+                    return
+            self._host_queues.pop(host, None)
+            self._host_active[host] -= 1
+            if not self._host_active[host]:
+                del self._host_active[host]
+            self._host_cond.notify_all()
+
+    def _gated(self, url: str, fn: Callable, *args):
+        """Call fn holding a slot for the URL's host (blocking, in the calling thread)"""
+        host = self._host(url)
+        previous = getattr(self._slot, "host", None)
+        if previous == host:
+            # Already holding this host's slot (run_many work)
+            return fn(*args)
+        with self._host_cond:
+            while self._host_active[host] >= self.per_host:
+                self._host_cond.wait()
+            self._host_active[host] += 1
+        self._slot.host = host
+        try:
+            return fn(*args)
+        finally:
+            self._slot.host = previous
+            self._release_host(host)
+
+    def fetch(self, url: str) -> Optional[str]:
+        """
+        Fetch one page (blocking, in the calling thread).
+
+        Returns:
+            HTML (truncated to max_bytes) or None on error / non-200
+        """
+        return self._gated(url, self._fetch, url)
+
+    def fetch_page(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[Dict]:
+        """
+        Fetch one page with its cache validators (blocking, in the calling thread).
+
+        Args:
+            url: Page URL
+            headers: Extra request headers (e.g. If-None-Match for revalidation)
+
+        Returns:
+            Dict with status, html (None on 304), etag and last_modified,
+            or None on error / other statuses
+        """
+        return self._gated(url, self._get_page, url, headers)
+
+    def _fetch(self, url: str) -> Optional[str]:
+        """Fetch one page; the caller holds a slot for its host"""
+        page = self._get_page(url)
+        return page["html"] if page else None
+
+    def _get_page(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[Dict]:
+        """Fetch one page with status and validators; the caller holds a slot for its host"""
+        start_time = time.time()
+        try:
+            with self.session.get(url, timeout=self.timeout, stream=True, headers=headers) as response:
+                page = {
+                    "status": response.status_code,
+                    "html": None,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
+                if response.status_code == 304 and headers:
+                    return page
+                if response.status_code != 200:
+                    logger.warning(f"Failed to fetch {url}: {response.status_code}")
+                    return None
+
+                body = bytearray()
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    body.extend(chunk)
+                    if len(body) >= self.max_bytes:
+                        logger.debug(f"Truncating {url} at {self.max_bytes:,} bytes")
+                        del body[self.max_bytes:]
+                        break
+
+                encoding = response.encoding or "utf-8"
+                page["html"] = body.decode(encoding, errors="replace")
+
+            logger.debug(f"Fetched {len(body):,} bytes from {url} in {time.time() - start_time:.2f}s")
+            return page
+
+        except requests.Timeout:
+            logger.warning(f"Timeout fetching {url}")
+            return None
+        except Exception as e:
+            logger.warning(f"Error fetching {url}: {e}")
+            return None
+
+    def fetch_many(
+        self,
+        urls: List[str],
+        deadline: float = None,
+        transform: Optional[Callable[[str], Optional[str]]] = None
+    ) -> Dict[str, Optional[str]]:
+        """
+        Fetch pages concurrently, returning whatever finished by the deadline.
+
+        Args:
+            urls: Page URLs (duplicates are fetched once)
+            deadline: Seconds to wait for the whole batch (default from config)
+            transform: Optional function applied to each page in the worker
+                (e.g. text extraction), so it counts against the deadline too
+
+        Returns:
+            url -> result (None if failed or not finished in time)
+        """
+        def run(url: str) -> Optional[str]:
+            html = self._fetch(url)
+            if html is None or transform is None:
+                return html
+            return transform(html)
+
+        return self.run_many(urls, run, deadline)
+
+    def run_many(
+        self,
+        urls: List[str],
+        work: Callable[[str], Any],
+        deadline: float = None
+    ) -> Dict[str, Any]:
+        """
+        Run work(url) for each URL on the fetch pool, returning whatever
+        finished by the deadline.
+
+        Each call holds a slot for its URL's host, so fetch() / fetch_page()
+        inside work for that URL go straight out, and the per-host limits and
+        queues apply exactly as for fetch_many.
+
+        Args:
+            urls: Page URLs (duplicates are run once)
+            work: Per-URL function (fetch plus any processing)
+            deadline: Seconds to wait for the whole batch (default from config)
+
+        Returns:
+            url -> result (None if failed or not finished in time)
+        """
+        if deadline is None:
+            deadline = get_internet_config().fetch_deadline
+
+        unique_urls = list(dict.fromkeys(urls))
+        if not unique_urls:
+            return {}
+
+        futures = {self._submit(url, lambda url=url: work(url)): url for url in unique_urls}
+        done, pending = wait(futures, timeout=deadline)
+
+        results = {url: None for url in unique_urls}
+        for future in done:
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                logger.warning(f"Error processing {futures[future]}: {e}")
+
+        if pending:
+            # Running fetches finish in the background (bounded by the request
+            # timeout) but this batch doesn't wait; queued ones never start
+            logger.info(
+                f"⏱️ Page fetch deadline ({deadline:.1f}s): "
+                f"{len(done)}/{len(unique_urls)} pages ready, {len(pending)} skipped"
+            )
+            for future in pending:
+                future.cancel()
+
+        return results
+
+
+# Singleton
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+def get_page_fetcher() -> PageFetcher:
+    """Get global page fetcher"""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = PageFetcher()
+    return _fetcher
@@ -64,6 +64,7 @@ async def lifespan(app: FastAPI):
         
         # NEW: Initialize query orchestrator
         query_orchestrator = get_query_orchestrator(retrieval_router)
+        query_orchestrator.warmup()
         logger.info("✅ Query orchestrator initialized")
         
         logger.info("🎉 AP Policy Assistant API v2 ready!")
@@ -120,6 +121,7 @@ class ProcessingTrace(BaseModel):
     controller_iterations: int
     sources_used: List[str] = []  # NEW: which sources were queried
     orchestration_time: float = 0.0  # NEW
+    source_status: Dict[str, str] = {}  # source -> ok, empty, error, timeout, deadline, late
 
 class QueryResponse(BaseModel):
     answer: str
@@ -186,7 +188,7 @@ async def query_endpoint(request: QueryRequest):
         # NEW: Use orchestrator instead of direct retrieval
         logger.info("🎯 Using orchestrator for multi-source retrieval...")
         
-        orchestration_response = query_orchestrator.orchestrate(
+        orchestration_response = await query_orchestrator.orchestrate_async(
             query=request.query,
             mode=request.mode,
             internet_toggle=request.use_internet
@@ -246,7 +248,11 @@ async def query_endpoint(request: QueryRequest):
             kg_traversal="multi_source",
             controller_iterations=1,
             sources_used=metadata.get("sources", []),
-            orchestration_time=metadata.get("orchestration_time", 0.0)
+            orchestration_time=metadata.get("orchestration_time", 0.0),
+            source_status={
+                source: status["status"]
+                for source, status in metadata.get("source_status", {}).items()
+            }
         )
         
         response = QueryResponse(
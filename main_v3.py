@@ -6,9 +6,10 @@ Backend API using the optimized V3 retrieval pipeline with parallel processing.
 
 import os
 import sys
+import asyncio
 import logging
 import time
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
@@ -36,6 +37,9 @@ from retrieval_v3.file_processing.file_handler import FileHandler
 from retrieval_v3.api.pdf_url import router as pdf_url_router
 from retrieval_v3.api.locate_snippet import router as locate_router
 
+# Admission control (per-mode lanes, load shedding)
+from retrieval_v3.api.admission import AdmissionController, AdmissionRejected
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -47,6 +51,7 @@ logger = logging.getLogger(__name__)
 v3_engine = None
 answer_generator = None
 answer_builder = None
+admission_controller = AdmissionController()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -128,8 +133,10 @@ class QueryRequest(BaseModel):
     mode: str = Field("qa", description="Query mode: qa, deep_think, brainstorm, policy_brief, or policy_draft")
     top_k: Optional[int] = Field(None, description="Override number of results")
     internet_enabled: Optional[bool] = Field(False, description="Enable internet search")
+    priority: Optional[str] = Field("normal", description="Queue priority: high, normal, or low")
     conversation_history: Optional[List[Dict[str, str]]] = Field(None, description="Previous conversation turns for context")
     external_context: Optional[str] = Field(None, description="Context from uploaded files (text content)")
+    bypass_cache: Optional[bool] = Field(False, description="Skip the answer cache and regenerate (evaluation runs)")
 
 class Citation(BaseModel):
     docId: str
@@ -245,10 +252,179 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "message": "V3 API is running with optimized performance"}
 
+async def generate_v3_answer(request: QueryRequest, v3_output) -> Tuple[str, List[Citation], bool]:
+    """
+    Generate the answer text and formatted citations for retrieved results
+    
+    Returns:
+        (answer_text, citations, cacheable) - cacheable is False for
+        template/error fallbacks so they are regenerated next time
+    """
+    if request.mode == "policy_draft":
+        # Use V3 AnswerBuilder for Policy Crafter
+        logger.info("📝 Using V3 AnswerBuilder for Policy Draft...")
+        
+        # Convert results for builder
+        results_for_builder = []
+        for result in v3_output.results:
+            results_for_builder.append({
+                "content": result.content,
+                "chunk_id": result.chunk_id,
+                "doc_id": result.doc_id,
+                "score": result.score,
+                "metadata": result.metadata,
+                "vertical": result.vertical,
+                "url": result.metadata.get('url') if 'url' in result.metadata else None
+            })
+        
+        answer_obj = await asyncio.to_thread(
+            answer_builder.build_answer,
+            query=request.query,
+            results=results_for_builder,
+            mode=request.mode,
+            external_context=request.external_context,
+            conversation_history=request.conversation_history
+        )
+        
+        # Build full answer from summary + sections
+        full_answer = answer_obj.summary
+        if answer_obj.sections:
+            for section_name, section_content in answer_obj.sections.items():
+                full_answer += "\n\n" + section_content
+        
+        answer_text = full_answer
+        citations_list = answer_obj.citations
+        cacheable = answer_obj.metadata.get('generated_by') == 'gemini_vertex'
+        
+    else:
+        # Use old AnswerGenerator for standard queries (better quality for QA)
+        # Convert V3 results to old format
+        results_old_fmt = []
+        for result in v3_output.results:
+            # Extract URL from metadata for internet results
+            url = result.metadata.get('url') if result.metadata else None
+            
+            result_dict = {
+                "chunk_id": result.chunk_id,
+                "text": result.content,
+                "doc_id": result.doc_id,
+                "score": result.score,
+                "metadata": result.metadata,
+                "vertical": result.vertical,
+                "rewrite_source": result.rewrite_source
+            }
+            
+            # Add URL at top level for easy access (internet results)
+            if url:
+                result_dict['url'] = url
+            
+            results_old_fmt.append(result_dict)
+        
+        answer_response = await asyncio.to_thread(
+            answer_generator.generate,
+            query=request.query,
+            results=results_old_fmt,
+            mode=request.mode,
+            max_context_chunks=5 if request.mode == "qa" else 10,
+            external_context=request.external_context,
+            conversation_history=request.conversation_history
+        )
+        
+        answer_text = answer_response.get("answer", "No answer generated")
+        citations_list = [] # We'll handle citations below based on the source
+        
+        # Extract citations from answer_response for processing below
+        raw_citations = answer_response.get("citations", [])
+        # Only model-written answers are cached; fallbacks (model disabled or
+        # failing, no documents) must not outlive the outage
+        cacheable = answer_response.get("generated_by") == "llm"
+    
+    # Format citations
+    citations = []
+    
+    if request.mode == "policy_draft":
+        # V3 Builder citations format
+        for citation in citations_list:
+            vertical = citation.get('vertical', 'unknown')
+            url = citation.get('url')
+            
+            # For internet results, use URL as docId
+            doc_id = url if (vertical == 'internet' and url) else (
+                citation.get('filename') or 
+                citation.get('source') or 
+                citation.get('doc_id', 'Unknown')
+            )
+            
+            citations.append(Citation(
+                docId=doc_id,
+                page=citation.get('page') or 1,
+                span=citation.get('source', '')[:150],
+                source=citation.get('filename') or citation.get('source', 'Policy Document'),
+                vertical=vertical,
+                url=url  # Include URL for internet results
+            ))
+    else:
+        # Old Generator citations format
+        for citation_num in raw_citations:
+            try:
+                result_idx = int(citation_num) - 1
+                if 0 <= result_idx < len(results_old_fmt):
+                    result = results_old_fmt[result_idx]
+                    metadata = result.get("metadata", {})
+                    
+                    vertical = result.get("vertical", "unknown")
+                    
+                    # Extract URL from multiple possible locations
+                    url = (
+                        result.get('url') or 
+                        metadata.get('url') or 
+                        metadata.get('source_url') or
+                        None
+                    )
+                    
+                    # For internet results, prioritize title and URL
+                    if vertical == 'internet' and url:
+                        # Use title from metadata or URL itself
+                        display_name = metadata.get('title') or metadata.get('source') or url
+                        # Make it clear it's a web source if not obvious
+                        if not display_name.startswith('http') and not display_name.endswith('(Web)'):
+                            display_name = f"{display_name} (Web)"
+                        # For internet, use URL as docId (not GCS path)
+                        gcs_path = url
+                    else:
+                        # Construct display name from metadata for non-internet results
+                        display_name = construct_citation_name(result, metadata)
+                        
+                        # Try to get actual GCS file path from metadata
+                        # Priority: filename > file_name > source > doc_id
+                        gcs_path = (
+                            metadata.get('filename') or 
+                            metadata.get('file_name') or 
+                            metadata.get('source') or 
+                            result.get("doc_id", "Unknown")
+                        )
+                    
+                    # Debug logging to see metadata
+                    logger.info(f"📋 Citation - vertical: {vertical}, url: {url}, display_name: {display_name}")
+                    
+                    citations.append(Citation(
+                        docId=gcs_path,  # Use URL for internet, GCS path for local docs
+                        page=metadata.get('page_number') or metadata.get('page') or 1,
+                        span=result.get("text", result.get("content", ""))[:150] + "...",
+                        source=display_name,  # Use display name for frontend
+                        vertical=vertical,
+                        url=url  # Internet search URL, None for local docs
+                    ))
+            except (ValueError, IndexError):
+                continue
+    
+    return answer_text, citations, cacheable
+
 @app.post("/v3/query", response_model=QueryResponse)
 async def v3_query_endpoint(request: QueryRequest):
     """V3 optimized query endpoint"""
     start_time = time.time()
+    ticket = None
     
     try:
         logger.info(f"🔍 V3 Query: '{request.query}' (mode: {request.mode}, internet: {request.internet_enabled})")
@@ -261,6 +437,9 @@ async def v3_query_endpoint(request: QueryRequest):
                 detail=f"Invalid mode '{request.mode}'. Must be one of: {valid_modes}"
             )
         
+        # Admission control: wait for a slot in this mode's lane (429/503 when shedding)
+        ticket = await admission_controller.acquire(request.mode, request.priority or "normal")
+        
         # V3 Retrieval with parallel processing
         logger.info("⚡ Starting V3 parallel retrieval...")
         retrieval_start = time.time()
@@ -272,8 +451,11 @@ async def v3_query_endpoint(request: QueryRequest):
             'internet_enabled': should_enable_internet,  # Always explicit (True or False)
             'mode': request.mode  # Pass mode for lightweight QA retrieval
         }
+        ticket.apply_downgrade(custom_plan)  # Cheaper plan when the lane is congested
         
-        v3_output = v3_engine.retrieve(
+        # Run blocking pipeline work off the event loop so other lanes keep moving
+        v3_output = await asyncio.to_thread(
+            v3_engine.retrieve,
             query=request.query,
             top_k=request.top_k,
             custom_plan=custom_plan,
@@ -283,164 +465,40 @@ async def v3_query_endpoint(request: QueryRequest):
         retrieval_time = time.time() - retrieval_start
         logger.info(f"📄 V3 Retrieved {v3_output.final_count} results in {retrieval_time:.2f}s")
         
-        # Generate answer
-        logger.info("💭 Generating answer...")
+        # Generate answer (served from the answer cache when the evidence is unchanged)
         answer_start = time.time()
+        answer_cache = v3_engine.answer_cache
+        answer_cache_status = "disabled"
+        cache_params = {
+            'external_context': request.external_context,
+            'conversation_history': request.conversation_history
+        }
+        cached_answer = None
+        if answer_cache is not None:
+            if request.bypass_cache:
+                answer_cache.record_bypass()
+                answer_cache_status = "bypass"
+            else:
+                cached_answer = await asyncio.to_thread(
+                    answer_cache.get, request.query, request.mode, v3_output.results, **cache_params
+                )
+                answer_cache_status = "hit" if cached_answer else "miss"
         
-        if request.mode == "policy_draft":
-            # Use V3 AnswerBuilder for Policy Crafter
-            logger.info("📝 Using V3 AnswerBuilder for Policy Draft...")
-            
-            # Convert results for builder
-            results_for_builder = []
-            for result in v3_output.results:
-                results_for_builder.append({
-                    "content": result.content,
-                    "chunk_id": result.chunk_id,
-                    "doc_id": result.doc_id,
-                    "score": result.score,
-                    "metadata": result.metadata,
-                    "vertical": result.vertical,
-                    "url": result.metadata.get('url') if 'url' in result.metadata else None
-                })
-            
-            answer_obj = answer_builder.build_answer(
-                query=request.query,
-                results=results_for_builder,
-                mode=request.mode,
-                external_context=request.external_context,
-                conversation_history=request.conversation_history
-            )
-            
-            # Build full answer from summary + sections
-            full_answer = answer_obj.summary
-            if answer_obj.sections:
-                for section_name, section_content in answer_obj.sections.items():
-                    full_answer += "\n\n" + section_content
-            
-            answer_text = full_answer
-            citations_list = answer_obj.citations
-            
+        if cached_answer:
+            answer_text = cached_answer['answer']
+            citations = [Citation(**citation) for citation in cached_answer['citations']]
         else:
-            # Use old AnswerGenerator for standard queries (better quality for QA)
-            # Convert V3 results to old format
-            results_old_fmt = []
-            for result in v3_output.results:
-                # Extract URL from metadata for internet results
-                url = result.metadata.get('url') if result.metadata else None
-                
-                result_dict = {
-                    "chunk_id": result.chunk_id,
-                    "text": result.content,
-                    "doc_id": result.doc_id,
-                    "score": result.score,
-                    "metadata": result.metadata,
-                    "vertical": result.vertical,
-                    "rewrite_source": result.rewrite_source
-                }
-                
-                # Add URL at top level for easy access (internet results)
-                if url:
-                    result_dict['url'] = url
-                
-                results_old_fmt.append(result_dict)
-            
-            answer_response = answer_generator.generate(
-                query=request.query,
-                results=results_old_fmt,
-                mode=request.mode,
-                max_context_chunks=5 if request.mode == "qa" else 10,
-                external_context=request.external_context,
-                conversation_history=request.conversation_history
-            )
-            
-            answer_text = answer_response.get("answer", "No answer generated")
-            citations_list = [] # We'll handle citations below based on the source
-            
-            # Extract citations from answer_response for processing below
-            raw_citations = answer_response.get("citations", [])
+            logger.info("💭 Generating answer...")
+            answer_text, citations, cacheable = await generate_v3_answer(request, v3_output)
+            if answer_cache_status == "miss" and cacheable:
+                await asyncio.to_thread(
+                    answer_cache.set, request.query, request.mode, v3_output.results,
+                    {'answer': answer_text, 'citations': [citation.dict() for citation in citations]},
+                    **cache_params
+                )
         
         answer_time = time.time() - answer_start
         
-        # Format citations
-        citations = []
-        
-        if request.mode == "policy_draft":
-            # V3 Builder citations format
-            for citation in citations_list:
-                vertical = citation.get('vertical', 'unknown')
-                url = citation.get('url')
-                
-                # For internet results, use URL as docId
-                doc_id = url if (vertical == 'internet' and url) else (
-                    citation.get('filename') or 
-                    citation.get('source') or 
-                    citation.get('doc_id', 'Unknown')
-                )
-                
-                citations.append(Citation(
-                    docId=doc_id,
-                    page=citation.get('page') or 1,
-                    span=citation.get('source', '')[:150],
-                    source=citation.get('filename') or citation.get('source', 'Policy Document'),
-                    vertical=vertical,
-                    url=url  # Include URL for internet results
-                ))
-        else:
-            # Old Generator citations format
-            for citation_num in raw_citations:
-                try:
-                    result_idx = int(citation_num) - 1
-                    if 0 <= result_idx < len(results_old_fmt):
-                        result = results_old_fmt[result_idx]
-                        metadata = result.get("metadata", {})
-                        
-                        vertical = result.get("vertical", "unknown")
-                        
-                        # Extract URL from multiple possible locations
-                        url = (
-                            result.get('url') or 
-                            metadata.get('url') or 
-                            metadata.get('source_url') or
-                            None
-                        )
-                        
-                        # For internet results, prioritize title and URL
-                        if vertical == 'internet' and url:
-                            # Use title from metadata or URL itself
-                            display_name = metadata.get('title') or metadata.get('source') or url
-                            # Make it clear it's a web source if not obvious
-                            if not display_name.startswith('http') and not display_name.endswith('(Web)'):
-                                display_name = f"{display_name} (Web)"
-                            # For internet, use URL as docId (not GCS path)
-                            gcs_path = url
-                        else:
-                            # Construct display name from metadata for non-internet results
-                            display_name = construct_citation_name(result, metadata)
-                            
-                            # Try to get actual GCS file path from metadata
-                            # Priority: filename > file_name > source > doc_id
-                            gcs_path = (
-                                metadata.get('filename') or 
-                                metadata.get('file_name') or 
-                                metadata.get('source') or 
-                                result.get("doc_id", "Unknown")
-                            )
-                        
-                        # Debug logging to see metadata
-                        logger.info(f"📋 Citation - vertical: {vertical}, url: {url}, display_name: {display_name}")
-                        
-                        citations.append(Citation(
-                            docId=gcs_path,  # Use URL for internet, GCS path for local docs
-                            page=metadata.get('page_number') or metadata.get('page') or 1,
-                            span=result.get("text", result.get("content", ""))[:150] + "...",
-                            source=display_name,  # Use display name for frontend
-                            vertical=vertical,
-                            url=url  # Internet search URL, None for local docs
-                        ))
-                except (ValueError, IndexError):
-                    continue
-        
         # Create V3 processing trace
         processing_trace = ProcessingTrace(
             language="en",
@@ -468,7 +526,10 @@ async def v3_query_endpoint(request: QueryRequest):
             "verticals_searched": len(v3_output.verticals_searched),
             "rewrites_generated": len(v3_output.rewrites),
             "candidates_processed": v3_output.total_candidates,
-            "parallel_processing": True
+            "parallel_processing": True,
+            "queue_time": round(ticket.queue_time, 3),
+            "downgraded": ticket.downgraded,
+            "answer_cache": answer_cache_status
         }
         
         response = QueryResponse(
@@ -482,11 +543,20 @@ async def v3_query_endpoint(request: QueryRequest):
         logger.info(f"✅ V3 Query completed in {total_time:.2f}s - Answer: {len(response.answer)} chars, Citations: {len(citations)}")
         return response
         
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"❌ V3 Query error: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"V3 processing error: {str(e)}")
+    finally:
+        if ticket:
+            admission_controller.release(ticket)
 
 @app.post("/v3/query_with_files", response_model=QueryResponse)
 async def v3_query_with_files_endpoint(
@@ -498,6 +568,7 @@ async def v3_query_with_files_endpoint(
 ):
     """V3 query endpoint with file upload support"""
     start_time = time.time()
+    ticket = None
     
     try:
         # Parse conversation history if provided (it comes as JSON string from form data)
@@ -566,6 +637,9 @@ async def v3_query_with_files_endpoint(
             logger.info("📝 No file context (no files uploaded or all failed)")
             file_context_text = None # Explicitly set to None
         
+        # Admission control: wait for a slot in this mode's lane (429/503 when shedding)
+        ticket = await admission_controller.acquire(mode)
+        
         # V3 Retrieval with ORIGINAL query (don't confuse retriever with file content)
         logger.info(f"⚡ Starting V3 retrieval with external_context length: {len(file_context_text) if file_context_text else 0}")
         retrieval_start = time.time()
@@ -575,8 +649,10 @@ async def v3_query_with_files_endpoint(
             'internet_enabled': internet_enabled,  # Always explicit (True or False)
             'mode': mode  # Pass mode for lightweight QA retrieval
         }
+        ticket.apply_downgrade(custom_plan)  # Cheaper plan when the lane is congested
         
-        v3_output = v3_engine.retrieve(
+        v3_output = await asyncio.to_thread(
+            v3_engine.retrieve,
             query=query,
             top_k=10,
             custom_plan=custom_plan,
@@ -607,7 +683,8 @@ async def v3_query_with_files_endpoint(
                     "url": result.metadata.get('url') if 'url' in result.metadata else None
                 })
             
-            answer_obj = answer_builder.build_answer(
+            answer_obj = await asyncio.to_thread(
+                answer_builder.build_answer,
                 query=query,
                 results=results_for_builder,
                 mode=mode,
@@ -639,7 +716,8 @@ async def v3_query_with_files_endpoint(
                     "rewrite_source": result.rewrite_source
                 })
             
-            answer_response = answer_generator.generate(
+            answer_response = await asyncio.to_thread(
+                answer_generator.generate,
                 query=query,
                 results=results_old_fmt,
                 mode=mode,
@@ -715,6 +793,8 @@ async def v3_query_with_files_endpoint(
             "verticals_searched": len(v3_output.verticals_searched),
             "rewrites_generated": len(v3_output.rewrites),
             "candidates_processed": v3_output.total_candidates,
+            "queue_time": round(ticket.queue_time, 3),
+            "downgraded": ticket.downgraded,
         }
         
         response = QueryResponse(
@@ -728,11 +808,20 @@ async def v3_query_with_files_endpoint(
         logger.info(f"✅ V3 Query with files completed in {total_time:.2f}s")
         return response
         
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"❌ V3 Query with files error: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"V3 file processing error: {str(e)}")
+    finally:
+        if ticket:
+            admission_controller.release(ticket)
 
 @app.get("/v3/status", response_model=SystemStatusResponse)
 async def get_v3_status():
@@ -759,6 +848,8 @@ async def get_v3_status():
                 "cache_hits": stats.get('cache_hits', 0),
                 "cache_hit_rate": round(stats.get('cache_hits', 0) / max(stats.get('total_queries', 1), 1) * 100, 1)
             }
+            if v3_engine.answer_cache:
+                engine_stats["answer_cache"] = v3_engine.answer_cache.get_stats()
         
         status = "healthy" if all(
             s in ["healthy", "active", "enabled", "connected", "configured"] 
@@ -845,6 +936,8 @@ async def get_v3_metrics():
                 "llm_rewrites_enabled": v3_engine.use_llm_rewrites,
                 "llm_reranking_enabled": v3_engine.use_llm_reranking
             },
+            "admission": admission_controller.get_stats(),
+            "answer_cache": v3_engine.answer_cache.get_stats() if v3_engine.answer_cache else None,
             "target_performance": {
                 "target_response_time": "< 5.0s",
                 "target_cache_speedup": "> 1.5x",
@@ -12,12 +12,16 @@ Main entry point:
         mode="qa",
         internet_toggle=False
     )
+    
+    # From async code: sources run as tasks with their own budgets and the
+    # answer uses whichever are ready at the deadline
+    response = await orchestrator.orchestrate_async(query="What is FLN?")
 """
 
 from .router import QueryOrchestrator, get_query_orchestrator
 from .config import OrchestratorConfig, get_orchestrator_config
 from .triggers import TriggerEngine, get_trigger_engine, TriggerDecision
-from .fusion import ContextFusion, get_context_fusion
+from .fusion import ContextFusion, MergeState, get_context_fusion
 
 __all__ = [
     "QueryOrchestrator",
@@ -28,5 +32,6 @@ __all__ = [
     "get_trigger_engine",
     "TriggerDecision",
     "ContextFusion",
+    "MergeState",
     "get_context_fusion",
 ]
\ No newline at end of file
@@ -24,11 +24,20 @@ class OrchestratorConfig:
     theory_enabled: bool = False
     theory_trigger_keywords: Set[str] = None
     
-    # Timeouts (seconds)
-    local_rag_timeout: float = 5.0
-    internet_timeout: float = 3.0
-    theory_timeout: float = 2.0
+    # Timeouts (seconds): per-source budgets and the overall deadline.
+    # A source that misses its budget is dropped; at the deadline the
+    # orchestrator answers with whichever sources are ready. Once local
+    # results are in, other sources get at most supplement_grace more,
+    # unless the user turned internet on for this query.
+    # Budgets are at least the internet path's own search_timeout +
+    # fetch_deadline (5.0 + 3.0, internet_service/config.py), so a source is
+    # never cancelled before the internet search and its snippet fallback can
+    # finish; the internet budget is raised further if those settings grow.
+    local_rag_timeout: float = 10.0
+    internet_timeout: float = 8.0
+    theory_timeout: float = 8.0
     total_timeout: float = 15.0
+    supplement_grace: float = 0.3
     
     # Result limits
     max_local_results: int = 10
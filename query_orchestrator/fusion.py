@@ -13,6 +13,58 @@ from .config import get_orchestrator_config
 logger = logging.getLogger(__name__)
 
 
+class MergeState:
+    """
+    Merge in progress: sources are added as they complete.
+    The merged list doesn't depend on arrival order.
+    """
+    
+    SOURCE_ORDER = ("local", "internet", "theory")
+    
+    def __init__(self, priorities: Dict[str, float]):
+        self.priorities = priorities
+        self.by_source: Dict[str, List[Dict]] = {}
+    
+    def add(self, source: str, results: List[Dict]):
+        """Add one source's results"""
+        
+        if not results:
+            return
+        
+        for result in results:
+            result["source_type"] = source
+            result["priority"] = self.priorities[source]
+        
+        self.by_source[source] = results
+        logger.info(f"Added {len(results)} {source} results")
+    
+    def result(self) -> Tuple[List[Dict], Dict]:
+        """(merged_results, metadata) for the sources added so far"""
+        
+        merged = []
+        metadata = {
+            "local_count": 0,
+            "internet_count": 0,
+            "theory_count": 0,
+            "total_count": 0,
+            "sources": []
+        }
+        
+        for source in self.SOURCE_ORDER:
+            results = self.by_source.get(source)
+            if results:
+                merged.extend(results)
+                metadata[f"{source}_count"] = len(results)
+                metadata["sources"].append(source)
+        
+        metadata["total_count"] = len(merged)
+        
+        # Sort by priority (local first, then internet, then theory)
+        merged.sort(key=lambda x: x.get("priority", 0), reverse=True)
+        
+        return merged, metadata
+
+
 class ContextFusion:
     """
     Merge contexts from multiple sources.
@@ -22,6 +74,15 @@ class ContextFusion:
     def __init__(self):
         self.config = get_orchestrator_config()
     
+    def start_merge(self) -> MergeState:
+        """Empty merge to add sources to as they complete"""
+        
+        return MergeState({
+            "local": 1.0,  # HIGHEST PRIORITY
+            "internet": self.config.internet_weight,
+            "theory": self.config.theory_weight
+        })
+    
     def merge(
         self,
         local_results: List[Dict],
@@ -40,54 +101,12 @@ class ContextFusion:
             (merged_results, metadata)
         """
         
-        merged = []
-        metadata = {
-            "local_count": 0,
-            "internet_count": 0,
-            "theory_count": 0,
-            "total_count": 0,
-            "sources": []
-        }
-        
-        # 1. Add local results (HIGHEST PRIORITY)
-        if local_results:
-            for result in local_results:
-                result["source_type"] = "local"
-                result["priority"] = 1.0
-                merged.append(result)
-            
-            metadata["local_count"] = len(local_results)
-            metadata["sources"].append("local")
-            logger.info(f"Added {len(local_results)} local results")
-        
-        # 2. Add internet results
-        if internet_results:
-            for result in internet_results:
-                result["source_type"] = "internet"
-                result["priority"] = self.config.internet_weight
-                merged.append(result)
-            
-            metadata["internet_count"] = len(internet_results)
-            metadata["sources"].append("internet")
-            logger.info(f"Added {len(internet_results)} internet results")
-        
-        # 3. Add theory results
-        if theory_results:
-            for result in theory_results:
-                result["source_type"] = "theory"
-                result["priority"] = self.config.theory_weight
-                merged.append(result)
-            
-            metadata["theory_count"] = len(theory_results)
-            metadata["sources"].append("theory")
-            logger.info(f"Added {len(theory_results)} theory results")
+        state = self.start_merge()
+        state.add("local", local_results)
+        state.add("internet", internet_results)
+        state.add("theory", theory_results)
         
-        metadata["total_count"] = len(merged)
-        
-        # 4. Sort by priority (local first, then internet, then theory)
-        merged.sort(key=lambda x: x.get("priority", 0), reverse=True)
-        
-        return merged, metadata
+        return state.result()
     
     def format_for_llm(
         self,
@@ -6,9 +6,10 @@ Clean, battle-tested, no BS.
 """
 
 import time
+import asyncio
 import logging
 from typing import Dict, List, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 
 from .config import get_orchestrator_config
 from .triggers import get_trigger_engine
@@ -38,10 +39,29 @@ class QueryOrchestrator:
         # Injected dependencies
         self.retrieval_router = retrieval_router
         
-        # Lazy-loaded services
+        # Lazy-loaded services (initialized up front by warmup())
         self._internet_client = None
         self._theory_retriever = None
     
+    def warmup(self):
+        """
+        Initialize source clients now (call at startup), so the first
+        query doesn't pay for it and the async path never blocks on it.
+        """
+        
+        try:
+            self.internet_client
+            logger.info("✅ Internet client initialized")
+        except Exception as e:
+            logger.warning(f"Internet client unavailable: {e}")
+        
+        if self.config.theory_enabled:
+            try:
+                self.theory_retriever
+                logger.info("✅ Theory retriever initialized")
+            except Exception as e:
+                logger.warning(f"Theory retriever unavailable: {e}")
+    
     @property
     def internet_client(self):
         """Lazy load internet client"""
@@ -105,45 +125,163 @@ class QueryOrchestrator:
                 theory_results=results.get("theory")
             )
             
-            # 4. Build fusion prompt
-            fusion_prompt = build_fusion_prompt(
-                query=query,
-                local_results=results.get("local", []),
-                internet_results=results.get("internet"),
-                theory_results=results.get("theory"),
-                mode=mode
+            return self._build_response(
+                query, mode, decision, results, merged_results, merge_metadata, start_time
             )
             
-            orchestration_time = time.time() - start_time
-            
-            logger.info(f"✅ Orchestration complete in {orchestration_time:.2f}s: "
-                       f"{merge_metadata['local_count']} local, "
-                       f"{merge_metadata['internet_count']} internet, "
-                       f"{merge_metadata['theory_count']} theory")
-            
+        except Exception as e:
+            logger.error(f"❌ Orchestration failed: {e}", exc_info=True)
             return {
-                "success": True,
+                "success": False,
+                "error": str(e),
                 "query": query,
-                "mode": mode,
-                "decision": {
-                    "use_local": decision.use_local,
-                    "use_internet": decision.use_internet,
-                    "use_theory": decision.use_theory,
-                    "reason": decision.reason
-                },
-                "results": merged_results,
-                "fusion_prompt": fusion_prompt,
-                "formatted_contexts": self.fusion.format_for_llm(
-                    results.get("local", []),
-                    results.get("internet"),
-                    results.get("theory")
-                ),
-                "metadata": {
-                    **merge_metadata,
-                    "orchestration_time": orchestration_time
-                }
+                "mode": mode
+            }
+    
+    def _build_response(
+        self,
+        query: str,
+        mode: str,
+        decision,
+        results: Dict[str, List[Dict]],
+        merged_results: List[Dict],
+        merge_metadata: Dict,
+        start_time: float,
+        source_status: Dict[str, Dict] = None
+    ) -> Dict:
+        """Fusion prompt, LLM contexts and metadata for merged results"""
+        
+        fusion_prompt = build_fusion_prompt(
+            query=query,
+            local_results=results.get("local", []),
+            internet_results=results.get("internet"),
+            theory_results=results.get("theory"),
+            mode=mode
+        )
+        
+        orchestration_time = time.time() - start_time
+        
+        logger.info(f"✅ Orchestration complete in {orchestration_time:.2f}s: "
+                   f"{merge_metadata['local_count']} local, "
+                   f"{merge_metadata['internet_count']} internet, "
+                   f"{merge_metadata['theory_count']} theory")
+        
+        metadata = {
+            **merge_metadata,
+            "orchestration_time": orchestration_time
+        }
+        if source_status is not None:
+            metadata["source_status"] = source_status
+        
+        return {
+            "success": True,
+            "query": query,
+            "mode": mode,
+            "decision": {
+                "use_local": decision.use_local,
+                "use_internet": decision.use_internet,
+                "use_theory": decision.use_theory,
+                "reason": decision.reason
+            },
+            "results": merged_results,
+            "fusion_prompt": fusion_prompt,
+            "formatted_contexts": self.fusion.format_for_llm(
+                results.get("local", []),
+                results.get("internet"),
+                results.get("theory")
+            ),
+            "metadata": metadata
+        }
+    
+    async def orchestrate_async(
+        self,
+        query: str,
+        mode: str = "qa",
+        internet_toggle: bool = False,
+        top_k: int = None
+    ) -> Dict:
+        """
+        Async orchestration: each source runs as its own task with its own
+        budget, results are merged as sources complete, and at the overall
+        deadline the answer uses whichever sources are ready. A slow
+        supplementary source never holds back a complete local answer: once
+        local returns results, the others get at most supplement_grace more
+        (unless internet_toggle is set, when they run to their own budgets).
+        
+        Same arguments and result as orchestrate(), plus
+        metadata["source_status"]: source -> {status, count, time[, error]},
+        status one of ok, empty, error, timeout (own budget), deadline,
+        late (cut off after local completed).
+        """
+        
+        start_time = time.time()
+        
+        try:
+            logger.info(f"🎯 Orchestrating query (async): '{query}' (mode={mode}, internet={internet_toggle})")
+            
+            decision = self.trigger_engine.decide(query, mode, internet_toggle)
+            
+            logger.info(f"📋 {decision.reason}")
+            
+            sources = {}
+            if decision.use_local and self.retrieval_router:
+                sources["local"] = (self._search_local, (query, mode, top_k), self.config.local_rag_timeout)
+            if decision.use_internet:
+                sources["internet"] = (self._search_internet, (query,), self._internet_budget())
+            if decision.use_theory:
+                sources["theory"] = (self._search_theory, (query,), self.config.theory_timeout)
+            
+            tasks = {
+                asyncio.create_task(self._run_source(name, fn, args, budget)): name
+                for name, (fn, args, budget) in sources.items()
             }
             
+            results = {"local": [], "internet": [], "theory": []}
+            source_status = {}
+            state = self.fusion.start_merge()
+            deadline = start_time + self.config.total_timeout
+            cutoff = "deadline"
+            pending = set(tasks)
+            
+            while pending:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    name, source_results, status = task.result()
+                    results[name] = source_results
+                    source_status[name] = status
+                    state.add(name, source_results)
+                    if name == "local" and source_results and pending and not internet_toggle:
+                        # Local answer is ready: supplements only get a short grace window
+                        # (not when the user asked for internet results)
+                        grace_deadline = time.time() + self.config.supplement_grace
+                        if grace_deadline < deadline:
+                            deadline, cutoff = grace_deadline, "late"
+            
+            for task in pending:
+                # Sources still running at the deadline are left out
+                task.cancel()
+                name = tasks[task]
+                source_status[name] = {
+                    "status": cutoff,
+                    "count": 0,
+                    "time": round(time.time() - start_time, 3)
+                }
+                if cutoff == "late":
+                    logger.warning(f"⏱️ {name} not ready {self.config.supplement_grace:.1f}s after local results, answering without it")
+                else:
+                    logger.warning(f"⏱️ {name} not ready at the {self.config.total_timeout:.1f}s deadline, answering without it")
+            
+            merged_results, merge_metadata = state.result()
+            
+            return self._build_response(
+                query, mode, decision, results, merged_results, merge_metadata, start_time, source_status
+            )
+            
         except Exception as e:
             logger.error(f"❌ Orchestration failed: {e}", exc_info=True)
             return {
@@ -153,6 +291,41 @@ class QueryOrchestrator:
                 "mode": mode
             }
     
+    def _internet_budget(self) -> float:
+        """Internet budget: never shorter than the search timeout plus the page-fetch deadline"""
+        try:
+            from internet_service.config import get_internet_config
+            internet_config = get_internet_config()
+            floor = internet_config.search_timeout + internet_config.fetch_deadline
+        except Exception:
+            return self.config.internet_timeout
+        return max(self.config.internet_timeout, floor)
+    
+    async def _run_source(self, name: str, fn, args: tuple, budget: float):
+        """Run one blocking source search in a thread, within its budget"""
+        
+        start = time.time()
+        try:
+            results = await asyncio.wait_for(asyncio.to_thread(fn, *args), timeout=budget)
+            status = "ok" if results else "empty"
+            error = None
+        except asyncio.TimeoutError:
+            # The worker thread finishes in the background; its result is dropped
+            logger.warning(f"⏱️ {name} exceeded its {budget:.1f}s budget")
+            results, status, error = [], "timeout", None
+        except Exception as e:
+            logger.error(f"Error querying {name}: {e}")
+            results, status, error = [], "error", str(e)
+        
+        source_status = {
+            "status": status,
+            "count": len(results),
+            "time": round(time.time() - start, 3)
+        }
+        if error:
+            source_status["error"] = error
+        return name, results, source_status
+    
     def _query_sources_parallel(
         self,
         query: str,
@@ -216,22 +389,7 @@ class QueryOrchestrator:
         """Query local RAG"""
         
         try:
-            logger.info("🔍 Querying local RAG...")
-            
-            response = self.retrieval_router.query(
-                query=query,
-                mode=mode,
-                top_k=top_k
-            )
-            
-            if response.get("success"):
-                results = response.get("results", [])
-                logger.info(f"✅ Local RAG returned {len(results)} results")
-                return results
-            else:
-                logger.warning(f"Local RAG failed: {response.get('error')}")
-                return []
-                
+            return self._search_local(query, mode, top_k)
         except Exception as e:
             logger.error(f"Local RAG error: {e}")
             return []
@@ -240,18 +398,7 @@ class QueryOrchestrator:
         """Query internet"""
         
         try:
-            logger.info("🌐 Querying internet...")
-            
-            result = self.internet_client.search(query)
-            
-            if result.success and result.has_results:
-                snippets = [s.to_dict() for s in result.snippets]
-                logger.info(f"✅ Internet returned {len(snippets)} snippets")
-                return snippets
-            else:
-                logger.warning("No internet results")
-                return []
-                
+            return self._search_internet(query)
         except Exception as e:
             logger.error(f"Internet query error: {e}")
             return []
@@ -260,20 +407,60 @@ class QueryOrchestrator:
         """Query theory corpus"""
         
         try:
-            if not self.theory_retriever:
-                logger.debug("Theory corpus not enabled")
-                return []
-            
-            logger.info("📚 Querying theory corpus...")
-            
-            results = self.theory_retriever.search(query, top_k=3)
-            
-            logger.info(f"✅ Theory corpus returned {len(results)} results")
-            return results
-            
+            return self._search_theory(query)
         except Exception as e:
             logger.error(f"Theory query error: {e}")
             return []
+    
+    def _search_local(self, query: str, mode: str, top_k: int = None) -> List[Dict]:
+        """Local RAG results (raises on failure)"""
+        
+        logger.info("🔍 Querying local RAG...")
+        
+        response = self.retrieval_router.query(
+            query=query,
+            mode=mode,
+            top_k=top_k
+        )
+        
+        if not response.get("success"):
+            raise RuntimeError(f"Local RAG failed: {response.get('error')}")
+        
+        results = response.get("results", [])
+        logger.info(f"✅ Local RAG returned {len(results)} results")
+        return results
+    
+    def _search_internet(self, query: str) -> List[Dict]:
+        """Internet snippets (raises on failure)"""
+        
+        logger.info("🌐 Querying internet...")
+        
+        result = self.internet_client.search(query)
+        
+        if not result.success:
+            raise RuntimeError(f"Internet search failed: {result.error}")
+        
+        if not result.has_results:
+            logger.warning("No internet results")
+            return []
+        
+        snippets = [s.to_dict() for s in result.snippets]
+        logger.info(f"✅ Internet returned {len(snippets)} snippets")
+        return snippets
+    
+    def _search_theory(self, query: str) -> List[Dict]:
+        """Theory corpus results (raises on failure)"""
+        
+        if not self.theory_retriever:
+            logger.debug("Theory corpus not enabled")
+            return []
+        
+        logger.info("📚 Querying theory corpus...")
+        
+        results = self.theory_retriever.search(query, top_k=3)
+        
+        logger.info(f"✅ Theory corpus returned {len(results)} results")
+        return results
 
 
 # Singleton
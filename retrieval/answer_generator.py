@@ -109,14 +109,16 @@ class AnswerGenerator:
             conversation_history: Previous conversation turns for context
             
         Returns:
-            Dict with answer, citations, bibliography
+            Dict with answer, citations, bibliography, confidence and
+            generated_by ("llm" only when the model wrote the answer)
         """
         if not results and not external_context:
             return {
                 "answer": "I couldn't find relevant information to answer your query.",
                 "citations": [],
                 "bibliography": [],
-                "confidence": 0.0
+                "confidence": 0.0,
+                "generated_by": "no_results"
             }
         
         # Normalize year query for better matching with academic year data
@@ -191,7 +193,8 @@ class AnswerGenerator:
                     "answer": answer_text,
                     "citations": citations,
                     "bibliography": bibliography,
-                    "confidence": max_score if results else 0.0
+                    "confidence": max_score if results else 0.0,
+                    "generated_by": "llm_disabled"
                 }
 
             # Optimize generation config based on mode for better quality
@@ -463,7 +466,8 @@ class AnswerGenerator:
                 "answer": answer_text,
                 "citations": citations,
                 "bibliography": bibliography,
-                "confidence": self._estimate_confidence(answer_text, citations)
+                "confidence": self._estimate_confidence(answer_text, citations),
+                "generated_by": "llm"
             }
             
         except Exception as e:
@@ -928,6 +932,7 @@ Suggest innovative approaches, citing existing policies with bracketed numbers w
                 "citations": [],
                 "bibliography": [],
                 "confidence": 0.0,
+                "generated_by": "rule_based",
             }
 
         bullets = []
@@ -948,6 +953,7 @@ Suggest innovative approaches, citing existing policies with bracketed numbers w
             "citations": citations,
             "bibliography": bibliography,
             "confidence": 0.2 if context_results else 0.0,
+            "generated_by": "rule_based",
         }
     
     # Backward compatibility aliases
@@ -52,7 +52,69 @@ def compute_mmr(
     if all(v is None for v in vectors):
         return results[:top_k]
     
-    # MMR algorithm
+    try:
+        selected_indices = _mmr_indices_vectorized(results, vectors, lambda_param, top_k)
+    except ImportError:
+        selected_indices = _mmr_indices(results, vectors, lambda_param, top_k)
+    
+    # Return selected results
+    return [results[i] for i in selected_indices]
+
+
+def _mmr_indices_vectorized(
+    results: List[Dict],
+    vectors: List,
+    lambda_param: float,
+    top_k: int
+) -> List[int]:
+    """
+    MMR selection over one normalized vector matrix.
+    
+    Keeps a running max-similarity per candidate, so each step is a single
+    matrix-vector product instead of re-comparing against every selected doc.
+    Same selection as _mmr_indices.
+    """
+    import numpy as np
+    
+    dim = len(next(v for v in vectors if v is not None))
+    has_vector = np.array([v is not None for v in vectors])
+    matrix = np.zeros((len(vectors), dim), dtype=np.float32)
+    for idx, vec in enumerate(vectors):
+        if vec is not None:
+            matrix[idx] = vec
+    norms = np.linalg.norm(matrix, axis=1)
+    norms[norms == 0] = 1.0
+    matrix /= norms[:, None]
+    
+    relevance = np.array([r["score"] for r in results], dtype=np.float32)
+    max_sim = np.full(len(results), -1.0, dtype=np.float32)
+    available = has_vector.copy()
+    
+    # Start with highest scoring document
+    selected_indices = [0]
+    available[0] = False
+    if has_vector[0]:
+        max_sim = np.maximum(max_sim, matrix @ matrix[0])
+    
+    while len(selected_indices) < top_k and available.any():
+        mmr_scores = lambda_param * relevance - (1 - lambda_param) * max_sim
+        mmr_scores[~available] = -np.inf
+        best_idx = int(np.argmax(mmr_scores))
+        
+        selected_indices.append(best_idx)
+        available[best_idx] = False
+        max_sim = np.maximum(max_sim, matrix @ matrix[best_idx])
+    
+    return selected_indices
+
+
+def _mmr_indices(
+    results: List[Dict],
+    vectors: List,
+    lambda_param: float,
+    top_k: int
+) -> List[int]:
+    """Pure-Python MMR selection (used when numpy is unavailable)"""
     selected_indices = []
     remaining_indices = list(range(len(results)))
     
@@ -60,6 +122,19 @@ def compute_mmr(
     selected_indices.append(0)
     remaining_indices.remove(0)
     
+    # Running max similarity to the selected set
+    max_sims = [-1.0] * len(results)
+    
+    def absorb(sel_idx: int):
+        if vectors[sel_idx] is None:
+            return
+        for idx in remaining_indices:
+            if vectors[idx] is not None:
+                sim = cosine_similarity(vectors[idx], vectors[sel_idx])
+                max_sims[idx] = max(max_sims[idx], sim)
+    
+    absorb(0)
+    
     while len(selected_indices) < top_k and remaining_indices:
         best_score = -float('inf')
         best_idx = None
@@ -68,18 +143,8 @@ def compute_mmr(
             if vectors[idx] is None:
                 continue
             
-            # Relevance score (original score)
-            relevance = results[idx]["score"]
-            
-            # Diversity score (min similarity to already selected)
-            max_sim = -1
-            for sel_idx in selected_indices:
-                if vectors[sel_idx] is not None:
-                    sim = cosine_similarity(vectors[idx], vectors[sel_idx])
-                    max_sim = max(max_sim, sim)
-            
             # MMR score
-            mmr_score = lambda_param * relevance - (1 - lambda_param) * max_sim
+            mmr_score = lambda_param * results[idx]["score"] - (1 - lambda_param) * max_sims[idx]
             
             if mmr_score > best_score:
                 best_score = mmr_score
@@ -88,11 +153,11 @@ def compute_mmr(
         if best_idx is not None:
             selected_indices.append(best_idx)
             remaining_indices.remove(best_idx)
+            absorb(best_idx)
         else:
             break
     
-    # Return selected results
-    return [results[i] for i in selected_indices]
+    return selected_indices
 
 
 def compute_bm25_score(
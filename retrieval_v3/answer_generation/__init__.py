@@ -1,5 +1,5 @@
 # Answer Generation Layer
-# Answer builder, answer validator
+# Answer builder, answer validator, answer cache
 
 """
 Answer Generation Layer
@@ -8,6 +8,7 @@ Build and validate structured answers with citations
 
 from .answer_builder import AnswerBuilder, Answer, build_answer
 from .answer_validator import AnswerValidator, validate_answer
+from .answer_cache import AnswerCache, get_answer_cache
 
 __all__ = [
     'AnswerBuilder',
@@ -15,6 +16,8 @@ __all__ = [
     'build_answer',
     'AnswerValidator',
     'validate_answer',
+    'AnswerCache',
+    'get_answer_cache',
 ]
 
 
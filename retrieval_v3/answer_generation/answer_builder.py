@@ -7,16 +7,26 @@ Creates well-formatted responses with proper attribution
 
 import os
 import re
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 
 # Import prompt templates
 try:
-    from .prompt_templates import get_prompt_template, format_documents_with_metadata, format_conversation_history
+    from .prompt_templates import build_prompt_parts, format_documents_with_metadata, format_conversation_history
+    from .prompt_cache import PromptPrefixCache
 except ImportError:
     # Fallback if running standalone
-    from prompt_templates import get_prompt_template, format_documents_with_metadata, format_conversation_history
+    from prompt_templates import build_prompt_parts, format_documents_with_metadata, format_conversation_history
+    from prompt_cache import PromptPrefixCache
+
+try:
+    from .context_packer import ContextPacker, estimate_tokens
+except ImportError:
+    from context_packer import ContextPacker, estimate_tokens
+
+# Retrieval results considered for the prompt (and cited)
+MAX_CONTEXT_RESULTS = 10
 
 
 @dataclass
@@ -46,6 +56,13 @@ class AnswerBuilder:
         self.use_oauth = True
         self.project_id = os.getenv("GOOGLE_CLOUD_PROJECT_ID") or os.getenv("GOOGLE_CLOUD_PROJECT")
         self.location = os.getenv("GOOGLE_CLOUD_LOCATION", "asia-south1")
+        self.context_packer = ContextPacker()
+        
+        # Static template prefixes are cached provider-side (once per TTL per mode)
+        self.prompt_cache = PromptPrefixCache(
+            ttl_seconds=int(os.getenv("PROMPT_CACHE_TTL_SECONDS", "3600")),
+            use_provider=os.getenv("PROMPT_CACHE_PROVIDER", "true").lower() != "false"
+        )
     
     def build_answer(
         self,
@@ -114,8 +131,8 @@ class AnswerBuilder:
             )
             model = client
             
-            # Prepare context from results
-            context = self._prepare_context(results)
+            # Prepare context from results (token-budgeted per mode)
+            context, packing = self._prepare_context(results, query, mode)
             
             # Append external context if provided
             if external_context:
@@ -128,8 +145,11 @@ ADDITIONAL CONTEXT FROM UPLOADED FILES:
 ---
 """
             
-            # Build prompt based on mode
-            prompt = self._build_prompt(query, context, mode, conversation_history)
+            # Build prompt based on mode (static prefix + per-request suffix)
+            prompt_parts = self._build_prompt_parts(query, context, mode, conversation_history)
+            packing['prompt_tokens'] = estimate_tokens(prompt_parts.text)
+            packing['prefix_tokens'] = estimate_tokens(prompt_parts.prefix)
+            packing['prefix_hash'] = prompt_parts.prefix_hash[:12]
             
             # Optimize generation config based on mode
             # QA: Lower temperature for accuracy, moderate tokens
@@ -172,10 +192,12 @@ ADDITIONAL CONTEXT FROM UPLOADED FILES:
             gen_config = mode_configs.get(mode, mode_configs['qa'])
             
             # Generate answer with optimized config
-            response = model.models.generate_content(
-                model=model_name,
-                contents=[{"role": "user", "parts": [{"text": prompt}]}],
+            response = self.prompt_cache.generate(
+                model,
+                model_name,
+                prompt_parts,
                 config=gen_config,
+                label=mode
             )
             
             # Parse response
@@ -203,7 +225,7 @@ ADDITIONAL CONTEXT FROM UPLOADED FILES:
                 sections=sections,
                 citations=citations,
                 confidence=confidence,
-                metadata={'generated_by': 'gemini_vertex', 'mode': mode}
+                metadata={'generated_by': 'gemini_vertex', 'mode': mode, 'context': packing}
             )
             
         except Exception as e:
@@ -252,23 +274,38 @@ ADDITIONAL CONTEXT FROM UPLOADED FILES:
             metadata={'generated_by': 'template', 'mode': mode}
         )
     
-    def _prepare_context(self, results: List[Dict]) -> str:
-        """Prepare context from results for LLM with enriched metadata"""
+    def _prepare_context(self, results: List[Dict], query: str = "", mode: str = "qa") -> Tuple[str, Dict]:
+        """
+        Prepare context from results for LLM with enriched metadata
+        
+        Returns:
+            (context text, packing stats: budget, packed docs/tokens, dropped, trimmed)
+        """
+        # Fit the top results into the mode's token budget
+        packed = self.context_packer.pack(query, results[:MAX_CONTEXT_RESULTS], mode)
+        
         # Enrich results with formatted metadata
-        enriched_results = self._enrich_results_metadata(results[:10])
+        enriched_results = self._enrich_results_metadata(packed.results, packed.indices)
         
         # Use template formatter
-        return format_documents_with_metadata(enriched_results)
+        return format_documents_with_metadata(enriched_results), packed.stats
     
-    def _enrich_results_metadata(self, results: List[Dict]) -> List[Dict]:
-        """Enrich results with formatted metadata for answer generation"""
+    def _enrich_results_metadata(self, results: List[Dict], indices: Optional[List[int]] = None) -> List[Dict]:
+        """
+        Enrich results with formatted metadata for answer generation
+        
+        Args:
+            results: Results to enrich
+            indices: Doc number per result (default 1..n); kept equal to the
+                result's citation number when some results were left out
+        """
         enriched = []
         
         for i, result in enumerate(results, 1):
             metadata = result.get('metadata', {})
             
             enriched_result = {
-                'doc_index': i,
+                'doc_index': indices[i - 1] if indices else i,
                 'content': result.get('content', ''),
                 'doc_id': result.get('doc_id', result.get('chunk_id', 'unknown')),
                 
@@ -339,6 +376,10 @@ ADDITIONAL CONTEXT FROM UPLOADED FILES:
     
     def _build_prompt(self, query: str, context: str, mode: str, conversation_history: Optional[List[Dict[str, str]]] = None) -> str:
         """Build LLM prompt based on mode using templates"""
+        return self._build_prompt_parts(query, context, mode, conversation_history).text
+    
+    def _build_prompt_parts(self, query: str, context: str, mode: str, conversation_history: Optional[List[Dict[str, str]]] = None):
+        """Build LLM prompt as PromptParts: cacheable template prefix + per-request suffix"""
         # Map mode aliases
         mode_map = {
             'qa': 'qa',
@@ -351,13 +392,13 @@ ADDITIONAL CONTEXT FROM UPLOADED FILES:
         }
         
         template_mode = mode_map.get(mode.lower(), 'qa')
-        template = get_prompt_template(template_mode)
         
         # Format conversation history
         formatted_history = format_conversation_history(conversation_history) if conversation_history else ""
         
         # Fill in template
-        return template.format(
+        return build_prompt_parts(
+            template_mode,
             query=query,
             documents_with_metadata=context,
             conversation_history=formatted_history
@@ -447,7 +488,7 @@ ADDITIONAL CONTEXT FROM UPLOADED FILES:
         """Build citation list from results"""
         citations = []
         
-        for i, result in enumerate(results[:10], 1):
+        for i, result in enumerate(results[:MAX_CONTEXT_RESULTS], 1):
             metadata = result.get('metadata', {})
             vertical = result.get('vertical', 'unknown')
             
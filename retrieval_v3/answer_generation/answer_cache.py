@@ -0,0 +1,334 @@
+# Answer Cache - persisted final answers keyed by query, mode and evidence
+
+"""
+Answer Cache - Serve repeated questions without regenerating the answer
+
+Entries are keyed by:
+- the normalized query (case, spacing and trailing punctuation ignored)
+- the answer mode and any other answer-shaping parameters (conversation
+  history, uploaded context, validation on/off)
+- an evidence fingerprint: the ordered chunk IDs with a hash of each
+  chunk's content
+
+If retrieval returns different chunks, the same chunks in another order, or
+a chunk whose text changed (re-ingested, superseded, fresh internet page),
+the fingerprint changes, the lookup misses and the new answer replaces the
+stale one. Ingestion can also drop answers built on specific chunks with
+invalidate_chunks().
+
+Stored values are plain JSON dicts (formatted answer, citations, validation
+output). Like the internet cache, entries live in one SQLite file (WAL
+mode, one connection per thread), are bounded by entry count (least
+recently used evicted first) and survive restarts.
+"""
+
+import os
+import re
+import json
+import time
+import zlib
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Cache key form of a query: case, spacing and trailing punctuation ignored"""
+    query = re.sub(r'\s+', ' ', query.lower()).strip()
+    return query.strip(' ?.!')
+
+
+def _field(result: Any, *names: str) -> Any:
+    """Read a field from a result dict or a RetrievalResult-like object"""
+    for name in names:
+        value = result.get(name) if isinstance(result, dict) else getattr(result, name, None)
+        if value is not None:
+            return value
+    return None
+
+
+def evidence_signature(results: Iterable[Any]) -> List[Tuple[str, str]]:
+    """Ordered (chunk_id, content hash) pairs for the chunks an answer is built from"""
+    signature = []
+    for result in results:
+        content = _field(result, 'content', 'text') or ''
+        chunk_id = _field(result, 'chunk_id', 'doc_id') or ''
+        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+        signature.append((str(chunk_id), content_hash))
+    return signature
+
+
+def evidence_fingerprint(results: Iterable[Any]) -> str:
+    """Hash of the ordered chunk IDs and their content"""
+    signature = evidence_signature(results)
+    return hashlib.sha256(json.dumps(signature).encode('utf-8')).hexdigest()
+
+
+class AnswerCache:
+    """SQLite-backed TTL cache for generated answers"""
+
+    # Only refresh an entry's LRU timestamp if it is older than this (seconds)
+    TOUCH_INTERVAL = 60.0
+
+    # Run LRU eviction every N writes
+    EVICT_EVERY = 50
+
+    def __init__(
+        self,
+        db_path: str = "cache/answer_cache.db",
+        ttl_seconds: float = 86400,
+        max_entries: int = 5000,
+        compress_threshold: int = 2048
+    ):
+        """
+        Initialize cache
+
+        Args:
+            db_path: SQLite file
+            ttl_seconds: Answers expire after this (0 disables the cache)
+            max_entries: Answers kept
+            compress_threshold: Compress values larger than this many bytes
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.compress_threshold = compress_threshold
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'stale': 0, 'bypassed': 0, 'stores': 0}
+
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS answers (
+                key TEXT PRIMARY KEY,
+                question TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                query TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                compressed INTEGER NOT NULL DEFAULT 0,
+                data BLOB NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS answer_chunks (
+                key TEXT NOT NULL,
+                chunk_id TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_answers_question ON answers(question)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_answers_accessed ON answers(accessed)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_answer_chunks_chunk ON answer_chunks(chunk_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_answer_chunks_key ON answer_chunks(key)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _key(*parts: Any) -> str:
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def _encode(self, value: Any) -> tuple:
+        data = json.dumps(value, ensure_ascii=False, default=str).encode('utf-8')
+        if len(data) > self.compress_threshold:
+            return zlib.compress(data, 6), 1
+        return data, 0
+
+    @staticmethod
+    def _decode(data: bytes, compressed: int) -> Any:
+        if compressed:
+            data = zlib.decompress(data)
+        return json.loads(data.decode('utf-8'))
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _after_write(self):
+        with self._lock:
+            self._writes += 1
+            if self._writes % self.EVICT_EVERY:
+                return
+        self.evict()
+
+    def _keys(self, query: str, mode: str, results: List[Any], params: Dict) -> Tuple[str, str, str, str]:
+        """(question key, entry key, normalized query, fingerprint)"""
+        normalized = normalize_query(query)
+        fingerprint = evidence_fingerprint(results)
+        question = self._key(normalized, mode, params)
+        return question, self._key(question, fingerprint), normalized, fingerprint
+
+    def get(self, query: str, mode: str, results: List[Any], **params) -> Optional[Dict[str, Any]]:
+        """
+        Cached answer for a query over exactly these results, or None
+
+        Args:
+            query: User query (normalized for the key)
+            mode: Answer mode
+            results: Ranked retrieval results the answer would be built from
+                (dicts or RetrievalResult objects with chunk_id and content)
+            **params: Other parameters that change the answer
+        """
+        if not self.ttl_seconds:
+            return None
+        start = time.time()
+        question, key, _, _ = self._keys(query, mode, results, params)
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT created, accessed, compressed, data FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+            now = time.time()
+            if row is None or now - row[0] > self.ttl_seconds:
+                # An answer for the same question over other evidence means a chunk changed
+                if row is None and conn.execute(
+                    "SELECT 1 FROM answers WHERE question = ? LIMIT 1", (question,)
+                ).fetchone():
+                    self._count('stale')
+                self._count('misses')
+                return None
+            if now - row[1] > self.TOUCH_INTERVAL:
+                conn.execute("UPDATE answers SET accessed = ? WHERE key = ?", (now, key))
+                conn.commit()
+            value = self._decode(row[3], row[2])
+            self._count('hits')
+            logger.info(f"⚡ Answer cache hit ({mode}, {now - row[0]:.0f}s old, {(time.time() - start) * 1000:.1f}ms)")
+            return value
+        except Exception as e:
+            logger.warning(f"Answer cache read failed: {e}")
+            return None
+
+    def set(self, query: str, mode: str, results: List[Any], value: Dict[str, Any], **params):
+        """
+        Store the answer for a query over these results
+
+        Replaces any answer to the same question built on other evidence.
+        """
+        if not self.ttl_seconds:
+            return
+        question, key, normalized, fingerprint = self._keys(query, mode, results, params)
+        chunk_ids = {chunk_id for chunk_id, _ in evidence_signature(results) if chunk_id}
+        try:
+            data, compressed = self._encode(value)
+            now = time.time()
+            conn = self._conn()
+            stale = [row[0] for row in conn.execute(
+                "SELECT key FROM answers WHERE question = ? AND key != ?", (question, key)
+            )]
+            self._delete(conn, stale + [key])
+            conn.execute(
+                "INSERT INTO answers (key, question, mode, query, fingerprint, created, accessed, compressed, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, question, mode, normalized, fingerprint, now, now, compressed, data)
+            )
+            conn.executemany(
+                "INSERT INTO answer_chunks (key, chunk_id) VALUES (?, ?)",
+                [(key, chunk_id) for chunk_id in chunk_ids]
+            )
+            conn.commit()
+            self._count('stores')
+            self._after_write()
+        except Exception as e:
+            logger.warning(f"Answer cache write failed: {e}")
+
+    def record_bypass(self):
+        """Count a request that skipped the cache (e.g. an evaluation run)"""
+        self._count('bypassed')
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, keys: List[str]):
+        if not keys:
+            return
+        conn.executemany("DELETE FROM answers WHERE key = ?", [(k,) for k in keys])
+        conn.executemany("DELETE FROM answer_chunks WHERE key = ?", [(k,) for k in keys])
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def invalidate_chunks(self, chunk_ids: Iterable[str]) -> int:
+        """Drop every answer built on any of these chunks; returns the number dropped"""
+        chunk_ids = [str(c) for c in chunk_ids]
+        if not chunk_ids:
+            return 0
+        try:
+            conn = self._conn()
+            keys = set()
+            for chunk_id in chunk_ids:
+                keys.update(row[0] for row in conn.execute(
+                    "SELECT key FROM answer_chunks WHERE chunk_id = ?", (chunk_id,)
+                ))
+            self._delete(conn, list(keys))
+            conn.commit()
+            if keys:
+                logger.info(f"Answer cache: dropped {len(keys)} answers built on {len(chunk_ids)} changed chunks")
+            return len(keys)
+        except Exception as e:
+            logger.warning(f"Answer cache invalidation failed: {e}")
+            return 0
+
+    def evict(self):
+        """Drop expired answers and least recently used entries beyond the bound"""
+        try:
+            conn = self._conn()
+            conn.execute("DELETE FROM answers WHERE created < ?", (time.time() - self.ttl_seconds,))
+            conn.execute(
+                "DELETE FROM answers WHERE key IN ("
+                "SELECT key FROM answers ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            conn.execute("DELETE FROM answer_chunks WHERE key NOT IN (SELECT key FROM answers)")
+            conn.commit()
+        except Exception as e:
+            logger.warning(f"Answer cache eviction failed: {e}")
+
+    def clear(self):
+        """Remove all entries"""
+        conn = self._conn()
+        conn.execute("DELETE FROM answers")
+        conn.execute("DELETE FROM answer_chunks")
+        conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, hit rate and entry count"""
+        conn = self._conn()
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['entries'] = conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        return stats
+
+
+# Global cache instance
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    """Get the shared answer cache (configured from environment)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AnswerCache(
+                db_path=os.getenv("ANSWER_CACHE_PATH", "cache/answer_cache.db"),
+                ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "86400")),
+                max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "5000")),
+            )
+    return _cache
@@ -0,0 +1,227 @@
+# Context Packer - token-budgeted context for answer prompts
+
+"""
+Context Packer - Fit retrieved chunks into a per-mode token budget
+
+Instead of concatenating a fixed top-N, the packer:
+1. Drops duplicate / heavily overlapping chunks (same text, or same doc
+   with mostly the same word sequences); the higher-ranked copy is kept
+2. Trims long chunks to the sentences that share the most terms with the
+   query (kept in their original order)
+3. Fills the mode's token budget greedily by score per token, always
+   starting with the top-ranked chunk so the best evidence is never cut
+
+Packed chunks keep their original rank as doc_index, so [Doc N] in the
+prompt still matches citation N. Token counts are local estimates
+(~4 characters per token), good enough for budgeting and benchmarking.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+
+# Context token budget per answer mode (documents only, excluding the template)
+MODE_TOKEN_BUDGETS = {
+    'qa': 6000,
+    'deep_think': 12000,
+    'policy_brief': 10000,
+    'policy_draft': 16000,
+    'brainstorm': 8000,
+}
+
+# Longest a single chunk may be before it is trimmed to its relevant sentences
+MODE_CHUNK_TOKENS = {
+    'qa': 600,
+    'deep_think': 1200,
+    'policy_brief': 1000,
+    'policy_draft': 1500,
+    'brainstorm': 800,
+}
+
+# Per-document header (doc label, metadata line, separators)
+DOC_OVERHEAD_TOKENS = 40
+
+# Chunks of the same doc sharing this share of word 5-grams are duplicates
+OVERLAP_THRESHOLD = 0.6
+SHINGLE_SIZE = 5
+
+STOPWORDS = {
+    'the', 'and', 'for', 'are', 'was', 'were', 'with', 'that', 'this', 'from',
+    'what', 'which', 'who', 'whom', 'how', 'why', 'when', 'where', 'does', 'did',
+    'has', 'have', 'had', 'can', 'could', 'should', 'would', 'will', 'shall',
+    'about', 'into', 'any', 'all', 'its', 'their', 'there', 'these', 'those',
+    'under', 'per', 'not', 'but', 'you', 'your', 'our', 'tell', 'give', 'list',
+    'explain', 'describe', 'latest', 'current', 'details',
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count (~4 characters per token)"""
+    if not text:
+        return 0
+    return (len(text) + 3) // 4
+
+
+def _terms(text: str) -> Set[str]:
+    return {
+        word for word in re.findall(r'[a-z0-9]+', text.lower())
+        if (len(word) > 2 or word.isdigit()) and word not in STOPWORDS
+    }
+
+
+def _shingles(text: str) -> Set[tuple]:
+    words = re.findall(r'\w+', text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _split_sentences(text: str) -> List[str]:
+    sentences = re.split(r'(?<=[.!?;])\s+|\n+', text)
+    return [s.strip() for s in sentences if s.strip()]
+
+
+@dataclass
+class PackedContext:
+    """Chunks selected for the prompt, with packing stats"""
+    results: List[Dict] = field(default_factory=list)   # copies, content possibly trimmed
+    indices: List[int] = field(default_factory=list)    # original 1-based rank per result
+    stats: Dict = field(default_factory=dict)
+
+
+class ContextPacker:
+    """Pack retrieval results into a token budget"""
+
+    def __init__(
+        self,
+        budgets: Optional[Dict[str, int]] = None,
+        chunk_tokens: Optional[Dict[str, int]] = None
+    ):
+        """
+        Initialize packer
+
+        Args:
+            budgets: Context token budget per mode (default MODE_TOKEN_BUDGETS)
+            chunk_tokens: Max tokens per chunk per mode (default MODE_CHUNK_TOKENS)
+        """
+        self.budgets = {**MODE_TOKEN_BUDGETS, **(budgets or {})}
+        self.chunk_tokens = {**MODE_CHUNK_TOKENS, **(chunk_tokens or {})}
+
+    def budget_for(self, mode: str) -> int:
+        return self.budgets.get(mode, self.budgets['qa'])
+
+    def pack(self, query: str, results: List[Dict], mode: str = "qa") -> PackedContext:
+        """
+        Select and trim results for the prompt
+
+        Args:
+            query: User query (for sentence relevance)
+            results: Ranked retrieval results (dicts with content, score, doc_id)
+            mode: Answer mode (selects the budget)
+
+        Returns:
+            PackedContext in original rank order
+        """
+        budget = self.budget_for(mode)
+        max_chunk = self.chunk_tokens.get(mode, self.chunk_tokens['qa'])
+        query_terms = _terms(query)
+
+        stats = {
+            'budget_tokens': budget,
+            'candidates': len(results),
+            'candidate_tokens': sum(estimate_tokens(r.get('content', '')) for r in results),
+            'duplicates_dropped': 0,
+            'chunks_trimmed': 0,
+            'packed_docs': 0,
+            'packed_tokens': 0,
+        }
+
+        # 1. Dedupe (keep the higher-ranked copy)
+        kept = []  # (rank, result, shingles)
+        seen_texts = set()
+        for rank, result in enumerate(results, 1):
+            content = result.get('content', '') or ''
+            text_key = re.sub(r'\s+', ' ', content.lower()).strip()
+            if not text_key:
+                continue
+            if text_key in seen_texts:
+                stats['duplicates_dropped'] += 1
+                continue
+            shingles = _shingles(content)
+            doc_id = result.get('doc_id')
+            if doc_id and any(
+                other.get('doc_id') == doc_id and self._overlaps(shingles, other_shingles)
+                for _, other, other_shingles in kept
+            ):
+                stats['duplicates_dropped'] += 1
+                continue
+            seen_texts.add(text_key)
+            kept.append((rank, result, shingles))
+
+        # 2. Trim long chunks to their most relevant sentences
+        candidates = []  # (rank, result, content, tokens)
+        for rank, result, _ in kept:
+            content = result.get('content', '') or ''
+            if estimate_tokens(content) > max_chunk:
+                content = self._trim(content, query_terms, max_chunk)
+                stats['chunks_trimmed'] += 1
+            candidates.append((rank, result, content, estimate_tokens(content) + DOC_OVERHEAD_TOKENS))
+
+        # 3. Greedy fill by score per token; the top-ranked chunk always goes first
+        selected = []
+        used = 0
+        if candidates:
+            first, rest = candidates[0], candidates[1:]
+            rest.sort(key=lambda c: (self._value(c[1]) / c[3], -c[0]), reverse=True)
+            for candidate in [first] + rest:
+                if used + candidate[3] <= budget:
+                    selected.append(candidate)
+                    used += candidate[3]
+
+        selected.sort(key=lambda c: c[0])
+        packed = PackedContext(stats=stats)
+        for rank, result, content, tokens in selected:
+            packed.results.append({**result, 'content': content})
+            packed.indices.append(rank)
+
+        stats['packed_docs'] = len(selected)
+        stats['packed_tokens'] = used
+        return packed
+
+    @staticmethod
+    def _value(result: Dict) -> float:
+        score = result.get('score')
+        # Small floor so unscored chunks are still packed, shortest first
+        return (score if isinstance(score, (int, float)) and score > 0 else 0.0) + 1e-6
+
+    @staticmethod
+    def _overlaps(a: Set[tuple], b: Set[tuple]) -> bool:
+        if not a or not b:
+            return False
+        return len(a & b) / min(len(a), len(b)) >= OVERLAP_THRESHOLD
+
+    @staticmethod
+    def _trim(content: str, query_terms: Set[str], max_tokens: int) -> str:
+        """Keep the sentences sharing the most query terms, in original order"""
+        sentences = _split_sentences(content)
+        ranked = sorted(
+            range(len(sentences)),
+            key=lambda i: (len(query_terms & _terms(sentences[i])), -i),
+            reverse=True
+        )
+
+        keep = []
+        used = 0
+        for i in ranked:
+            tokens = estimate_tokens(sentences[i]) + 1
+            if used + tokens > max_tokens:
+                continue
+            keep.append(i)
+            used += tokens
+
+        if not keep:
+            # One huge sentence: hard cut
+            return content[:max_tokens * 4]
+
+        return ' '.join(sentences[i] for i in sorted(keep))
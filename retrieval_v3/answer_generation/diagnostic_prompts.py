@@ -4,6 +4,11 @@ Diagnostic Mode for AP Policy Assistant
 Exposes retrieval quality, reasoning gaps, and answer weaknesses.
 """
 
+try:
+    from .prompt_cache import split_prompt
+except ImportError:
+    from prompt_cache import split_prompt
+
 # 4-Layer Diagnostic Prompts
 
 DIAGNOSTIC_PROMPT = """
@@ -177,13 +182,8 @@ Answer: {answer}
 COMPREHENSIVE_DIAGNOSTIC = """
 You are diagnosing the quality of a policy answer.
 
-**Query**: {query}
-
-**Retrieved Documents**: 
-{documents}
-
-**Current Answer**: 
-{answer}
+The query, retrieved documents and current answer are given at the end.
+Write the report below.
 
 ---
 
@@ -217,6 +217,16 @@ You are diagnosing the quality of a policy answer.
 
 ### Corrected Answer
 Provide the best possible answer given the retrieved documents.
+
+---
+
+**Query**: {query}
+
+**Retrieved Documents**: 
+{documents}
+
+**Current Answer**: 
+{answer}
 """
 
 
@@ -233,6 +243,15 @@ def get_diagnostic_prompt(query: str, documents: str, answer: str = None, mode:
     Returns:
         Formatted diagnostic prompt
     """
+    return get_diagnostic_prompt_parts(query, documents, answer, mode).text
+
+
+def get_diagnostic_prompt_parts(query: str, documents: str, answer: str = None, mode: str = "comprehensive"):
+    """
+    Diagnostic prompt as PromptParts: static instructions + per-request inputs
+    
+    Same arguments as get_diagnostic_prompt.
+    """
     prompts = {
         'comprehensive': COMPREHENSIVE_DIAGNOSTIC,
         'retrieval': RETRIEVAL_SANITY_TEST,
@@ -244,4 +263,4 @@ def get_diagnostic_prompt(query: str, documents: str, answer: str = None, mode:
     }
     
     template = prompts.get(mode, COMPREHENSIVE_DIAGNOSTIC)
-    return template.format(query=query, documents=documents, answer=answer or "")
+    return split_prompt(template, query=query, documents=documents, answer=answer or "")
@@ -14,11 +14,11 @@ from typing import Callable, Dict, Any, Tuple
 
 # Handle both relative and absolute imports for diagnostic_prompts
 try:
-    from .diagnostic_prompts import get_diagnostic_prompt
+    from .diagnostic_prompts import get_diagnostic_prompt_parts
 except ImportError:
     # Fallback for when run as script directly
     try:
-        from retrieval_v3.answer_generation.diagnostic_prompts import get_diagnostic_prompt
+        from retrieval_v3.answer_generation.diagnostic_prompts import get_diagnostic_prompt_parts
     except ImportError:
         # Last resort: add current directory to path
         import sys
@@ -26,7 +26,7 @@ except ImportError:
         current_dir = Path(__file__).parent
         if str(current_dir) not in sys.path:
             sys.path.insert(0, str(current_dir))
-        from diagnostic_prompts import get_diagnostic_prompt
+        from diagnostic_prompts import get_diagnostic_prompt_parts
 
 try:
     # Local import to avoid circulars at import time
@@ -80,6 +80,19 @@ def _format_docs_for_diagnostic(
     return "\n".join(lines)
 
 
+def _run_diagnostic_llm(diagnostic_llm: Callable[[str], str], parts) -> str:
+    """
+    Call the diagnostic LLM with a PromptParts prompt.
+
+    LLMs that can cache prompt prefixes (e.g. prompt_cache.PrefixCachedLLM)
+    get the static instructions and the per-query part separately; plain
+    callables get the full prompt text.
+    """
+    if hasattr(diagnostic_llm, "generate_parts"):
+        return diagnostic_llm.generate_parts(parts, label="diagnostic")
+    return diagnostic_llm(parts.text)
+
+
 def _answer_to_text(answer: "Answer") -> str:
     """
     Flatten `Answer` into a single text blob for diagnostics.
@@ -113,7 +126,8 @@ def diagnose_and_improve(
         query:    User query text
         diagnostic_llm:
             Callable that takes a prompt string and returns the
-            LLM's text output (e.g. `lambda p: llm.generate(p)`).
+            LLM's text output (e.g. `lambda p: llm.generate(p)`), or a
+            prompt_cache.PrefixCachedLLM to cache the static instructions.
         initial_mode:
             Mode used for the first answer (e.g. "qa").
         improved_mode:
@@ -146,13 +160,13 @@ def diagnose_and_improve(
     answer_text = _answer_to_text(initial_answer)
 
     # STEP 2: Diagnostic on baseline answer
-    diagnostic_prompt = get_diagnostic_prompt(
+    diagnostic_prompt = get_diagnostic_prompt_parts(
         query=query,
         documents=docs_str,
         answer=answer_text,
         mode=diagnostic_mode,
     )
-    initial_diagnostic = diagnostic_llm(diagnostic_prompt)
+    initial_diagnostic = _run_diagnostic_llm(diagnostic_llm, diagnostic_prompt)
 
     # STEP 3: Improved run – keep retrieval, but force a stronger answer structure
     # Reuse the same retrieval output to avoid extra Qdrant calls.
@@ -216,13 +230,13 @@ def diagnose_and_improve(
     improved_docs_str = _format_docs_for_diagnostic(improved_retrieval)
     improved_answer_text = _answer_to_text(improved_answer)
 
-    improved_diag_prompt = get_diagnostic_prompt(
+    improved_diag_prompt = get_diagnostic_prompt_parts(
         query=query,
         documents=improved_docs_str,
         answer=improved_answer_text,
         mode=diagnostic_mode,
     )
-    improved_diagnostic = diagnostic_llm(improved_diag_prompt)
+    improved_diagnostic = _run_diagnostic_llm(diagnostic_llm, improved_diag_prompt)
 
     return {
         "initial_retrieval": initial_retrieval,
@@ -261,13 +275,13 @@ def quick_diagnose(
     docs_str = _format_docs_for_diagnostic(retrieval_output)
     answer_text = _answer_to_text(answer)
 
-    diagnostic_prompt = get_diagnostic_prompt(
+    diagnostic_prompt = get_diagnostic_prompt_parts(
         query=query,
         documents=docs_str,
         answer=answer_text,
         mode=diagnostic_mode,
     )
-    diagnostic_text = diagnostic_llm(diagnostic_prompt)
+    diagnostic_text = _run_diagnostic_llm(diagnostic_llm, diagnostic_prompt)
 
     return retrieval_output, answer, diagnostic_text
 
@@ -0,0 +1,265 @@
+# Prompt Cache - reusable static prompt prefixes for Gemini
+
+"""
+Prompt Cache - Pay for long static instructions once per TTL
+
+Answer and diagnostic prompts are a long static part (role, rules, output
+structure) followed by the per-request part (history, documents, query).
+Prompts are assembled as PromptParts(prefix, suffix) so the static prefix
+is byte-identical across requests.
+
+PromptPrefixCache sends them to Gemini:
+- Provider cache: the prefix is stored once per TTL with
+  client.caches.create() and later requests send only the suffix with
+  cached_content=<name>
+- Local fallback (prefix below the provider minimum, caching unsupported or
+  failing): the full prompt is sent as before, prefix first, so Gemini's
+  implicit prefix caching can still apply
+
+Either way, prefix hashes and reuse rates are recorded for get_stats().
+"""
+
+import hashlib
+import logging
+import string
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+try:
+    from .context_packer import estimate_tokens
+except ImportError:
+    from context_packer import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PromptParts:
+    """A prompt split into its static prefix and per-request suffix"""
+    prefix: str
+    suffix: str
+
+    @property
+    def text(self) -> str:
+        return self.prefix + self.suffix
+
+    @property
+    def prefix_hash(self) -> str:
+        return hashlib.sha256(self.prefix.encode('utf-8')).hexdigest()
+
+
+def split_prompt(template: str, **values) -> PromptParts:
+    """
+    Fill a str.format template, splitting at its first placeholder
+
+    Everything before the first {field} is the static prefix; the rest,
+    with values filled in, is the suffix. prefix + suffix equals
+    template.format(**values).
+    """
+    prefix = []
+    for literal, field_name, _, _ in string.Formatter().parse(template):
+        prefix.append(literal)
+        if field_name is not None:
+            break
+    prefix_text = ''.join(prefix)
+    # Re-escape braces to find where the literal prefix ends in the template
+    raw_prefix_len = len(prefix_text.replace('{', '{{').replace('}', '}}'))
+    return PromptParts(prefix=prefix_text, suffix=template[raw_prefix_len:].format(**values))
+
+
+class PromptPrefixCache:
+    """Provider-side context caching for prompt prefixes, with local fallback"""
+
+    # After a failed cache creation, use full prompts for this long before retrying
+    RETRY_SECONDS = 300
+
+    def __init__(
+        self,
+        ttl_seconds: int = 3600,
+        min_provider_tokens: int = 1024,
+        use_provider: bool = True
+    ):
+        """
+        Initialize cache
+
+        Args:
+            ttl_seconds: Lifetime of a provider cache entry
+            min_provider_tokens: Smallest prefix worth a provider cache
+                (Gemini rejects smaller cached contents)
+            use_provider: Set False to only record prefix statistics
+        """
+        self.ttl_seconds = ttl_seconds
+        self.min_provider_tokens = min_provider_tokens
+        self.use_provider = use_provider
+
+        self._lock = threading.Lock()
+        self._create_lock = threading.Lock()
+        self._provider: Dict[str, Dict[str, Any]] = {}   # (model:hash) -> {name, expires_at}
+        self._seen: Dict[str, Dict[str, Any]] = {}       # hash -> {label, tokens, uses, last_used}
+        self.stats = {
+            'requests': 0,
+            'prefix_reuses': 0,
+            'provider_hits': 0,
+            'provider_creates': 0,
+            'provider_errors': 0,
+            'local_fallbacks': 0,
+            'cached_tokens': 0,
+        }
+
+    def _count(self, stat: str, amount: int = 1):
+        with self._lock:
+            self.stats[stat] += amount
+
+    def _record(self, parts: PromptParts, label: str) -> bool:
+        """Track the prefix hash; True if it was used within the TTL before"""
+        prefix_hash = parts.prefix_hash
+        now = time.time()
+        with self._lock:
+            self.stats['requests'] += 1
+            entry = self._seen.get(prefix_hash)
+            reused = entry is not None and now - entry['last_used'] < self.ttl_seconds
+            if entry is None:
+                entry = self._seen[prefix_hash] = {
+                    'label': label,
+                    'tokens': estimate_tokens(parts.prefix),
+                    'uses': 0,
+                }
+            entry['uses'] += 1
+            entry['last_used'] = now
+            if reused:
+                self.stats['prefix_reuses'] += 1
+        return reused
+
+    def _provider_cache_name(self, client, model: str, parts: PromptParts) -> Optional[str]:
+        """Name of a live provider cache for this prefix, creating one if needed (None if unavailable)"""
+        key = f"{model}:{parts.prefix_hash}"
+        with self._create_lock:
+            with self._lock:
+                entry = self._provider.get(key)
+                if entry and entry['expires_at'] > time.time():
+                    if entry['name']:
+                        self.stats['provider_hits'] += 1
+                    return entry['name']
+
+            try:
+                cache = client.caches.create(
+                    model=model,
+                    config={
+                        'contents': [{'role': 'user', 'parts': [{'text': parts.prefix}]}],
+                        'ttl': f"{self.ttl_seconds}s",
+                        'display_name': f"prompt-prefix-{parts.prefix_hash[:16]}",
+                    },
+                )
+            except Exception as e:
+                # Don't retry on every request (unsupported model, quota, permissions)
+                logger.warning(f"Could not create prompt prefix cache, using full prompts for now: {e}")
+                with self._lock:
+                    self._provider[key] = {'name': None, 'expires_at': time.time() + self.RETRY_SECONDS}
+                    self.stats['provider_errors'] += 1
+                return None
+            # Treat it as expired a little early so we never send a dead name
+            with self._lock:
+                self._provider[key] = {
+                    'name': cache.name,
+                    'expires_at': time.time() + self.ttl_seconds * 0.95,
+                }
+                self.stats['provider_creates'] += 1
+            logger.info(f"Created prompt prefix cache {cache.name} ({estimate_tokens(parts.prefix)} tokens)")
+            return cache.name
+
+    def _forget(self, model: str, parts: PromptParts):
+        with self._lock:
+            self._provider.pop(f"{model}:{parts.prefix_hash}", None)
+
+    def generate(
+        self,
+        client,
+        model: str,
+        parts: PromptParts,
+        config: Optional[Dict[str, Any]] = None,
+        label: str = ""
+    ):
+        """
+        generate_content with the prefix served from cache where possible
+
+        Args:
+            client: google.genai Client (or anything with the same
+                models.generate_content / caches.create interface)
+            model: Model name
+            parts: Prompt prefix and suffix
+            config: Generation config dict
+            label: Name for the prefix in stats (e.g. the answer mode)
+
+        Returns:
+            The generate_content response
+        """
+        config = dict(config or {})
+        self._record(parts, label)
+
+        if self.use_provider and estimate_tokens(parts.prefix) >= self.min_provider_tokens:
+            name = self._provider_cache_name(client, model, parts)
+            if name:
+                try:
+                    response = client.models.generate_content(
+                        model=model,
+                        contents=[{'role': 'user', 'parts': [{'text': parts.suffix}]}],
+                        config={**config, 'cached_content': name},
+                    )
+                    self._count_cached_tokens(response)
+                    return response
+                except Exception as e:
+                    # e.g. the cache expired or was deleted server-side; recreate next time
+                    logger.warning(f"Prompt prefix cache {name} failed, sending full prompt: {e}")
+                    self._count('provider_errors')
+                    self._forget(model, parts)
+
+        self._count('local_fallbacks')
+        response = client.models.generate_content(
+            model=model,
+            contents=[{'role': 'user', 'parts': [{'text': parts.text}]}],
+            config=config,
+        )
+        self._count_cached_tokens(response)
+        return response
+
+    def _count_cached_tokens(self, response):
+        usage = getattr(response, 'usage_metadata', None)
+        cached = getattr(usage, 'cached_content_token_count', None) if usage else None
+        if cached:
+            self._count('cached_tokens', cached)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters, reuse rate and per-prefix usage"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['reuse_rate'] = (
+                round(stats['prefix_reuses'] / stats['requests'], 3) if stats['requests'] else 0.0
+            )
+            stats['prefixes'] = {
+                prefix_hash[:12]: {'label': e['label'], 'tokens': e['tokens'], 'uses': e['uses']}
+                for prefix_hash, e in self._seen.items()
+            }
+        return stats
+
+
+class PrefixCachedLLM:
+    """
+    Text-in/text-out LLM callable that serves prompt prefixes from cache
+
+    Works wherever a Callable[[str], str] is expected; callers that have
+    PromptParts can use generate_parts() to benefit from the cache.
+    """
+
+    def __init__(self, client, model: str, cache: Optional[PromptPrefixCache] = None, config: Optional[Dict] = None):
+        self.client = client
+        self.model = model
+        self.cache = cache or PromptPrefixCache()
+        self.config = config or {}
+
+    def generate_parts(self, parts: PromptParts, label: str = "") -> str:
+        return self.cache.generate(self.client, self.model, parts, self.config, label=label).text
+
+    def __call__(self, prompt: str) -> str:
+        return self.generate_parts(PromptParts(prefix="", suffix=prompt))
@@ -4,6 +4,11 @@ Prompt Templates for Answer Generation
 Mode-specific templates with structured formatting instructions.
 """
 
+try:
+    from .prompt_cache import split_prompt
+except ImportError:
+    from prompt_cache import split_prompt
+
 def format_conversation_history(conversation_history):
     """Format conversation history for inclusion in prompts"""
     if not conversation_history or len(conversation_history) == 0:
@@ -575,8 +580,7 @@ Your task is to interpret the user's request and return a structured JSON respon
 You are not just a chatbot; you are an intelligent editor. You must interpret the user's intent to add, verify, or refine policy content.
 
 **Input Context:**
-- **User Query:** {query}
-- **Retrieved Documents:** {documents_with_metadata}
+The user query and retrieved documents are given at the end, under "Input".
 
 **Task:**
 1. Analyze the retrieved documents to extract relevant policy details (GO numbers, rules, schemes).
@@ -628,6 +632,10 @@ Structure:
 - Escape all double quotes in content string.
 - No trailing commas.
 - Ensure the JSON is parseable by `JSON.parse()`.
+
+**Input:**
+- **User Query:** {query}
+- **Retrieved Documents:** {documents_with_metadata}
 """
 
 
@@ -643,11 +651,33 @@ def get_prompt_template(mode: str) -> str:
     return templates.get(mode.lower(), QA_MODE_PROMPT)
 
 
+def build_prompt_parts(mode: str, query: str, documents_with_metadata: str, conversation_history: str = ""):
+    """
+    Fill the mode's template as a static prefix plus per-request suffix
+    
+    Every template keeps its per-request fields at the end, so the prefix
+    (role, rules, output structure) is identical for every query in a mode
+    and can be cached by the provider.
+    
+    Returns:
+        PromptParts(prefix, suffix)
+    """
+    return split_prompt(
+        get_prompt_template(mode),
+        query=query,
+        documents_with_metadata=documents_with_metadata,
+        conversation_history=conversation_history
+    )
+
+
 def format_documents_with_metadata(results: list) -> str:
     """Format results with rich metadata for prompt"""
     formatted_docs = []
     
-    for i, result in enumerate(results, 1):
+    for position, result in enumerate(results, 1):
+        # Keep the caller's numbering (matches citation ids) when given
+        i = result.get('doc_index', position)
+        
         # Check if it's a web result
         is_web = result.get('is_web') or result.get('metadata', {}).get('is_web')
         
@@ -0,0 +1,211 @@
+"""
+Admission control for the V3 query endpoints.
+
+Requests are sorted into lanes by mode (QA lookups never wait behind
+deep-think/brainstorm jobs). Each lane has its own concurrency limit and a
+bounded priority queue. When a lane is saturated the controller:
+
+- downgrades admitted requests to a cheaper plan once the queue gets deep
+  (no LLM rewrites, no relation-entity reranking),
+- rejects with 429 when the queue is full,
+- rejects with 503 when a request waits longer than the lane's queue budget.
+
+All state lives on the event loop thread, so no locks are needed.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Request shed by admission control (maps to an HTTP 429/503)."""
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+@dataclass
+class LaneConfig:
+    """Limits for one admission lane."""
+
+    max_concurrency: int      # Requests running at once
+    max_queue: int            # Requests waiting before 429
+    queue_timeout: float      # Max seconds waiting before 503
+    downgrade_depth: int      # Queue depth at which admitted requests are downgraded
+
+
+@dataclass
+class AdmissionTicket:
+    """Handle for an admitted request."""
+
+    lane: str
+    mode: str
+    priority: int
+    queue_time: float = 0.0
+    downgraded: bool = False
+
+    def apply_downgrade(self, custom_plan: Dict) -> Dict:
+        """Switch a custom plan to the cheap variant when the lane is congested."""
+        if self.downgraded:
+            custom_plan['llm_rewrites'] = False
+            custom_plan['use_relation_entity'] = False
+        return custom_plan
+
+
+@dataclass
+class _Lane:
+    config: LaneConfig
+    active: int = 0
+    waiters: List = field(default_factory=list)  # heap of (priority, seq, future)
+    admitted: int = 0
+    downgraded: int = 0
+    rejected_full: int = 0
+    rejected_timeout: int = 0
+    total_queue_time: float = 0.0
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, fut in self.waiters if not fut.done())
+
+
+class AdmissionController:
+    """Per-mode lanes with concurrency limits, priority queues and load shedding."""
+
+    # Request mode -> lane
+    MODE_LANES = {
+        'qa': 'interactive',
+        'policy_brief': 'standard',
+        'policy_draft': 'heavy',
+        'deep_think': 'heavy',
+        'brainstorm': 'heavy',
+    }
+
+    DEFAULT_LANES = {
+        'interactive': LaneConfig(max_concurrency=4, max_queue=32, queue_timeout=5.0, downgrade_depth=8),
+        'standard': LaneConfig(max_concurrency=2, max_queue=16, queue_timeout=15.0, downgrade_depth=4),
+        'heavy': LaneConfig(max_concurrency=2, max_queue=6, queue_timeout=30.0, downgrade_depth=2),
+    }
+
+    PRIORITIES = {'high': 0, 'normal': 1, 'low': 2}
+
+    def __init__(self, lanes: Optional[Dict[str, LaneConfig]] = None):
+        self._lanes = {
+            name: _Lane(config)
+            for name, config in (lanes or self.DEFAULT_LANES).items()
+        }
+        self._seq = itertools.count()
+
+    def lane_for(self, mode: str) -> str:
+        lane = self.MODE_LANES.get(mode, 'standard')
+        return lane if lane in self._lanes else next(iter(self._lanes))
+
+    async def acquire(self, mode: str, priority: str = 'normal') -> AdmissionTicket:
+        """
+        Wait for a slot in the request's lane.
+
+        Raises:
+            AdmissionRejected: 429 when the lane queue is full, 503 when the
+                queue-time budget runs out
+        """
+        lane_name = self.lane_for(mode)
+        lane = self._lanes[lane_name]
+        config = lane.config
+        ticket = AdmissionTicket(
+            lane=lane_name,
+            mode=mode,
+            priority=self.PRIORITIES.get(priority, self.PRIORITIES['normal'])
+        )
+
+        depth = lane.queued
+        if lane.active < config.max_concurrency and depth == 0:
+            lane.active += 1
+            return self._admit(lane, ticket)
+
+        if depth >= config.max_queue:
+            lane.rejected_full += 1
+            logger.warning(f"🚦 Lane '{lane_name}' full ({depth} queued), rejecting {mode} request")
+            raise AdmissionRejected(
+                429,
+                f"Too many {mode} requests in progress. Please retry shortly.",
+                retry_after=self._retry_after(lane)
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(lane.waiters, (ticket.priority, next(self._seq), future))
+        ticket.downgraded = depth + 1 >= config.downgrade_depth
+
+        start = time.time()
+        try:
+            await asyncio.wait_for(future, timeout=config.queue_timeout)
+        except asyncio.TimeoutError:
+            if not (future.done() and not future.cancelled()):
+                lane.rejected_timeout += 1
+                logger.warning(
+                    f"🚦 {mode} request waited {config.queue_timeout:.1f}s in lane '{lane_name}', shedding"
+                )
+                raise AdmissionRejected(
+                    503,
+                    "Server is busy. Please retry shortly.",
+                    retry_after=self._retry_after(lane)
+                )
+            # Slot was handed over just as the timeout fired - keep it
+        except asyncio.CancelledError:
+            # Client went away; pass on a slot that was already handed to us
+            if future.done() and not future.cancelled():
+                self.release(ticket)
+            raise
+
+        ticket.queue_time = time.time() - start
+        # Long waits mean the lane is congested even if the queue is short
+        if ticket.queue_time > config.queue_timeout / 2:
+            ticket.downgraded = True
+        return self._admit(lane, ticket)
+
+    def release(self, ticket: AdmissionTicket):
+        """Free the ticket's slot, handing it to the best queued request."""
+        lane = self._lanes[ticket.lane]
+        while lane.waiters:
+            _, _, future = heapq.heappop(lane.waiters)
+            if not future.done():
+                future.set_result(None)  # Slot transfers; active count unchanged
+                return
+        lane.active = max(0, lane.active - 1)
+
+    def _admit(self, lane: _Lane, ticket: AdmissionTicket) -> AdmissionTicket:
+        lane.admitted += 1
+        lane.total_queue_time += ticket.queue_time
+        if ticket.downgraded:
+            lane.downgraded += 1
+            logger.info(f"🚦 Lane '{ticket.lane}' congested: downgrading {ticket.mode} request to a cheaper plan")
+        return ticket
+
+    def _retry_after(self, lane: _Lane) -> int:
+        """Rough seconds until a slot frees up."""
+        backlog = lane.queued / max(1, lane.config.max_concurrency)
+        return max(1, int(lane.config.queue_timeout * max(1.0, backlog) / 2))
+
+    def get_stats(self) -> Dict:
+        """Per-lane admission statistics."""
+        return {
+            name: {
+                'active': lane.active,
+                'queued': lane.queued,
+                'max_concurrency': lane.config.max_concurrency,
+                'admitted': lane.admitted,
+                'downgraded': lane.downgraded,
+                'rejected_full': lane.rejected_full,
+                'rejected_timeout': lane.rejected_timeout,
+                'avg_queue_time': round(lane.total_queue_time / lane.admitted, 3) if lane.admitted else 0.0,
+            }
+            for name, lane in self._lanes.items()
+        }
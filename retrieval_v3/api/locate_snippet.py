@@ -4,14 +4,15 @@ API endpoint for temporarily returning the raw PDF instead of locating a snippet
 POST /api/locate-snippet
 """
 
-import io
+import asyncio
 import logging
 import time
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from fastapi.responses import StreamingResponse
 from google.cloud.exceptions import NotFound
 
 from retrieval_v3.services.gcs_service import get_gcs_service
+from retrieval_v3.services.pdf_cache import parse_range
 from .requests import LocateSnippetRequest
 
 logger = logging.getLogger(__name__)
@@ -20,15 +21,18 @@ router = APIRouter()
 
 
 @router.post("/locate-snippet")
-async def locate_snippet(request: LocateSnippetRequest):
+async def locate_snippet(request: LocateSnippetRequest, http_request: Request):
     """
     Temporarily return the raw PDF instead of locating a snippet.
 
-    This flow only fetches the PDF from GCS and streams it back so we can
-    verify PDF delivery before enabling snippet search.
+    This flow only fetches the PDF and streams it back so we can verify PDF
+    delivery before enabling snippet search. The PDF is served from the local
+    PDF cache (downloaded from GCS only when missing or changed), in chunks,
+    honouring Range and If-None-Match headers.
 
     Raises:
         404: PDF not found in GCS
+        416: Requested range not satisfiable
         500: Configuration errors
     """
     start_time = time.time()
@@ -39,27 +43,65 @@ async def locate_snippet(request: LocateSnippetRequest):
             f"(snippet length: {len(request.snippet)} chars)"
         )
 
-        # Get GCS service and fetch PDF bytes
         gcs_service = get_gcs_service()
-        logger.info("📥 Fetching PDF from GCS...")
         fetch_start = time.time()
-        pdf_bytes = gcs_service.fetch_pdf_bytes(request.doc_id)
+
+        # Open the body before sending headers; if the PDF was evicted between
+        # lookup and open, look it up again (headers follow the entry we stream)
+        for attempt in range(2):
+            cached_pdf = await asyncio.to_thread(gcs_service.get_cached_pdf, request.doc_id)
+
+            headers = {
+                "Content-Disposition": f"inline; filename={request.doc_id}.pdf",
+                "Accept-Ranges": "bytes",
+                "ETag": cached_pdf.etag,
+            }
+
+            if http_request.headers.get("if-none-match") == cached_pdf.etag:
+                return Response(status_code=304, headers=headers)
+
+            try:
+                byte_range = parse_range(http_request.headers.get("range"), cached_pdf.size)
+            except ValueError:
+                raise HTTPException(
+                    status_code=416,
+                    detail="Requested range not satisfiable",
+                    headers={"Content-Range": f"bytes */{cached_pdf.size}"}
+                )
+
+            status_code = 200
+            start, end = 0, cached_pdf.size - 1
+            if byte_range is not None:
+                start, end = byte_range
+                status_code = 206
+                headers["Content-Range"] = f"bytes {start}-{end}/{cached_pdf.size}"
+            headers["Content-Length"] = str(end - start + 1)
+
+            try:
+                body = gcs_service.pdf_cache.iter_range(cached_pdf, start, end)
+                break
+            except FileNotFoundError:
+                if attempt:
+                    raise
+                logger.info(f"Cached PDF for '{request.doc_id}' evicted before streaming, fetching again")
         fetch_time = time.time() - fetch_start
 
         logger.info(
-            f"✅ Fetched PDF in {fetch_time:.2f}s ({len(pdf_bytes):,} bytes). "
-            f"Total time: {time.time() - start_time:.2f}s"
+            f"✅ PDF ready in {fetch_time:.2f}s ({cached_pdf.size:,} bytes, "
+            f"serving {start}-{end}). Total time: {time.time() - start_time:.2f}s"
         )
 
-        # Stream the PDF back to the client
+        # Stream the PDF back to the client from the cache
         return StreamingResponse(
-            io.BytesIO(pdf_bytes),
+            body,
+            status_code=status_code,
             media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"inline; filename={request.doc_id}.pdf",
-            },
+            headers=headers,
         )
 
+    except HTTPException:
+        raise
+
     except NotFound as e:
         logger.error(f"PDF not found: {e}")
         raise HTTPException(
@@ -4,6 +4,7 @@ API endpoint for generating signed PDF URLs.
 GET /api/pdf-url?doc_id=<doc_id>
 """
 
+import asyncio
 import logging
 from fastapi import APIRouter, HTTPException, Query
 from google.cloud.exceptions import NotFound
@@ -64,8 +65,10 @@ async def get_pdf_url(
         # Get GCS service
         gcs_service = get_gcs_service()
         
-        # Generate signed URL with source hint
-        signed_url, expiration = gcs_service.generate_signed_url(
+        # Generate signed URL with source hint (off the event loop; a cache
+        # miss may still relist the bucket)
+        signed_url, expiration = await asyncio.to_thread(
+            gcs_service.generate_signed_url,
             doc_id=doc_id,
             expiration_minutes=expiration_minutes,
             source_hint=source_hint
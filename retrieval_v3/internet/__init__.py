@@ -6,12 +6,17 @@ Internet Layer - Web search and content fetching
 Google PSE integration, crawling, merging
 """
 
+from .internet_cache import InternetCache, get_internet_cache
 from .google_pse_client import GooglePSEClient, WebResult, google_search
 from .internet_crawler import InternetCrawler, fetch_url
 from .page_cleaner import PageCleaner, clean_html
 from .internet_merger import InternetMerger, MergedResult, merge_results
 
 __all__ = [
+    # Cache
+    'InternetCache',
+    'get_internet_cache',
+    
     # Google PSE
     'GooglePSEClient',
     'WebResult',
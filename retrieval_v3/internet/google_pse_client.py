@@ -8,7 +8,9 @@ Searches the web for current information
 import os
 import requests
 from typing import List, Dict, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
+
+from .internet_cache import InternetCache, get_internet_cache
 
 
 @dataclass
@@ -27,7 +29,9 @@ class GooglePSEClient:
     def __init__(
         self,
         api_key: Optional[str] = None,
-        search_engine_id: Optional[str] = None
+        search_engine_id: Optional[str] = None,
+        cache: Optional[InternetCache] = None,
+        use_cache: bool = True
     ):
         """
         Initialize Google PSE client
@@ -35,7 +39,10 @@ class GooglePSEClient:
         Args:
             api_key: Google API key (or set GOOGLE_API_KEY env var)
             search_engine_id: Search engine ID (or set GOOGLE_SEARCH_ENGINE_ID)
+            cache: Search result cache (default: shared internet cache)
+            use_cache: Set False to always call the API
         """
+        self.cache = (cache or get_internet_cache()) if use_cache else None
         self.api_key = api_key or os.getenv('GOOGLE_API_KEY')
         self.search_engine_id = search_engine_id or os.getenv('GOOGLE_SEARCH_ENGINE_ID')
         self.base_url = "https://www.googleapis.com/customsearch/v1"
@@ -59,6 +66,16 @@ class GooglePSEClient:
         Returns:
             List of WebResult objects
         """
+        cache_params = {
+            'num_results': min(num_results, 10),
+            'site_restrict': site_restrict,
+            'date_restrict': date_restrict
+        }
+        if self.cache:
+            cached = self.cache.get_search('pse', query, **cache_params)
+            if cached is not None:
+                return [WebResult(**item) for item in cached]
+        
         if not self.api_key or not self.search_engine_id:
             print("Warning: Google PSE credentials not set, returning empty results")
             return []
@@ -96,6 +113,9 @@ class GooglePSEClient:
                     rank=i
                 ))
             
+            if results and self.cache:
+                self.cache.set_search('pse', query, [asdict(r) for r in results], **cache_params)
+            
             return results
             
         except requests.exceptions.RequestException as e:
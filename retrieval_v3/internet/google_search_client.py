@@ -6,6 +6,8 @@ from google.genai import types
 import concurrent.futures
 import time
 
+from .internet_cache import get_internet_cache
+
 logger = logging.getLogger(__name__)
 
 class GoogleSearchClient:
@@ -62,6 +64,13 @@ class GoogleSearchClient:
         - NO API key fallback - if Vertex AI fails, client will be None
         - Requires GOOGLE_CLOUD_PROJECT_ID and proper IAM permissions
         """
+        # Query → results cache (skips the grounding call for repeat queries)
+        try:
+            self.cache = get_internet_cache()
+        except Exception as e:
+            logger.warning(f"Internet cache unavailable: {e}")
+            self.cache = None
+
         # Project/location for Vertex AI (REQUIRED)
         self.project_id = os.environ.get("GOOGLE_CLOUD_PROJECT_ID") or os.environ.get("GOOGLE_CLOUD_PROJECT")
         self.location = os.environ.get("GOOGLE_CLOUD_LOCATION", "asia-south1")
@@ -127,6 +136,11 @@ class GoogleSearchClient:
         Returns:
             List of search results with title, snippet, url, and source
         """
+        if self.cache:
+            cached = self.cache.get_search("gemini_grounding", query, max_results=max_results)
+            if cached is not None:
+                return cached
+
         if not self.client:
             logger.error("GoogleSearchClient not initialized.")
             return []
@@ -141,6 +155,9 @@ class GoogleSearchClient:
                 future = executor.submit(self._perform_search, search_query, max_results)
                 try:
                     results = future.result(timeout=timeout)
+                    # Failures and timeouts come back empty and aren't cached
+                    if results and self.cache:
+                        self.cache.set_search("gemini_grounding", query, results, max_results=max_results)
                     return results
                 except concurrent.futures.TimeoutError:
                     logger.warning(f"⏱️ Internet search timeout ({timeout}s), returning empty results")
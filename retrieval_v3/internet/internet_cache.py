@@ -0,0 +1,324 @@
+# Internet Cache - persisted search results and cleaned pages
+
+"""
+Internet Cache - Two-level local cache for internet mode
+
+- Search results: normalized query (+ provider and parameters) → result list,
+  short TTL, so repeated/trending questions skip the grounding or PSE call
+- Pages: URL → cleaned text with the page's ETag/Last-Modified, longer TTL.
+  Fresh pages skip the network and HTML cleaning entirely; stale ones are
+  revalidated with a conditional GET and only re-cleaned if they changed
+
+Both live in one SQLite file (WAL mode, one connection per thread), are
+bounded by entry count (least recently used evicted first) and survive
+restarts.
+"""
+
+import os
+import re
+import json
+import time
+import zlib
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Cache key form of a query: case, spacing and trailing punctuation ignored"""
+    query = re.sub(r'\s+', ' ', query.lower()).strip()
+    return query.strip(' ?.!')
+
+
+class InternetCache:
+    """SQLite-backed TTL cache for search results and cleaned page text"""
+
+    # Only refresh an entry's LRU timestamp if it is older than this (seconds)
+    TOUCH_INTERVAL = 60.0
+
+    # Run LRU eviction every N writes
+    EVICT_EVERY = 50
+
+    def __init__(
+        self,
+        db_path: str = "cache/internet_cache.db",
+        search_ttl_seconds: float = 900,
+        page_ttl_seconds: float = 86400,
+        max_search_entries: int = 2000,
+        max_page_entries: int = 5000,
+        compress_threshold: int = 2048
+    ):
+        """
+        Initialize cache
+
+        Args:
+            db_path: SQLite file
+            search_ttl_seconds: Search results expire after this (0 disables search caching)
+            page_ttl_seconds: Pages are served without revalidation for this long
+                (0 means always revalidate)
+            max_search_entries: Search result entries kept
+            max_page_entries: Page entries kept
+            compress_threshold: Compress values larger than this many bytes
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.search_ttl_seconds = search_ttl_seconds
+        self.page_ttl_seconds = page_ttl_seconds
+        self.max_entries = {'searches': max_search_entries, 'pages': max_page_entries}
+        self.compress_threshold = compress_threshold
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.stats = {
+            'search_hits': 0, 'search_misses': 0,
+            'page_hits': 0, 'page_revalidated': 0, 'page_misses': 0
+        }
+
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS searches (
+                key TEXT PRIMARY KEY,
+                provider TEXT NOT NULL,
+                query TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                compressed INTEGER NOT NULL DEFAULT 0,
+                data BLOB NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                checked REAL NOT NULL,
+                accessed REAL NOT NULL,
+                compressed INTEGER NOT NULL DEFAULT 0,
+                data BLOB NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_searches_accessed ON searches(accessed)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages(accessed)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _key(*parts: Any) -> str:
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def _encode(self, value: Any) -> tuple:
+        data = json.dumps(value, ensure_ascii=False).encode('utf-8')
+        if len(data) > self.compress_threshold:
+            return zlib.compress(data, 6), 1
+        return data, 0
+
+    @staticmethod
+    def _decode(data: bytes, compressed: int) -> Any:
+        if compressed:
+            data = zlib.decompress(data)
+        return json.loads(data.decode('utf-8'))
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _touch(self, conn: sqlite3.Connection, table: str, key: str, accessed: float, now: float):
+        if now - accessed > self.TOUCH_INTERVAL:
+            conn.execute(f"UPDATE {table} SET accessed = ? WHERE key = ?", (now, key))
+            conn.commit()
+
+    def _after_write(self):
+        with self._lock:
+            self._writes += 1
+            if self._writes % self.EVICT_EVERY:
+                return
+        self.evict()
+
+    # ------------------------------------------------------------------
+    # Search results
+    # ------------------------------------------------------------------
+
+    def get_search(self, provider: str, query: str, **params) -> Optional[List[Any]]:
+        """
+        Cached results for a query, or None
+
+        Args:
+            provider: Search backend name (e.g. 'gemini_grounding', 'pse')
+            query: User query (normalized for the key)
+            **params: Parameters that change the results (max results, filters)
+        """
+        if not self.search_ttl_seconds:
+            return None
+        key = self._key(provider, normalize_query(query), params)
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT created, accessed, compressed, data FROM searches WHERE key = ?", (key,)
+            ).fetchone()
+            now = time.time()
+            if row is None or now - row[0] > self.search_ttl_seconds:
+                self._count('search_misses')
+                return None
+            self._touch(conn, 'searches', key, row[1], now)
+            self._count('search_hits')
+            logger.info(f"⚡ Internet search cache hit ({provider}, {now - row[0]:.0f}s old)")
+            return self._decode(row[3], row[2])
+        except Exception as e:
+            logger.warning(f"Internet cache read failed: {e}")
+            return None
+
+    def set_search(self, provider: str, query: str, results: List[Any], **params):
+        """Store results for a query (JSON-serializable list)"""
+        if not self.search_ttl_seconds:
+            return
+        normalized = normalize_query(query)
+        key = self._key(provider, normalized, params)
+        try:
+            data, compressed = self._encode(results)
+            now = time.time()
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO searches (key, provider, query, created, accessed, compressed, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, provider, normalized, now, now, compressed, data)
+            )
+            conn.commit()
+            self._after_write()
+        except Exception as e:
+            logger.warning(f"Internet cache write failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Pages
+    # ------------------------------------------------------------------
+
+    def get_page(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Cached page, or None
+
+        Returns:
+            Dict with text, etag, last_modified and fresh (True if within the
+            page TTL; otherwise revalidate with etag/last_modified before use)
+        """
+        key = self._key(url)
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT etag, last_modified, checked, accessed, compressed, data FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._count('page_misses')
+                return None
+            etag, last_modified, checked, accessed, compressed, data = row
+            now = time.time()
+            self._touch(conn, 'pages', key, accessed, now)
+            fresh = now - checked < self.page_ttl_seconds
+            if fresh:
+                self._count('page_hits')
+            return {
+                'text': self._decode(data, compressed),
+                'etag': etag,
+                'last_modified': last_modified,
+                'fresh': fresh
+            }
+        except Exception as e:
+            logger.warning(f"Internet cache read failed: {e}")
+            return None
+
+    def set_page(self, url: str, text: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Store cleaned text for a URL with its validators"""
+        key = self._key(url)
+        try:
+            data, compressed = self._encode(text)
+            now = time.time()
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (key, url, etag, last_modified, checked, accessed, compressed, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, etag, last_modified, now, now, compressed, data)
+            )
+            conn.commit()
+            self._after_write()
+        except Exception as e:
+            logger.warning(f"Internet cache write failed: {e}")
+
+    def mark_page_valid(self, url: str):
+        """Record a successful revalidation (page unchanged): fresh for another TTL"""
+        self._count('page_revalidated')
+        try:
+            now = time.time()
+            conn = self._conn()
+            conn.execute("UPDATE pages SET checked = ?, accessed = ? WHERE key = ?", (now, now, self._key(url)))
+            conn.commit()
+        except Exception as e:
+            logger.warning(f"Internet cache write failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def evict(self):
+        """Drop expired search results and least recently used entries beyond the bounds"""
+        try:
+            conn = self._conn()
+            if self.search_ttl_seconds:
+                conn.execute("DELETE FROM searches WHERE created < ?", (time.time() - self.search_ttl_seconds,))
+            for table, max_entries in self.max_entries.items():
+                conn.execute(
+                    f"DELETE FROM {table} WHERE key IN ("
+                    f"SELECT key FROM {table} ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (max_entries,)
+                )
+            conn.commit()
+        except Exception as e:
+            logger.warning(f"Internet cache eviction failed: {e}")
+
+    def clear(self):
+        """Remove all entries"""
+        conn = self._conn()
+        conn.execute("DELETE FROM searches")
+        conn.execute("DELETE FROM pages")
+        conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and entry counts"""
+        conn = self._conn()
+        with self._lock:
+            stats = dict(self.stats)
+        stats['search_entries'] = conn.execute("SELECT COUNT(*) FROM searches").fetchone()[0]
+        stats['page_entries'] = conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        return stats
+
+
+# Global cache instance
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_internet_cache() -> InternetCache:
+    """Get the shared internet cache (configured from environment)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = InternetCache(
+                db_path=os.getenv("INTERNET_CACHE_PATH", "cache/internet_cache.db"),
+                search_ttl_seconds=float(os.getenv("INTERNET_SEARCH_CACHE_TTL_SECONDS", "900")),
+                page_ttl_seconds=float(os.getenv("INTERNET_PAGE_CACHE_TTL_SECONDS", "86400")),
+                max_search_entries=int(os.getenv("INTERNET_SEARCH_CACHE_MAX_ENTRIES", "2000")),
+                max_page_entries=int(os.getenv("INTERNET_PAGE_CACHE_MAX_ENTRIES", "5000")),
+            )
+    return _cache
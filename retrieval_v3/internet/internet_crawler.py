@@ -5,22 +5,36 @@ Internet Crawler - Fetch and extract content from web pages
 Fallback HTML fetcher for government domains
 """
 
-import requests
-from typing import Optional
+from typing import Dict, List, Optional
 from urllib.parse import urlparse
 
+from .internet_cache import InternetCache, get_internet_cache
+
 
 class InternetCrawler:
     """Fetch and extract web page content"""
     
-    def __init__(self, timeout: int = 10):
+    def __init__(
+        self,
+        fetcher=None,
+        cache: Optional[InternetCache] = None,
+        use_cache: bool = True
+    ):
         """
         Initialize crawler
         
         Args:
-            timeout: Request timeout in seconds
+            fetcher: internet_service PageFetcher (default: the shared one, whose
+                pool, session and per-host limits every page fetch goes through;
+                its config sets the request timeout and page size cap)
+            cache: Cache for cleaned pages (default: shared internet cache)
+            use_cache: Set False to always fetch and clean
         """
-        self.timeout = timeout
+        if fetcher is None:
+            from internet_service.fetch import get_page_fetcher
+            fetcher = get_page_fetcher()
+        self.fetcher = fetcher
+        self.cache = (cache or get_internet_cache()) if use_cache else None
         self.allowed_domains = [
             'gov.in', 'nic.in', 'ac.in',  # Indian government/education
             'unesco.org', 'oecd.org',      # International education
@@ -42,39 +56,100 @@ class InternetCrawler:
             print(f"Domain not in allowed list: {url}")
             return None
         
-        try:
-            response = requests.get(
-                url,
-                timeout=self.timeout,
-                headers={
-                    'User-Agent': 'Mozilla/5.0 (Education Policy Assistant Bot)'
-                }
-            )
-            response.raise_for_status()
-            return response.text
-            
-        except requests.exceptions.RequestException as e:
-            print(f"Failed to fetch {url}: {e}")
-            return None
+        return self.fetcher.fetch(url)
+    
+    @staticmethod
+    def _revalidation_headers(cached: Optional[Dict]) -> Dict[str, str]:
+        """Conditional GET headers from a cached copy's validators"""
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        return headers
     
     def fetch_and_clean(self, url: str) -> Optional[str]:
         """
         Fetch page and extract clean text
         
+        Pages are served from the internet cache while fresh; stale copies are
+        revalidated (ETag/Last-Modified) and only re-cleaned if they changed.
+        
         Args:
             url: Web page URL
             
         Returns:
             Cleaned text content
         """
-        html = self.fetch_page(url)
-        if not html:
+        if not self._is_allowed_domain(url):
+            print(f"Domain not in allowed list: {url}")
+            return None
+        
+        cached = self.cache.get_page(url) if self.cache else None
+        if cached and cached['fresh']:
+            return cached['text']
+        
+        return self._refresh(url, cached)
+    
+    def _refresh(self, url: str, cached: Optional[Dict]) -> Optional[str]:
+        """Fetch (or revalidate a stale cached copy of) a page and clean it"""
+        page = self.fetcher.fetch_page(url, self._revalidation_headers(cached))
+        if not page:
+            return None
+        
+        if cached and (
+            page['status'] == 304
+            or (page['etag'] and page['etag'] == cached['etag'])
+        ):
+            # Unchanged since it was cleaned
+            self.cache.mark_page_valid(url)
+            return cached['text']
+        
+        if not page['html']:
             return None
         
         # Use page cleaner
         from .page_cleaner import PageCleaner
         cleaner = PageCleaner()
-        return cleaner.clean_html(html)
+        text = cleaner.clean_html(page['html'])
+        
+        if self.cache and text:
+            self.cache.set_page(url, text, etag=page['etag'], last_modified=page['last_modified'])
+        return text
+    
+    def fetch_and_clean_many(self, urls: List[str], deadline: float = 5.0) -> Dict[str, Optional[str]]:
+        """
+        Fetch and clean several pages concurrently
+        
+        Fresh cached pages are returned directly; the rest run on the shared
+        PageFetcher pool under its per-host limits.
+        
+        Args:
+            urls: Web page URLs
+            deadline: Seconds to wait for the whole batch
+            
+        Returns:
+            url -> cleaned text (None if failed or not finished by the deadline)
+        """
+        results = {url: None for url in urls}
+        stale = {}
+        for url in results:
+            if not self._is_allowed_domain(url):
+                print(f"Domain not in allowed list: {url}")
+                continue
+            cached = self.cache.get_page(url) if self.cache else None
+            if cached and cached['fresh']:
+                results[url] = cached['text']
+            else:
+                stale[url] = cached
+        
+        if stale:
+            results.update(self.fetcher.run_many(
+                list(stale), lambda url: self._refresh(url, stale[url]), deadline
+            ))
+        
+        return results
     
     def _is_allowed_domain(self, url: str) -> bool:
         """Check if URL is from allowed domain"""
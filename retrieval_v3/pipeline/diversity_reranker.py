@@ -19,6 +19,7 @@ current_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(current_dir))
 
 from query_understanding.category_predictor import CategoryPredictor, PolicyCategory
+from retrieval_core.scoring import get_chunk_features
 
 
 @dataclass
@@ -195,10 +196,17 @@ class DiversityReranker:
         categorized_results = []
         
         for result in results:
-            # Analyze content to determine categories
-            categories, confidence, keywords = self._analyze_content_categories(
-                result.content, predicted_categories
-            )
+            # Prefer ingestion-time category counts (no per-request regex scan)
+            features = get_chunk_features(getattr(result, 'metadata', None))
+            if features and 'categories' in features:
+                categories, confidence, keywords = self._categories_from_features(
+                    features['categories'], predicted_categories
+                )
+            else:
+                # Analyze content to determine categories
+                categories, confidence, keywords = self._analyze_content_categories(
+                    result.content, predicted_categories
+                )
             
             categorized_results.append(CategoryResult(
                 result=result,
@@ -248,6 +256,27 @@ class DiversityReranker:
         
         return assigned_categories, confidence, found_keywords[:10]  # Limit keywords
     
+    def _categories_from_features(
+        self,
+        category_counts: Dict[str, int],
+        predicted_categories: List[PolicyCategory]
+    ) -> Tuple[List[PolicyCategory], float, List[str]]:
+        """Assign categories from precomputed keyword counts (same scoring as _analyze_content_categories)"""
+        category_scores = {
+            category: category_counts.get(category.value, 0)
+            for category in predicted_categories
+            if category_counts.get(category.value, 0) > 0
+        }
+        
+        assigned_categories = list(category_scores.keys())
+        if not assigned_categories and predicted_categories:
+            assigned_categories = [predicted_categories[0]]  # Default to first predicted
+        
+        confidence = min(sum(category_scores.values()) / 5.0, 1.0)
+        
+        # Matched keyword strings are not stored in features
+        return assigned_categories, confidence, []
+    
     def _group_by_categories(
         self, 
         categorized_results: List[CategoryResult]
@@ -39,6 +39,13 @@ class EngineStatsManager:
             'reranking': [],
             'total': []
         }
+        
+        # Per-unit latency samples for the cost-model planner
+        # (seconds per rewrite, per search wave, per cross-encoder candidate, ...)
+        self.unit_costs: Dict[str, List[float]] = {}
+        
+        # (plan mode, predicted total, actual total) for planner accuracy tracking
+        self.plan_costs: List[tuple] = []
     
     def update_stats(self, output: RetrievalOutput):
         """Update engine statistics"""
@@ -58,6 +65,62 @@ class EngineStatsManager:
             if len(self.stage_timings[stage]) > 100:
                 self.stage_timings[stage] = self.stage_timings[stage][-100:]
     
+    def record_unit_cost(self, stage: str, duration: float, units: float = 1):
+        """Record the latency of one unit of work for a stage (cost-model input)"""
+        if units <= 0:
+            return
+        samples = self.unit_costs.setdefault(stage, [])
+        samples.append(duration / units)
+        # Same window as stage_timings
+        if len(samples) > 100:
+            self.unit_costs[stage] = samples[-100:]
+    
+    def estimate_unit_cost(
+        self,
+        stage: str,
+        default: float,
+        percentile: float = 0.5,
+        min_samples: int = 5
+    ) -> float:
+        """
+        Estimate the per-unit latency of a stage from recent samples
+        
+        Args:
+            stage: Unit cost stage name
+            default: Prior used until enough samples are recorded
+            percentile: 0.5 for the typical cost, 0.95 for timeouts
+            min_samples: Samples needed before trusting the histogram
+        """
+        samples = self.unit_costs.get(stage)
+        if not samples or len(samples) < min_samples:
+            return default
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+    
+    def record_plan_cost(self, mode: str, predicted: float, actual: float):
+        """Record predicted vs actual latency of an executed plan"""
+        self.plan_costs.append((mode, predicted, actual))
+        if len(self.plan_costs) > 100:
+            self.plan_costs = self.plan_costs[-100:]
+    
+    def get_plan_cost_stats(self) -> Dict:
+        """Get planner accuracy (predicted vs actual total latency) per mode"""
+        by_mode = {}
+        for mode, predicted, actual in self.plan_costs:
+            by_mode.setdefault(mode, []).append((predicted, actual))
+        
+        plan_stats = {}
+        for mode, pairs in by_mode.items():
+            errors = [actual - predicted for predicted, actual in pairs]
+            plan_stats[mode] = {
+                'count': len(pairs),
+                'avg_predicted': statistics.mean(p for p, _ in pairs),
+                'avg_actual': statistics.mean(a for _, a in pairs),
+                'mean_abs_error': statistics.mean(abs(e) for e in errors),
+                'underestimates': len([e for e in errors if e > 0])
+            }
+        return plan_stats
+    
     def get_stage_stats(self) -> Dict:
         """Get per-stage statistics - OPTIMIZATION P4-2"""
         stage_stats = {}
@@ -13,6 +13,11 @@ from query_understanding.query_interpreter import QueryInterpreter, QueryInterpr
 from query_understanding.query_rewriter import QueryRewriter
 from query_understanding.domain_expander import DomainExpander
 
+try:
+    from retrieval_v3.utils.single_flight import SingleFlight
+except ImportError:
+    from utils.single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,6 +39,9 @@ class QueryUnderstandingCoordinator:
         self.expander = expander
         self.executor = executor
         self.use_llm_rewrites = use_llm_rewrites
+        
+        # Single-flight: concurrent identical queries share one paid Gemini rewrite call
+        self._rewrite_flight = SingleFlight("gemini_rewrites")
     
     def extract_entities_from_text(self, text: str) -> List[str]:
         """Extract explicit entities like GOs, Acts, Sections from text"""
@@ -54,13 +62,20 @@ class QueryUnderstandingCoordinator:
         
         return list(set(entities))
     
+    def uses_llm_rewrites(self, is_qa_mode: bool = False, use_llm_rewrites: Optional[bool] = None) -> bool:
+        """Whether understand_query generates rewrites with the LLM for this request"""
+        if use_llm_rewrites is None:
+            use_llm_rewrites = self.use_llm_rewrites
+        return bool(use_llm_rewrites and self.use_llm_rewrites and not is_qa_mode)
+    
     def understand_query(
         self,
         query: str,
         normalized_query: Optional[str] = None,
         external_context: Optional[str] = None,
         is_qa_mode: bool = False,
-        num_rewrites: Optional[int] = None
+        num_rewrites: Optional[int] = None,
+        use_llm_rewrites: Optional[bool] = None
     ) -> tuple[QueryInterpretation, List[str], List[str]]:
         """
         Understand query: interpret, rewrite, expand
@@ -70,6 +85,8 @@ class QueryUnderstandingCoordinator:
             normalized_query: Pre-normalized query (if already normalized)
             external_context: External context from uploaded files
             is_qa_mode: Whether this is QA mode (lightweight)
+            num_rewrites: Number of rewrites to generate
+            use_llm_rewrites: Per-request override (False = rule-based rewrites only)
         
         Returns:
             (interpretation, rewrites, expanded_rewrites)
@@ -102,9 +119,11 @@ class QueryUnderstandingCoordinator:
         if num_rewrites is None:
             num_rewrites = 1 if is_qa_mode else 3  # Default: QA minimal, others moderate
         
-        if self.use_llm_rewrites and not is_qa_mode:
+        if self.uses_llm_rewrites(is_qa_mode, use_llm_rewrites):
             # Skip LLM rewrites for QA mode (saves ~10s)
             understanding_futures['rewrites'] = self.executor.submit(
+                self._rewrite_flight.do,
+                (normalized_query, num_rewrites),
                 self.rewriter.generate_rewrites_with_gemini,
                 normalized_query, num_rewrites
             )
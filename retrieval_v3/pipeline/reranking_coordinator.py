@@ -1,10 +1,11 @@
 # Reranking Coordinator
 
 """
-Coordinates reranking operations: LLM, cross-encoder, diversity, relation-entity
+Coordinates reranking operations: LLM, cross-encoder, diversity, relation-entity, semantic MMR
 """
 
 import logging
+import time
 import concurrent.futures
 from typing import List, Dict, Optional
 
@@ -12,6 +13,7 @@ from .models import RetrievalResult
 from query_understanding.category_predictor import CategoryPredictor
 from pipeline.diversity_reranker import DiversityReranker
 from reranking.cross_encoder_reranker import CrossEncoderReranker
+from reranking.mmr_reranker import SemanticMMRReranker
 from routing.retrieval_plan import RetrievalPlan
 
 logger = logging.getLogger(__name__)
@@ -26,18 +28,21 @@ class RerankingCoordinator:
         diversity_reranker: DiversityReranker,
         cross_encoder: Optional[CrossEncoderReranker] = None,
         relation_entity_processor = None,
+        mmr_reranker: Optional[SemanticMMRReranker] = None,
         use_cross_encoder: bool = True,
         use_relation_entity: bool = True,
         gemini_api_key: Optional[str] = None,
         enable_cache: bool = True,
         llm_cache: Optional[Dict] = None,
         cache_max_size: int = 100,
-        stats: Optional[Dict] = None
+        stats: Optional[Dict] = None,
+        stats_manager = None
     ):
         self.category_predictor = category_predictor
         self.diversity_reranker = diversity_reranker
         self.cross_encoder = cross_encoder
         self.relation_entity_processor = relation_entity_processor
+        self.mmr_reranker = mmr_reranker
         self.use_cross_encoder = use_cross_encoder
         self.use_relation_entity = use_relation_entity
         self.gemini_api_key = gemini_api_key
@@ -45,6 +50,7 @@ class RerankingCoordinator:
         self._llm_cache = llm_cache or {}
         self._cache_max_size = cache_max_size
         self.stats = stats or {}
+        self.stats_manager = stats_manager  # Unit-cost histograms for the cost-model planner
     
     def rerank(
         self,
@@ -54,7 +60,8 @@ class RerankingCoordinator:
         interpretation,
         plan: RetrievalPlan,
         trace_steps: List[str],
-        bm25_booster = None
+        bm25_booster = None,
+        predicted_categories: Optional[List] = None
     ) -> List[RetrievalResult]:
         """
         Coordinate complete reranking pipeline
@@ -64,6 +71,10 @@ class RerankingCoordinator:
         - Policy: Full pipeline
         - Legal: Already handled by clause indexer
         
+        Args:
+            predicted_categories: Categories already predicted for this
+                query by the caller (predicted here if None)
+        
         Returns:
             Reranked results
         """
@@ -80,13 +91,12 @@ class RerankingCoordinator:
             for keyword in ['section', 'clause', 'article', 'rule', 'act']
         )
         
-        # 5.1: Predict categories (cache for reuse in metadata)
-        predicted_categories = self.category_predictor.predict_categories(
-            normalized_query, 
-            query_type=query_type
-        )
-        # Cache for reuse in retrieval_engine metadata generation
-        self._last_predicted_categories = predicted_categories
+        # 5.1: Predict categories (unless the caller already did)
+        if predicted_categories is None:
+            predicted_categories = self.category_predictor.predict_categories(
+                normalized_query, 
+                query_type=query_type
+            )
         
         # OPTIMIZATION P1-4 & P3-1: Parallelize BM25 boost and relation-entity when both needed
         # OPTIMIZATION P3-1: Skip relation-entity for QA mode (fast path)
@@ -145,6 +155,22 @@ class RerankingCoordinator:
                 needs_relation_entity = False
                 logger.warning(f"⚠️ Circuit breaker (critical): Skipping relation-entity for comprehensive mode (recent_timeouts={recent_failures})")
         
+        # Cost-model budget: the plan may drop relation-entity or some of its phases
+        if needs_relation_entity and not getattr(plan, 'use_relation_entity', True):
+            needs_relation_entity = False
+            logger.info(f"💰 Skipping relation-entity (over latency budget for {mode})")
+        relation_phases = getattr(plan, 'relation_phases', None) or {
+            'relation_scoring': True, 
+            'entity_matching': True, 
+            'entity_expansion': True,
+            'bidirectional_search': False  # DISABLED - was taking 38.78s and finding 0 results
+        }
+        stage_timeouts = getattr(plan, 'stage_timeouts', None) or {}
+        relation_timeout = max(
+            8.0 if interpretation.needs_deep_mode else 5.0,
+            stage_timeouts.get('relation_entity', 0.0)
+        )
+        
         # Run BM25 boost and relation-entity in parallel if both needed
         if needs_bm25_boost and needs_relation_entity:
             # Parallel execution
@@ -156,21 +182,18 @@ class RerankingCoordinator:
                 )
             
             def run_relation_entity():
-                timeout_limit = 8.0 if interpretation.needs_deep_mode else 5.0
+                timeout_limit = relation_timeout
                 with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+                    relation_start = time.time()
                     future = executor.submit(
                         self.relation_entity_processor.process_complete,
                         query=normalized_query,
                         results=results,  # Use original results for relation-entity
-                        phases_enabled={
-                            'relation_scoring': True, 
-                            'entity_matching': True, 
-                            'entity_expansion': True,
-                            'bidirectional_search': False
-                        }
+                        phases_enabled=relation_phases
                     )
                     try:
                         result = future.result(timeout=timeout_limit)
+                        self._record_unit_cost('relation_entity', time.time() - relation_start)
                         # Reset failure counter on success
                         if hasattr(self, 'stats') and self.stats:
                             self.stats['recent_timeouts'] = max(0, self.stats.get('recent_timeouts', 0) - 1)
@@ -195,7 +218,7 @@ class RerankingCoordinator:
                 
                 try:
                     bm25_boosted = future_bm25.result(timeout=3.0)
-                    relation_enhanced = future_relation.result(timeout=8.0)
+                    relation_enhanced = future_relation.result(timeout=relation_timeout)
                     logger.info(f"✅ Parallel BM25 boost + relation-entity completed")
                 except concurrent.futures.TimeoutError:
                     logger.warning("⏱️ Parallel reranking timeout, using partial results")
@@ -217,24 +240,21 @@ class RerankingCoordinator:
                 trace_steps.append("Checking superseded policies and relations...")
                 print(f"🔗 Starting relation-entity processing...")
                 
-                # Add timeout protection (8s for deep think, 5s for regular)
-                timeout_limit = 8.0 if interpretation.needs_deep_mode else 5.0
+                # Add timeout protection (8s for deep think, 5s for regular; extended by the plan when slow)
+                timeout_limit = relation_timeout
                 
                 with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+                    relation_start = time.time()
                     future = executor.submit(
                         self.relation_entity_processor.process_complete,
                         query=normalized_query,
                         results=bm25_boosted,
-                        phases_enabled={
-                            'relation_scoring': True, 
-                            'entity_matching': True, 
-                            'entity_expansion': True,
-                            'bidirectional_search': False  # DISABLED - was taking 38.78s and finding 0 results
-                        }
+                        phases_enabled=relation_phases
                     )
                     
                     try:
                         relation_enhanced = future.result(timeout=timeout_limit)
+                        self._record_unit_cost('relation_entity', time.time() - relation_start)
                         logger.info(f"✅ Relation-entity processing completed within {timeout_limit}s")
                         # Reset failure counter on success
                         if hasattr(self, 'stats') and self.stats:
@@ -262,12 +282,22 @@ class RerankingCoordinator:
             # Convert to dicts for reranker
             res_dicts = [{'content': r.content, 'score': r.score, 'obj': r} for r in relation_enhanced]
             # Pass mode to cross-encoder for adaptive candidate selection
+            # (budgeted plans set the candidate depth explicitly)
+            rerank_candidates = getattr(plan, 'rerank_candidates', None)
+            cross_encoder_start = time.time()
             reranked_dicts = self.cross_encoder.rerank(
                 normalized_query, 
                 res_dicts, 
                 top_k=plan.rerank_top_k,
+                max_candidates=rerank_candidates or 50,  # 50 = mode-adaptive default
                 mode=mode  # Use mode from plan
             )
+            if rerank_candidates:
+                self._record_unit_cost(
+                    'cross_encoder',
+                    time.time() - cross_encoder_start,
+                    units=min(len(res_dicts), rerank_candidates)
+                )
             
             # Update scores in objects
             reranked = []
@@ -307,4 +337,16 @@ class RerankingCoordinator:
             # Just take top-k without diversity reranking
             final_results = reranked[:plan.top_k_total]
         
+        # 5.6: Semantic MMR (comprehensive modes only)
+        # Reorders the final pool with stored embeddings; membership (and so
+        # category coverage) is unchanged
+        if is_comprehensive_mode and self.mmr_reranker and plan.diversity_weight > 0:
+            lambda_param = min(0.9, max(0.3, 1.0 - plan.diversity_weight))
+            final_results = self.mmr_reranker.rerank(final_results, lambda_param=lambda_param)
+        
         return final_results
+    
+    def _record_unit_cost(self, stage: str, duration: float, units: float = 1):
+        """Feed the cost-model histograms (if a stats manager is attached)"""
+        if self.stats_manager:
+            self.stats_manager.record_unit_cost(stage, duration, units=units)
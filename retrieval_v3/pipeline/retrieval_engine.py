@@ -6,6 +6,7 @@ Coordinates: normalization → interpretation → routing → retrieval → rera
 """
 
 import time
+from dataclasses import asdict
 from typing import List, Dict, Optional, Any
 import os
 from concurrent.futures import ThreadPoolExecutor
@@ -31,7 +32,8 @@ from query_understanding.domain_expander import DomainExpander
 from query_understanding.category_predictor import CategoryPredictor
 
 from routing.vertical_router import VerticalRouter, Vertical
-from routing.retrieval_plan import RetrievalPlanBuilder, RetrievalPlan
+from routing.retrieval_plan import RetrievalPlan
+from routing.cost_planner import CostModelPlanBuilder
 from pipeline.diversity_reranker import DiversityReranker
 
 # Import BM25Booster with correct path
@@ -45,6 +47,7 @@ from production_clause_indexer import ProductionClauseIndexer
 # Import answer generation components
 from answer_generation.answer_builder import AnswerBuilder, Answer
 from answer_generation.answer_validator import AnswerValidator
+from answer_generation.answer_cache import get_answer_cache
 
 # Import relation-entity system
 from relation_reranker import RelationEntityProcessor
@@ -53,8 +56,13 @@ from relation_reranker import RelationEntityProcessor
 from retrieval_core.bm25_retriever import BM25Retriever
 from retrieval_core.supersession_manager import SupersessionManager
 from reranking.cross_encoder_reranker import CrossEncoderReranker
+from reranking.mmr_reranker import SemanticMMRReranker
 from retrieval_core.hybrid_search import HybridSearcher
 from cache.query_cache import QueryCache
+try:
+    from retrieval_v3.utils.single_flight import SingleFlight, query_flight_key
+except ImportError:
+    from utils.single_flight import SingleFlight, query_flight_key
 from internet.google_search_client import GoogleSearchClient
 
 # Import modularized components
@@ -133,7 +141,6 @@ class RetrievalEngine:
         self.expander = DomainExpander()
         self.category_predictor = CategoryPredictor()
         self.router = VerticalRouter()
-        self.plan_builder = RetrievalPlanBuilder()
         self.diversity_reranker = DiversityReranker(self.category_predictor)
         self.bm25_booster = BM25Booster()
         
@@ -155,11 +162,17 @@ class RetrievalEngine:
         self.answer_builder = AnswerBuilder(use_llm=True)
         self.answer_validator = AnswerValidator()
         
+        # Final answers keyed by query, mode and evidence fingerprint (shared SQLite file)
+        self.answer_cache = get_answer_cache() if enable_cache else None
+        
         # Initialize cross-encoder model (lazy loading)
         self.cross_encoder = None
         if self.use_cross_encoder:
             self.cross_encoder = CrossEncoderReranker()
         
+        # Semantic MMR over stored vectors (deep think / brainstorm)
+        self.mmr_reranker = SemanticMMRReranker(qdrant_client) if qdrant_client else None
+        
         # Initialize relation-entity processor
         self.relation_entity_processor = None
         if self.use_relation_entity:
@@ -168,6 +181,10 @@ class RetrievalEngine:
         # Initialize query cache (10 minute TTL)
         self.query_cache = QueryCache(ttl_seconds=600)
         
+        # Single-flight: identical concurrent requests share one pipeline run
+        # (the query cache is only filled after completion)
+        self._retrieve_flight = SingleFlight("retrieve")
+        
         # Initialize Diagnostic Runner
         from diagnostics.diagnostic_runner import DiagnosticRunner
         # Removed API key passing
@@ -182,6 +199,12 @@ class RetrievalEngine:
         # Share stats dict reference for backward compatibility
         self.stats = self.stats_manager.stats
         
+        # Cost-model planner: budgets each plan from the live stage histograms
+        self.plan_builder = CostModelPlanBuilder(
+            stats_manager=self.stats_manager,
+            max_workers=self.executor._max_workers
+        )
+        
         # Initialize coordinators
         self.query_coordinator = QueryUnderstandingCoordinator(
             normalizer=self.normalizer,
@@ -216,13 +239,15 @@ class RetrievalEngine:
             diversity_reranker=self.diversity_reranker,
             cross_encoder=self.cross_encoder,
             relation_entity_processor=self.relation_entity_processor,
+            mmr_reranker=self.mmr_reranker,
             use_cross_encoder=use_cross_encoder,
             use_relation_entity=use_relation_entity,
             gemini_api_key=self.gemini_api_key,
             enable_cache=enable_cache,
             llm_cache=llm_cache,
             cache_max_size=self.stats_manager._cache_max_size,
-            stats=self.stats
+            stats=self.stats,
+            stats_manager=self.stats_manager
         )
         
         self.legal_clause_handler = LegalClauseHandler(
@@ -304,6 +329,37 @@ class RetrievalEngine:
                 self.stats['cache_hits'] += 1
                 return cached_result
         
+        # SINGLE-FLIGHT: attach to an identical in-flight request instead of rerunning
+        # Keyed like the query cache (query, filter, mode) plus the other result-shaping args
+        flight_key = query_flight_key(
+            normalized_query,
+            force_filter,
+            custom_plan,
+            top_k=top_k,
+            force_verticals=force_verticals,
+            external_context=external_context
+        )
+        return self._retrieve_flight.do(
+            flight_key,
+            self._run_pipeline,
+            query, normalized_query, force_filter, top_k, custom_plan,
+            force_verticals, external_context, start_time, stage_start, trace_steps
+        )
+    
+    def _run_pipeline(
+        self,
+        query: str,
+        normalized_query: str,
+        force_filter: Optional[Dict],
+        top_k: Optional[int],
+        custom_plan: Optional[Dict],
+        force_verticals: Optional[List[str]],
+        external_context: Optional[str],
+        start_time: float,
+        stage_start: float,
+        trace_steps: List[str]
+    ) -> RetrievalOutput:
+        """Run the full pipeline after a query-cache miss (single-flight leader only)"""
         # 1.2: CLAUSE INDEXER FAST PATH - Handle legal clause queries instantly
         # ====================================================================
         is_qa_mode = custom_plan and custom_plan.get('mode') == 'qa'
@@ -338,38 +394,25 @@ class RetrievalEngine:
         trace_steps.append("Expanding and rewriting query...")
         
         # Determine mode early to get correct num_rewrites for deep think/brainstorm
+        # Rewrite count comes from the mode config, trimmed to the mode's latency budget
         mode = custom_plan.get('mode') if custom_plan else None
-        if mode in ['deepthink', 'deep_think']:
-            num_rewrites_for_understanding = 5  # Deep think: 5 rewrites
-        elif mode == 'brainstorm':
-            num_rewrites_for_understanding = 5  # Brainstorm: 5 rewrites
-        elif mode == 'policy' or mode == 'framework':
-            num_rewrites_for_understanding = 3  # Policy/Framework: 3 rewrites
-        else:
-            num_rewrites_for_understanding = None  # Use default (1 for QA, 3 for others)
+        num_rewrites_for_understanding = self.plan_builder.plan_num_rewrites(mode)  # None = default (1 for QA, 3 for others)
         
         # 1.3: Query Understanding via Coordinator
         # Pass already-normalized query to avoid double normalization
         # Pass num_rewrites to ensure deep think/brainstorm get correct number
+        llm_rewrites_override = custom_plan.get('llm_rewrites') if custom_plan else None
         interpretation, rewrites, expanded_rewrites = self.query_coordinator.understand_query(
             query=query,
             normalized_query=normalized_query,
             external_context=external_context,
             is_qa_mode=is_qa_mode,
-            num_rewrites=num_rewrites_for_understanding
+            num_rewrites=num_rewrites_for_understanding,
+            use_llm_rewrites=llm_rewrites_override
         )
         
-        # OPTIMIZATION P2-4: Adaptive thread pool sizing based on query complexity
-        # Note: Executor is shared, but we log the optimal size for monitoring
-        if is_qa_mode:
-            optimal_workers = 4
-        elif interpretation.query_type.value in ['policy', 'framework', 'brainstorm']:
-            optimal_workers = 10
-        else:
-            optimal_workers = 6
-        logger.debug(f"🔧 Optimal thread pool size for this query: {optimal_workers} workers")
-        
         # Add context entities trace if external context provided
+        context_entities = []
         if external_context:
             context_entities = self.query_coordinator.extract_entities_from_text(external_context)
             if context_entities:
@@ -380,6 +423,11 @@ class RetrievalEngine:
         # OPTIMIZATION P4-2: Record query understanding timing
         query_understanding_time = time.time() - stage_start
         self.stats_manager.record_stage_timing('query_understanding', query_understanding_time)
+        # Only LLM rewrites feed the planner's per-rewrite cost; rule-based runs
+        # and failed LLM calls (original query only) would bias the estimate down
+        generated_rewrites = len(rewrites) - 1 - len(context_entities)
+        if generated_rewrites > 0 and self.query_coordinator.uses_llm_rewrites(is_qa_mode, llm_rewrites_override):
+            self.stats_manager.record_unit_cost('rewrite', query_understanding_time, units=generated_rewrites)
         stage_start = time.time()
         
         # STEP 2: ROUTING & PLANNING
@@ -418,9 +466,24 @@ class RetrievalEngine:
             plan.num_hops = 1  # Single hop only
             logger.info("⚡ QA mode: Using lightweight retrieval (1 rewrite, 1 hop)")
         
+        # Downgraded requests (admission control under load) skip relation-entity
+        if custom_plan and custom_plan.get('use_relation_entity') is False:
+            plan.use_relation_entity = False
+        
+        # 2.3: Fit the plan to the mode's latency budget (cost model)
+        plan = self.plan_builder.apply_budget(
+            plan,
+            num_collections=len(collection_names),
+            pinned=(custom_plan or {}).keys()
+        )
+        collection_names = collection_names[:plan.max_collections]
+        # Rewrites beyond the budgeted count are dropped (file entities are always searched)
+        expanded_rewrites = expanded_rewrites[:plan.num_rewrites + 1 + len(context_entities)]
+        
         # OPTIMIZATION P4-2: Record routing timing
         routing_time = time.time() - stage_start
         self.stats_manager.record_stage_timing('routing', routing_time)
+        search_waves = self.plan_builder.search_waves(1, len(collection_names))
         stage_start = time.time()
         
         # STEP 3: RETRIEVAL (HYBRID)
@@ -480,8 +543,10 @@ class RetrievalEngine:
                 collection_names,
                 top_k=plan.top_k_per_vertical,
                 hop_number=1,
-                mode=getattr(plan, 'mode', None)  # Pass mode for timeout calculation
+                mode=getattr(plan, 'mode', None),  # Pass mode for timeout calculation
+                timeouts=plan.stage_timeouts
             )
+            search_waves += self.plan_builder.search_waves(len(expanded_rewrites) - 1, len(collection_names))
             all_results.extend(self.result_processor.normalize_scores(rewrite_results, method='min-max'))
             
         # 3.2: Multi-hop retrieval (if enabled) - SKIP if early exit
@@ -510,8 +575,10 @@ class RetrievalEngine:
                     collection_names,
                     top_k=plan.top_k_per_vertical // 2,
                     hop_number=2,
-                    mode=getattr(plan, 'mode', None)  # Pass mode for timeout calculation
+                    mode=getattr(plan, 'mode', None),  # Pass mode for timeout calculation
+                    timeouts=plan.stage_timeouts
                 )
+                search_waves += self.plan_builder.search_waves(len(hop2_queries), len(collection_names))
                 all_results.extend(self.result_processor.normalize_scores(hop2_results, method='min-max'))
             else:
                 logger.info(f"⚡ Skipping multi-hop (good results from first hop: max_score={max_score_hop1:.2f})")
@@ -519,13 +586,17 @@ class RetrievalEngine:
         # 3.3: Internet Retrieval (Optional Layer)
         # ====================================================================
         internet_enabled = self.internet_handler.should_enable_internet(plan, custom_plan)
+        internet_time = 0.0
         if internet_enabled:
+            internet_start = time.time()
             internet_results = self.internet_handler.search(query, trace_steps)
             all_results.extend(internet_results)
+            internet_time = time.time() - internet_start
         
         # OPTIMIZATION P4-2: Record retrieval timing
         retrieval_time = time.time() - stage_start
         self.stats_manager.record_stage_timing('retrieval', retrieval_time)
+        self.stats_manager.record_unit_cost('search_wave', retrieval_time - internet_time, units=search_waves)
         stage_start = time.time()
         
         # STEP 4: AGGREGATION & FILTERING
@@ -557,10 +628,18 @@ class RetrievalEngine:
         # OPTIMIZATION P4-2: Record aggregation timing
         aggregation_time = time.time() - stage_start
         self.stats_manager.record_stage_timing('aggregation', aggregation_time)
+        self.stats_manager.record_unit_cost('overhead', routing_time + aggregation_time)
         stage_start = time.time()
         
         # STEP 5: ENHANCED RERANKING
         # ====================================================================
+        # Predicted once per request and passed along (the coordinator is shared
+        # by concurrent requests, so it must not hold per-request state)
+        predicted_categories = self.category_predictor.predict_categories(
+            normalized_query,
+            query_type=interpretation.query_type.value
+        )
+        
         # OPTIMIZATION P1-5: Use lightweight reranking for early exit cases
         if early_exit_triggered:
             # Lightweight reranking: just sort by score and apply diversity
@@ -585,7 +664,8 @@ class RetrievalEngine:
                 interpretation=interpretation,
                 plan=plan,
                 trace_steps=trace_steps,
-                bm25_booster=self.bm25_booster
+                bm25_booster=self.bm25_booster,
+                predicted_categories=predicted_categories
             )
         
         # 5.6: Clause indexer lookup for legal queries with poor results
@@ -614,16 +694,14 @@ class RetrievalEngine:
         self.stats_manager.record_stage_timing('reranking', reranking_time)
         self.stats_manager.record_stage_timing('total', processing_time)
         
-        # OPTIMIZATION: Reuse predicted categories from reranking (already computed)
-        # Check if categories were already predicted in reranking coordinator
-        if hasattr(self.reranking_coordinator, '_last_predicted_categories'):
-            predicted_categories = self.reranking_coordinator._last_predicted_categories
-        else:
-            # Fallback: predict if not cached
-            predicted_categories = self.category_predictor.predict_categories(
-                normalized_query, 
-                query_type=interpretation.query_type.value
-            )
+        # Record predicted vs actual cost of the chosen plan
+        cost_plan = self.plan_builder.record_outcome(plan, {
+            'query_understanding': query_understanding_time,
+            'retrieval': retrieval_time,
+            'reranking': reranking_time,
+            'overhead': routing_time + aggregation_time,
+            'total': processing_time
+        })
         
         output = RetrievalOutput(
             query=query,
@@ -641,6 +719,7 @@ class RetrievalEngine:
                 'num_verticals': len(verticals),
                 'num_hops': plan.num_hops,
                 'dedup_reduction': len(all_results) - len(unique_results),
+                'cost_plan': cost_plan,
                 'predicted_categories': [cat.value for cat in predicted_categories],
                 'category_coverage_report': self.diversity_reranker.get_category_coverage_report(
                     normalized_query, final_results, predicted_categories
@@ -654,8 +733,13 @@ class RetrievalEngine:
         
         # CACHE THE RESULT before returning
         # OPTIMIZATION P2-5: Include mode in cache key
+        # Downgraded (cheaper) plans are not cached so they don't outlive the load spike
         mode = custom_plan.get('mode') if custom_plan else getattr(plan, 'mode', None)
-        self.query_cache.set(normalized_query, output, force_filter, mode=mode)
+        is_downgraded = bool(custom_plan) and (
+            custom_plan.get('llm_rewrites') is False or custom_plan.get('use_relation_entity') is False
+        )
+        if not is_downgraded:
+            self.query_cache.set(normalized_query, output, force_filter, mode=mode)
         
         return output
     
@@ -664,16 +748,22 @@ class RetrievalEngine:
         query: str,
         mode: str = "qa",
         top_k: Optional[int] = None,
-        validate_answer: bool = True
+        validate_answer: bool = True,
+        use_answer_cache: bool = True
     ) -> tuple[RetrievalOutput, Answer, Dict]:
         """
         Complete pipeline: retrieve + build answer + validate
         
+        If the same question was answered before from the same chunks (same
+        IDs, order and content), the cached answer and validation are
+        returned without calling the LLM.
+        
         Args:
             query: User query
             mode: Answer mode (qa, policy, framework, etc.)
             top_k: Override final result count
             validate_answer: Whether to validate the generated answer
+            use_answer_cache: Set False to always regenerate (evaluation runs)
             
         Returns:
             (RetrievalOutput, Answer, validation_metadata)
@@ -694,14 +784,26 @@ class RetrievalEngine:
                 'url': result.metadata.get('url') if 'url' in result.metadata else None
             })
         
-        # Step 3: Build answer
+        # Step 3: Serve a cached answer built from the same evidence
+        answer_cache = self.answer_cache
+        if answer_cache is not None and not use_answer_cache:
+            answer_cache.record_bypass()
+            answer_cache = None
+        if answer_cache is not None:
+            cached = answer_cache.get(query, mode, results_for_builder, validate=validate_answer)
+            if cached:
+                answer = Answer(**cached['answer'])
+                answer.metadata['answer_cache'] = 'hit'
+                return retrieval_output, answer, cached['validation']
+        
+        # Step 4: Build answer
         answer = self.answer_builder.build_answer(
             query=query,
             results=results_for_builder,
             mode=mode
         )
         
-        # Step 4: Validate answer (if enabled)
+        # Step 5: Validate answer (if enabled)
         validation_metadata = {}
         if validate_answer:
             # Convert Answer object to dict for validator
@@ -756,6 +858,14 @@ class RetrievalEngine:
                 if suggestions:
                     print(f"   Suggestions: {suggestions[0]}")
         
+        # Step 6: Cache LLM answers (template/error fallbacks are retried next time)
+        if answer_cache is not None and answer.metadata.get('generated_by') == 'gemini_vertex':
+            answer_cache.set(
+                query, mode, results_for_builder,
+                {'answer': asdict(answer), 'validation': validation_metadata},
+                validate=validate_answer
+            )
+        
         return retrieval_output, answer, validation_metadata
     
     def run_diagnostic(self, query: str, test_type: str = "full") -> Dict[str, Any]:
@@ -810,6 +920,7 @@ class RetrievalEngine:
         """Get per-stage performance statistics - OPTIMIZATION P4-2"""
         return {
             'stage_timings': self.stats_manager.get_stage_stats(),
+            'plan_costs': self.stats_manager.get_plan_cost_stats(),
             'overall': self.stats_manager.get_stats()
         }
 
@@ -16,6 +16,11 @@ from retrieval_core.bm25_retriever import BM25Retriever
 from retrieval_core.hybrid_search import HybridSearcher
 from routing.retrieval_plan import RetrievalPlan
 
+try:
+    from retrieval_v3.utils.single_flight import SingleFlight
+except ImportError:
+    from utils.single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
 
@@ -45,6 +50,10 @@ class RetrievalExecutor:
         self.stats = stats
         self.bm25_retriever = bm25_retriever
         self.hybrid_searcher = hybrid_searcher or HybridSearcher()
+        
+        # Single-flight: concurrent requests share identical embedding calls and Qdrant searches
+        self._embed_flight = SingleFlight("embed")
+        self._search_flight = SingleFlight("qdrant_search")
     
     def execute_hybrid_search(
         self,
@@ -67,7 +76,8 @@ class RetrievalExecutor:
                 collection_names, 
                 top_k=plan.top_k_per_vertical, 
                 hop_number=hop,
-                mode=getattr(plan, 'mode', None)  # Pass mode for timeout calculation
+                mode=getattr(plan, 'mode', None),  # Pass mode for timeout calculation
+                timeouts=getattr(plan, 'stage_timeouts', None)
             )
         
         def run_bm25_search():
@@ -108,6 +118,10 @@ class RetrievalExecutor:
                 else:
                     vector_timeout = 15.0  # Fast for QA
                     bm25_timeout = 8.0
+                # Budgeted plans may extend (never shorten) them when searches run slow
+                stage_timeouts = getattr(plan, 'stage_timeouts', None) or {}
+                vector_timeout = max(vector_timeout, stage_timeouts.get('vector', 0.0))
+                bm25_timeout = max(bm25_timeout, stage_timeouts.get('bm25', 0.0))
                 
                 vector_res = future_vector.result(timeout=vector_timeout)
                 bm25_res = future_bm25.result(timeout=bm25_timeout)
@@ -150,14 +164,19 @@ class RetrievalExecutor:
         
         # Apply section type boost (orders > annexure > preamble)
         try:
-            from retrieval_v3.retrieval_core.scoring import section_type_boost
+            from retrieval_v3.retrieval_core.scoring import section_type_boost, get_chunk_features
             for result in fused_results:
+                features = get_chunk_features(result.metadata)
                 section_type = result.metadata.get('section_type')
-                if section_type:
+                if features and 'section_boost' in features:
+                    boost = features['section_boost']  # Precomputed at ingestion
+                elif section_type:
                     boost = section_type_boost(section_type)
-                    if boost > 1.0:
-                        result.score *= boost
-                        result.metadata['section_boost'] = boost
+                else:
+                    boost = 1.0
+                if boost > 1.0:
+                    result.score *= boost
+                    result.metadata['section_boost'] = boost
         except Exception as e:
             logger.warning(f"Section boost failed: {e}")
         
@@ -169,13 +188,17 @@ class RetrievalExecutor:
         collections: List[str],
         top_k: int,
         hop_number: int = 1,
-        mode: Optional[str] = None
+        mode: Optional[str] = None,
+        timeouts: Optional[Dict[str, float]] = None
     ) -> List[RetrievalResult]:
         """
         Parallel retrieval across all query-collection combinations
         
         This dramatically speeds up retrieval by running searches concurrently
         OPTIMIZATION P2-3: Batch embedding generation for all queries at once
+        
+        Args:
+            timeouts: Plan stage timeouts ('round', 'search'); extend the mode defaults
         """
         if not self.qdrant_client or not self.embedder:
             return self._generate_stub_results(queries, collections, top_k, hop_number)
@@ -197,50 +220,24 @@ class RetrievalExecutor:
                     uncached_queries.append(query)
         
         # Batch generate embeddings for uncached queries
+        # (single-flight: identical concurrent batches share one embedding call)
         if uncached_queries:
-            try:
-                if hasattr(self.embedder, 'embed_queries'):
-                    # Use batch method if available
-                    embeddings = self.embedder.embed_queries(uncached_queries)
-                    for query, embedding in zip(uncached_queries, embeddings):
-                        query_to_embedding[query] = embedding
-                elif hasattr(self.embedder, 'embed_texts'):
-                    # Batch embed using embed_texts
-                    embeddings = self.embedder.embed_texts(uncached_queries)
-                    for query, embedding in zip(uncached_queries, embeddings):
-                        query_to_embedding[query] = embedding
-                else:
-                    # Fallback: embed one by one (slower but works)
-                    for query in uncached_queries:
-                        if hasattr(self.embedder, 'embed_query'):
-                            query_to_embedding[query] = self.embedder.embed_query(query)
-                        else:
-                            query_to_embedding[query] = self.embedder.embed_texts([query])[0]
-                
-                # Cache the new embeddings
-                with self._lock:
-                    if self.enable_cache:
-                        for query in uncached_queries:
-                            if query in query_to_embedding:
-                                cache_key = f"embed_{query}"
-                                embedding = query_to_embedding[query]
-                                if len(self._embedding_cache) >= self._cache_max_size:
-                                    oldest_key = next(iter(self._embedding_cache))
-                                    del self._embedding_cache[oldest_key]
-                                self._embedding_cache[cache_key] = embedding
-            except Exception as e:
-                logger.warning(f"Batch embedding failed: {e}, falling back to per-query")
-                # Fallback: generate one by one
-                for query in uncached_queries:
-                    if query not in query_to_embedding:
-                        try:
-                            if hasattr(self.embedder, 'embed_query'):
-                                query_to_embedding[query] = self.embedder.embed_query(query)
-                            else:
-                                query_to_embedding[query] = self.embedder.embed_texts([query])[0]
-                        except Exception as e2:
-                            logger.warning(f"Embedding failed for '{query}': {e2}")
-                            continue
+            new_embeddings = self._embed_flight.do(
+                tuple(sorted(uncached_queries)),
+                self._embed_queries,
+                sorted(uncached_queries)
+            )
+            query_to_embedding.update(new_embeddings)
+            
+            # Cache the new embeddings
+            with self._lock:
+                if self.enable_cache:
+                    for query, embedding in new_embeddings.items():
+                        cache_key = f"embed_{query}"
+                        if len(self._embedding_cache) >= self._cache_max_size:
+                            oldest_key = next(iter(self._embedding_cache))
+                            del self._embedding_cache[oldest_key]
+                        self._embedding_cache[cache_key] = embedding
         
         # Create all search tasks (now with pre-computed embeddings)
         search_tasks = []
@@ -281,6 +278,8 @@ class RetrievalExecutor:
             min_timeout = 10  # Minimum 10s
         
         adaptive_timeout = min(max_timeout, max(min_timeout, num_searches * base_timeout_per_search + 10))
+        if timeouts and 'round' in timeouts:
+            adaptive_timeout = max(adaptive_timeout, timeouts['round'])  # Cost-model tail estimate
         logger.debug(f"Parallel retrieval: {num_searches} searches, mode={mode}, timeout={adaptive_timeout}s")
         
         # Collect results as they complete with adaptive timeout
@@ -291,6 +290,8 @@ class RetrievalExecutor:
             individual_timeout = 7  # 7s per search for policy modes
         else:
             individual_timeout = 5  # 5s per search for QA
+        if timeouts and 'search' in timeouts:
+            individual_timeout = max(individual_timeout, timeouts['search'])
         
         completed_count = 0
         for future in as_completed(future_to_task, timeout=adaptive_timeout):
@@ -313,6 +314,42 @@ class RetrievalExecutor:
         
         return all_results
     
+    def _embed_queries(self, queries: List[str]) -> Dict[str, List[float]]:
+        """Embed queries in one batch call (per-query fallback on failure)"""
+        query_to_embedding = {}
+        try:
+            if hasattr(self.embedder, 'embed_queries'):
+                # Use batch method if available
+                embeddings = self.embedder.embed_queries(queries)
+                for query, embedding in zip(queries, embeddings):
+                    query_to_embedding[query] = embedding
+            elif hasattr(self.embedder, 'embed_texts'):
+                # Batch embed using embed_texts
+                embeddings = self.embedder.embed_texts(queries)
+                for query, embedding in zip(queries, embeddings):
+                    query_to_embedding[query] = embedding
+            else:
+                # Fallback: embed one by one (slower but works)
+                for query in queries:
+                    if hasattr(self.embedder, 'embed_query'):
+                        query_to_embedding[query] = self.embedder.embed_query(query)
+                    else:
+                        query_to_embedding[query] = self.embedder.embed_texts([query])[0]
+        except Exception as e:
+            logger.warning(f"Batch embedding failed: {e}, falling back to per-query")
+            # Fallback: generate one by one
+            for query in queries:
+                if query not in query_to_embedding:
+                    try:
+                        if hasattr(self.embedder, 'embed_query'):
+                            query_to_embedding[query] = self.embedder.embed_query(query)
+                        else:
+                            query_to_embedding[query] = self.embedder.embed_texts([query])[0]
+                    except Exception as e2:
+                        logger.warning(f"Embedding failed for '{query}': {e2}")
+                        continue
+        return query_to_embedding
+    
     def _search_with_embedding(
         self,
         query: str,
@@ -323,15 +360,13 @@ class RetrievalExecutor:
     ) -> List[RetrievalResult]:
         """Search using pre-computed embedding (optimized for batch processing)"""
         try:
-            response = self.qdrant_client.query_points(
-                collection_name=collection,
-                query=embedding,
-                limit=top_k,
-                score_threshold=0.3,
-                with_payload=True,
-                with_vectors=False
+            # Single-flight: the embedding is a function of the query text, so
+            # (collection, query, top_k) identifies the Qdrant call
+            search_results = self._search_flight.do(
+                (collection, query, top_k),
+                self._query_points,
+                collection, embedding, top_k
             )
-            search_results = response.points
             
             # Convert to RetrievalResult objects
             results = []
@@ -345,6 +380,8 @@ class RetrievalExecutor:
                         hit_id = hit.id
                         hit_score = hit.score
                         hit_payload = hit.payload
+                    # Points may be shared with coalesced callers; downstream mutates metadata
+                    hit_payload = dict(hit_payload or {})
                     
                     results.append(RetrievalResult(
                         chunk_id=str(hit_id),
@@ -366,6 +403,18 @@ class RetrievalExecutor:
             print(f"Search failed for {collection}: {e}")
             return []
     
+    def _query_points(self, collection: str, embedding, top_k: int) -> List:
+        """Raw Qdrant vector search"""
+        response = self.qdrant_client.query_points(
+            collection_name=collection,
+            query=embedding,
+            limit=top_k,
+            score_threshold=0.3,
+            with_payload=True,
+            with_vectors=False
+        )
+        return response.points
+    
     def _search_single_threadsafe(
         self,
         query: str,
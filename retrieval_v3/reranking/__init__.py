@@ -1,5 +1,5 @@
 # Reranking Layer
-# LLM reranker, diversity reranker, internet reranker, score fusion
+# LLM reranker, diversity reranker, semantic MMR, internet reranker, score fusion
 
 """
 Reranking Layer - LLM, diversity, internet, score fusion
@@ -7,12 +7,14 @@ Reranking Layer - LLM, diversity, internet, score fusion
 
 from .llm_reranker import LLMReranker
 from .diversity_reranker import DiversityReranker
+from .mmr_reranker import SemanticMMRReranker
 from .internet_reranker import InternetReranker
 from .score_fusion import ScoreFusion
 
 __all__ = [
     'LLMReranker',
     'DiversityReranker',
+    'SemanticMMRReranker',
     'InternetReranker',
     'ScoreFusion',
 ]
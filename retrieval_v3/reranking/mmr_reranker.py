@@ -0,0 +1,155 @@
+# Semantic MMR Reranker - embedding-based diversity for the final pool
+
+"""
+Semantic MMR Reranker - Real semantic diversity using stored vectors
+
+Search runs with with_vectors=False, so the keyword/vertical diversity pass
+never sees embeddings. This stage fetches stored vectors for the final
+candidate pool only (one batched retrieve per collection), stacks them into
+one normalized matrix and reorders the pool with vectorized MMR.
+"""
+
+import logging
+import threading
+from collections import OrderedDict, defaultdict
+from typing import List, Optional
+
+try:
+    from retrieval_v3.retrieval_core.scoring import mmr_select, normalize_rows
+except ImportError:
+    from retrieval_core.scoring import mmr_select, normalize_rows
+
+logger = logging.getLogger(__name__)
+
+
+# Result.vertical -> Qdrant collection (vector search strips the collection
+# name, BM25 results keep the full collection name)
+VERTICAL_COLLECTIONS = {
+    'government': 'ap_government_orders',
+    'go': 'ap_government_orders',
+    'legal': 'ap_legal_documents',
+    'judicial': 'ap_judicial_documents',
+    'schemes': 'ap_schemes',
+    'data': 'ap_data_reports',
+    'reports': 'ap_data_reports',
+}
+
+
+class SemanticMMRReranker:
+    """Reorder a candidate pool with MMR over stored chunk embeddings"""
+
+    def __init__(self, qdrant_client=None, cache_max_size: int = 5000):
+        """
+        Initialize reranker
+
+        Args:
+            qdrant_client: Qdrant client used to fetch stored vectors
+            cache_max_size: Max vectors kept in memory (stored vectors never change)
+        """
+        self.qdrant_client = qdrant_client
+        self._vector_cache: "OrderedDict[tuple, List[float]]" = OrderedDict()
+        self._cache_max_size = cache_max_size
+        self._cache_lock = threading.Lock()  # Shared by concurrent requests
+
+    def rerank(
+        self,
+        results: List,
+        lambda_param: float = 0.7,
+        top_k: Optional[int] = None
+    ) -> List:
+        """
+        MMR-reorder results using stored embeddings
+
+        Args:
+            results: RetrievalResult objects (already reranked and trimmed)
+            lambda_param: Relevance vs diversity trade-off (1.0 = pure relevance)
+            top_k: Number of results to keep (default: all)
+
+        Returns:
+            Reordered results (input order if vectors are unavailable)
+        """
+        if top_k is None:
+            top_k = len(results)
+        if len(results) < 3 or not self.qdrant_client:
+            return results[:top_k]
+
+        vectors = self._fetch_vectors(results)
+        has_vector = [v is not None for v in vectors]
+        if sum(has_vector) < 2:
+            logger.debug("Semantic MMR skipped: no stored vectors for candidates")
+            return results[:top_k]
+
+        dim = len(next(v for v in vectors if v is not None))
+        zero = [0.0] * dim
+        matrix = normalize_rows([
+            v if v is not None and len(v) == dim else zero
+            for v in vectors
+        ])
+
+        # Min-max normalize so relevance and cosine similarity share a scale
+        scores = [r.score for r in results]
+        lo, hi = min(scores), max(scores)
+        span = (hi - lo) or 1.0
+        relevance = [(s - lo) / span for s in scores]
+
+        order = mmr_select(relevance, matrix, k=top_k, lambda_param=lambda_param, has_vector=has_vector)
+        return [results[i] for i in order]
+
+    def _fetch_vectors(self, results: List) -> List[Optional[List[float]]]:
+        """Fetch stored vectors (batched per collection, cached by point id)"""
+        keys = [(self._collection_for(r), str(r.chunk_id)) for r in results]
+
+        # Take hits under the lock so concurrent requests can't evict them
+        # before this one reads them
+        found = {}
+        missing = defaultdict(list)
+        with self._cache_lock:
+            for key in keys:
+                collection, point_id = key
+                if not collection:
+                    continue
+                vector = self._vector_cache.get(key)
+                if vector is not None:
+                    self._vector_cache.move_to_end(key)
+                    found[key] = vector
+                else:
+                    missing[collection].append(point_id)
+
+        for collection, point_ids in missing.items():
+            try:
+                points = self.qdrant_client.retrieve(
+                    collection_name=collection,
+                    ids=list(dict.fromkeys(point_ids)),
+                    with_payload=False,
+                    with_vectors=True
+                )
+            except Exception as e:
+                logger.warning(f"Vector fetch failed for {collection}: {e}")
+                continue
+
+            for point in points:
+                vector = point.vector
+                if isinstance(vector, dict):
+                    # Named vectors: use the first (collections have one dense vector)
+                    vector = next(iter(vector.values()), None)
+                if vector:
+                    key = (collection, str(point.id))
+                    found[key] = list(vector)
+                    with self._cache_lock:
+                        self._cache_vector(key, found[key])
+
+        return [found.get(key) for key in keys]
+
+    def _cache_vector(self, key: tuple, vector: List[float]):
+        """Insert into the bounded LRU vector cache (caller holds _cache_lock)"""
+        self._vector_cache[key] = vector
+        self._vector_cache.move_to_end(key)
+        while len(self._vector_cache) > self._cache_max_size:
+            self._vector_cache.popitem(last=False)
+
+    def _collection_for(self, result) -> Optional[str]:
+        """Resolve the Qdrant collection a result came from"""
+        vertical = (result.vertical or '').lower()
+        if vertical.startswith('ap_'):
+            return vertical
+        return VERTICAL_COLLECTIONS.get(vertical)
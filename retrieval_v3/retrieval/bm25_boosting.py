@@ -230,15 +230,24 @@ class BM25Booster:
         self,
         query_terms: List[str],
         document_text: str,
-        doc_length: Optional[int] = None
+        doc_length: Optional[int] = None,
+        term_freqs: Optional[Dict[str, int]] = None
     ) -> float:
-        """Calculate BM25 score for document given query terms"""
-        if not query_terms or not document_text:
+        """
+        Calculate BM25 score for document given query terms
+        
+        If term_freqs (the document's token counts) is given, the document
+        text is not tokenized again.
+        """
+        if not query_terms or (not document_text and term_freqs is None):
             return 0.0
         
-        doc_text_lower = document_text.lower()
-        doc_tokens = re.findall(r'\w+', doc_text_lower)
-        doc_length = doc_length or len(doc_tokens)
+        if term_freqs is None:
+            doc_tokens = re.findall(r'\w+', document_text.lower())
+            term_freqs = Counter(doc_tokens)
+            doc_length = doc_length or len(doc_tokens)
+        else:
+            doc_length = doc_length or sum(term_freqs.values())
         
         if doc_length == 0:
             return 0.0
@@ -251,7 +260,7 @@ class BM25Booster:
             term_lower = term.lower()
             
             # Term frequency in document
-            tf = doc_tokens.count(term_lower)
+            tf = term_freqs.get(term_lower, 0)
             if tf == 0:
                 continue
             
@@ -309,13 +318,20 @@ class BM25Booster:
             # Calculate category-specific boosts
             total_boost = 0.0
             matched_categories = []
+            # Tokenize once per result, not once per boost category
+            doc_tokens = re.findall(r'\w+', (result.content or '').lower())
+            term_freqs = Counter(doc_tokens)
             
             for category, terms in boost_terms.items():
                 if category not in self.category_patterns:
                     continue
                 
                 # Calculate BM25 score for these terms in this document
-                bm25_score = self.calculate_bm25_score(terms, result.content)
+                bm25_score = self.calculate_bm25_score(
+                    terms, result.content,
+                    doc_length=len(doc_tokens),
+                    term_freqs=term_freqs
+                )
                 
                 if bm25_score > 0:
                     boost_factor = self.category_patterns[category]['boost_factor']
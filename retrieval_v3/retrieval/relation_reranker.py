@@ -687,11 +687,19 @@ class EntityMatcher:
         wants_recent = any(keyword in query_entities.get('keywords', []) 
                           for keyword in ['recent', 'recently', 'latest', 'new', 'current'])
         
+        try:
+            from retrieval_v3.retrieval_core.scoring import get_chunk_features
+        except ImportError:
+            from retrieval_core.scoring import get_chunk_features
+        
         for result in results:
             original_score = result.score
+            features = get_chunk_features(result.metadata)
             
-            # Get entities from result metadata
+            # Get entities from result metadata (fall back to ingestion-time entity keys)
             result_entities = result.metadata.get('entities', {})
+            if (not result_entities or not isinstance(result_entities, dict)) and features:
+                result_entities = features.get('entity_keys', {})
             
             # Calculate entity overlap
             overlap_score = self._calculate_entity_overlap(query_entities, result_entities)
@@ -6,7 +6,9 @@ Provides recency scoring, operational validity checks, and relation boost calcul
 
 import math
 import time
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Sequence, Set
+
+import numpy as np
 
 
 # Relation weights (capped, deduped)
@@ -102,6 +104,29 @@ def section_type_boost(section_type: Optional[str]) -> float:
     return boosts.get(section_type.lower() if section_type else "", 1.0)
 
 
+# Must match ingestion_v2/config/constants.py::CHUNK_FEATURE_VERSION
+CHUNK_FEATURE_VERSION = 1
+
+
+def get_chunk_features(payload: Optional[Dict]) -> Optional[Dict]:
+    """
+    Get precomputed ingestion-time features from a chunk payload
+    
+    Args:
+        payload: Chunk payload / result metadata
+        
+    Returns:
+        Feature dict, or None if missing or built by a different feature version
+        (callers then fall back to scanning the text)
+    """
+    if not payload:
+        return None
+    features = payload.get('features')
+    if not isinstance(features, dict) or features.get('version') != CHUNK_FEATURE_VERSION:
+        return None
+    return features
+
+
 def deduplicate_by_doc_id(results: List[Dict]) -> List[Dict]:
     """
     Deduplicate results by doc_id, keeping highest score
@@ -147,6 +172,70 @@ def rrf_fusion(rankings: Dict[str, List[int]], k: int = 60) -> Dict[str, float]:
     return scores
 
 
+def normalize_rows(vectors: Sequence[Sequence[float]]) -> np.ndarray:
+    """
+    Stack vectors into one L2-normalized float32 matrix
+    
+    Zero vectors stay zero (similarity 0 to everything).
+    """
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim != 2:
+        raise ValueError(f"Expected a 2-D vector matrix, got shape {matrix.shape}")
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def mmr_select(
+    relevance: Sequence[float],
+    matrix: np.ndarray,
+    k: int = 10,
+    lambda_param: float = 0.7,
+    has_vector: Optional[Sequence[bool]] = None
+) -> List[int]:
+    """
+    Vectorized Maximal Marginal Relevance over row indices
+    
+    Keeps a running max-similarity per candidate, so each of the k steps is
+    one matrix-vector product: O(k·n·d) total instead of O(k²·n·d).
+    
+    Args:
+        relevance: Relevance score per row
+        matrix: Row-normalized embedding matrix (see normalize_rows)
+        k: Number of rows to select
+        lambda_param: Trade-off between relevance and diversity (0.7 = 70% relevance)
+        has_vector: Rows with a real embedding (rows without one are never
+            penalized and never penalize others). Defaults to all rows.
+        
+    Returns:
+        Selected row indices in MMR order
+    """
+    relevance = np.asarray(relevance, dtype=np.float32)
+    n = len(relevance)
+    if has_vector is None:
+        has_vector = np.ones(n, dtype=bool)
+    else:
+        has_vector = np.asarray(has_vector, dtype=bool)
+    
+    # -inf until some selected row has a vector (penalty 0 until then)
+    max_sim = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    selected = []
+    
+    for _ in range(min(k, n)):
+        penalty = np.where(np.isfinite(max_sim) & has_vector, max_sim, 0.0)
+        mmr_scores = lambda_param * relevance - (1 - lambda_param) * penalty
+        mmr_scores[~available] = -np.inf
+        best = int(np.argmax(mmr_scores))
+        
+        selected.append(best)
+        available[best] = False
+        if has_vector[best]:
+            max_sim = np.maximum(max_sim, matrix @ matrix[best])
+    
+    return selected
+
+
 def mmr_diversify(
     candidates: Dict[str, float],
     embeddings: Dict[str, List[float]],
@@ -165,48 +254,27 @@ def mmr_diversify(
     Returns:
         List of doc_ids in MMR order
     """
-    selected = set()
-    result = []
+    if not candidates or k <= 0:
+        return []
     
-    def cosine_similarity(v1: List[float], v2: List[float]) -> float:
-        """Simple cosine similarity"""
-        dot = sum(a * b for a, b in zip(v1, v2))
-        mag1 = math.sqrt(sum(a * a for a in v1))
-        mag2 = math.sqrt(sum(b * b for b in v2))
-        return dot / (mag1 * mag2) if mag1 and mag2 else 0.0
+    doc_ids = list(candidates)
+    has_vector = [doc_id in embeddings for doc_id in doc_ids]
     
-    remaining = dict(candidates)
+    if any(has_vector):
+        dim = len(next(embeddings[d] for d, has in zip(doc_ids, has_vector) if has))
+        zero = [0.0] * dim
+        matrix = normalize_rows([embeddings[d] if has else zero for d, has in zip(doc_ids, has_vector)])
+    else:
+        matrix = np.zeros((len(doc_ids), 1), dtype=np.float32)
     
-    while len(result) < k and remaining:
-        best_doc = None
-        best_score = -1e9
-        
-        for doc_id, base_score in remaining.items():
-            # Calculate max similarity to already selected docs
-            if selected and doc_id in embeddings:
-                max_sim = max(
-                    cosine_similarity(embeddings[doc_id], embeddings[sel_id])
-                    for sel_id in selected
-                    if sel_id in embeddings
-                )
-            else:
-                max_sim = 0.0
-            
-            # MMR score: λ * relevance - (1-λ) * similarity
-            mmr_score = lambda_param * base_score - (1 - lambda_param) * max_sim
-            
-            if mmr_score > best_score:
-                best_score = mmr_score
-                best_doc = doc_id
-        
-        if best_doc:
-            result.append(best_doc)
-            selected.add(best_doc)
-            remaining.pop(best_doc)
-        else:
-            break
-    
-    return result
+    selected = mmr_select(
+        [candidates[d] for d in doc_ids],
+        matrix,
+        k=k,
+        lambda_param=lambda_param,
+        has_vector=has_vector
+    )
+    return [doc_ids[i] for i in selected]
 
 
 # Example usage
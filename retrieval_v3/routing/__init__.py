@@ -13,6 +13,7 @@ from .retrieval_plan import (
     RetrievalMode,
     build_retrieval_plan
 )
+from .cost_planner import CostModelPlanBuilder
 
 __all__ = [
     'VerticalRouter',
@@ -22,6 +23,7 @@ __all__ = [
     'RetrievalPlan',
     'RetrievalMode',
     'build_retrieval_plan',
+    'CostModelPlanBuilder',
 ]
 
 
@@ -0,0 +1,337 @@
+# Cost-Model Planner - fits each retrieval plan to a per-mode latency budget
+
+"""
+Cost-Model Plan Builder - Budget rewrites, collections, hops and rerankers
+Estimates per-stage latency from live unit-cost histograms (EngineStatsManager)
+and degrades the mode's plan step by step until it fits the mode's target latency
+"""
+
+import math
+import logging
+from typing import Dict, Iterable, Optional
+
+from .retrieval_plan import RetrievalPlanBuilder, RetrievalPlan, RetrievalMode
+
+logger = logging.getLogger(__name__)
+
+
+class CostModelPlanBuilder(RetrievalPlanBuilder):
+    """Retrieval plan builder that budgets each plan by predicted cost"""
+
+    # Per-mode latency targets and budget floors
+    MODE_BUDGETS = {
+        RetrievalMode.QA: {
+            'latency_target': 6.0,
+            'rerank_candidates': 25,
+            'min_rerank_candidates': 10,
+            'min_rewrites': 1,
+            'min_collections': 2,
+        },
+        RetrievalMode.COMPLIANCE: {
+            'latency_target': 8.0,
+            'rerank_candidates': 25,
+            'min_rerank_candidates': 10,
+            'min_rewrites': 1,
+            'min_collections': 2,
+        },
+        RetrievalMode.POLICY: {
+            'latency_target': 15.0,
+            'rerank_candidates': 30,
+            'min_rerank_candidates': 15,
+            'min_rewrites': 1,
+            'min_collections': 2,
+        },
+        RetrievalMode.FRAMEWORK: {
+            'latency_target': 20.0,
+            'rerank_candidates': 30,
+            'min_rerank_candidates': 15,
+            'min_rewrites': 2,
+            'min_collections': 3,
+        },
+        RetrievalMode.DEEPTHINK: {
+            'latency_target': 30.0,
+            'rerank_candidates': 30,
+            'min_rerank_candidates': 20,
+            'min_rewrites': 3,
+            'min_collections': 3,
+        },
+        RetrievalMode.BRAINSTORM: {
+            'latency_target': 30.0,
+            'rerank_candidates': 30,
+            'min_rerank_candidates': 20,
+            'min_rewrites': 3,
+            'min_collections': 3,
+        },
+    }
+
+    # Per-unit latency priors (seconds), used until the histograms have samples
+    UNIT_COST_PRIORS = {
+        'rewrite': 0.8,           # Per generated rewrite (query understanding)
+        'search_wave': 0.6,       # One wave of parallel Qdrant searches
+        'relation_entity': 3.0,   # One relation-entity pass
+        'cross_encoder': 0.08,    # Per cross-encoder candidate
+        'overhead': 0.5,          # Routing + aggregation
+    }
+
+    DEFAULT_RELATION_PHASES = {
+        'relation_scoring': True,
+        'entity_matching': True,
+        'entity_expansion': True,
+        'bidirectional_search': False,  # DISABLED - was taking 38.78s and finding 0 results
+    }
+
+    # Rewrites generated during query understanding (before budget trimming);
+    # other modes keep the understanding default (1 for QA, 3 otherwise)
+    UNDERSTANDING_REWRITES = {
+        RetrievalMode.DEEPTHINK: 5,
+        RetrievalMode.BRAINSTORM: 5,
+        RetrievalMode.POLICY: 3,
+        RetrievalMode.FRAMEWORK: 3,
+    }
+
+    HOP2_QUERIES = 3           # RetrievalExecutor.generate_hop2_queries limit
+    EXPANSION_COST_SHARE = 0.4 # Share of relation-entity time spent on entity expansion
+    REWRITE_BUDGET_SHARE = 0.25
+
+    def __init__(self, stats_manager=None, max_workers: int = 6):
+        """
+        Initialize planner
+
+        Args:
+            stats_manager: EngineStatsManager holding the live unit-cost histograms
+            max_workers: Size of the shared search thread pool
+        """
+        super().__init__()
+        self.stats_manager = stats_manager
+        self.max_workers = max_workers
+
+    # ------------------------------------------------------------------
+    # Cost model
+    # ------------------------------------------------------------------
+
+    def unit_cost(self, stage: str, percentile: float = 0.5) -> float:
+        """Per-unit latency estimate for a stage (live histogram or prior)"""
+        prior = self.UNIT_COST_PRIORS[stage]
+        if percentile > 0.5:
+            prior *= 2  # Pessimistic prior for tail estimates
+        if not self.stats_manager:
+            return prior
+        return self.stats_manager.estimate_unit_cost(stage, prior, percentile=percentile)
+
+    def search_waves(self, num_queries: int, num_collections: int) -> int:
+        """Waves needed to run num_queries x num_collections searches on the pool"""
+        tasks = num_queries * num_collections
+        if tasks <= 0:
+            return 0
+        return math.ceil(tasks / self.max_workers)
+
+    def latency_budget(self, mode: RetrievalMode) -> float:
+        """Target latency for a mode, tightened while searches are timing out"""
+        target = self.MODE_BUDGETS[mode]['latency_target']
+        recent_timeouts = 0
+        if self.stats_manager:
+            recent_timeouts = self.stats_manager.stats.get('recent_timeouts', 0)
+        return target * max(0.5, 1.0 - 0.1 * recent_timeouts)
+
+    def predict_cost(self, plan: RetrievalPlan, num_collections: int) -> Dict[str, float]:
+        """
+        Predict per-stage latency of a plan
+
+        Returns:
+            Dict of stage -> seconds (query_understanding, retrieval, reranking,
+            overhead, total)
+        """
+        collections = min(num_collections, plan.max_collections or num_collections)
+
+        waves = self.search_waves(1, collections)  # Hybrid search for the original query
+        waves += self.search_waves(plan.num_rewrites, collections)
+        if plan.num_hops > 1:
+            waves += self.search_waves(self.HOP2_QUERIES, collections)
+
+        reranking = 0.0
+        if plan.mode != RetrievalMode.QA.value and plan.use_relation_entity:
+            relation = self.unit_cost('relation_entity')
+            phases = plan.relation_phases or self.DEFAULT_RELATION_PHASES
+            if not phases.get('entity_expansion', True):
+                relation *= 1.0 - self.EXPANSION_COST_SHARE
+            reranking += relation
+        reranking += self.unit_cost('cross_encoder') * (plan.rerank_candidates or 0)
+
+        cost = {
+            'query_understanding': self.unit_cost('rewrite') * plan.num_rewrites,
+            'retrieval': self.unit_cost('search_wave') * waves,
+            'reranking': reranking,
+            'overhead': self.unit_cost('overhead'),
+        }
+        cost['total'] = sum(cost.values())
+        return cost
+
+    # ------------------------------------------------------------------
+    # Planning
+    # ------------------------------------------------------------------
+
+    def resolve_mode(self, mode: Optional[str]) -> Optional[RetrievalMode]:
+        """Map a mode string (including 'deep_think') to RetrievalMode"""
+        if not mode:
+            return None
+        mode = str(mode).lower()
+        if mode == 'deep_think':
+            mode = 'deepthink'
+        try:
+            return RetrievalMode(mode)
+        except ValueError:
+            return None
+
+    def plan_num_rewrites(self, mode: Optional[str]) -> Optional[int]:
+        """
+        Rewrite count for query understanding (decided before interpretation)
+
+        Returns:
+            Number of rewrites, or None to keep the understanding default
+        """
+        mode_enum = self.resolve_mode(mode)
+        if mode_enum not in self.UNDERSTANDING_REWRITES:
+            return None
+
+        num_rewrites = self.UNDERSTANDING_REWRITES[mode_enum]
+        min_rewrites = self.MODE_BUDGETS[mode_enum]['min_rewrites']
+        rewrite_budget = self.latency_budget(mode_enum) * self.REWRITE_BUDGET_SHARE
+        while num_rewrites > min_rewrites and self.unit_cost('rewrite') * num_rewrites > rewrite_budget:
+            num_rewrites -= 1
+        return num_rewrites
+
+    def apply_budget(
+        self,
+        plan: RetrievalPlan,
+        num_collections: int,
+        pinned: Optional[Iterable[str]] = None
+    ) -> RetrievalPlan:
+        """
+        Fit a plan to its mode's latency budget
+
+        Degrades (in order) cross-encoder depth, hop 2, entity expansion,
+        rewrites, collections and finally relation-entity reranking until the
+        predicted latency fits, then derives stage timeouts from tail costs.
+
+        Args:
+            plan: Plan from build_plan (after caller overrides)
+            num_collections: Number of routed collections
+            pinned: Plan fields set explicitly by the caller (never degraded)
+
+        Returns:
+            The same plan, budgeted
+        """
+        mode_enum = self.resolve_mode(plan.mode) or RetrievalMode.QA
+        budget = self.MODE_BUDGETS[mode_enum]
+        pinned = set(pinned or ())
+
+        plan.latency_budget = self.latency_budget(mode_enum)
+        if plan.rerank_candidates is None:
+            plan.rerank_candidates = budget['rerank_candidates']
+        if plan.relation_phases is None:
+            plan.relation_phases = dict(self.DEFAULT_RELATION_PHASES)
+        if plan.max_collections is None:
+            plan.max_collections = num_collections
+
+        def over_budget() -> bool:
+            return self.predict_cost(plan, num_collections)['total'] > plan.latency_budget
+
+        # 1. Cross-encoder depth
+        if 'rerank_candidates' not in pinned:
+            while over_budget() and plan.rerank_candidates > budget['min_rerank_candidates']:
+                plan.rerank_candidates = max(budget['min_rerank_candidates'], plan.rerank_candidates - 5)
+                self._note(plan, f"rerank_candidates={plan.rerank_candidates}")
+
+        # 2. Hop 2
+        if over_budget() and plan.num_hops > 1 and 'num_hops' not in pinned:
+            plan.num_hops = 1
+            self._note(plan, "num_hops=1")
+
+        # 3. Entity expansion
+        if over_budget() and plan.relation_phases.get('entity_expansion') and 'relation_phases' not in pinned:
+            plan.relation_phases['entity_expansion'] = False
+            self._note(plan, "entity_expansion=off")
+
+        # 4. Rewrites
+        if 'num_rewrites' not in pinned:
+            while over_budget() and plan.num_rewrites > budget['min_rewrites']:
+                plan.num_rewrites -= 1
+                self._note(plan, f"num_rewrites={plan.num_rewrites}")
+
+        # 5. Collections (router order is priority order)
+        if 'max_collections' not in pinned:
+            while over_budget() and plan.max_collections > budget['min_collections']:
+                plan.max_collections -= 1
+                self._note(plan, f"max_collections={plan.max_collections}")
+
+        # 6. Relation-entity reranking
+        if over_budget() and plan.use_relation_entity and 'use_relation_entity' not in pinned:
+            plan.use_relation_entity = False
+            self._note(plan, "relation_entity=off")
+
+        plan.predicted_cost = self.predict_cost(plan, num_collections)
+        plan.stage_timeouts = self._stage_timeouts(plan, num_collections)
+
+        if plan.budget_actions:
+            logger.info(
+                f"💰 Plan budgeted for {plan.mode}: predicted {plan.predicted_cost['total']:.1f}s "
+                f"/ budget {plan.latency_budget:.1f}s ({', '.join(plan.budget_actions)})"
+            )
+        else:
+            logger.debug(
+                f"💰 Plan within budget for {plan.mode}: predicted {plan.predicted_cost['total']:.1f}s "
+                f"/ budget {plan.latency_budget:.1f}s"
+            )
+        return plan
+
+    def _note(self, plan: RetrievalPlan, action: str):
+        """Record a budget degradation (latest value per setting)"""
+        key = action.split('=')[0]
+        plan.budget_actions = [a for a in plan.budget_actions if a.split('=')[0] != key]
+        plan.budget_actions.append(action)
+
+    def _stage_timeouts(self, plan: RetrievalPlan, num_collections: int) -> Dict[str, float]:
+        """
+        Derive stage timeouts from tail (p95) unit costs, capped by the budget
+
+        Consumers use these only to extend their per-mode timeouts when the
+        backend is slow; a budget never shortens a search timeout.
+        """
+        collections = min(num_collections, plan.max_collections or num_collections)
+        wave_p95 = self.unit_cost('search_wave', percentile=0.95)
+        ceiling = max(10.0, plan.latency_budget)
+
+        search = min(15.0, max(5.0, 3 * wave_p95))
+        largest_round = max(plan.num_rewrites, self.HOP2_QUERIES if plan.num_hops > 1 else 1)
+        round_timeout = min(ceiling, max(10.0, 2 * wave_p95 * self.search_waves(largest_round, collections) + search))
+        vector = min(ceiling, max(8.0, 2 * wave_p95 * self.search_waves(1, collections) + search))
+
+        return {
+            'search': search,
+            'round': round_timeout,
+            'vector': vector,
+            'bm25': max(5.0, vector / 2),
+            'relation_entity': min(8.0, max(4.0, 1.5 * self.unit_cost('relation_entity', percentile=0.95))),
+        }
+
+    def record_outcome(self, plan: RetrievalPlan, actual: Dict[str, float]) -> Dict:
+        """
+        Record predicted vs actual cost of an executed plan
+
+        Args:
+            plan: Executed (budgeted) plan
+            actual: Stage -> measured seconds (must include 'total')
+
+        Returns:
+            Summary for the retrieval output metadata
+        """
+        predicted = plan.predicted_cost or {}
+        if self.stats_manager and 'total' in predicted and 'total' in actual:
+            self.stats_manager.record_plan_cost(plan.mode, predicted['total'], actual['total'])
+
+        return {
+            'latency_budget': plan.latency_budget,
+            'predicted': {k: round(v, 3) for k, v in predicted.items()},
+            'actual': {k: round(v, 3) for k, v in actual.items()},
+            'budget_actions': list(plan.budget_actions),
+        }
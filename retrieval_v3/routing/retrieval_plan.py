@@ -5,8 +5,8 @@ Retrieval Plan Builder - Create adaptive retrieval strategies
 Determines: number of rewrites, hops, top_k, internet usage
 """
 
-from typing import Dict, List
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 import logging
 
@@ -26,6 +26,16 @@ class RetrievalPlan:
     diversity_weight: float    # Diversity vs relevance (0-1)
     mode: str                  # qa | policy | framework | deepthink
     
+    # Execution budget (set by CostModelPlanBuilder; None/empty = legacy defaults)
+    max_collections: Optional[int] = None      # Search only the top-N routed collections
+    rerank_candidates: Optional[int] = None    # Cross-encoder depth
+    use_relation_entity: bool = True           # Run relation-entity reranking at all
+    relation_phases: Optional[Dict[str, bool]] = None  # Relation-entity phases to run
+    stage_timeouts: Dict[str, float] = field(default_factory=dict)  # Stage -> timeout (s)
+    latency_budget: Optional[float] = None     # Target latency (s)
+    predicted_cost: Dict[str, float] = field(default_factory=dict)  # Stage -> predicted latency (s)
+    budget_actions: List[str] = field(default_factory=list)  # Degradations applied to fit the budget
+    
     def to_dict(self) -> Dict:
         """Convert to dictionary"""
         return asdict(self)
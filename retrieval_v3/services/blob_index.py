@@ -0,0 +1,302 @@
+"""
+Local index of PDF blob paths in the GCS bucket.
+
+Resolving a doc_id used to list the whole bucket on every miss. The index is
+built once from a bucket listing, saved to a local JSON file (so restarts are
+instant), and refreshed in the background. A refresh relists the bucket and
+compares each blob's generation/updated stamp, so the lookup tables are only
+rebuilt (and the file only rewritten) when something actually changed.
+
+Lookups are a dictionary hit on the exact path or the case-insensitive file
+name. Anything else falls back to the fuzzy strategies of the old bucket scan,
+run over the in-memory names and memoized.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def match_pdf_path(pdf_filename: str, names: Iterable[str]) -> Optional[str]:
+    """
+    Find the blob path that best matches a PDF filename.
+
+    Tries, in bucket order:
+    1. Exact filename match (case-insensitive suffix) - returned immediately
+    2. Filename without numeric prefix (e.g., '5294663_file.pdf' → 'file.pdf')
+    3. Partial match ignoring underscores and separators
+    4. Alphanumeric-only match (at least 6 characters)
+
+    Among strategy 2-4 candidates the shortest path wins.
+
+    Args:
+        pdf_filename: The PDF filename to search for (e.g., '2025SE_MS26_E.PDF')
+        names: Blob names to search
+
+    Returns:
+        Matching blob path, or None
+    """
+    search_name_lower = pdf_filename.lower()
+
+    filename_without_prefix = None
+    if '_' in pdf_filename:
+        parts = pdf_filename.split('_', 1)
+        if parts[0].isdigit():
+            filename_without_prefix = parts[1].lower()
+
+    base_search = search_name_lower.replace('.pdf', '').replace('_', '')
+    search_alpha = "".join(c for c in search_name_lower.replace('.pdf', '') if c.isalnum())
+
+    matches = []
+    for name in names:
+        blob_name_lower = name.lower()
+
+        if blob_name_lower.endswith(search_name_lower):
+            return name
+
+        if filename_without_prefix and blob_name_lower.endswith(filename_without_prefix):
+            matches.append(name)
+
+        if not blob_name_lower.endswith('.pdf'):
+            continue
+
+        base_blob = blob_name_lower.replace('.pdf', '').replace('_', '').replace('/', '')
+        if base_search in base_blob:
+            matches.append(name)
+            continue
+
+        blob_alpha = "".join(c for c in blob_name_lower if c.isalnum())
+        if len(search_alpha) > 5 and search_alpha in blob_alpha:
+            matches.append(name)
+
+    if matches:
+        # Prefer shorter matches (likely closer to exact filename vs deep path)
+        matches.sort(key=len)
+        return matches[0]
+    return None
+
+
+class BlobIndex:
+    """
+    doc filename → blob path index for one bucket.
+
+    The lister returns blob-like objects with name, generation and updated
+    (google.cloud.storage blobs, or any fake with the same attributes).
+    """
+
+    def __init__(
+        self,
+        lister: Callable[[], Iterable],
+        index_path: Optional[str] = None,
+        refresh_seconds: float = 600.0,
+        miss_refresh_seconds: float = 60.0
+    ):
+        """
+        Initialize index (loads the saved copy, if any; nothing is listed yet).
+
+        Args:
+            lister: Callable listing every blob in the bucket
+            index_path: Local JSON file the index is saved to (None = memory only)
+            refresh_seconds: Background refresh interval (0 = no background refresh)
+            miss_refresh_seconds: A lookup miss relists the bucket at most this often
+        """
+        self._lister = lister
+        self.index_path = Path(index_path) if index_path else None
+        self.refresh_seconds = refresh_seconds
+        self.miss_refresh_seconds = miss_refresh_seconds
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._blobs: Dict[str, Tuple[Optional[int], Optional[str]]] = {}
+        self._by_name: Dict[str, List[str]] = {}
+        self._resolved: Dict[str, Optional[str]] = {}
+        self._loaded = False
+        self._failed_at = 0.0
+        self.refreshed_at = 0.0
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'hits': 0, 'fuzzy': 0, 'misses': 0, 'refreshes': 0, 'changes': 0}
+
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _install(self, blobs: Dict[str, Tuple[Optional[int], Optional[str]]]):
+        by_name: Dict[str, List[str]] = {}
+        for name in sorted(blobs):
+            by_name.setdefault(name.rsplit('/', 1)[-1].lower(), []).append(name)
+        with self._lock:
+            self._blobs = blobs
+            self._by_name = by_name
+            self._resolved = {}
+            self._loaded = True
+
+    def _load(self):
+        if not self.index_path or not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            blobs = {name: (entry[0], entry[1]) for name, entry in data.get('blobs', {}).items()}
+            self._install(blobs)
+            self.refreshed_at = data.get('refreshed_at', 0.0)
+            logger.info(f"📇 Loaded blob index: {len(blobs)} blobs from {self.index_path}")
+        except Exception as e:
+            logger.warning(f"⚠️ Ignoring unreadable blob index {self.index_path}: {e}")
+
+    def _save(self):
+        if not self.index_path:
+            return
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_suffix(self.index_path.suffix + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'refreshed_at': self.refreshed_at,
+                    'blobs': {name: list(stamp) for name, stamp in self._blobs.items()}
+                }, f)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not save blob index to {self.index_path}: {e}")
+
+    def refresh(self, max_age: Optional[float] = None) -> bool:
+        """
+        Relist the bucket and apply any changes.
+
+        Args:
+            max_age: Skip the listing if the index was refreshed within this
+                many seconds (concurrent callers then share one listing)
+
+        Returns:
+            True if blobs were added, removed or updated
+        """
+        with self._refresh_lock:
+            start = time.time()
+            if max_age is not None and self._loaded and start - self.refreshed_at < max_age:
+                return False
+            blobs = {}
+            for blob in self._lister():
+                updated = getattr(blob, 'updated', None)
+                blobs[blob.name] = (
+                    getattr(blob, 'generation', None),
+                    updated.isoformat() if hasattr(updated, 'isoformat') else updated
+                )
+
+            changed = not self._loaded or blobs != self._blobs
+            if changed:
+                added = len(blobs.keys() - self._blobs.keys())
+                removed = len(self._blobs.keys() - blobs.keys())
+                self._install(blobs)
+                self.stats['changes'] += 1
+                logger.info(
+                    f"📇 Blob index refreshed: {len(blobs)} blobs "
+                    f"(+{added} / -{removed}) in {time.time() - start:.2f}s"
+                )
+            self.refreshed_at = time.time()
+            self.stats['refreshes'] += 1
+            if changed or self.index_path and not self.index_path.exists():
+                self._save()
+            return changed
+
+    def ensure_loaded(self):
+        """Build the index now if neither a saved copy nor a listing exists yet."""
+        if self._loaded:
+            return
+        if time.time() - self._failed_at < self.miss_refresh_seconds:
+            raise RuntimeError("blob index unavailable (bucket listing failed recently)")
+        try:
+            self.refresh(max_age=float('inf'))
+        except Exception:
+            self._failed_at = time.time()
+            raise
+
+    # ------------------------------------------------------------------
+    # Background refresh
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the background refresh thread (no-op if disabled or running)."""
+        if self.refresh_seconds <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, name="gcs-blob-index", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _refresh_loop(self):
+        # A saved copy may already be stale, so the first wait can be zero
+        while not self._stop.wait(max(0.0, self.refreshed_at + self.refresh_seconds - time.time())):
+            try:
+                self.refresh(max_age=self.refresh_seconds / 2)
+            except Exception as e:
+                logger.warning(f"⚠️ Blob index refresh failed: {e}")
+                self._stop.wait(self.miss_refresh_seconds)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._blobs
+
+    def _lookup(self, pdf_filename: str) -> Optional[str]:
+        if pdf_filename in self._blobs:
+            return pdf_filename
+
+        names = self._by_name.get(pdf_filename.rsplit('/', 1)[-1].lower())
+        if names:
+            return names[0]
+
+        resolved = self._resolved
+        key = pdf_filename.lower()
+        if key not in resolved:
+            resolved[key] = match_pdf_path(pdf_filename, sorted(self._blobs))
+            if resolved[key]:
+                self.stats['fuzzy'] += 1
+        return resolved[key]
+
+    def resolve(self, pdf_filename: str, source_hint: Optional[str] = None) -> Optional[str]:
+        """
+        Blob path for a PDF filename.
+
+        Args:
+            pdf_filename: Filename or path from doc_id_to_pdf_filename
+            source_hint: Optional path hint from citation metadata
+
+        Returns:
+            Blob path, or None if the bucket has no matching PDF
+        """
+        self.ensure_loaded()
+
+        if source_hint and source_hint in self._blobs:
+            self.stats['hits'] += 1
+            return source_hint
+
+        path = self._lookup(pdf_filename)
+        if path is None and time.time() - self.refreshed_at > self.miss_refresh_seconds:
+            # Possibly uploaded since the last listing
+            self.refresh(max_age=self.miss_refresh_seconds)
+            path = self._lookup(pdf_filename)
+
+        self.stats['hits' if path else 'misses'] += 1
+        return path
+
+    def stamp(self, path: str) -> Tuple[Optional[int], Optional[str]]:
+        """(generation, updated) recorded for a blob path."""
+        return self._blobs.get(path, (None, None))
@@ -3,23 +3,35 @@ Google Cloud Storage service for PDF access.
 
 Handles:
 - Generating signed URLs for frontend PDF display
-- Fetching PDF bytes for text extraction
+- Fetching PDF bytes for text extraction (through a local PDF cache)
 - Converting doc_id to GCS PDF filenames
+- Resolving doc_ids to blob paths through a locally saved bucket index
 """
 
 import os
+import math
+import time
 import logging
-from datetime import datetime, timedelta
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
 from typing import Optional
 from functools import lru_cache
 
 from google.cloud import storage
 from google.cloud.exceptions import NotFound
+from google.oauth2 import service_account
 
 from retrieval_v3.utils.pdf_utils import doc_id_to_pdf_filename
+from retrieval_v3.services.blob_index import BlobIndex, match_pdf_path
+from retrieval_v3.services.local_bucket import LocalStorageClient
+from retrieval_v3.services.pdf_cache import CachedPdf, PdfCache
 
 logger = logging.getLogger(__name__)
 
+# V4 signed URLs are valid for at most 7 days
+MAX_SIGNED_URL_SECONDS = 7 * 24 * 3600
+
 
 class GCSService:
     """Service for Google Cloud Storage operations."""
@@ -27,7 +39,9 @@ class GCSService:
     def __init__(
         self, 
         bucket_name: Optional[str] = None,
-        credentials_path: Optional[str] = None
+        credentials_path: Optional[str] = None,
+        client=None,
+        index_path: Optional[str] = None
     ):
         """
         Initialize GCS service.
@@ -35,6 +49,10 @@ class GCSService:
         Args:
             bucket_name: GCS bucket name (defaults to env var GCS_BUCKET_NAME)
             credentials_path: Path to service account JSON (defaults to GOOGLE_APPLICATION_CREDENTIALS env var)
+            client: Storage client to use instead of building one (e.g. LocalStorageClient;
+                GCS_LOCAL_ROOT selects a local one)
+            index_path: Blob index file (defaults to GCS_BLOB_INDEX_PATH or
+                cache/gcs_blob_index/<bucket>.json)
         """
         self.bucket_name = bucket_name or os.getenv('GCS_BUCKET_NAME')
         
@@ -57,7 +75,17 @@ class GCSService:
             service_account_file = os.path.expanduser(service_account_file)
             service_account_file = os.path.abspath(service_account_file)
         
-        if service_account_file and os.path.exists(service_account_file):
+        local_root = os.getenv('GCS_LOCAL_ROOT')
+        if client is None and local_root:
+            client = LocalStorageClient(local_root)
+            logger.info(f"📁 GCS Service using local bucket directory: {local_root}")
+        
+        if client is not None:
+            self.client = client
+            self._service_account_creds = (
+                service_account_file if service_account_file and os.path.exists(service_account_file) else None
+            )
+        elif service_account_file and os.path.exists(service_account_file):
             # Use service account credentials (required for signed URLs)
             self.client = storage.Client.from_service_account_json(service_account_file)
             self._service_account_creds = service_account_file
@@ -80,8 +108,84 @@ class GCSService:
         
         self.bucket = self.client.bucket(self.bucket_name)
         
+        # Signing credentials (loaded on first use) and signed URLs by blob path
+        self._signing_credentials = None
+        self._signing_credentials_file: Optional[str] = None
+        self._signed_urls: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
+        self._signed_url_lock = threading.Lock()
+        self.signed_url_bucket_minutes = int(os.getenv('SIGNED_URL_BUCKET_MINUTES', '15'))
+        self.signed_url_cache_size = int(os.getenv('SIGNED_URL_CACHE_SIZE', '2048'))
+        self.signed_url_stats = {'hits': 0, 'signed': 0}
+        
+        # doc_id → blob path index (saved locally, refreshed in the background)
+        self.blob_index = BlobIndex(
+            lister=self._list_pdf_blobs,
+            index_path=index_path or os.getenv(
+                'GCS_BLOB_INDEX_PATH',
+                os.path.join('cache', 'gcs_blob_index', f"{self.bucket_name}.json")
+            ),
+            refresh_seconds=float(os.getenv('GCS_BLOB_INDEX_REFRESH_SECONDS', '600')),
+            miss_refresh_seconds=float(os.getenv('GCS_BLOB_INDEX_MISS_REFRESH_SECONDS', '60'))
+        )
+        self.blob_index.start()
+        
+        # Downloaded PDFs (disk + memory LRU, validated by generation)
+        self.pdf_cache = PdfCache(
+            cache_dir=os.getenv('PDF_CACHE_DIR', os.path.join('cache', 'pdf_cache')),
+            max_disk_bytes=int(float(os.getenv('PDF_CACHE_MAX_MB', '2048')) * 1024 ** 2),
+            max_memory_bytes=int(float(os.getenv('PDF_CACHE_MEMORY_MB', '128')) * 1024 ** 2)
+        )
+        
         logger.info(f"GCS Service initialized with bucket: {self.bucket_name}")
     
+    def _list_pdf_blobs(self):
+        """List the bucket (only the fields the index needs)."""
+        return self.client.list_blobs(
+            self.bucket_name,
+            fields="items(name,generation,updated),nextPageToken"
+        )
+    
+    def resolve_blob_path(self, doc_id: str, source_hint: Optional[str] = None) -> str:
+        """
+        Blob path of the PDF for a doc_id.
+        
+        Uses the blob index; if the bucket can't be listed (e.g. no list
+        permission), falls back to existence checks plus a bucket scan.
+        
+        Args:
+            doc_id: Qdrant doc_id
+            source_hint: Optional source/filename hint from metadata
+            
+        Returns:
+            Blob path
+            
+        Raises:
+            NotFound: If no matching PDF exists
+        """
+        pdf_filename = doc_id_to_pdf_filename(doc_id)
+        hint = source_hint if source_hint and ('/' in source_hint or source_hint.lower().endswith('.pdf')) else None
+        
+        try:
+            full_path = self.blob_index.resolve(pdf_filename, source_hint=hint)
+        except Exception as e:
+            logger.warning(f"⚠️ Blob index unavailable ({e}), checking bucket directly")
+            full_path = self._resolve_without_index(pdf_filename, hint)
+        
+        if not full_path:
+            logger.error(f"PDF not found in GCS: {pdf_filename}")
+            raise NotFound(f"PDF '{pdf_filename}' not found in bucket '{self.bucket_name}'")
+        
+        if full_path != pdf_filename:
+            logger.info(f"📁 Resolved '{pdf_filename}' to: {full_path}")
+        return full_path
+    
+    def _resolve_without_index(self, pdf_filename: str, source_hint: Optional[str]) -> Optional[str]:
+        if self.bucket.blob(pdf_filename).exists():
+            return pdf_filename
+        if source_hint and self.bucket.blob(source_hint).exists():
+            return source_hint
+        return self.find_pdf_in_bucket(pdf_filename)
+    
     def find_pdf_in_bucket(self, pdf_filename: str) -> Optional[str]:
         """
         Recursively search for a PDF file in the bucket with flexible matching.
@@ -99,62 +203,12 @@ class GCSService:
         """
         logger.info(f"🔍 Searching for '{pdf_filename}' in bucket recursively...")
         
-        # Normalize search filename (case-insensitive)
-        search_name_lower = pdf_filename.lower()
+        names = (blob.name for blob in self.client.list_blobs(self.bucket_name))
+        match = match_pdf_path(pdf_filename, names)
         
-        # Extract filename without numeric prefix for additional search
-        # e.g., '5294663_SALIENT_FEATURES.PDF' → 'SALIENT_FEATURES.PDF'
-        filename_without_prefix = None
-        if '_' in pdf_filename:
-            parts = pdf_filename.split('_', 1)
-            if parts[0].isdigit():
-                filename_without_prefix = parts[1].lower()
-                logger.info(f"   Also searching for variant without numeric prefix: '{filename_without_prefix}'")
-        
-        # List all blobs in the bucket
-        blobs = self.client.list_blobs(self.bucket_name)
-        
-        matches = []
-        for blob in blobs:
-            blob_name_lower = blob.name.lower()
-            
-            # Strategy 1: Exact match (case-insensitive)
-            if blob_name_lower.endswith(search_name_lower):
-                logger.info(f"✅ Found exact match at: {blob.name}")
-                return blob.name
-            
-            # Strategy 2: Match without numeric prefix
-            if filename_without_prefix and blob_name_lower.endswith(filename_without_prefix):
-                logger.info(f"✅ Found match (without prefix) at: {blob.name}")
-                matches.append(blob.name)
-            
-            # Strategy 3: Partial match (filename is contained in blob path - basic)
-            base_search = search_name_lower.replace('.pdf', '').replace('_', '')
-            base_blob = blob_name_lower.replace('.pdf', '').replace('_', '').replace('/', '')
-            
-            if base_search in base_blob and blob_name_lower.endswith('.pdf'):
-                logger.info(f"   Potential partial match (basic): {blob.name}")
-                matches.append(blob.name)
-                continue
-
-            # Strategy 4: Aggressive Alphanumeric Match
-            # useful when doc_id has underscores but file has spaces, or other separators differ
-            search_alpha = "".join(c for c in search_name_lower.replace('.pdf', '') if c.isalnum())
-            blob_alpha = "".join(c for c in blob_name_lower if c.isalnum())
-            
-            # Check if the core alphanumeric sequence exists in the blob name
-            # We enforce a minimum length to avoid spurious matches on short IDs
-            if len(search_alpha) > 5 and search_alpha in blob_alpha and blob_name_lower.endswith('.pdf'):
-                logger.info(f"   Potential fuzzy match (alphanumeric): {blob.name}")
-                matches.append(blob.name)
-        
-        # Return first match if any were found
-        if matches:
-            # Prefer shorter matches (likely closer to exact filename vs deep path)
-            matches.sort(key=len)
-            best_match = matches[0]
-            logger.info(f"✅ Returning best match: {best_match}")
-            return best_match
+        if match:
+            logger.info(f"✅ Found match at: {match}")
+            return match
         
         logger.warning(f"❌ PDF '{pdf_filename}' not found anywhere in bucket")
         return None
@@ -187,40 +241,71 @@ class GCSService:
         if source_hint:
             logger.info(f"   Source hint provided: '{source_hint}'")
         
-        # Try direct path first
-        blob = self.bucket.blob(pdf_filename)
+        blob = self.bucket.blob(self.resolve_blob_path(doc_id, source_hint))
         
-        # If not found at root, try multiple strategies
-        if not blob.exists():
-            logger.warning(f"PDF not found at root, trying alternative strategies...")
-            full_path = None
-            
-            # Strategy 1: Try source hint if it looks like a path
-            if source_hint and ('/' in source_hint or source_hint.lower().endswith('.pdf')):
-                logger.info(f"   Trying source hint as direct path: {source_hint}")
-                test_blob = self.bucket.blob(source_hint)
-                if test_blob.exists():
-                    logger.info(f"✅ Found PDF using source hint!")
-                    full_path = source_hint
-            
-            # Strategy 2: Search recursively
-            if not full_path:
-                logger.info(f"   Searching recursively in bucket...")
-                full_path = self.find_pdf_in_bucket(pdf_filename)
-            
-            if full_path:
-                logger.info(f"📁 Found PDF at nested path: {full_path}")
-                blob = self.bucket.blob(full_path)
-            else:
-                logger.error(f"PDF not found in GCS: {pdf_filename}")
-                raise NotFound(f"PDF '{pdf_filename}' not found in bucket '{self.bucket_name}'")
+        signed_url, expiration = self._signed_url_for(blob, expiration_minutes)
         
-        # Calculate expiration
-        expiration = datetime.utcnow() + timedelta(minutes=expiration_minutes)
+        logger.info(f"✅ Signed URL for '{pdf_filename}', expires at {expiration.isoformat()}Z")
+        
+        return signed_url, expiration
+    
+    def _signed_url_for(self, blob, expiration_minutes: int) -> tuple[str, datetime]:
+        """
+        Signed URL for a blob, reusing a cached one that is still valid long enough.
+        
+        Expirations are rounded up to SIGNED_URL_BUCKET_MINUTES, so every request
+        for the same PDF within that window gets the same URL (and the browser
+        can reuse its cached copy of the PDF).
+        """
+        now = time.time()
+        needed = now + expiration_minutes * 60
+        
+        with self._signed_url_lock:
+            cached = self._signed_urls.get(blob.name)
+            if cached and cached[1] >= needed:
+                self._signed_urls.move_to_end(blob.name)
+                self.signed_url_stats['hits'] += 1
+                return cached[0], datetime.fromtimestamp(cached[1], timezone.utc).replace(tzinfo=None)
+        
+        step = self.signed_url_bucket_minutes * 60
+        expires_at = math.ceil(needed / step) * step if step > 0 else needed
+        if expires_at - now > MAX_SIGNED_URL_SECONDS:
+            expires_at = needed
+        # Naive UTC, as datetime.utcnow() returned before
+        expiration = datetime.fromtimestamp(expires_at, timezone.utc).replace(tzinfo=None)
         
         # Generate signed URL (v4 for better security)
-        # Signed URLs require service account credentials with private key
-        # OAuth user credentials don't have private keys, so they can't sign URLs
+        # Signed locally with the service account key - no API round trip
+        signed_url = blob.generate_signed_url(
+            version='v4',
+            expiration=expiration,
+            method='GET',
+            response_type='application/pdf',
+            credentials=self._get_signing_credentials()
+        )
+        
+        with self._signed_url_lock:
+            self._signed_urls[blob.name] = (signed_url, expires_at)
+            self._signed_urls.move_to_end(blob.name)
+            while len(self._signed_urls) > self.signed_url_cache_size:
+                self._signed_urls.popitem(last=False)
+            self.signed_url_stats['signed'] += 1
+        
+        return signed_url, expiration
+    
+    def _get_signing_credentials(self):
+        """
+        Service account credentials for URL signing (loaded once per key file).
+        
+        Signed URLs require service account credentials with private key.
+        OAuth user credentials don't have private keys, so they can't sign URLs.
+        
+        Returns:
+            Credentials, or None for a local bucket (its URLs aren't signed)
+            
+        Raises:
+            ValueError: If no service account key file is available
+        """
         service_account_file = self._service_account_creds
         if not service_account_file:
             # Try to get from environment (in case it was set after initialization)
@@ -232,6 +317,9 @@ class GCSService:
             service_account_file = os.path.abspath(service_account_file)
         
         if not service_account_file or not os.path.exists(service_account_file):
+            if isinstance(self.client, LocalStorageClient):
+                return None
+            
             # Provide helpful error message
             env_value = os.getenv('GOOGLE_APPLICATION_CREDENTIALS', 'Not set')
             error_msg = (
@@ -255,31 +343,14 @@ class GCSService:
             logger.error(error_msg)
             raise ValueError(error_msg)
         
-        # Use service account credentials for signing
-        if self._service_account_creds and self._service_account_creds == service_account_file:
-            # Use existing service account client
-            signed_url = blob.generate_signed_url(
-                version='v4',
-                expiration=expiration,
-                method='GET',
-                response_type='application/pdf'
-            )
-        else:
-            # Create a new client with service account for signing
-            signing_client = storage.Client.from_service_account_json(service_account_file)
-            # Get the blob path (name) from the original blob
-            blob_path = blob.name
-            signing_blob = signing_client.bucket(self.bucket_name).blob(blob_path)
-            signed_url = signing_blob.generate_signed_url(
-                version='v4',
-                expiration=expiration,
-                method='GET',
-                response_type='application/pdf'
-            )
-        
-        logger.info(f"✅ Generated signed URL for '{pdf_filename}', expires at {expiration.isoformat()}Z")
-        
-        return signed_url, expiration
+        with self._signed_url_lock:
+            if self._signing_credentials_file != service_account_file:
+                self._signing_credentials = service_account.Credentials.from_service_account_file(
+                    service_account_file
+                )
+                self._signing_credentials_file = service_account_file
+                logger.info(f"🔑 Loaded URL signing credentials from {service_account_file}")
+            return self._signing_credentials
     
     def fetch_pdf_bytes(self, doc_id: str) -> bytes:
         """
@@ -298,27 +369,30 @@ class GCSService:
         
         logger.info(f"Fetching PDF bytes for '{pdf_filename}'")
         
-        blob = self.bucket.blob(pdf_filename)
-        
-        # If not found at root, search recursively  
-        if not blob.exists():
-            logger.warning(f"PDF not found at root, searching recursively...")
-            full_path = self.find_pdf_in_bucket(pdf_filename)
-            
-            if full_path:
-                logger.info(f"📁 Found PDF at nested path: {full_path}")
-                blob = self.bucket.blob(full_path)
-            else:
-                logger.error(f"PDF not found in GCS: {pdf_filename}")
-                raise NotFound(f"PDF '{pdf_filename}' not found in bucket '{self.bucket_name}'")
-        
-        # Download as bytes
-        pdf_bytes = blob.download_as_bytes()
+        pdf_bytes = self.pdf_cache.read_bytes(self.get_cached_pdf(doc_id))
         
         logger.info(f"✅ Fetched {len(pdf_bytes):,} bytes for '{pdf_filename}'")
         
         return pdf_bytes
     
+    def get_cached_pdf(self, doc_id: str, source_hint: Optional[str] = None) -> CachedPdf:
+        """
+        Locally cached copy of a doc_id's PDF (downloaded only if missing or changed).
+        
+        Args:
+            doc_id: Qdrant doc_id
+            source_hint: Optional source/filename hint from metadata
+            
+        Returns:
+            CachedPdf (stream it with pdf_cache.iter_range)
+            
+        Raises:
+            NotFound: If PDF doesn't exist
+        """
+        blob_path = self.resolve_blob_path(doc_id, source_hint)
+        generation, _ = self.blob_index.stamp(blob_path)
+        return self.pdf_cache.get(self.bucket.blob(blob_path), generation=generation)
+    
     def pdf_exists(self, doc_id: str) -> bool:
         """
         Check if a PDF exists in GCS.
@@ -329,9 +403,11 @@ class GCSService:
         Returns:
             True if PDF exists, False otherwise
         """
-        pdf_filename = doc_id_to_pdf_filename(doc_id)
-        blob = self.bucket.blob(pdf_filename)
-        return blob.exists()
+        try:
+            self.resolve_blob_path(doc_id)
+            return True
+        except NotFound:
+            return False
 
 
 # Global singleton instance (initialized lazily)
@@ -0,0 +1,135 @@
+"""
+Filesystem-backed stand-in for the google.cloud.storage client.
+
+Implements the subset GCSService uses (bucket/blob lookup, listing, metadata,
+ranged downloads, signed URLs) on top of a local directory, where each bucket
+is a subdirectory. Used for local development without GCS credentials
+(GCS_LOCAL_ROOT=/path/to/dir) and for exercising the PDF paths offline:
+
+    client = LocalStorageClient("/tmp/buckets")
+    service = GCSService(bucket_name="docs", client=client)
+"""
+
+import hashlib
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+from urllib.parse import quote
+
+from google.cloud.exceptions import NotFound
+
+
+class LocalBlob:
+    """A file under the bucket directory, addressed by its relative path."""
+
+    def __init__(self, bucket: "LocalBucket", name: str):
+        self.bucket = bucket
+        self.name = name
+        self.generation: Optional[int] = None
+        self.updated: Optional[datetime] = None
+        self.size: Optional[int] = None
+        self.etag: Optional[str] = None
+
+    @property
+    def _path(self) -> Path:
+        return self.bucket.root / self.name
+
+    def exists(self, client=None) -> bool:
+        return self._path.is_file()
+
+    def reload(self, client=None):
+        """Load generation/updated/size/etag (raises NotFound)."""
+        try:
+            stat = self._path.stat()
+        except FileNotFoundError:
+            raise NotFound(f"No such object: {self.bucket.name}/{self.name}")
+        self.generation = stat.st_mtime_ns
+        self.updated = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+        self.size = stat.st_size
+        self.etag = hashlib.md5(f"{self.name}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()
+
+    def _check_generation(self, if_generation_match: Optional[int]):
+        if if_generation_match is not None:
+            self.reload()
+            if self.generation != if_generation_match:
+                # GCS answers 412 Precondition Failed; close enough for callers that re-resolve
+                raise NotFound(f"Generation mismatch for {self.name}")
+
+    def download_as_bytes(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        if_generation_match: Optional[int] = None,
+        **kwargs
+    ) -> bytes:
+        """Object bytes; start/end are inclusive offsets as in GCS."""
+        self._check_generation(if_generation_match)
+        if not self.exists():
+            raise NotFound(f"No such object: {self.bucket.name}/{self.name}")
+        with open(self._path, 'rb') as f:
+            offset = start or 0
+            f.seek(offset)
+            if end is None:
+                return f.read()
+            return f.read(max(0, end - offset + 1))
+
+    def download_to_filename(self, filename: str, if_generation_match: Optional[int] = None, **kwargs):
+        self._check_generation(if_generation_match)
+        if not self.exists():
+            raise NotFound(f"No such object: {self.bucket.name}/{self.name}")
+        shutil.copyfile(self._path, filename)
+
+    def upload_from_string(self, data, content_type: Optional[str] = None):
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._path, 'wb') as f:
+            f.write(data.encode('utf-8') if isinstance(data, str) else data)
+
+    def generate_signed_url(self, expiration=None, credentials=None, **kwargs) -> str:
+        """file:// URL carrying the expiry (no real signature)."""
+        expires = int(expiration.timestamp()) if hasattr(expiration, 'timestamp') else expiration
+        return f"{self._path.resolve().as_uri()}?X-Local-Expires={quote(str(expires))}"
+
+
+class LocalBucket:
+    """Directory acting as a bucket."""
+
+    def __init__(self, root: Path, name: str):
+        self.root = Path(root) / name
+        self.name = name
+
+    def blob(self, name: str) -> LocalBlob:
+        return LocalBlob(self, name)
+
+    def get_blob(self, name: str, **kwargs) -> Optional[LocalBlob]:
+        blob = self.blob(name)
+        try:
+            blob.reload()
+        except NotFound:
+            return None
+        return blob
+
+
+class LocalStorageClient:
+    """Drop-in for storage.Client over a local directory of buckets."""
+
+    def __init__(self, root: str):
+        self.root = Path(os.path.expanduser(root))
+
+    def bucket(self, bucket_name: str) -> LocalBucket:
+        return LocalBucket(self.root, bucket_name)
+
+    def list_blobs(self, bucket_or_name, prefix: Optional[str] = None, **kwargs) -> Iterator[LocalBlob]:
+        bucket = bucket_or_name if isinstance(bucket_or_name, LocalBucket) else self.bucket(bucket_or_name)
+        if not bucket.root.is_dir():
+            return
+        for path in sorted(bucket.root.rglob('*')):
+            if not path.is_file():
+                continue
+            name = path.relative_to(bucket.root).as_posix()
+            if prefix and not name.startswith(prefix):
+                continue
+            blob = bucket.blob(name)
+            blob.reload()
+            yield blob
@@ -0,0 +1,215 @@
+"""
+Per-document page-text index for snippet location.
+
+Built once per PDF version (one pdfplumber pass) and saved as gzipped JSON,
+so locating a snippet afterwards never opens the PDF. The index holds:
+
+- normalized text per page (pdf_utils.normalize_text, as before)
+- each page's character offsets in the normalized document text
+- postings: token → pages containing it
+
+Lookup gives the same answer as the old page-by-page scan: the first page
+where an exact match, a 50-character prefix match or a >70% token overlap
+succeeds. Postings narrow the pages to check: snippet tokens other than the
+first and last (which may be cut mid-word) must all occur on a page for a
+substring match to be possible there.
+"""
+
+import bisect
+import gzip
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from retrieval_v3.utils.pdf_utils import normalize_text
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+# Matching thresholds (unchanged from the page-by-page scan)
+PREFIX_CHARS = 50
+MIN_PREFIX_CHARS = 20
+MIN_OVERLAP_TOKEN_LEN = 4
+MIN_OVERLAP_TOKENS = 6
+OVERLAP_RATIO = 0.7
+
+
+class PageIndex:
+    """Normalized page texts of one PDF with token postings."""
+
+    def __init__(self, pages: List[str], postings: Optional[Dict[str, List[int]]] = None):
+        """
+        Args:
+            pages: Normalized text per page ('' for pages without text)
+            postings: token → 1-based page numbers (built if not given)
+        """
+        self.pages = pages
+        self.offsets: List[int] = []
+        position = 0
+        for page_text in pages:
+            self.offsets.append(position)
+            position += len(page_text) + 1  # pages joined with a single space
+        if postings is None:
+            postings = {}
+            for page_num, page_text in enumerate(pages, start=1):
+                for token in set(page_text.split()):
+                    postings.setdefault(token, []).append(page_num)
+        self.postings = postings
+
+    @property
+    def total_pages(self) -> int:
+        return len(self.pages)
+
+    @classmethod
+    def from_page_texts(cls, page_texts: Iterable[Optional[str]]) -> "PageIndex":
+        """Build from raw extracted text per page."""
+        return cls([normalize_text(text) if text else '' for text in page_texts])
+
+    def to_dict(self) -> Dict:
+        return {'version': INDEX_VERSION, 'pages': self.pages, 'postings': self.postings}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PageIndex":
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported page index version: {data.get('version')}")
+        return cls(data['pages'], data.get('postings'))
+
+    def page_for_offset(self, offset: int) -> int:
+        """1-based page containing a character offset of the normalized document text."""
+        return max(1, bisect.bisect_right(self.offsets, offset))
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def _pages_with(self, tokens: Iterable[str]) -> Set[int]:
+        """Pages containing every token (all pages if there are none)."""
+        candidates = None
+        for token in sorted(set(tokens), key=lambda t: len(self.postings.get(t, ()))):
+            pages = self.postings.get(token)
+            if not pages:
+                return set()
+            candidates = set(pages) if candidates is None else candidates.intersection(pages)
+            if not candidates:
+                return candidates
+        return set(range(1, self.total_pages + 1)) if candidates is None else candidates
+
+    def _substring_pages(self, needle: str) -> Set[int]:
+        # First and last tokens may be partial words; inner tokens are whole
+        inner_tokens = needle.split()[1:-1]
+        return {
+            page_num for page_num in self._pages_with(inner_tokens)
+            if needle in self.pages[page_num - 1]
+        }
+
+    def _overlap_pages(self, snippet_tokens: Set[str]) -> Set[int]:
+        counts: Dict[int, int] = {}
+        for token in snippet_tokens:
+            for page_num in self.postings.get(token, ()):
+                counts[page_num] = counts.get(page_num, 0) + 1
+        return {
+            page_num for page_num, count in counts.items()
+            if count / len(snippet_tokens) > OVERLAP_RATIO
+        }
+
+    def locate(self, normalized_snippet: str) -> Dict:
+        """
+        Find the first page matching a normalized snippet.
+
+        Returns:
+            Dict with page (None if not found), found, normalized_snippet,
+            total_pages and match_confidence ('exact', 'medium', 'low', 'none')
+        """
+        matches = []  # (page, strategy rank, confidence, reported snippet)
+
+        exact = self._substring_pages(normalized_snippet)
+        if exact:
+            matches.append((min(exact), 0, 'exact', normalized_snippet))
+
+        snippet_start = normalized_snippet[:PREFIX_CHARS]
+        if len(snippet_start) > MIN_PREFIX_CHARS:
+            prefix = self._substring_pages(snippet_start)
+            if prefix:
+                matches.append((min(prefix), 1, 'medium', snippet_start))
+
+        snippet_tokens = set(word for word in normalized_snippet.split() if len(word) >= MIN_OVERLAP_TOKEN_LEN)
+        if len(snippet_tokens) >= MIN_OVERLAP_TOKENS:
+            overlap = self._overlap_pages(snippet_tokens)
+            if overlap:
+                matches.append((min(overlap), 2, 'low', normalized_snippet))
+
+        if not matches:
+            return {
+                'page': None,
+                'found': False,
+                'normalized_snippet': normalized_snippet,
+                'total_pages': self.total_pages,
+                'match_confidence': 'none'
+            }
+
+        page_num, _, confidence, reported = min(matches)
+        return {
+            'page': page_num,
+            'found': True,
+            'normalized_snippet': reported,
+            'total_pages': self.total_pages,
+            'match_confidence': confidence
+        }
+
+
+class PageIndexStore:
+    """Saved page indexes (gzipped JSON) with an in-memory LRU."""
+
+    def __init__(self, index_dir: str = "cache/page_index", max_memory_entries: int = 64):
+        self.index_dir = Path(index_dir)
+        self.max_memory_entries = max_memory_entries
+        self._memory: "OrderedDict[str, PageIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.index_dir / f"{key}.json.gz"
+
+    def get(self, key: str) -> Optional[PageIndex]:
+        """Index for a PDF version key, or None."""
+        with self._lock:
+            index = self._memory.get(key)
+            if index is not None:
+                self._memory.move_to_end(key)
+                return index
+
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                index = PageIndex.from_dict(json.load(f))
+        except Exception as e:
+            logger.warning(f"⚠️ Ignoring unreadable page index {path.name}: {e}")
+            return None
+        self._remember(key, index)
+        return index
+
+    def put(self, key: str, index: PageIndex):
+        """Save an index (atomically) and keep it in memory."""
+        self._remember(key, index)
+        try:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                json.dump(index.to_dict(), f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not save page index {key}: {e}")
+
+    def _remember(self, key: str, index: PageIndex):
+        with self._lock:
+            self._memory[key] = index
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
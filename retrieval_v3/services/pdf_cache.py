@@ -0,0 +1,393 @@
+"""
+Bounded PDF cache for GCS blobs: on disk, with a small in-memory tier.
+
+Every locate-snippet request used to download the whole PDF into memory.
+Now a PDF is downloaded once (to a temp file, then renamed into place) and
+served from disk, in chunks or byte ranges, until its GCS generation changes.
+
+Validation uses the generation recorded by the blob index, so a cached hit
+normally costs no GCS round trip. When the index has no stamp for a path, the
+blob metadata is reloaded at most every `revalidate_seconds`.
+
+Concurrent requests for the same uncached PDF share one download
+(SingleFlight). Disk and memory use are bounded; the least recently used
+PDFs are evicted first. Each generation gets its own file name, so a newer
+download never overwrites a file in use, and iter_range() opens the file
+before returning. A PDF evicted or replaced while it is being streamed
+stays readable through that handle, so the body matches the headers.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from retrieval_v3.utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Temp files older than this at startup are leftovers of interrupted downloads
+# (younger ones may belong to another worker process still downloading)
+STALE_TMP_SECONDS = 3600
+
+
+@dataclass
+class CachedPdf:
+    """One cached PDF version."""
+    blob_path: str
+    file_path: Path
+    size: int
+    generation: Optional[int]
+    etag: str
+    validated_at: float = 0.0
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range HTTP Range header.
+
+    Args:
+        header: Range header value (e.g. 'bytes=0-1023', 'bytes=-500')
+        size: Resource size in bytes
+
+    Returns:
+        Inclusive (start, end), or None to serve the whole file
+        (no header, or a form we don't serve partially, such as multi-range)
+
+    Raises:
+        ValueError: If the range is unsatisfiable (HTTP 416)
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    start_text, _, end_text = header[len('bytes='):].strip().partition('-')
+    try:
+        if not start_text:
+            # Suffix range: last N bytes
+            length = int(end_text)
+            if length <= 0:
+                raise ValueError(f"Unsatisfiable range: {header}")
+            return max(0, size - length), size - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        raise ValueError(f"Unsatisfiable range: {header}")
+    if start >= size or end < start:
+        raise ValueError(f"Unsatisfiable range: {header}")
+    return start, min(end, size - 1)
+
+
+class PdfCache:
+    """Disk + memory LRU cache of PDF blobs, keyed by blob path."""
+
+    def __init__(
+        self,
+        cache_dir: str = "cache/pdf_cache",
+        max_disk_bytes: int = 2 * 1024 ** 3,
+        max_memory_bytes: int = 128 * 1024 ** 2,
+        max_memory_item_bytes: int = 8 * 1024 ** 2,
+        revalidate_seconds: float = 300.0
+    ):
+        """
+        Initialize cache (picks up PDFs cached by earlier runs).
+
+        Args:
+            cache_dir: Directory for cached PDFs and their metadata
+            max_disk_bytes: Disk budget
+            max_memory_bytes: Memory budget for the hot tier
+            max_memory_item_bytes: PDFs larger than this are only kept on disk
+            revalidate_seconds: Reload blob metadata at most this often when the
+                caller can't supply the current generation
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self.max_memory_item_bytes = max_memory_item_bytes
+        self.revalidate_seconds = revalidate_seconds
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CachedPdf]" = OrderedDict()
+        self._disk_bytes = 0
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._downloads = SingleFlight("pdf_cache")
+        self.stats = {'hits': 0, 'memory_hits': 0, 'downloads': 0, 'revalidations': 0, 'evictions': 0}
+
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _key(self, blob_path: str) -> str:
+        return hashlib.sha256(blob_path.encode('utf-8')).hexdigest()
+
+    def _file_path(self, blob_path: str, generation: Optional[int]) -> Path:
+        return self.cache_dir / f"{self._key(blob_path)}.{generation}.pdf"
+
+    def _load(self):
+        for tmp_path in self.cache_dir.glob('*.tmp'):
+            try:
+                if time.time() - tmp_path.stat().st_mtime > STALE_TMP_SECONDS:
+                    tmp_path.unlink()
+            except OSError:
+                pass
+
+        loaded = []
+        for meta_path in self.cache_dir.glob('*.json'):
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                file_path = meta_path.with_suffix('.pdf')
+                stat = file_path.stat()
+                if stat.st_size != meta['size']:
+                    raise ValueError("size mismatch")
+                loaded.append((stat.st_atime, CachedPdf(
+                    blob_path=meta['blob_path'],
+                    file_path=file_path,
+                    size=meta['size'],
+                    generation=meta.get('generation'),
+                    etag=meta['etag'],
+                )))
+            except Exception:
+                # Orphaned or torn entry
+                meta_path.unlink(missing_ok=True)
+                meta_path.with_suffix('.pdf').unlink(missing_ok=True)
+
+        for _, entry in sorted(loaded, key=lambda item: item[0]):
+            old = self._entries.pop(entry.blob_path, None)
+            if old is not None:
+                # Two versions of one blob (interrupted cleanup): keep the newer
+                if (old.generation or 0) > (entry.generation or 0):
+                    old, entry = entry, old
+                self._disk_bytes -= old.size
+                self._delete_files(old)
+            self._entries[entry.blob_path] = entry
+            self._disk_bytes += entry.size
+        if loaded:
+            logger.info(f"📦 PDF cache: {len(loaded)} PDFs ({self._disk_bytes / 1024 ** 2:.1f} MB) in {self.cache_dir}")
+        with self._lock:
+            self._evict_disk()
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def get(self, blob, generation: Optional[int] = None) -> CachedPdf:
+        """
+        Cached PDF for a blob, downloading it if missing or stale.
+
+        Args:
+            blob: Storage blob (google.cloud.storage.Blob or LocalBlob)
+            generation: Current generation if known (e.g. from the blob index);
+                None means revalidate against blob metadata when due
+
+        Returns:
+            CachedPdf for the current version
+
+        Raises:
+            NotFound: If the blob doesn't exist
+        """
+        blob_path = blob.name
+        with self._lock:
+            entry = self._entries.get(blob_path)
+
+        if entry is not None and entry.file_path.exists():
+            if generation is None and time.time() - entry.validated_at > self.revalidate_seconds:
+                blob.reload()
+                generation = blob.generation
+                self.stats['revalidations'] += 1
+                entry.validated_at = time.time()
+            if generation is None or generation == entry.generation:
+                with self._lock:
+                    if blob_path in self._entries:
+                        self._entries.move_to_end(blob_path)
+                self.stats['hits'] += 1
+                return entry
+
+        return self._downloads.do(blob_path, self._download, blob, generation)
+
+    def _download(self, blob, generation: Optional[int]) -> CachedPdf:
+        start = time.time()
+        key = self._key(blob.name)
+        tmp_path = self.cache_dir / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        try:
+            # Pin the generation so metadata and bytes describe the same version
+            if generation is not None:
+                try:
+                    blob.download_to_filename(str(tmp_path), if_generation_match=generation)
+                except Exception as e:
+                    # The caller's generation may be stale (blob replaced since the index refresh)
+                    logger.info(f"Generation {generation} of '{blob.name}' not downloadable ({e}), reloading")
+                    generation = None
+            if generation is None:
+                blob.reload()
+                generation = blob.generation
+                blob.download_to_filename(str(tmp_path), if_generation_match=generation)
+            size = tmp_path.stat().st_size
+            etag = f'"{key[:16]}-{generation}"'
+            file_path = self._file_path(blob.name, generation)
+            os.replace(tmp_path, file_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+        entry = CachedPdf(
+            blob_path=blob.name,
+            file_path=file_path,
+            size=size,
+            generation=generation,
+            etag=etag,
+            validated_at=time.time(),
+        )
+        with open(file_path.with_suffix('.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'blob_path': entry.blob_path,
+                'size': entry.size,
+                'generation': entry.generation,
+                'etag': entry.etag,
+            }, f)
+
+        with self._lock:
+            old = self._entries.pop(blob.name, None)
+            if old is not None:
+                self._disk_bytes -= old.size
+                self._drop_memory(blob.name)
+                if old.file_path != file_path:
+                    # Open handles on the previous version keep streaming it
+                    self._delete_files(old)
+            self._entries[blob.name] = entry
+            self._disk_bytes += size
+            self._evict_disk(keep=blob.name)
+        self.stats['downloads'] += 1
+        logger.info(f"📥 Cached PDF '{blob.name}' ({size:,} bytes) in {time.time() - start:.2f}s")
+        return entry
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def read_bytes(self, entry: CachedPdf) -> bytes:
+        """Whole PDF (memory tier first)."""
+        with self._lock:
+            data = self._memory.get(entry.blob_path)
+            if data is not None:
+                self._memory.move_to_end(entry.blob_path)
+                self.stats['memory_hits'] += 1
+                return data
+        with open(entry.file_path, 'rb') as f:
+            data = f.read()
+        self._remember(entry, data)
+        return data
+
+    def iter_range(
+        self,
+        entry: CachedPdf,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """
+        Bytes start..end (inclusive) as an iterator of chunks.
+
+        Served from the memory tier when the PDF is there, otherwise streamed
+        from disk, so memory use doesn't grow with the PDF size. The source
+        is pinned before this returns (memory copy or open file handle):
+        call it before sending headers, and later eviction can't cut the
+        response short.
+
+        Raises:
+            FileNotFoundError: If the PDF was evicted since get() returned it
+        """
+        end = entry.size - 1 if end is None else end
+        with self._lock:
+            data = self._memory.get(entry.blob_path)
+            if data is not None:
+                self._memory.move_to_end(entry.blob_path)
+                self.stats['memory_hits'] += 1
+
+        if data is not None:
+            return self._iter_memory(data, start, end, chunk_size)
+        return self._iter_file(entry, open(entry.file_path, 'rb'), start, end, chunk_size)
+
+    @staticmethod
+    def _iter_memory(data: bytes, start: int, end: int, chunk_size: int) -> Iterator[bytes]:
+        view = memoryview(data)
+        for offset in range(start, end + 1, chunk_size):
+            yield bytes(view[offset:min(offset + chunk_size, end + 1)])
+
+    def _iter_file(self, entry: CachedPdf, f, start: int, end: int, chunk_size: int) -> Iterator[bytes]:
+        # Small PDFs are promoted to memory once read whole
+        promote = start == 0 and end == entry.size - 1 and entry.size <= self.max_memory_item_bytes
+        parts = [] if promote else None
+        with f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                if parts is not None:
+                    parts.append(chunk)
+                yield chunk
+        if parts is not None and remaining == 0:
+            self._remember(entry, b"".join(parts))
+
+    # ------------------------------------------------------------------
+    # Eviction (called with the lock held unless noted)
+    # ------------------------------------------------------------------
+
+    def _remember(self, entry: CachedPdf, data: bytes):
+        if len(data) > self.max_memory_item_bytes or len(data) > self.max_memory_bytes:
+            return
+        with self._lock:
+            current = self._entries.get(entry.blob_path)
+            if current is not entry or entry.blob_path in self._memory:
+                return
+            self._memory[entry.blob_path] = data
+            self._memory_bytes += len(data)
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def _drop_memory(self, blob_path: str):
+        data = self._memory.pop(blob_path, None)
+        if data is not None:
+            self._memory_bytes -= len(data)
+
+    def _evict_disk(self, keep: Optional[str] = None):
+        while self._disk_bytes > self.max_disk_bytes and len(self._entries) > 1:
+            blob_path, entry = next(iter(self._entries.items()))
+            if blob_path == keep:
+                self._entries.move_to_end(blob_path)
+                continue
+            del self._entries[blob_path]
+            self._disk_bytes -= entry.size
+            self._drop_memory(blob_path)
+            self._delete_files(entry)
+            self.stats['evictions'] += 1
+
+    @staticmethod
+    def _delete_files(entry: CachedPdf):
+        entry.file_path.with_suffix('.json').unlink(missing_ok=True)
+        entry.file_path.unlink(missing_ok=True)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                **self.stats,
+                'disk_entries': len(self._entries),
+                'disk_mb': round(self._disk_bytes / 1024 ** 2, 1),
+                'memory_entries': len(self._memory),
+                'memory_mb': round(self._memory_bytes / 1024 ** 2, 1),
+            }
@@ -3,11 +3,14 @@ PDF text extraction and snippet location service.
 
 Handles:
 - On-demand PDF text extraction using pdfplumber
-- Page-by-page snippet location with early termination
+- Snippet location through a saved per-document page index (built with one
+  pdfplumber pass on first access, see page_index.py)
 - Text normalization for robust matching
 """
 
 import io
+import os
+import hashlib
 import logging
 from typing import Optional, Dict
 from functools import lru_cache
@@ -15,6 +18,7 @@ from functools import lru_cache
 import pdfplumber
 
 from retrieval_v3.utils.pdf_utils import normalize_text
+from retrieval_v3.services.page_index import PageIndex, PageIndexStore
 
 logger = logging.getLogger(__name__)
 
@@ -22,25 +26,60 @@ logger = logging.getLogger(__name__)
 class PDFService:
     """Service for PDF text extraction and snippet location."""
     
-    def __init__(self):
-        """Initialize PDF service."""
+    def __init__(self, index_dir: Optional[str] = None):
+        """
+        Initialize PDF service.
+        
+        Args:
+            index_dir: Where page indexes are saved (defaults to PAGE_INDEX_DIR
+                env var or cache/page_index)
+        """
+        self.page_indexes = PageIndexStore(
+            index_dir or os.getenv('PAGE_INDEX_DIR', os.path.join('cache', 'page_index'))
+        )
         logger.info("PDF Service initialized")
     
+    def get_page_index(self, pdf_bytes: bytes, index_key: Optional[str] = None) -> PageIndex:
+        """
+        Page index for a PDF, built (one pdfplumber pass) and saved on first access.
+        
+        Args:
+            pdf_bytes: PDF file bytes
+            index_key: Key identifying this PDF version (e.g. the PDF cache
+                ETag); defaults to a hash of the bytes
+            
+        Returns:
+            PageIndex
+        """
+        key = hashlib.sha256(index_key.encode('utf-8') if index_key else pdf_bytes).hexdigest()
+        index = self.page_indexes.get(key)
+        if index is not None:
+            return index
+        
+        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+            index = PageIndex.from_page_texts(page.extract_text() for page in pdf.pages)
+        logger.info(f"📑 Built page index: {index.total_pages} pages, {len(index.postings):,} tokens")
+        self.page_indexes.put(key, index)
+        return index
+    
     def locate_snippet_in_pdf(
         self, 
         pdf_bytes: bytes, 
         snippet: str,
-        doc_id: Optional[str] = None
+        doc_id: Optional[str] = None,
+        index_key: Optional[str] = None
     ) -> Dict:
         """
         Locate a text snippet within a PDF document.
         
-        Uses page-by-page extraction with early termination for performance.
+        Looks the snippet up in the PDF's page index; the PDF itself is only
+        parsed the first time it is seen.
         
         Args:
             pdf_bytes: PDF file bytes
             snippet: Text snippet to locate
             doc_id: Optional doc_id for logging
+            index_key: Optional key identifying this PDF version (see get_page_index)
             
         Returns:
             Dict with keys:
@@ -48,7 +87,7 @@ class PDFService:
                 - found: bool
                 - normalized_snippet: str
                 - total_pages: int
-                - match_confidence: str ('exact' or 'none')
+                - match_confidence: str ('exact', 'medium', 'low' or 'none')
         """
         doc_label = doc_id or "PDF"
         logger.info(f"Locating snippet in {doc_label} (snippet length: {len(snippet)} chars)")
@@ -68,82 +107,28 @@ class PDFService:
             }
         
         try:
-            # Open PDF from bytes
-            pdf_file = io.BytesIO(pdf_bytes)
+            index = self.get_page_index(pdf_bytes, index_key)
+            result = index.locate(normalized_snippet)
+            total_pages = index.total_pages
             
-            with pdfplumber.open(pdf_file) as pdf:
-                total_pages = len(pdf.pages)
-                logger.info(f"📄 PDF has {total_pages} pages")
-                
-                # Search page by page (early termination)
-                for page_num, page in enumerate(pdf.pages, start=1):
-                    # Extract text from page
-                    page_text = page.extract_text()
-                    
-                    if not page_text:
-                        logger.debug(f"Page {page_num}: No text extracted (might be scanned)")
-                        continue
-                    
-                    # Normalize page text
-                    normalized_page_text = normalize_text(page_text)
-                    
-                    # Strategy 1: Exact Normalized Match
-                    if normalized_snippet in normalized_page_text:
-                        logger.info(f"✅ Snippet found on page {page_num}/{total_pages} (Exact Match)")
-                        return {
-                            'page': page_num,
-                            'found': True,
-                            'normalized_snippet': normalized_snippet,
-                            'total_pages': total_pages,
-                            'match_confidence': 'exact'
-                        }
-                    
-                    # Strategy 2: Partial Match (First 50 chars)
-                    # Often the beginning of a citation is consistent even if the end is cut off or different
-                    snippet_start = normalized_snippet[:50]
-                    if len(snippet_start) > 20 and snippet_start in normalized_page_text:
-                        logger.info(f"✅ Snippet found on page {page_num}/{total_pages} (Partial Start Match)")
-                        return {
-                            'page': page_num,
-                            'found': True,
-                            'normalized_snippet': snippet_start, # Return what was found
-                            'total_pages': total_pages,
-                            'match_confidence': 'medium'
-                        }
-
-                    # Strategy 3: Token Overlap (Bag of Words)
-                    # If > 70% of unique significant words in snippet are present in page
-                    snippet_tokens = set(word for word in normalized_snippet.split() if len(word) > 3)
-                    if len(snippet_tokens) > 5:
-                        page_tokens = set(normalized_page_text.split())
-                        common_tokens = snippet_tokens.intersection(page_tokens)
-                        overlap_ratio = len(common_tokens) / len(snippet_tokens)
-                        
-                        if overlap_ratio > 0.7:
-                            logger.info(f"✅ Snippet found on page {page_num}/{total_pages} (Token Overlap: {overlap_ratio:.2f})")
-                            return {
-                                'page': page_num,
-                                'found': True,
-                                'normalized_snippet': normalized_snippet,
-                                'total_pages': total_pages,
-                                'match_confidence': 'low'
-                            }
-                    
-                    # Log progress every 10 pages
-                    if page_num % 10 == 0:
-                        logger.debug(f"Searched {page_num}/{total_pages} pages...")
-                
-                # If not found, return page 1 but indicate not found
-                # This ensures the viewer opens even if snippet isn't located
-                logger.warning(f"❌ Snippet NOT found in {total_pages} pages. Defaulting to page 1.")
-                return {
-                    'page': 1,
-                    'found': False, 
-                    'normalized_snippet': normalized_snippet,
-                    'total_pages': total_pages,
-                    'match_confidence': 'none',
-                    'error': 'Snippet not found, defaulted to page 1'
-                }
+            if result['found']:
+                logger.info(
+                    f"✅ Snippet found on page {result['page']}/{total_pages} "
+                    f"({result['match_confidence']} match)"
+                )
+                return result
+            
+            # If not found, return page 1 but indicate not found
+            # This ensures the viewer opens even if snippet isn't located
+            logger.warning(f"❌ Snippet NOT found in {total_pages} pages. Defaulting to page 1.")
+            return {
+                'page': 1,
+                'found': False, 
+                'normalized_snippet': normalized_snippet,
+                'total_pages': total_pages,
+                'match_confidence': 'none',
+                'error': 'Snippet not found, defaulted to page 1'
+            }
         
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {e}", exc_info=True)
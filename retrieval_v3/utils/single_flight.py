@@ -0,0 +1,120 @@
+# Single-Flight - coalesce identical in-flight calls
+
+"""
+Single-Flight - Coalesce identical concurrent calls
+The first caller for a key runs the function; callers arriving while it is
+in flight wait and receive the same result (or exception). Nothing is kept
+after the call completes - caching stays with the query/embedding caches.
+"""
+
+import json
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """One in-flight call"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Thread-safe single-flight group"""
+
+    def __init__(self, name: str = "single_flight"):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.stats = {'leaders': 0, 'coalesced': 0, 'wait_timeouts': 0}
+
+    def do(
+        self,
+        key: Hashable,
+        fn: Callable,
+        *args,
+        wait_timeout: Optional[float] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Run fn(*args, **kwargs) once per key among concurrent callers
+
+        Args:
+            key: Canonical call key
+            fn: Function to run
+            wait_timeout: Max seconds a follower waits before running fn itself
+                (None = wait for the leader)
+
+        Returns:
+            fn's result (shared by all callers of the flight)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self.stats['leaders'] += 1
+                is_leader = True
+            else:
+                call.waiters += 1
+                self.stats['coalesced'] += 1
+                is_leader = False
+
+        if not is_leader:
+            if call.done.wait(wait_timeout):
+                if call.error is not None:
+                    raise call.error
+                return call.result
+            # Leader is too slow - run our own copy rather than fail
+            with self._lock:
+                self.stats['wait_timeouts'] += 1
+            logger.debug(f"[{self.name}] wait timeout, running call independently")
+            return fn(*args, **kwargs)
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+            if call.waiters:
+                logger.debug(f"[{self.name}] shared one call with {call.waiters} waiting caller(s)")
+
+    def in_flight(self) -> int:
+        """Number of keys currently in flight"""
+        with self._lock:
+            return len(self._calls)
+
+
+def query_flight_key(
+    normalized_query: str,
+    force_filter: Optional[Dict] = None,
+    custom_plan: Optional[Dict] = None,
+    **extra
+) -> str:
+    """
+    Canonical request key for retrieval coalescing
+
+    Same inputs as the query cache key (normalized query, filter, mode) plus
+    the remaining request parameters that change the result (rest of the
+    custom plan, top_k, forced verticals, external context).
+    """
+    payload = {
+        'query': normalized_query,
+        'filter': force_filter,
+        'plan': custom_plan or {},
+        'extra': {k: v for k, v in extra.items() if v is not None},
+    }
+    canonical = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
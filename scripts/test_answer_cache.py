@@ -0,0 +1,116 @@
+"""
+Test the answer cache: evidence fingerprinting, invalidation, bypass
+accounting and hit latency (temporary SQLite file, no LLM calls).
+"""
+
+import sys
+import time
+import types
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Load retrieval_v3 submodules without the package __init__ (which pulls in
+# the whole retrieval stack)
+_pkg = types.ModuleType("retrieval_v3")
+_pkg.__path__ = [str(PROJECT_ROOT / "retrieval_v3")]
+sys.modules.setdefault("retrieval_v3", _pkg)
+
+from retrieval_v3.answer_generation.answer_cache import AnswerCache, evidence_fingerprint
+
+
+def chunk(chunk_id, content):
+    return {'chunk_id': chunk_id, 'doc_id': chunk_id.split('#')[0], 'content': content, 'score': 0.9}
+
+
+RESULTS = [
+    chunk('go24#1', 'GO 24 sets teacher transfer norms for 2024.'),
+    chunk('go24#2', 'Transfers are processed through the online portal.'),
+]
+ANSWER = {
+    'answer': 'Teacher transfers follow GO 24 [1] and are processed online [2].',
+    'citations': [{'docId': 'GO 24', 'page': 1}],
+    'validation': {'is_valid': True, 'issues': [], 'quality_score': 0.9},
+}
+
+
+def new_cache(**kwargs):
+    return AnswerCache(db_path=str(Path(tempfile.mkdtemp()) / "answers.db"), **kwargs)
+
+
+def test_fingerprint():
+    print("\n1. Evidence fingerprint tracks chunk IDs, order and content")
+    print("=" * 50)
+    base = evidence_fingerprint(RESULTS)
+    assert base == evidence_fingerprint([dict(r, score=0.1) for r in RESULTS]), "scores don't matter"
+    assert base != evidence_fingerprint(RESULTS[::-1]), "order matters"
+    assert base != evidence_fingerprint([RESULTS[0], chunk('go24#2', 'Transfers are now manual.')])
+    objects = [types.SimpleNamespace(chunk_id=r['chunk_id'], content=r['content']) for r in RESULTS]
+    assert base == evidence_fingerprint(objects), "RetrievalResult objects and dicts agree"
+    print("✅ Passed")
+
+
+def test_hit_miss_and_invalidation():
+    print("\n2. Hits, misses and automatic invalidation")
+    print("=" * 50)
+    cache = new_cache()
+    assert cache.get("What are teacher transfer norms?", "qa", RESULTS) is None
+    cache.set("What are teacher transfer norms?", "qa", RESULTS, ANSWER)
+
+    start = time.time()
+    cached = cache.get("  what are TEACHER transfer norms ", "qa", RESULTS)
+    elapsed_ms = (time.time() - start) * 1000
+    assert cached == ANSWER
+    print(f"   hit served in {elapsed_ms:.2f}ms")
+    assert elapsed_ms < 50
+
+    assert cache.get("What are teacher transfer norms?", "deep_think", RESULTS) is None, "mode is part of the key"
+    assert cache.get("What are teacher transfer norms?", "qa", RESULTS, conversation_history=[{'role': 'user'}]) is None
+
+    changed = [RESULTS[0], chunk('go24#2', 'Transfers are now processed manually.')]
+    assert cache.get("What are teacher transfer norms?", "qa", changed) is None, "changed chunk misses"
+    cache.set("What are teacher transfer norms?", "qa", changed, dict(ANSWER, answer="new"))
+    assert cache.get("What are teacher transfer norms?", "qa", RESULTS) is None, "stale answer replaced"
+    assert cache.get("What are teacher transfer norms?", "qa", changed)['answer'] == "new"
+
+    assert cache.invalidate_chunks(['go24#1']) == 1
+    assert cache.get("What are teacher transfer norms?", "qa", changed) is None
+
+    cache.record_bypass()
+    stats = cache.get_stats()
+    print(f"   {stats}")
+    assert stats['hits'] == 2 and stats['bypassed'] == 1 and stats['stale'] >= 1
+    assert stats['entries'] == 0
+    print("✅ Passed")
+
+
+def test_expiry_and_bounds():
+    print("\n3. TTL expiry, LRU bound and disabled cache")
+    print("=" * 50)
+    cache = new_cache(ttl_seconds=0.2)
+    cache.set("q", "qa", RESULTS, ANSWER)
+    assert cache.get("q", "qa", RESULTS) == ANSWER
+    time.sleep(0.3)
+    assert cache.get("q", "qa", RESULTS) is None
+
+    cache = new_cache(max_entries=3)
+    for i in range(6):
+        cache.set(f"question {i}", "qa", RESULTS, ANSWER)
+    cache.evict()
+    assert cache.get_stats()['entries'] == 3
+
+    cache = new_cache(ttl_seconds=0)
+    cache.set("q", "qa", RESULTS, ANSWER)
+    assert cache.get("q", "qa", RESULTS) is None and cache.get_stats()['entries'] == 0
+    print("✅ Passed")
+
+
+if __name__ == "__main__":
+    print("🧪 Answer Cache")
+    test_fingerprint()
+    test_hit_miss_and_invalidation()
+    test_expiry_and_bounds()
+    print("\n🎉 All answer cache tests passed")
@@ -0,0 +1,241 @@
+"""
+Test concurrent page fetching against a local HTTP server.
+
+Pages are served with fixed delays; a batch should take about as long as its
+slowest page (or the deadline), not the sum of all pages.
+"""
+
+import sys
+import time
+import types
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Load retrieval_v3 submodules without the package __init__ (which pulls in
+# the whole retrieval stack)
+_pkg = types.ModuleType("retrieval_v3")
+_pkg.__path__ = [str(PROJECT_ROOT / "retrieval_v3")]
+sys.modules.setdefault("retrieval_v3", _pkg)
+_internet = types.ModuleType("retrieval_v3.internet")
+_internet.__path__ = [str(PROJECT_ROOT / "retrieval_v3" / "internet")]
+sys.modules.setdefault("retrieval_v3.internet", _internet)
+
+from internet_service.fetch import PageFetcher
+from retrieval_v3.internet.internet_crawler import InternetCrawler
+
+# path -> (delay seconds, body size in bytes)
+PAGES = {
+    "/fast-1": (0.2, 2_000),
+    "/fast-2": (0.3, 2_000),
+    "/medium": (0.6, 2_000),
+    "/slow": (0.9, 2_000),
+    "/very-slow": (5.0, 2_000),
+    "/huge": (0.1, 5_000_000),
+}
+
+
+# Page served with an ETag; conditional GETs with a matching one get a 304
+ETAG_PATH = "/etag"
+ETAG = '"v1"'
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == ETAG_PATH:
+            if self.headers.get("If-None-Match") == ETAG:
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = b"<html><body><p>Scheme guidelines</p></body></html>"
+            self.send_response(200)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path not in PAGES:
+            self.send_response(404)
+            self.end_headers()
+            return
+        delay, size = PAGES[self.path]
+        time.sleep(delay)
+        body = b"<html><body>" + b"x" * size + b"</body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client stopped reading (size cap)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_latency_bounded_by_slowest(base_url):
+    print("\n1. Batch latency ~ slowest page, not the sum")
+    print("=" * 50)
+    paths = ["/fast-1", "/fast-2", "/medium", "/slow"]
+    fetcher = PageFetcher(max_workers=8, per_host=8, timeout=5.0)
+
+    start = time.time()
+    results = fetcher.fetch_many([base_url + p for p in paths], deadline=5.0)
+    elapsed = time.time() - start
+
+    total = sum(PAGES[p][0] for p in paths)
+    slowest = max(PAGES[p][0] for p in paths)
+    print(f"   sum of delays: {total:.1f}s, slowest: {slowest:.1f}s, batch: {elapsed:.2f}s")
+    assert all(results.values()), "all pages should be fetched"
+    assert elapsed < slowest + 0.5, "batch should finish shortly after the slowest page"
+    print("✅ Passed")
+
+
+def test_deadline_returns_ready_pages(base_url):
+    print("\n2. Deadline returns finished pages, skips the rest")
+    print("=" * 50)
+    paths = ["/fast-1", "/medium", "/very-slow"]
+    fetcher = PageFetcher(max_workers=8, per_host=8, timeout=10.0)
+
+    start = time.time()
+    results = fetcher.fetch_many([base_url + p for p in paths], deadline=1.0)
+    elapsed = time.time() - start
+
+    print(f"   batch: {elapsed:.2f}s (deadline 1.0s)")
+    assert results[base_url + "/fast-1"] and results[base_url + "/medium"]
+    assert results[base_url + "/very-slow"] is None
+    assert elapsed < 1.3
+    print("✅ Passed")
+
+
+def test_per_host_limit(base_url):
+    print("\n3. Per-host limit serializes requests to one host")
+    print("=" * 50)
+    fetcher = PageFetcher(max_workers=8, per_host=1, timeout=5.0)
+    urls = [f"{base_url}/fast-1?n={i}" for i in range(3)]
+    PAGES.update({f"/fast-1?n={i}": PAGES["/fast-1"] for i in range(3)})
+
+    start = time.time()
+    fetcher.fetch_many(urls, deadline=5.0)
+    elapsed = time.time() - start
+
+    print(f"   3 x 0.2s pages with per_host=1: {elapsed:.2f}s")
+    assert elapsed >= 0.6
+    print("✅ Passed")
+
+
+def test_busy_host_does_not_starve_others(base_url):
+    print("\n5. Many URLs on one host don't block other hosts")
+    print("=" * 50)
+    # Same server under two host names: 127.0.0.1 (busy) and localhost
+    other_url = base_url.replace("127.0.0.1", "localhost") + "/fast-1"
+    PAGES.update({f"/slow?n={i}": PAGES["/slow"] for i in range(6)})
+    busy_urls = [f"{base_url}/slow?n={i}" for i in range(6)]
+    fetcher = PageFetcher(max_workers=2, per_host=1, timeout=5.0)
+
+    start = time.time()
+    results = fetcher.fetch_many(busy_urls + [other_url], deadline=1.5)
+    elapsed = time.time() - start
+
+    ready = sum(1 for url in busy_urls if results[url])
+    print(f"   busy host: {ready}/6 pages by the deadline, other host: {'ready' if results[other_url] else 'starved'}")
+    assert results[other_url], "other host should get a worker despite the busy host's queue"
+    assert ready == 1, "busy host stays within its per-host limit"
+    assert elapsed < 2.0
+    print("✅ Passed")
+
+
+def test_size_cap(base_url):
+    print("\n4. Oversized responses are truncated")
+    print("=" * 50)
+    fetcher = PageFetcher(max_workers=2, per_host=2, timeout=5.0, max_bytes=100_000)
+    html = fetcher.fetch(base_url + "/huge")
+    print(f"   page: {PAGES['/huge'][1]:,} bytes, read: {len(html):,} chars")
+    assert len(html) == 100_000
+    print("✅ Passed")
+
+
+class StaleCache:
+    """InternetCache stand-in: every page is cached but stale"""
+
+    def __init__(self, text):
+        self.text = text
+        self.revalidated = []
+        self.stored = {}
+
+    def get_page(self, url):
+        if url in self.stored:
+            return {"text": self.stored[url], "etag": None, "last_modified": None, "fresh": True}
+        return {"text": self.text, "etag": ETAG, "last_modified": None, "fresh": False}
+
+    def mark_page_valid(self, url):
+        self.revalidated.append(url)
+
+    def set_page(self, url, text, etag=None, last_modified=None):
+        self.stored[url] = text
+
+
+def test_crawler_uses_shared_fetcher(base_url):
+    print("\n6. Crawler batches run on the PageFetcher pool under its per-host limit")
+    print("=" * 50)
+    PAGES.update({f"/fast-1?c={i}": PAGES["/fast-1"] for i in range(3)})
+    urls = [f"{base_url}/fast-1?c={i}" for i in range(3)]
+    fetcher = PageFetcher(max_workers=8, per_host=1, timeout=5.0)
+    crawler = InternetCrawler(fetcher=fetcher, use_cache=False)
+    crawler.add_allowed_domain("127.0.0.1")
+
+    start = time.time()
+    results = crawler.fetch_and_clean_many(urls + ["https://example.com/page"], deadline=5.0)
+    elapsed = time.time() - start
+
+    print(f"   3 x 0.2s pages with per_host=1: {elapsed:.2f}s")
+    assert all(results[url] for url in urls), "fetch_page inside run_many reuses the held host slot"
+    assert results["https://example.com/page"] is None, "disallowed domain is never fetched"
+    assert elapsed >= 0.6, "pages on one host are serialized by the shared per-host limit"
+    print("✅ Passed")
+
+
+def test_crawler_revalidation(base_url):
+    print("\n7. Stale cached pages are revalidated through the fetcher")
+    print("=" * 50)
+    fetcher = PageFetcher(max_workers=2, per_host=1, timeout=5.0)
+    cache = StaleCache("cached text")
+    crawler = InternetCrawler(fetcher=fetcher, cache=cache)
+    crawler.add_allowed_domain("127.0.0.1")
+
+    url = base_url + ETAG_PATH
+    results = crawler.fetch_and_clean_many([url], deadline=5.0)
+    assert results[url] == "cached text", "304 keeps the cached text"
+    assert cache.revalidated == [url]
+
+    page = fetcher.fetch_page(url)
+    assert page["status"] == 200 and page["etag"] == ETAG and "Scheme guidelines" in page["html"]
+    print("✅ Passed")
+
+
+if __name__ == "__main__":
+    print("🧪 Internet Page Fetcher")
+    server, base_url = start_server()
+    try:
+        test_latency_bounded_by_slowest(base_url)
+        test_deadline_returns_ready_pages(base_url)
+        test_per_host_limit(base_url)
+        test_size_cap(base_url)
+        test_busy_host_does_not_starve_others(base_url)
+        test_crawler_uses_shared_fetcher(base_url)
+        test_crawler_revalidation(base_url)
+    finally:
+        server.shutdown()
+    print("\n🎉 All fetcher tests passed")
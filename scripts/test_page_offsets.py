@@ -0,0 +1,71 @@
+"""
+Test that page offsets line up with the extracted document text, for native
+text and for whole-document OCR with blank (whitespace-only) pages.
+"""
+
+import sys
+import types
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Load ingestion_v2 submodules without the package __init__ (which builds the
+# whole ingestion pipeline)
+_pkg = types.ModuleType("ingestion_v2")
+_pkg.__path__ = [str(PROJECT_ROOT / "ingestion_v2")]
+sys.modules.setdefault("ingestion_v2", _pkg)
+
+from ingestion_v2.extraction import ocr_engine
+from ingestion_v2.extraction.extract_text import TextExtractor
+
+
+def check_offsets(text, page_texts, offsets):
+    for offset in offsets:
+        page_text = page_texts[offset["page"] - 1]
+        assert text[offset["start"]:offset["end"]] == page_text, (
+            f"page {offset['page']} at {offset['start']}:{offset['end']} "
+            f"reads {text[offset['start']:offset['end']]!r}, expected {page_text!r}"
+        )
+
+
+def test_native_pages():
+    print("\n1. Native text: offsets match assemble_text")
+    print("=" * 50)
+    page_texts = ["Page one text", "", "Page three text", "Page four"]
+    tables = [{"formatted_text": "| a | b |"}]
+    text = TextExtractor.assemble_text(page_texts, tables)
+    offsets = TextExtractor.page_offsets(page_texts)
+    assert [o["page"] for o in offsets] == [1, 3, 4]
+    check_offsets(text, page_texts, offsets)
+    print("✅ Passed")
+
+
+def test_ocr_blank_page():
+    print("\n2. Whole-document OCR: a blank scanned page doesn't shift later pages")
+    print("=" * 50)
+    ocr_output = {1: "Page one text", 2: "\x0c", 3: "Page three text", 4: "  \n", 5: "Page five"}
+
+    engine = ocr_engine.OCREngine(max_workers=1)
+    engine.available = True
+    engine.ocr_pages = lambda pdf_path, pages: {n: ocr_output[n] for n in pages}
+    # Page count normally comes from poppler; no PDF is read here
+    ocr_engine.pdf2image = types.SimpleNamespace(pdfinfo_from_path=lambda path: {"Pages": len(ocr_output)})
+
+    result = engine.ocr_pdf(Path("scanned.pdf"))
+    assert result["success"], result
+    offsets = TextExtractor.page_offsets(result["page_texts"])
+    print(f"   text: {result['text']!r}")
+    print(f"   offsets: {offsets}")
+    assert [o["page"] for o in offsets] == [1, 3, 5]
+    check_offsets(result["text"], result["page_texts"], offsets)
+    assert result["text"][offsets[1]["start"]:].startswith("Page three text")
+    print("✅ Passed")
+
+
+if __name__ == "__main__":
+    print("🧪 Page Offsets")
+    test_native_pages()
+    test_ocr_blank_page()
+    print("\n🎉 All page offset tests passed")
@@ -0,0 +1,143 @@
+"""
+Test prompt prefix/suffix assembly and prefix cache accounting with a fake
+Gemini client (no network, no credentials).
+"""
+
+import sys
+import types
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Load retrieval_v3 submodules without the package __init__ (which pulls in
+# the whole retrieval stack)
+_pkg = types.ModuleType("retrieval_v3")
+_pkg.__path__ = [str(PROJECT_ROOT / "retrieval_v3")]
+sys.modules.setdefault("retrieval_v3", _pkg)
+
+from retrieval_v3.answer_generation.prompt_cache import PromptPrefixCache, PrefixCachedLLM
+from retrieval_v3.answer_generation.prompt_templates import build_prompt_parts, get_prompt_template
+from retrieval_v3.answer_generation.diagnostic_prompts import get_diagnostic_prompt_parts
+from retrieval_v3.answer_generation.diagnostic_runner import _run_diagnostic_llm
+
+
+class FakeResponse:
+    def __init__(self, text, cached_tokens=0):
+        self.text = text
+        self.usage_metadata = types.SimpleNamespace(cached_content_token_count=cached_tokens)
+
+
+class FakeClient:
+    """Records caches.create / models.generate_content calls"""
+
+    def __init__(self, fail_create=False):
+        self.created = []
+        self.calls = []
+        self.fail_create = fail_create
+        self.caches = types.SimpleNamespace(create=self._create)
+        self.models = types.SimpleNamespace(generate_content=self._generate)
+
+    def _create(self, model, config):
+        if self.fail_create:
+            raise RuntimeError("context caching not supported")
+        self.created.append(config)
+        return types.SimpleNamespace(name=f"cachedContents/{len(self.created)}")
+
+    def _generate(self, model, contents, config):
+        self.calls.append({"text": contents[0]["parts"][0]["text"], "config": config})
+        cached = 1000 if config.get("cached_content") else 0
+        return FakeResponse("ok", cached)
+
+
+def test_prompt_split():
+    print("\n1. Templates split into static prefix + per-request suffix")
+    print("=" * 50)
+    for mode in ["qa", "deep_think", "brainstorm", "policy_brief", "policy_draft"]:
+        a = build_prompt_parts(mode, "What is GO 24?", "[Doc 1] alpha", "")
+        b = build_prompt_parts(mode, "Teacher transfers?", "[Doc 1] beta", "User: hi")
+        full = get_prompt_template(mode).format(
+            query="What is GO 24?", documents_with_metadata="[Doc 1] alpha", conversation_history=""
+        )
+        assert a.text == full, f"{mode}: prefix + suffix must equal the filled template"
+        assert a.prefix == b.prefix, f"{mode}: prefix must not depend on the request"
+        assert "What is GO 24?" in a.suffix and "[Doc 1] alpha" in a.suffix
+        assert len(a.prefix) > len(a.suffix) - len("[Doc 1] alpha"), f"{mode}: static part should dominate"
+        print(f"   {mode:13s} prefix {len(a.prefix):5d} chars, suffix {len(a.suffix):4d} chars")
+
+    diag = get_diagnostic_prompt_parts("q?", "docs", "answer")
+    assert "q?" not in diag.prefix and "q?" in diag.suffix
+    print("✅ Passed")
+
+
+def test_provider_cache_accounting():
+    print("\n2. Prefix cached once, then only suffixes are sent")
+    print("=" * 50)
+    client = FakeClient()
+    cache = PromptPrefixCache(ttl_seconds=3600, min_provider_tokens=100)
+
+    for query in ["What is GO 24?", "Teacher transfers?", "FLN targets?"]:
+        parts = build_prompt_parts("qa", query, "[Doc 1] text", "")
+        cache.generate(client, "gemini-2.5-flash", parts, {"temperature": 0.2}, label="qa")
+
+    stats = cache.get_stats()
+    print(f"   creates={stats['provider_creates']} hits={stats['provider_hits']} "
+          f"reuse_rate={stats['reuse_rate']} cached_tokens={stats['cached_tokens']}")
+    assert len(client.created) == 1
+    assert client.created[0]["contents"][0]["parts"][0]["text"] == parts.prefix
+    assert all(call["config"]["cached_content"] == "cachedContents/1" for call in client.calls)
+    assert all(call["text"] == build_prompt_parts("qa", q, "[Doc 1] text", "").suffix
+               for call, q in zip(client.calls, ["What is GO 24?", "Teacher transfers?", "FLN targets?"]))
+    assert client.calls[0]["config"]["temperature"] == 0.2
+    assert stats["provider_creates"] == 1 and stats["provider_hits"] == 2
+    assert stats["prefix_reuses"] == 2 and stats["reuse_rate"] == round(2 / 3, 3)
+    assert stats["cached_tokens"] == 3000
+    print("✅ Passed")
+
+
+def test_local_fallback():
+    print("\n3. Small prefixes and failed cache creation fall back to full prompts")
+    print("=" * 50)
+    parts = build_prompt_parts("policy_brief", "Brief on RTE", "[Doc 1] text", "")
+
+    client = FakeClient()
+    cache = PromptPrefixCache(min_provider_tokens=10 ** 6)
+    cache.generate(client, "m", parts)
+    assert not client.created and client.calls[0]["text"] == parts.text
+    assert "cached_content" not in client.calls[0]["config"]
+
+    client = FakeClient(fail_create=True)
+    cache = PromptPrefixCache(min_provider_tokens=10)
+    cache.generate(client, "m", parts)
+    cache.generate(client, "m", parts)
+    stats = cache.get_stats()
+    assert [call["text"] for call in client.calls] == [parts.text, parts.text]
+    assert stats["provider_errors"] == 1, "creation is not retried on every request"
+    assert stats["local_fallbacks"] == 2 and stats["prefix_reuses"] == 1
+    print(f"   fallbacks={stats['local_fallbacks']} errors={stats['provider_errors']}")
+    print("✅ Passed")
+
+
+def test_diagnostic_llm():
+    print("\n4. Diagnostic runner passes prompt parts to a prefix-caching LLM")
+    print("=" * 50)
+    client = FakeClient()
+    llm = PrefixCachedLLM(client, "m", PromptPrefixCache(min_provider_tokens=10))
+    for query in ["q1?", "q2?"]:
+        _run_diagnostic_llm(llm, get_diagnostic_prompt_parts(query, "docs", "answer"))
+    assert len(client.created) == 1 and len(client.calls) == 2
+
+    plain_prompts = []
+    _run_diagnostic_llm(lambda p: plain_prompts.append(p) or "ok", get_diagnostic_prompt_parts("q3?", "docs", "answer"))
+    assert plain_prompts[0].endswith(get_diagnostic_prompt_parts("q3?", "docs", "answer").suffix)
+    print("✅ Passed")
+
+
+if __name__ == "__main__":
+    print("🧪 Prompt Prefix Cache")
+    test_prompt_split()
+    test_provider_cache_accounting()
+    test_local_fallback()
+    test_diagnostic_llm()
+    print("\n🎉 All prompt cache tests passed")
@@ -0,0 +1,130 @@
+"""
+Test the bulk Qdrant writer against an in-memory Qdrant: batch splitting by
+point count and request bytes, and the final wait=True barrier in flush().
+"""
+
+import sys
+import types
+import threading
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Load ingestion_v2 submodules without the package __init__ (which builds the
+# whole ingestion pipeline)
+_pkg = types.ModuleType("ingestion_v2")
+_pkg.__path__ = [str(PROJECT_ROOT / "ingestion_v2")]
+sys.modules.setdefault("ingestion_v2", _pkg)
+
+from qdrant_client import QdrantClient
+
+from ingestion_v2.embedding.qdrant_writer import QdrantWriter, estimate_point_bytes
+
+VECTOR_SIZE = 8
+COLLECTION = "test_chunks"
+
+
+class RecordingClient:
+    """QdrantClient proxy that records every upsert (batch size, wait flag, last id)"""
+
+    def __init__(self, client: QdrantClient):
+        self._client = client
+        self._lock = threading.Lock()
+        self.upserts = []
+
+    def upsert(self, collection_name, points, wait=True, **kwargs):
+        with self._lock:
+            self.upserts.append((len(points), wait, points[-1].id))
+        return self._client.upsert(collection_name=collection_name, points=points, wait=wait, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def make_points(writer, count, text="chunk text"):
+    chunks = [
+        {"doc_id": "go24", "chunk_id": f"go24#{i}", "content": f"{text} {i}", "vertical": "go"}
+        for i in range(count)
+    ]
+    return [writer.make_point(chunk, [0.1 * (i % 10)] * VECTOR_SIZE) for i, chunk in enumerate(chunks)]
+
+
+def new_writer(**kwargs):
+    client = RecordingClient(QdrantClient(":memory:"))
+    writer = QdrantWriter(client, vector_size=VECTOR_SIZE, create_indexes=False, **kwargs)
+    writer.ensure_collection(COLLECTION)
+    return client, writer
+
+
+def test_split_by_point_count():
+    print("\n1. Batches are capped by point count")
+    print("=" * 50)
+    client, writer = new_writer(max_batch_points=4, workers=2)
+    futures = writer.upsert(COLLECTION, make_points(writer, 10))
+    assert sorted(f.result() for f in futures) == [2, 4, 4]
+    report = writer.flush()
+    writer.close()
+
+    batch_sizes = [size for size, wait, _ in client.upserts if not wait]
+    print(f"   batches: {batch_sizes}")
+    assert sorted(batch_sizes) == [2, 4, 4]
+    assert report["points"] == 10 and report["batches"] == 3
+    assert client.count(COLLECTION).count == 10
+    print("✅ Passed")
+
+
+def test_split_by_bytes():
+    print("\n2. Batches are capped by estimated request bytes")
+    print("=" * 50)
+    client, writer = new_writer(max_batch_points=1000, workers=1)
+    points = make_points(writer, 12, text="x" * 500)
+    per_point = max(estimate_point_bytes(p) for p in points)
+    writer.batch_bytes = per_point * 5
+
+    batches = writer._batches(points)
+    print(f"   {per_point} bytes/point, limit {writer.batch_bytes}: {[len(b) for b, _ in batches]}")
+    assert [len(b) for b, _ in batches] == [5, 5, 2]
+    assert all(size <= writer.batch_bytes for _, size in batches)
+    assert [p.id for b, _ in batches for p in b] == [p.id for p in points], "order kept"
+
+    writer.upsert(COLLECTION, points)
+    writer.close()
+    assert client.count(COLLECTION).count == 12
+    print("✅ Passed")
+
+
+def test_flush_barrier():
+    print("\n3. flush() ends with one wait=True upsert per touched collection")
+    print("=" * 50)
+    client, writer = new_writer(max_batch_points=3, workers=3)
+    writer.ensure_collection("other_chunks")
+    points = make_points(writer, 7)
+    writer.upsert(COLLECTION, points)
+    writer.upsert("other_chunks", points[:2])
+    writer.flush()
+
+    waited = [(size, last_id) for size, wait, last_id in client.upserts if wait]
+    print(f"   upserts: {len(client.upserts)}, barriers: {waited}")
+    assert len(waited) == 2, "one barrier per collection"
+    assert all(size == 1 for size, _ in waited), "barrier re-sends a single point"
+    assert all(wait for _, wait, _ in client.upserts[-2:]), "barriers come after every batch"
+    batch_ends = {last_id for _, wait, last_id in client.upserts if not wait}
+    assert {last_id for _, last_id in waited} <= batch_ends, "barrier repeats a batch's last point"
+
+    # A second flush with nothing queued sends no barrier
+    sent = len(client.upserts)
+    writer.flush()
+    assert len(client.upserts) == sent
+    writer.close()
+    assert client.count(COLLECTION).count == 7 and client.count("other_chunks").count == 2
+    print("✅ Passed")
+
+
+if __name__ == "__main__":
+    print("🧪 Qdrant Writer")
+    test_split_by_point_count()
+    test_split_by_bytes()
+    test_flush_barrier()
+    print("\n🎉 All Qdrant writer tests passed")
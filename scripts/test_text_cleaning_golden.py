@@ -0,0 +1,74 @@
+"""
+Golden-corpus test for ingestion text cleaning.
+
+scripts/fixtures/cleaning_golden.json holds inputs with the output of the
+original sequential cleaner (TextCleaner.clean then NormalizationRules.apply_all,
+before the compiled RuleSet engine). The compiled rules must reproduce those
+outputs byte for byte. The expected outputs come from the old implementation:
+add new cases with the reference output, never by regenerating from the
+current code.
+"""
+
+import sys
+import json
+import types
+from pathlib import Path
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# Load ingestion_v2 submodules without the package __init__ (which builds the
+# whole ingestion pipeline)
+_pkg = types.ModuleType("ingestion_v2")
+_pkg.__path__ = [str(PROJECT_ROOT / "ingestion_v2")]
+sys.modules.setdefault("ingestion_v2", _pkg)
+
+from ingestion_v2.cleaning.text_cleaner import TextCleaner
+from ingestion_v2.cleaning.normalization_rules import NormalizationRules
+
+GOLDEN_FILE = Path(__file__).parent / "fixtures" / "cleaning_golden.json"
+
+
+def load_cases():
+    with open(GOLDEN_FILE, encoding="utf-8") as f:
+        return json.load(f)["cases"]
+
+
+def test_golden_corpus():
+    print("\n1. Compiled rules match the reference cleaner byte for byte")
+    print("=" * 50)
+    cleaner = TextCleaner()
+    cases = load_cases()
+    mismatches = []
+    for case in cases:
+        cleaned, _ = cleaner.clean_with_hits(case["input"])
+        output, _ = NormalizationRules.apply_with_hits(cleaned)
+        if output != case["expected"]:
+            mismatches.append(case["name"])
+            if len(mismatches) <= 3:
+                print(f"   ❌ {case['name']}")
+                print(f"      expected: {case['expected']!r}")
+                print(f"      got:      {output!r}")
+    print(f"   {len(cases) - len(mismatches)}/{len(cases)} cases match")
+    assert not mismatches, f"{len(mismatches)} golden cases differ: {mismatches[:10]}"
+    print("✅ Passed")
+
+
+def test_entry_points_agree():
+    print("\n2. clean/apply_all and the hit-counting variants give the same text")
+    print("=" * 50)
+    cleaner = TextCleaner()
+    for case in load_cases():
+        cleaned, hits = cleaner.clean_with_hits(case["input"])
+        assert cleaner.clean(case["input"]) == cleaned, case["name"]
+        assert all(count > 0 for count in hits.values()), case["name"]
+        assert NormalizationRules.apply_all(cleaned) == NormalizationRules.apply_with_hits(cleaned)[0], case["name"]
+    print("✅ Passed")
+
+
+if __name__ == "__main__":
+    print("🧪 Text Cleaning Golden Corpus")
+    test_golden_corpus()
+    test_entry_points_agree()
+    print("\n🎉 All text cleaning golden tests passed")